@@ -8,6 +8,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
@@ -23,15 +24,26 @@ from .serializers import (
 try:
     from auth_package import (
         TOTPProvider, SMSProvider, EmailProvider,
-        SessionManager, DeviceInfo, 
-        AuditLogger, AuditEventType, AuditSeverity,
-        PasswordValidator, AccountLockoutManager,
+        DeviceInfo,
+        AuditEventType, AuditSeverity,
+        PasswordValidator,
         JWTStrategy, JWTConfig
     )
+    from auth_package.audit_logging import default_audit_logger
+    from auth_package.password_policies import default_lockout_manager
+    from auth_package.session_management import default_session_manager
+    from auth_package.token_state import default_token_state
     AUTH_PACKAGE_AVAILABLE = True
 except ImportError:
     AUTH_PACKAGE_AVAILABLE = False
 
+# Views are instantiated per request, so stateful auth services are shared
+# process-wide; their state lives in the AUTH_STATE_STORE backend.
+if AUTH_PACKAGE_AVAILABLE:
+    jwt_strategy = JWTStrategy(JWTConfig(
+        secret_key=getattr(settings, 'JWT_SECRET_KEY', settings.SECRET_KEY)
+    ), token_state=default_token_state)
+
 User = get_user_model()
 
 
@@ -100,11 +112,10 @@ class LoginView(APIView):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if AUTH_PACKAGE_AVAILABLE:
-            self.lockout_manager = AccountLockoutManager()
-            self.audit_logger = AuditLogger()
-            self.session_manager = SessionManager()
-            jwt_config = JWTConfig(secret_key="your-secret-key")  # Use from settings
-            self.jwt_strategy = JWTStrategy(jwt_config)
+            self.lockout_manager = default_lockout_manager
+            self.audit_logger = default_audit_logger
+            self.session_manager = default_session_manager
+            self.jwt_strategy = jwt_strategy
     
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -396,7 +407,7 @@ class MFASetupView(APIView):
             self.totp_provider = TOTPProvider()
             self.sms_provider = SMSProvider()
             self.email_provider = EmailProvider()
-            self.audit_logger = AuditLogger()
+            self.audit_logger = default_audit_logger
     
     def post(self, request):
         if not AUTH_PACKAGE_AVAILABLE:
@@ -487,7 +498,7 @@ class MFAVerifyView(APIView):
             self.totp_provider = TOTPProvider()
             self.sms_provider = SMSProvider()
             self.email_provider = EmailProvider()
-            self.audit_logger = AuditLogger()
+            self.audit_logger = default_audit_logger
     
     def post(self, request):
         if not AUTH_PACKAGE_AVAILABLE:
@@ -569,8 +580,8 @@ class SessionManagementView(APIView):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if AUTH_PACKAGE_AVAILABLE:
-            self.session_manager = SessionManager()
-            self.audit_logger = AuditLogger()
+            self.session_manager = default_session_manager
+            self.audit_logger = default_audit_logger
     
     def get(self, request):
         """Get active sessions for current user."""
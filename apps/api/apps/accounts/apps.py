@@ -9,3 +9,16 @@ class AccountsConfig(AppConfig):
     def ready(self):
         """Initialize account configurations when Django starts."""
         import apps.accounts.signals
+        
+        # Point the auth package's shared managers at AUTH_STATE_STORE, its
+        # audit logger at AUTH_AUDIT_LOGGER and its password hasher at
+        # AUTH_PASSWORD_HASHING
+        try:
+            from auth_package.django_integration import (
+                configure_audit_logger, configure_password_hasher, configure_state_store
+            )
+        except ImportError:
+            return
+        configure_state_store()
+        configure_audit_logger()
+        configure_password_hasher()
@@ -0,0 +1,63 @@
+"""
+Database storage for the auth package's audit events.
+
+``AUTH_AUDIT_LOGGER['DATABASE_WRITER']`` points the package's audit logger
+at ``store_auth_audit_events``, which its background writer calls with
+each batch of events; the batch becomes one ``bulk_create`` of
+``AuditLog`` rows.
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, connection
+
+from apps.core.models import AuditLog
+
+User = get_user_model()
+
+ACTION_TYPES = {
+    'login_success': AuditLog.ActionType.LOGIN,
+    'logout': AuditLog.ActionType.LOGOUT,
+    'permission_granted': AuditLog.ActionType.PERMISSION_CHANGE,
+    'role_assigned': AuditLog.ActionType.PERMISSION_CHANGE,
+    'role_removed': AuditLog.ActionType.PERMISSION_CHANGE,
+    'account_created': AuditLog.ActionType.CREATE,
+    'account_updated': AuditLog.ActionType.UPDATE,
+    'account_deleted': AuditLog.ActionType.DELETE,
+}
+
+
+def existing_user_ids(user_ids):
+    """Map the events' user ids to the primary keys of users that exist."""
+    pks = {}
+    for user_id in user_ids:
+        try:
+            pks[user_id] = User._meta.pk.to_python(user_id)
+        except ValidationError:
+            continue
+    found = set(User.objects.filter(pk__in=pks.values()).values_list('pk', flat=True))
+    return {user_id: pk for user_id, pk in pks.items() if pk in found}
+
+
+def store_auth_audit_events(events):
+    """Insert a batch of auth package audit events as ``AuditLog`` rows."""
+    # The background writer thread keeps its own connection; recycle it
+    # between batches the way request_finished does for request threads
+    if not connection.in_atomic_block:
+        close_old_connections()
+    users = existing_user_ids({event.user_id for event in events if event.user_id})
+    AuditLog.objects.bulk_create([
+        AuditLog(
+            action_type=ACTION_TYPES.get(event.event_type.value, AuditLog.ActionType.SECURITY_EVENT),
+            object_type='auth',
+            object_id=event.event_type.value,
+            description=f"{event.event_type.value}: {event.result}",
+            user_id=users.get(event.user_id),
+            ip_address=event.ip_address or '0.0.0.0',
+            user_agent=event.user_agent or '',
+            extra_data=json.loads(event.to_json()),
+        )
+        for event in events
+    ])
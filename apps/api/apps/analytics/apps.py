@@ -5,3 +5,7 @@ class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.analytics'
     verbose_name = 'Analytics System'
+    
+    def ready(self):
+        """Connect the dashboard metrics stream signals."""
+        import apps.analytics.signals
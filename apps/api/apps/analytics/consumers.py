@@ -4,7 +4,8 @@ Analytics WebSocket consumers for real-time dashboard updates
 
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
+
+from .live_metrics import dashboard_metrics
 
 
 class AnalyticsDashboardConsumer(AsyncWebsocketConsumer):
@@ -27,8 +28,9 @@ class AnalyticsDashboardConsumer(AsyncWebsocketConsumer):
         
         await self.accept()
         
-        # Send initial dashboard data
-        dashboard_data = await self.get_dashboard_data()
+        # Send initial dashboard data from the shared metrics state; later
+        # changes arrive as periodic ``dashboard_delta`` messages
+        dashboard_data = await dashboard_metrics.subscribe(self)
         await self.send(text_data=json.dumps({
             'type': 'dashboard_data',
             'data': dashboard_data
@@ -36,11 +38,14 @@ class AnalyticsDashboardConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
+        await dashboard_metrics.unsubscribe(self)
+        
         # Leave room group
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        if getattr(self, 'room_group_name', None):
+            await self.channel_layer.group_discard(
+                self.room_group_name,
+                self.channel_name
+            )
     
     async def receive(self, text_data):
         """Handle messages from WebSocket."""
@@ -49,7 +54,7 @@ class AnalyticsDashboardConsumer(AsyncWebsocketConsumer):
             message_type = text_data_json.get('type')
             
             if message_type == 'refresh_dashboard':
-                # Send updated dashboard data
+                # Send the full snapshot; served from memory, not the database
                 dashboard_data = await self.get_dashboard_data()
                 await self.send(text_data=json.dumps({
                     'type': 'dashboard_data',
@@ -66,34 +71,6 @@ class AnalyticsDashboardConsumer(AsyncWebsocketConsumer):
             'data': event['data']
         }))
     
-    @database_sync_to_async
-    def get_dashboard_data(self):
-        """Get current dashboard data."""
-        from django.utils import timezone
-        from datetime import timedelta
-        from .models import PageView, UserSession
-        
-        # Get data for last 24 hours
-        end_time = timezone.now()
-        start_time = end_time - timedelta(hours=24)
-        
-        # Page views
-        page_views = PageView.objects.filter(timestamp__gte=start_time)
-        total_views = page_views.count()
-        unique_views = page_views.values('ip_address').distinct().count()
-        
-        # Sessions
-        sessions = UserSession.objects.filter(started_at__gte=start_time)
-        total_sessions = sessions.count()
-        
-        # Real-time visitors (last 5 minutes)
-        recent_time = end_time - timedelta(minutes=5)
-        active_visitors = PageView.objects.filter(timestamp__gte=recent_time).values('ip_address').distinct().count()
-        
-        return {
-            'total_views': total_views,
-            'unique_views': unique_views,
-            'total_sessions': total_sessions,
-            'active_visitors': active_visitors,
-            'timestamp': end_time.isoformat()
-        }
\ No newline at end of file
+    async def get_dashboard_data(self):
+        """Get current dashboard data from the shared metrics state."""
+        return dashboard_metrics.snapshot()
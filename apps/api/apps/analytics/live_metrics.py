@@ -0,0 +1,314 @@
+"""
+Shared in-process metrics state for the real-time analytics dashboard.
+
+Every process keeps one ``DashboardMetricsState``. It is seeded from the
+database once, when the first dashboard socket connects, and is then kept
+current from the page-view/session event stream published by
+``apps.analytics.signals``. All dashboard sockets in the process receive the
+same periodic delta, so the database cost does not grow with the number of
+open dashboards.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import timedelta
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Channel layer group the analytics signals publish raw events to. Each
+# process with open dashboards joins it with exactly one channel.
+METRICS_STREAM_GROUP = 'analytics_metrics_stream'
+
+PAGE_VIEW_EVENT = 'metrics.page_view'
+SESSION_STARTED_EVENT = 'metrics.session_started'
+# Several of the events above, sent to the group in one message
+EVENT_BATCH = 'metrics.batch'
+
+
+class DashboardMetricsState:
+    """Rolling 24h dashboard counters updated incrementally."""
+
+    window = timedelta(hours=24)
+    active_window = timedelta(minutes=5)
+    # Events held while a seed query runs; the oldest are dropped beyond this
+    max_pending_events = 10000
+
+    def __init__(self):
+        self._consumers = set()
+        self._tasks = []
+        self._pending_events = deque(maxlen=self.max_pending_events)
+        self._seed_lock = None
+        # Events may be applied from request threads (no channel layer)
+        # while the event loop reads the counters
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        """Drop all counters; the next subscriber reseeds from the database."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        # Per-minute buckets of (minute, count), oldest first
+        self._view_buckets = deque()
+        self._session_buckets = deque()
+        self._total_views = 0
+        self._total_sessions = 0
+        # ip -> last seen (epoch seconds), kept in last-seen order
+        self._visitors = OrderedDict()
+        self._active_visitors = OrderedDict()
+        self._seeded_at = None
+        self._last_pushed = {}
+
+    @property
+    def is_seeded(self):
+        return self._seeded_at is not None
+
+    @property
+    def subscriber_count(self):
+        return len(self._consumers)
+
+    # Incremental updates
+
+    @staticmethod
+    def _add_to_buckets(buckets, ts, amount=1):
+        minute = int(ts // 60)
+        if buckets and buckets[-1][0] == minute:
+            buckets[-1][1] += amount
+        elif buckets and buckets[-1][0] > minute:
+            # Late event; the deque holds at most one bucket per minute
+            for index, bucket in enumerate(buckets):
+                if bucket[0] == minute:
+                    bucket[1] += amount
+                    return
+                if bucket[0] > minute:
+                    buckets.insert(index, [minute, amount])
+                    return
+        else:
+            buckets.append([minute, amount])
+
+    @staticmethod
+    def _touch(visitors, ip, ts):
+        previous = visitors.get(ip)
+        if previous is None or ts >= previous:
+            visitors[ip] = ts
+            visitors.move_to_end(ip)
+
+    def record_page_view(self, ip_address, ts):
+        """Account for a page view by ``ip_address`` at epoch time ``ts``."""
+        if not self.is_seeded or ts < self._seeded_at:
+            # Not tracking yet, or already included in the seed query
+            return
+        self._add_to_buckets(self._view_buckets, ts)
+        self._total_views += 1
+        self._touch(self._visitors, ip_address, ts)
+        self._touch(self._active_visitors, ip_address, ts)
+
+    def record_session(self, ts):
+        """Account for a session started at epoch time ``ts``."""
+        if not self.is_seeded or ts < self._seeded_at:
+            return
+        self._add_to_buckets(self._session_buckets, ts)
+        self._total_sessions += 1
+
+    def apply_event(self, message):
+        """Apply a raw event, or a batch of them, from the metrics stream group."""
+        with self._lock:
+            self._apply(message)
+
+    def _apply(self, message):
+        if message.get('type') == EVENT_BATCH:
+            for event in message['events']:
+                self._apply(event)
+            return
+        if not self.is_seeded:
+            # Hold events that race the seed query, replayed once it lands;
+            # with no dashboard open there is no seed coming, so drop them
+            if self._consumers:
+                self._pending_events.append(message)
+            return
+        event_type = message.get('type')
+        if event_type == PAGE_VIEW_EVENT:
+            self.record_page_view(message['ip_address'], message['ts'])
+        elif event_type == SESSION_STARTED_EVENT:
+            self.record_session(message['ts'])
+
+    def prune(self, now=None):
+        """Expire buckets and visitors that fell out of their windows."""
+        now = now if now is not None else timezone.now().timestamp()
+        oldest_minute = int((now - self.window.total_seconds()) // 60)
+
+        while self._view_buckets and self._view_buckets[0][0] < oldest_minute:
+            self._total_views -= self._view_buckets.popleft()[1]
+        while self._session_buckets and self._session_buckets[0][0] < oldest_minute:
+            self._total_sessions -= self._session_buckets.popleft()[1]
+
+        for visitors, window in ((self._visitors, self.window),
+                                 (self._active_visitors, self.active_window)):
+            cutoff = now - window.total_seconds()
+            while visitors:
+                ip, last_seen = next(iter(visitors.items()))
+                if last_seen >= cutoff:
+                    break
+                visitors.popitem(last=False)
+
+    # Reading
+
+    def snapshot(self):
+        """Return the full dashboard payload."""
+        now = timezone.now()
+        with self._lock:
+            self.prune(now.timestamp())
+            return {
+                'total_views': self._total_views,
+                'unique_views': len(self._visitors),
+                'total_sessions': self._total_sessions,
+                'active_visitors': len(self._active_visitors),
+                'timestamp': now.isoformat()
+            }
+
+    def delta(self):
+        """Return the metrics changed since the previous delta, or None."""
+        with self._lock:
+            snapshot = self.snapshot()
+            changed = {
+                key: value for key, value in snapshot.items()
+                if key != 'timestamp' and self._last_pushed.get(key) != value
+            }
+            if not changed:
+                return None
+            self._last_pushed.update(changed)
+        changed['timestamp'] = snapshot['timestamp']
+        return changed
+
+    # Seeding
+
+    def load_from_database(self, now=None):
+        """Seed the counters with three aggregate queries over the window."""
+        from django.db.models import Count, Max
+        from django.db.models.functions import TruncMinute
+        from .models import PageView, UserSession
+
+        now = now or timezone.now()
+        start_time = now - self.window
+
+        page_views = PageView.objects.filter(timestamp__gte=start_time, timestamp__lt=now)
+        view_rows = list(
+            page_views.annotate(minute=TruncMinute('timestamp'))
+            .values('minute').annotate(count=Count('id')).order_by('minute')
+        )
+        visitor_rows = list(
+            page_views.values('ip_address')
+            .annotate(last_seen=Max('timestamp')).order_by('last_seen')
+        )
+        session_rows = list(
+            UserSession.objects.filter(started_at__gte=start_time, started_at__lt=now)
+            .annotate(minute=TruncMinute('started_at'))
+            .values('minute').annotate(count=Count('id')).order_by('minute')
+        )
+
+        with self._lock:
+            self._clear()
+            for row in view_rows:
+                self._view_buckets.append([int(row['minute'].timestamp() // 60), row['count']])
+                self._total_views += row['count']
+            for row in session_rows:
+                self._session_buckets.append([int(row['minute'].timestamp() // 60), row['count']])
+                self._total_sessions += row['count']
+
+            active_cutoff = (now - self.active_window).timestamp()
+            for row in visitor_rows:
+                last_seen = row['last_seen'].timestamp()
+                self._visitors[row['ip_address']] = last_seen
+                if last_seen >= active_cutoff:
+                    self._active_visitors[row['ip_address']] = last_seen
+
+            self._seeded_at = now.timestamp()
+
+    # Subscriptions
+
+    async def subscribe(self, consumer):
+        """Register a dashboard socket and return the current snapshot."""
+        if self._seed_lock is None:
+            self._seed_lock = asyncio.Lock()
+
+        self._consumers.add(consumer)
+        async with self._seed_lock:
+            if not self._tasks:
+                await self._start()
+            if not self.is_seeded:
+                await database_sync_to_async(self.load_from_database)()
+                pending = list(self._pending_events)
+                self._pending_events.clear()
+                for message in pending:
+                    self.apply_event(message)
+                self._last_pushed = {
+                    key: value for key, value in self.snapshot().items()
+                    if key != 'timestamp'
+                }
+        return self.snapshot()
+
+    async def unsubscribe(self, consumer):
+        """Remove a dashboard socket, stopping the pump when none are left."""
+        self._consumers.discard(consumer)
+        if not self._consumers and self._tasks:
+            for task in self._tasks:
+                task.cancel()
+            self._tasks = []
+            self._pending_events.clear()
+            # Events are not collected while idle, so reseed on next use
+            self._reset()
+
+    async def _start(self):
+        # Join the stream before seeding so no event falls between the two
+        channel_layer = get_channel_layer()
+        if channel_layer is not None:
+            channel = await channel_layer.new_channel()
+            await channel_layer.group_add(METRICS_STREAM_GROUP, channel)
+            self._tasks.append(
+                asyncio.create_task(self._consume_stream(channel_layer, channel))
+            )
+        self._tasks.append(asyncio.create_task(self._push_loop()))
+
+    async def _consume_stream(self, channel_layer, channel):
+        try:
+            while True:
+                self.apply_event(await channel_layer.receive(channel))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Analytics metrics stream stopped')
+        finally:
+            await asyncio.shield(channel_layer.group_discard(METRICS_STREAM_GROUP, channel))
+
+    async def _push_loop(self):
+        interval = settings.WEBSOCKET_SETTINGS.get('DASHBOARD_PUSH_INTERVAL', 2)
+        while True:
+            await asyncio.sleep(interval)
+            await self.push_delta()
+
+    async def push_delta(self):
+        """Send the pending delta, serialized once, to every local dashboard."""
+        if not self.is_seeded:
+            return
+        delta = self.delta()
+        if delta is None:
+            return
+        text_data = json.dumps({'type': 'dashboard_delta', 'data': delta})
+        for consumer in list(self._consumers):
+            try:
+                await consumer.send(text_data=text_data)
+            except Exception:
+                logger.warning('Dropping dashboard socket after failed push')
+                self._consumers.discard(consumer)
+
+
+dashboard_metrics = DashboardMetricsState()
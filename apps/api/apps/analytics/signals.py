@@ -0,0 +1,121 @@
+"""
+Analytics signals feeding the real-time dashboard metrics stream.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .live_metrics import (
+    EVENT_BATCH, METRICS_STREAM_GROUP, PAGE_VIEW_EVENT, SESSION_STARTED_EVENT,
+    dashboard_metrics
+)
+from .models import PageView, UserSession
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsEventPublisher:
+    """
+    Queue metrics events and send them to the stream group in batches.
+
+    A daemon thread flushes the queue every ``METRICS_FLUSH_INTERVAL``
+    seconds, so tracked requests never wait on the channel layer and the
+    layer sees one message per interval instead of one per request.
+    """
+
+    max_batch_size = 500
+    # Events kept while the channel layer is slow; the oldest are dropped beyond this
+    max_queued_events = 10000
+
+    def __init__(self):
+        self._events = deque(maxlen=self.max_queued_events)
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def publish(self, event):
+        """Queue ``event`` for the next flush."""
+        self._events.append(event)
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            self._start()
+
+    def _start(self):
+        with self._thread_lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='analytics-metrics-publisher', daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        interval = settings.WEBSOCKET_SETTINGS.get('METRICS_FLUSH_INTERVAL', 0.5)
+        stop = threading.Event()
+        while not stop.wait(interval):
+            self.flush()
+
+    def flush(self):
+        """Send every queued event; returns the number of events sent."""
+        sent = 0
+        while self._events:
+            batch = []
+            while self._events and len(batch) < self.max_batch_size:
+                batch.append(self._events.popleft())
+            try:
+                async_to_sync(get_channel_layer().group_send)(
+                    METRICS_STREAM_GROUP, {'type': EVENT_BATCH, 'events': batch}
+                )
+            except Exception as e:
+                # The batch is lost; dashboards resync when they reconnect
+                logger.warning(f"Failed to publish analytics metrics events: {e}")
+                continue
+            sent += len(batch)
+        return sent
+
+
+metrics_publisher = MetricsEventPublisher()
+
+
+def publish_metrics_event(event):
+    """Publish a compact event once the transaction that saved it commits."""
+    transaction.on_commit(lambda: send_metrics_event(event))
+
+
+def send_metrics_event(event):
+    """Hand a compact event to every process with open dashboards."""
+    if get_channel_layer() is None:
+        # No cross-process transport; feed this process' state directly
+        dashboard_metrics.apply_event(event)
+        return
+    metrics_publisher.publish(event)
+
+
+@receiver(post_save, sender=PageView)
+def publish_page_view(sender, instance, created, **kwargs):
+    """Stream new page views to the dashboard metrics state."""
+    if created:
+        publish_metrics_event({
+            'type': PAGE_VIEW_EVENT,
+            'ip_address': instance.ip_address,
+            'ts': instance.timestamp.timestamp(),
+        })
+
+
+@receiver(post_save, sender=UserSession)
+def publish_session_started(sender, instance, created, **kwargs):
+    """Stream new sessions to the dashboard metrics state."""
+    if created:
+        publish_metrics_event({
+            'type': SESSION_STARTED_EVENT,
+            'ts': instance.started_at.timestamp(),
+        })
@@ -5,6 +5,8 @@ API v1 URL Configuration
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from apps.core.export_jobs import ExportJobViewSet
+
 app_name = 'v1'
 
 # Create router for ViewSets
@@ -15,6 +17,7 @@ router = DefaultRouter()
 # router.register(r'categories', CategoryViewSet, basename='category')
 # router.register(r'tags', TagViewSet, basename='tag')
 # router.register(r'comments', CommentViewSet, basename='comment')
+router.register(r'exports', ExportJobViewSet, basename='export-job')
 
 urlpatterns = [
     # Include router URLs
@@ -3,6 +3,8 @@ Blog API Views
 RESTful API endpoints for blog functionality with advanced features.
 """
 
+import uuid
+
 from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -14,7 +16,7 @@ from django.utils import timezone
 from .models import Post, Category, Tag, PostView
 from .serializers import (
     PostSerializer, PostDetailSerializer, PostCreateUpdateSerializer,
-    CategorySerializer, TagSerializer, PostViewSerializer
+    PostImportSerializer, CategorySerializer, TagSerializer, PostViewSerializer
 )
 from .filters import PostFilter
 
@@ -77,6 +79,8 @@ class PostViewSet(SmartCacheMixin, ConditionalCacheMixin, ETagCacheMixin,
             return PostDetailSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return PostCreateUpdateSerializer
+        elif self.action in ['import_csv', 'import_json', 'import_excel', 'bulk_import']:
+            return PostImportSerializer
         return PostSerializer
     
     def get_permissions(self):
@@ -89,7 +93,7 @@ class PostViewSet(SmartCacheMixin, ConditionalCacheMixin, ETagCacheMixin,
             permission_classes = [permissions.IsAuthenticated, RoleBasedPermission]
         elif self.action in ['bulk_create', 'bulk_update', 'bulk_delete']:
             permission_classes = [permissions.IsAuthenticated, RoleBasedPermission]
-        elif self.action in ['import_csv', 'import_json', 'import_excel']:
+        elif self.action in ['import_csv', 'import_json', 'import_excel', 'bulk_import']:
             permission_classes = [permissions.IsAuthenticated, IsStaffOrReadOnly]
         else:
             permission_classes = [permissions.AllowAny]
@@ -187,28 +191,78 @@ class PostViewSet(SmartCacheMixin, ConditionalCacheMixin, ETagCacheMixin,
         """Get required fields for import."""
         return ['title', 'content', 'author']
     
+    import_slug_fields = {'slug': 'title'}
+    
+    def prepare_import_batch(self, rows, file_format):
+        """Resolve the batch's authors, categories and tags with one query each."""
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+        
+        usernames = {row['author'] for row in rows if isinstance(row.get('author'), str)}
+        category_names = {row['category'] for row in rows if isinstance(row.get('category'), str)}
+        tag_names = set()
+        for row in rows:
+            if isinstance(row.get('tags'), str):
+                row['tags'] = [name.strip() for name in row['tags'].split(',') if name.strip()]
+            if isinstance(row.get('tags'), list):
+                tag_names.update(name for name in row['tags'] if isinstance(name, str))
+        
+        self.import_lookups = {
+            'authors': dict(
+                User.objects.filter(username__in=usernames).values_list('username', 'id')
+            ) if usernames else {},
+            'categories': dict(
+                Category.objects.filter(name__in=category_names).values_list('name', 'id')
+            ) if category_names else {},
+            'tags': dict(
+                Tag.objects.filter(name__in=tag_names).values_list('name', 'id')
+            ) if tag_names else {},
+        }
+    
     def transform_import_row(self, row, file_format):
         """Transform import row data."""
+        lookups = self.import_lookups
+        
         # Handle author field - convert username to user ID
-        if 'author' in row:
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            try:
-                if isinstance(row['author'], str):
-                    user = User.objects.get(username=row['author'])
-                    row['author'] = user.id
-            except User.DoesNotExist:
-                row['author'] = self.request.user.id
+        if isinstance(row.get('author'), str):
+            row['author'] = lookups['authors'].get(row['author'], self.request.user.id)
         
         # Handle category field
-        if 'category' in row and isinstance(row['category'], str):
-            try:
-                category = Category.objects.get(name=row['category'])
-                row['category'] = category.id
-            except Category.DoesNotExist:
-                row.pop('category', None)
+        if isinstance(row.get('category'), str):
+            if row['category'] in lookups['categories']:
+                row['category'] = lookups['categories'][row['category']]
+            else:
+                row.pop('category')
+        
+        # Handle tags given by name; unknown names are ignored
+        if isinstance(row.get('tags'), list):
+            tag_ids = []
+            for tag in row['tags']:
+                if tag in lookups['tags']:
+                    tag_ids.append(lookups['tags'][tag])
+                elif self.is_tag_id(tag):
+                    tag_ids.append(tag)
+            row['tags'] = tag_ids
         
         return row
+    
+    @staticmethod
+    def is_tag_id(value):
+        """Check whether an imported tag reference is an ID rather than a name."""
+        try:
+            uuid.UUID(str(value))
+        except ValueError:
+            return False
+        return True
+    
+    def prepare_import_instances(self, instances):
+        """Compute published_at and reading time, which save() would set."""
+        for post in instances:
+            post.update_derived_fields()
+    
+    def prepare_bulk_update_instances(self, instances):
+        """Recompute published_at and reading time for bulk updates."""
+        self.prepare_import_instances(instances)
 
 
 class CategoryViewSet(SmartCacheMixin, BulkOperationMixin, DataExportMixin,
@@ -201,6 +201,12 @@ class Post(models.Model):
         if not self.slug:
             self.slug = slugify(self.title)
         
+        self.update_derived_fields()
+        
+        super().save(*args, **kwargs)
+    
+    def update_derived_fields(self):
+        """Set fields computed from others; also used before bulk inserts."""
         # Auto-set published_at when status changes to published
         if self.status == self.PostStatus.PUBLISHED and not self.published_at:
             self.published_at = timezone.now()
@@ -209,8 +215,6 @@ class Post(models.Model):
         if self.content:
             word_count = len(self.content.split())
             self.reading_time = max(1, word_count // 200)  # Assume 200 words per minute
-        
-        super().save(*args, **kwargs)
     
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'slug': self.slug})
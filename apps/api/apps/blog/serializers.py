@@ -153,6 +153,23 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
         return instance
 
 
+class PostImportSerializer(serializers.ModelSerializer):
+    """Serializer for validating rows of bulk post imports."""
+    
+    class Meta:
+        model = Post
+        fields = [
+            'title', 'slug', 'excerpt', 'content', 'author', 'category', 'tags',
+            'featured_image_alt', 'status', 'post_type', 'is_featured',
+            'allow_comments', 'published_at', 'meta_title', 'meta_description',
+            'meta_keywords'
+        ]
+        extra_kwargs = {
+            # Generated from the title when missing
+            'slug': {'required': False},
+        }
+
+
 class PostViewSerializer(serializers.ModelSerializer):
     """Serializer for post views."""
     
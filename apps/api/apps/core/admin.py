@@ -4,7 +4,8 @@ Core admin configuration
 
 from django.contrib import admin
 from .models import (
-    SiteConfiguration, MenuItem, Redirect, APIKey, AuditLog, CacheInvalidation
+    SiteConfiguration, MenuItem, Redirect, APIKey, AuditLog, CacheInvalidation,
+    ExportJob
 )
 
 
@@ -154,4 +155,17 @@ class CacheInvalidationAdmin(admin.ModelAdmin):
         return False
     
     def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Background export job admin."""
+    
+    list_display = ('id', 'user', 'export_format', 'status', 'processed_rows', 'total_rows', 'created_at')
+    list_filter = ('status', 'export_format', 'created_at')
+    search_fields = ('id', 'user__username', 'file_name')
+    readonly_fields = ('created_at', 'started_at', 'completed_at', 'checksum', 'file_size')
+    
+    def has_add_permission(self, request):
+        return False
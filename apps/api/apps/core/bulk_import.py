@@ -0,0 +1,516 @@
+"""
+Streaming bulk import engine.
+
+Uploaded CSV, JSON and Excel files are parsed incrementally and processed in
+fixed-size batches. Each batch is validated with a single serializer whose
+related-object lookups and uniqueness checks run once per batch instead of
+once per row, and valid rows are written with ``bulk_create`` (``COPY`` on
+PostgreSQL). Invalid rows are skipped and reported individually rather than
+failing the whole import.
+"""
+
+import codecs
+import csv
+import io
+import json
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueValidator
+import openpyxl
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMPORT_SETTINGS = {
+    'BATCH_SIZE': 1000,  # Rows validated and written per transaction
+    'READ_CHUNK_SIZE': 64 * 1024,
+    'MAX_REPORTED_ERRORS': 100,
+    'USE_COPY': True,
+    **getattr(settings, 'IMPORT_SETTINGS', {}),
+}
+
+JSON_WHITESPACE = ' \t\n\r'
+
+
+class ImportFormatError(ValueError):
+    """Raised when an uploaded file cannot be parsed."""
+
+
+def iter_csv_records(file_obj):
+    """Yield CSV rows as dicts, decoding the upload line by line."""
+    reader = csv.DictReader(codecs.iterdecode(file_obj, 'utf-8-sig'))
+    for row in reader:
+        # Empty cells fall back to model defaults, as with Excel imports
+        row = {k: v for k, v in row.items() if k is not None and v not in ('', None)}
+        if row:
+            yield row
+
+
+def iter_json_records(file_obj, chunk_size=None):
+    """
+    Yield the objects of a JSON array, or of newline-delimited JSON, without
+    loading the whole document into memory.
+    """
+    chunk_size = chunk_size or IMPORT_SETTINGS['READ_CHUNK_SIZE']
+    chunks = codecs.iterdecode(iter(lambda: file_obj.read(chunk_size), b''), 'utf-8-sig')
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        for chunk in chunks:
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+        eof = True
+        return False
+
+    def skip(chars):
+        """Advance past ``chars``; return False once the input is exhausted."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if not read_more():
+                return False
+
+    if not skip(JSON_WHITESPACE):
+        return
+
+    in_array = buffer[pos] == '['
+    if in_array:
+        pos += 1
+    separators = JSON_WHITESPACE + ',' if in_array else JSON_WHITESPACE
+
+    while skip(separators):
+        if in_array and buffer[pos] == ']':
+            return
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # The value may simply continue in the next chunk
+                if read_more():
+                    continue
+                raise ImportFormatError(f'Invalid JSON: {str(e)}') from e
+            if end == len(buffer) and not eof and read_more():
+                continue
+            break
+
+        pos = end
+        if not isinstance(value, dict):
+            raise ImportFormatError('JSON file must contain an array of objects')
+        yield value
+
+    if in_array:
+        raise ImportFormatError('Invalid JSON: unterminated array')
+
+
+def iter_excel_records(file_obj):
+    """Yield rows of the active worksheet as dicts keyed by the header row."""
+    wb = openpyxl.load_workbook(file_obj, read_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = next(rows, None)
+        if headers is None:
+            return
+        for row in rows:
+            # Remove None values and skip empty rows
+            row_data = {k: v for k, v in zip(headers, row) if k is not None and v is not None}
+            if row_data:
+                yield row_data
+    finally:
+        wb.close()
+
+
+RECORD_READERS = {
+    'csv': iter_csv_records,
+    'json': iter_json_records,
+    'excel': iter_excel_records,
+}
+
+
+def iter_batches(iterable, size):
+    """Yield lists of up to ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def assign_unique_slugs(instances, slug_field, source_field):
+    """
+    Fill empty ``slug_field`` values from ``source_field``.
+
+    Follows the same ``base``, ``base-1``, ``base-2`` scheme as the pre_save
+    slug signals, but checks a whole batch against the database with at most
+    two queries instead of one query per candidate slug.
+    """
+    pending = [obj for obj in instances if not getattr(obj, slug_field)]
+    if not pending:
+        return
+
+    model = type(pending[0])
+    manager = model._default_manager
+    taken = {getattr(obj, slug_field) for obj in instances if getattr(obj, slug_field)}
+    bases = [
+        (obj, slugify(str(getattr(obj, source_field) or '')) or model._meta.model_name)
+        for obj in pending
+    ]
+
+    base_counts = defaultdict(int)
+    for _, base in bases:
+        base_counts[base] += 1
+    taken.update(manager.filter(
+        **{f'{slug_field}__in': list(base_counts)}
+    ).values_list(slug_field, flat=True))
+
+    # Only bases that already clash need their suffixed variants loaded
+    crowded = [base for base, n in base_counts.items() if n > 1 or base in taken]
+    if crowded:
+        query = Q()
+        for base in crowded:
+            query |= Q(**{f'{slug_field}__startswith': f'{base}-'})
+        taken.update(manager.filter(query).values_list(slug_field, flat=True))
+
+    next_suffix = {}
+    for obj, base in bases:
+        slug = base
+        counter = next_suffix.get(base, 1)
+        while slug in taken:
+            slug = f'{base}-{counter}'
+            counter += 1
+        next_suffix[base] = counter
+        taken.add(slug)
+        setattr(obj, slug_field, slug)
+
+
+def cached_pk_lookup(field, pk_field, objects):
+    """Build a ``to_internal_value`` that reads from prefetched ``objects``."""
+    def to_internal_value(data):
+        if isinstance(data, bool):
+            field.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            key = pk_field.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            field.fail('incorrect_type', data_type=type(data).__name__)
+        obj = objects.get(key)
+        if obj is None:
+            field.fail('does_not_exist', pk_value=data)
+        return obj
+    return to_internal_value
+
+
+def prefetch_related_fields(serializer, rows, delimiter=','):
+    """
+    Resolve the primary key relations referenced by ``rows`` with one query
+    per serializer field, so validating each row does not hit the database.
+
+    Many-to-many values given as delimited strings (as CSV cells are) are
+    split into lists in place.
+    """
+    for name, field in serializer.fields.items():
+        if field.read_only:
+            continue
+        many = isinstance(field, ManyRelatedField)
+        relation = field.child_relation if many else field
+        if not isinstance(relation, PrimaryKeyRelatedField) or relation.pk_field is not None:
+            continue
+
+        queryset = relation.get_queryset()
+        pk_field = queryset.model._meta.pk
+        keys = set()
+        for row in rows:
+            value = row.get(name)
+            if many and isinstance(value, str):
+                value = row[name] = [v.strip() for v in value.split(delimiter) if v.strip()]
+            for item in (value if many and isinstance(value, (list, tuple)) else [value]):
+                if item is None or isinstance(item, bool):
+                    continue
+                try:
+                    keys.add(pk_field.to_python(item))
+                except (DjangoValidationError, TypeError, ValueError):
+                    continue
+
+        objects = queryset.in_bulk(list(keys)) if keys else {}
+        relation.to_internal_value = cached_pk_lookup(relation, pk_field, objects)
+
+
+def detach_unique_validators(serializer):
+    """
+    Remove field-level ``UniqueValidator``s, which query once per row, and
+    return them keyed by field name so they can be checked per batch.
+    """
+    unique = {}
+    for name, field in serializer.fields.items():
+        validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        detached = [v for v in field.validators if isinstance(v, UniqueValidator)]
+        if detached:
+            field.validators = validators
+            unique[name] = (field.source, detached[0])
+    return unique
+
+
+def copy_csv_value(value):
+    """Render one database value as a quoted CSV field for ``COPY``."""
+    if value is None:
+        return ''  # Unquoted empty field is NULL in CSV format
+    if isinstance(value, bool):
+        value = 't' if value else 'f'
+    elif not isinstance(value, (str, int, float, Decimal, uuid.UUID, datetime, date, time)):
+        raise TypeError(f'Cannot COPY values of type {type(value).__name__}')
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_instances(model, instances, connection):
+    """Insert ``instances`` through PostgreSQL ``COPY ... FROM STDIN``."""
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    for obj in instances:
+        values = []
+        for field in fields:
+            value = field.pre_save(obj, add=True)
+            if isinstance(field, models.JSONField):
+                value = None if value is None else json.dumps(value, cls=field.encoder)
+            else:
+                value = field.get_db_prep_save(value, connection)
+            values.append(copy_csv_value(value))
+        buffer.write(','.join(values))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+
+    for obj in instances:
+        obj._state.adding = False
+        obj._state.db = connection.alias
+
+
+def insert_instances(model, instances, using):
+    """Insert ``instances`` with ``COPY`` where possible, else ``bulk_create``."""
+    connection = connections[using]
+    if (IMPORT_SETTINGS['USE_COPY'] and connection.vendor == 'postgresql'
+            and len(instances) > 1 and all(obj.pk is not None for obj in instances)):
+        try:
+            copy_instances(model, instances, connection)
+            return
+        except TypeError as e:
+            # A field needs a database adapter; let the ORM handle it
+            logger.debug(f"COPY unavailable for {model.__name__}: {str(e)}")
+    model._default_manager.using(using).bulk_create(instances)
+
+
+class ImportResult:
+    """Counters and per-row errors collected during an import."""
+
+    def __init__(self, max_errors=None):
+        self.max_errors = max_errors or IMPORT_SETTINGS['MAX_REPORTED_ERRORS']
+        self.total_rows = 0
+        self.imported_count = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            if not isinstance(errors, dict):
+                errors = {api_settings.NON_FIELD_ERRORS_KEY: errors}
+            self.errors.append({'row': row, 'errors': errors})
+
+
+class BulkImporter:
+    """
+    Import records through a ViewSet's serializer in batches.
+
+    The view provides the serializer via ``get_serializer()`` and can shape
+    the pipeline with the ``DataImportMixin`` hooks, all of which are
+    optional: ``get_required_import_fields``, ``validate_import_row``,
+    ``prepare_import_batch``, ``transform_import_row``,
+    ``import_slug_fields`` and ``prepare_import_instances``.
+    """
+
+    def __init__(self, view, file_format, batch_size=None):
+        self.view = view
+        self.file_format = file_format
+        self.batch_size = (
+            batch_size or getattr(view, 'import_batch_size', None) or IMPORT_SETTINGS['BATCH_SIZE']
+        )
+        self.result = ImportResult()
+
+    def run(self, records):
+        """Import every record of ``records``; returns an ``ImportResult``."""
+        for batch in iter_batches(records, self.batch_size):
+            first_row = self.result.total_rows + 1
+            self.result.total_rows += len(batch)
+            self.process_batch(list(enumerate(batch, first_row)))
+        return self.result
+
+    def process_batch(self, rows):
+        rows = self.transform_rows(rows)
+        if not rows:
+            return
+
+        serializer = self.view.get_serializer()
+        unique_fields = detach_unique_validators(serializer)
+        prefetch_related_fields(serializer, [row for _, row in rows])
+
+        validated = []
+        for number, row in rows:
+            try:
+                validated.append((number, serializer.run_validation(row)))
+            except serializers.ValidationError as e:
+                self.result.add_error(number, e.detail)
+
+        validated = self.check_unique(unique_fields, validated)
+        if validated:
+            self.write(serializer.Meta.model, self.build_instances(serializer.Meta.model, validated))
+
+    def transform_rows(self, rows):
+        """Apply required-field checks and the view's row transformations."""
+        view = self.view
+        required = view.get_required_import_fields() if hasattr(view, 'get_required_import_fields') else []
+
+        checked = []
+        for number, row in rows:
+            if not isinstance(row, dict):
+                self.result.add_error(number, [f'Expected object, got {type(row).__name__}'])
+                continue
+            row_errors = [f'Missing required field: {field}' for field in required if not row.get(field)]
+            if hasattr(view, 'validate_import_row'):
+                row_errors.extend(view.validate_import_row(row, number - 1) or [])
+            if row_errors:
+                self.result.add_error(number, row_errors)
+            else:
+                checked.append((number, row))
+
+        if checked and hasattr(view, 'prepare_import_batch'):
+            view.prepare_import_batch([row for _, row in checked], self.file_format)
+
+        if not hasattr(view, 'transform_import_row'):
+            return checked
+
+        transformed = []
+        for number, row in checked:
+            try:
+                row = view.transform_import_row(row, self.file_format)
+            except Exception as e:
+                self.result.add_error(number, [str(e)])
+                continue
+            if row:
+                transformed.append((number, row))
+        return transformed
+
+    def check_unique(self, unique_fields, validated):
+        """Reject rows whose unique values clash with stored or sibling rows."""
+        for name, (source, validator) in unique_fields.items():
+            values = {data[source] for _, data in validated if data.get(source) not in (None, '')}
+            if not values:
+                continue
+            existing = set(validator.queryset.filter(
+                **{f'{source}__in': list(values)}
+            ).values_list(source, flat=True))
+
+            seen = set()
+            kept = []
+            for number, data in validated:
+                value = data.get(source)
+                if value in (None, ''):
+                    kept.append((number, data))
+                elif value in existing or value in seen:
+                    self.result.add_error(number, {name: [validator.message]})
+                else:
+                    seen.add(value)
+                    kept.append((number, data))
+            validated = kept
+        return validated
+
+    def build_instances(self, model, validated):
+        """Turn validated rows into unsaved instances plus their M2M targets."""
+        many_to_many = [
+            name for name, relation in model_meta.get_field_info(model).forward_relations.items()
+            if relation.to_many
+        ]
+
+        objects = []
+        for number, data in validated:
+            data = dict(data)
+            relations = {name: data.pop(name) for name in many_to_many if name in data}
+            try:
+                objects.append((number, model(**data), relations))
+            except (TypeError, ValueError) as e:
+                self.result.add_error(number, [str(e)])
+
+        instances = [instance for _, instance, _ in objects]
+        for slug_field, source_field in getattr(self.view, 'import_slug_fields', {}).items():
+            assign_unique_slugs(instances, slug_field, source_field)
+        if hasattr(self.view, 'prepare_import_instances'):
+            self.view.prepare_import_instances(instances)
+        return objects
+
+    def write(self, model, objects):
+        """Write a batch in one transaction, falling back to row by row."""
+        if not objects:
+            return
+        using = router.db_for_write(model)
+        try:
+            with transaction.atomic(using=using):
+                insert_instances(model, [instance for _, instance, _ in objects], using)
+                self.write_many_to_many(model, objects, using)
+        except IntegrityError as e:
+            logger.warning(f"Bulk import batch failed, retrying row by row: {str(e)}")
+            self.write_rows(model, objects, using)
+        else:
+            self.result.imported_count += len(objects)
+
+    def write_rows(self, model, objects, using):
+        """Insert rows one savepoint at a time to isolate integrity errors."""
+        for number, instance, relations in objects:
+            try:
+                with transaction.atomic(using=using):
+                    model._default_manager.using(using).bulk_create([instance])
+                    self.write_many_to_many(model, [(number, instance, relations)], using)
+            except IntegrityError as e:
+                self.result.add_error(number, [str(e)])
+            else:
+                self.result.imported_count += 1
+
+    def write_many_to_many(self, model, objects, using):
+        """Create the M2M links of a batch with one insert per relation."""
+        links = defaultdict(list)
+        for _, instance, relations in objects:
+            for name, targets in relations.items():
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                for target in targets:
+                    links[through].append(through(**{
+                        field.m2m_field_name(): instance,
+                        field.m2m_reverse_field_name(): target,
+                    }))
+        for through, rows in links.items():
+            through._default_manager.using(using).bulk_create(rows, ignore_conflicts=True)
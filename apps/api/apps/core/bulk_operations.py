@@ -2,17 +2,33 @@
 Bulk operations utilities for efficient data management.
 """
 
+from collections import defaultdict
 from rest_framework import serializers, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.utils import model_meta
+from django.conf import settings
 from django.db import transaction, IntegrityError
 from django.core.exceptions import ValidationError
 from django.db.models import Q
+from django.utils import timezone
 from typing import List, Dict, Any
 import logging
 
+from .bulk_import import (
+    RECORD_READERS, BulkImporter, ImportFormatError,
+    detach_unique_validators, prefetch_related_fields
+)
+from .signals import post_bulk_update
+
 logger = logging.getLogger(__name__)
 
+BULK_OPERATION_SETTINGS = {
+    'MAX_UPDATE_ITEMS': 10000,
+    'BATCH_SIZE': 500,  # Rows per UPDATE/INSERT statement
+    **getattr(settings, 'BULK_OPERATION_SETTINGS', {}),
+}
+
 
 class BulkOperationMixin:
     """Mixin to add bulk operations to ViewSets."""
@@ -54,7 +70,12 @@ class BulkOperationMixin:
     
     @action(detail=False, methods=['patch'])
     def bulk_update(self, request):
-        """Update multiple objects in a single request."""
+        """Update multiple objects in a single request.
+        
+        Targets are loaded with one ``in_bulk`` query and validated in
+        memory; writes are one ``bulk_update`` per set of changed fields.
+        Nothing is written unless every item is valid.
+        """
         data = request.data
         
         if not isinstance(data, list):
@@ -63,52 +84,33 @@ class BulkOperationMixin:
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if len(data) > 100:
+        max_items = BULK_OPERATION_SETTINGS['MAX_UPDATE_ITEMS']
+        if len(data) > max_items:
             return Response(
-                {'error': 'Maximum 100 objects allowed per bulk operation'},
+                {'error': f'Maximum {max_items} objects allowed per bulk operation'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        updated_objects = []
-        errors = []
-        
         try:
-            with transaction.atomic():
-                for item_data in data:
-                    if 'id' not in item_data:
-                        errors.append({'error': 'ID is required for updates'})
-                        continue
-                    
-                    try:
-                        instance = self.get_queryset().get(pk=item_data['id'])
-                        serializer = self.get_serializer(
-                            instance, data=item_data, partial=True
-                        )
-                        
-                        if serializer.is_valid():
-                            updated_instance = serializer.save()
-                            updated_objects.append(updated_instance)
-                        else:
-                            errors.append({
-                                'id': item_data['id'],
-                                'errors': serializer.errors
-                            })
-                    except self.queryset.model.DoesNotExist:
-                        errors.append({
-                            'id': item_data['id'],
-                            'error': 'Object not found'
-                        })
-                
-                if errors:
-                    return Response(
-                        {'errors': errors},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
+            queryset = self.get_queryset()
+            updates, errors = self.validate_bulk_update(queryset, data)
+            
+            if errors:
                 return Response(
-                    self.get_serializer(updated_objects, many=True).data,
-                    status=status.HTTP_200_OK
+                    {'errors': errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            with transaction.atomic():
+                updated_objects = BulkQueryManager.bulk_update_instances(
+                    queryset.model, updates,
+                    prepare=self.prepare_bulk_update_instances
                 )
+            
+            return Response(
+                self.get_serializer(updated_objects, many=True).data,
+                status=status.HTTP_200_OK
+            )
         except Exception as e:
             logger.error(f"Bulk update error: {str(e)}")
             return Response(
@@ -116,6 +118,73 @@ class BulkOperationMixin:
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    def validate_bulk_update(self, queryset, data):
+        """Validate update items against their targets.
+        
+        Returns ``(updates, errors)`` where ``updates`` is a list of
+        ``(instance, validated_data)`` pairs.
+        """
+        errors = []
+        pk_field = queryset.model._meta.pk
+        
+        items = []
+        for item_data in data:
+            if not isinstance(item_data, dict) or 'id' not in item_data:
+                errors.append({'error': 'ID is required for updates'})
+                continue
+            try:
+                items.append((pk_field.to_python(item_data['id']), item_data))
+            except ValidationError:
+                errors.append({'id': item_data['id'], 'error': 'Object not found'})
+        
+        targets = queryset.in_bulk([pk for pk, _ in items]) if items else {}
+        
+        # One serializer validates every item; relations and unique
+        # fields are checked once for the whole request
+        serializer = self.get_serializer(partial=True)
+        unique_fields = detach_unique_validators(serializer)
+        prefetch_related_fields(serializer, [item_data for _, item_data in items])
+        
+        updates = []
+        for pk, item_data in items:
+            instance = targets.get(pk)
+            if instance is None:
+                errors.append({'id': item_data['id'], 'error': 'Object not found'})
+                continue
+            
+            serializer.instance = instance
+            try:
+                updates.append((instance, serializer.run_validation(item_data)))
+            except serializers.ValidationError as e:
+                errors.append({'id': item_data['id'], 'errors': e.detail})
+        
+        for name, (source, validator) in unique_fields.items():
+            values = {values[source] for _, values in updates if values.get(source) not in (None, '')}
+            if not values:
+                continue
+            owners = dict(validator.queryset.filter(
+                **{f'{source}__in': list(values)}
+            ).values_list(source, 'pk'))
+            
+            claimed = {}
+            for instance, values in updates:
+                value = values.get(source)
+                if value in (None, ''):
+                    continue
+                owner = claimed.setdefault(value, owners.get(value, instance.pk))
+                if owner != instance.pk:
+                    errors.append({'id': str(instance.pk), 'errors': {name: [validator.message]}})
+        
+        return updates, errors
+    
+    def prepare_bulk_update_instances(self, instances):
+        """Hook called with updated instances before they are written.
+        
+        ``bulk_update`` skips ``save()``; override to recompute anything the
+        model derives on save. Changes made here are written too.
+        """
+        pass
+    
     @action(detail=False, methods=['delete'])
     def bulk_delete(self, request):
         """Delete multiple objects in a single request."""
@@ -167,23 +236,20 @@ class BulkSerializer(serializers.ListSerializer):
     
     def update(self, instance, validated_data):
         """Update multiple instances efficiently."""
-        # This is more complex as bulk_update requires specific fields
-        # For now, we'll update individually but within a transaction
-        updated_instances = []
-        
-        for item_data in validated_data:
-            if 'id' in item_data:
-                try:
-                    obj = instance.get(pk=item_data['id'])
-                    for attr, value in item_data.items():
-                        if attr != 'id':
-                            setattr(obj, attr, value)
-                    obj.save()
-                    updated_instances.append(obj)
-                except instance.model.DoesNotExist:
-                    continue
-        
-        return updated_instances
+        # ``instance`` is the queryset holding the objects to update
+        model_class = instance.model
+        pk_field = model_class._meta.pk
+        items = [
+            (pk_field.to_python(item_data['id']), item_data)
+            for item_data in validated_data if 'id' in item_data
+        ]
+        targets = instance.in_bulk([pk for pk, _ in items])
+        
+        updates = [
+            (targets[pk], {attr: value for attr, value in item_data.items() if attr != 'id'})
+            for pk, item_data in items if pk in targets
+        ]
+        return BulkQueryManager.bulk_update_instances(model_class, updates)
 
 
 class BulkOperationValidator:
@@ -240,38 +306,155 @@ class BulkQueryManager:
     """Manager for efficient bulk queries."""
     
     @staticmethod
-    def bulk_get_or_create(model_class, data_list, unique_fields):
+    def bulk_get_or_create(model_class, data_list, unique_fields, batch_size=None):
         """Efficiently get or create multiple objects."""
-        existing_objects = {}
-        new_objects = []
+        batch_size = batch_size or BULK_OPERATION_SETTINGS['BATCH_SIZE']
+        attnames = [model_class._meta.get_field(field).attname for field in unique_fields]
         
-        # Build query for existing objects
-        q_objects = Q()
-        for data in data_list:
-            q_filter = Q()
-            for field in unique_fields:
-                if field in data:
-                    q_filter &= Q(**{field: data[field]})
-            q_objects |= q_filter
-        
-        # Get existing objects
-        if q_objects:
-            existing = model_class.objects.filter(q_objects)
-            for obj in existing:
-                key = tuple(getattr(obj, field) for field in unique_fields)
-                existing_objects[key] = obj
-        
-        # Identify new objects
+        def key_of(data):
+            return tuple(
+                data.get(field, data.get(attname))
+                for field, attname in zip(unique_fields, attnames)
+            )
+        
+        keys = list(dict.fromkeys(key_of(data) for data in data_list))
+        
+        # Look existing objects up in chunks rather than one OR per object
+        existing_keys = set()
+        for i in range(0, len(keys), batch_size):
+            chunk = keys[i:i + batch_size]
+            if len(unique_fields) == 1:
+                query = Q(**{f'{unique_fields[0]}__in': [key[0] for key in chunk]})
+            else:
+                query = Q()
+                for key in chunk:
+                    query |= Q(**dict(zip(unique_fields, key)))
+            existing_keys.update(
+                tuple(row) for row in
+                model_class.objects.filter(query).values_list(*attnames)
+            )
+        
+        # Identify new objects, once per key
+        new_objects = []
+        pending = set(existing_keys)
         for data in data_list:
-            key = tuple(data.get(field) for field in unique_fields)
-            if key not in existing_objects:
+            key = key_of(data)
+            if key not in pending:
+                pending.add(key)
                 new_objects.append(model_class(**data))
         
         # Bulk create new objects
         if new_objects:
-            model_class.objects.bulk_create(new_objects)
+            model_class.objects.bulk_create(new_objects, batch_size=batch_size)
         
-        return len(new_objects), len(existing_objects)
+        return len(new_objects), len(existing_keys)
+    
+    @staticmethod
+    def bulk_update_instances(model_class, updates, batch_size=None, prepare=None):
+        """Apply ``(instance, values)`` pairs as set-based updates.
+        
+        Instances are grouped by the set of fields that actually changed and
+        each group is written with ``bulk_update``. Many-to-many values
+        replace the current links, as ``ModelSerializer.update`` does, with
+        one read, one delete and one insert per relation. A single
+        ``post_bulk_update`` signal replaces the per-object ``post_save``.
+        
+        Returns the updated instances.
+        """
+        batch_size = batch_size or BULK_OPERATION_SETTINGS['BATCH_SIZE']
+        opts = model_class._meta
+        many_to_many = {
+            name for name, relation in model_meta.get_field_info(model_class).forward_relations.items()
+            if relation.to_many
+        }
+        concrete_fields = [field for field in opts.concrete_fields if not field.primary_key]
+        
+        snapshots = []
+        m2m_values = defaultdict(dict)
+        for instance, values in updates:
+            before = {field.attname: getattr(instance, field.attname) for field in concrete_fields}
+            for attr, value in values.items():
+                if attr in many_to_many:
+                    m2m_values[attr][instance.pk] = {target.pk for target in value}
+                else:
+                    setattr(instance, attr, value)
+            snapshots.append((instance, before))
+        
+        instances = [instance for instance, _ in snapshots]
+        if prepare:
+            prepare(instances)
+        
+        changed = defaultdict(set)
+        for name, targets in m2m_values.items():
+            for pk in BulkQueryManager.replace_many_to_many(model_class, name, targets, batch_size):
+                changed[pk].add(name)
+        
+        now = timezone.now()
+        groups = defaultdict(list)
+        for instance, before in snapshots:
+            fields = {
+                field.name for field in concrete_fields
+                if getattr(instance, field.attname) != before[field.attname]
+            }
+            fields |= changed[instance.pk]
+            if not fields:
+                continue
+            for field in concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    setattr(instance, field.attname, now)
+                    fields.add(field.name)
+            changed[instance.pk] = fields
+            groups[frozenset(fields - many_to_many)].append(instance)
+        
+        for fields, group in groups.items():
+            if fields:
+                model_class.objects.bulk_update(group, sorted(fields), batch_size=batch_size)
+        
+        updated = [instance for instance in instances if changed.get(instance.pk)]
+        if updated:
+            post_bulk_update.send(
+                sender=model_class,
+                instances=updated,
+                update_fields={instance.pk: changed[instance.pk] for instance in updated}
+            )
+        
+        return instances
+    
+    @staticmethod
+    def replace_many_to_many(model_class, name, targets, batch_size=None):
+        """Set M2M links for several objects at once.
+        
+        ``targets`` maps source primary keys to sets of target primary keys.
+        Returns the primary keys whose links changed.
+        """
+        field = model_class._meta.get_field(name)
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        
+        current = defaultdict(dict)
+        for link_pk, source_pk, target_pk in through.objects.filter(
+            **{f'{source}__in': list(targets)}
+        ).values_list('pk', source, target):
+            current[source_pk][target_pk] = link_pk
+        
+        stale = []
+        new_links = []
+        changed = []
+        for source_pk, wanted in targets.items():
+            existing = current.get(source_pk, {})
+            removed = [link_pk for target_pk, link_pk in existing.items() if target_pk not in wanted]
+            added = [target_pk for target_pk in wanted if target_pk not in existing]
+            stale.extend(removed)
+            new_links.extend(through(**{source: source_pk, target: target_pk}) for target_pk in added)
+            if removed or added:
+                changed.append(source_pk)
+        
+        if stale:
+            through.objects.filter(pk__in=stale).delete()
+        if new_links:
+            through.objects.bulk_create(new_links, batch_size=batch_size)
+        return changed
     
     @staticmethod
     def bulk_update_fields(queryset, updates_dict):
@@ -308,50 +491,46 @@ class BulkImportExportMixin:
         file_obj = request.FILES['file']
         file_format = request.data.get('format', 'json')
         
-        try:
-            if file_format == 'json':
-                import json
-                data = json.load(file_obj)
-            elif file_format == 'csv':
-                import csv
-                import io
-                
-                # Read CSV and convert to list of dicts
-                text_file = io.TextIOWrapper(file_obj, encoding='utf-8')
-                csv_reader = csv.DictReader(text_file)
-                data = list(csv_reader)
-            else:
-                return Response(
-                    {'error': 'Unsupported file format'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validate data
-            validation_result = BulkOperationValidator.validate_bulk_data(data)
-            if not validation_result['valid']:
-                return Response(validation_result, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Process import
-            serializer = self.get_serializer(data=data, many=True)
-            if serializer.is_valid():
-                with transaction.atomic():
-                    instances = serializer.save()
-                    return Response(
-                        {
-                            'imported_count': len(instances),
-                            'message': f'Successfully imported {len(instances)} objects'
-                        },
-                        status=status.HTTP_201_CREATED
-                    )
-            else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if file_format not in RECORD_READERS:
+            return Response(
+                {'error': 'Unsupported file format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        # Rows are streamed and imported in batches; invalid rows are reported
+        importer = BulkImporter(self, file_format)
+        try:
+            result = importer.run(RECORD_READERS[file_format](file_obj))
+        except ImportFormatError as e:
+            return Response(
+                {'error': str(e), 'imported_count': importer.result.imported_count},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             logger.error(f"Bulk import error: {str(e)}")
             return Response(
-                {'error': 'Import failed'},
+                {'error': 'Import failed', 'imported_count': importer.result.imported_count},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        
+        if not result.total_rows:
+            return Response(
+                {'valid': False, 'error': 'Empty data list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        response_data = {
+            'imported_count': result.imported_count,
+            'message': f'Successfully imported {result.imported_count} objects'
+        }
+        if result.error_count:
+            response_data['errors'] = result.errors
+            response_data['error_count'] = result.error_count
+        
+        return Response(
+            response_data,
+            status=status.HTTP_201_CREATED if result.imported_count else status.HTTP_400_BAD_REQUEST
+        )
     
     @action(detail=False, methods=['get'])
     def bulk_export(self, request):
@@ -3,28 +3,66 @@ Data export and import utilities for API endpoints.
 """
 
 import csv
+import io
 import json
-import xml.etree.ElementTree as ET
-from io import StringIO, BytesIO
-from django.http import HttpResponse, JsonResponse
+from xml.sax.saxutils import XMLGenerator
+from django.http import StreamingHttpResponse
 from django.core.serializers import serialize
-from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import FieldError, ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db import transaction
 from django.utils import timezone
 from datetime import datetime
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
 import logging
 
+from .bulk_import import RECORD_READERS, BulkImporter, ImportFormatError
+from .export_jobs import enqueue_export_job
+from .models import ExportJob
+
 logger = logging.getLogger(__name__)
 
 
+class Echo:
+    """File-like object that hands back what is written, for streaming writers."""
+    
+    def write(self, value):
+        return value
+
+
+class ExportStreamBuffer(io.TextIOBase):
+    """Text sink that collects writer output until the stream drains it."""
+    
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, value):
+        self._parts.append(value)
+        return len(value)
+    
+    def drain(self):
+        data = ''.join(self._parts)
+        self._parts = []
+        return data
+
+
 class DataExportMixin:
-    """Mixin to add data export capabilities to ViewSets."""
+    """Mixin to add data export capabilities to ViewSets.
+    
+    CSV, JSON and XML exports are streamed: rows are read with a chunked
+    ``.iterator()`` over a ``values_list`` projection of the export fields
+    and written out in batches, so memory stays flat whatever the size of
+    the export.
+    """
+    
+    # Rows fetched per database round trip and emitted per response chunk
+    export_chunk_size = 2000
     
     @action(detail=False, methods=['get'])
     def export_csv(self, request):
@@ -34,23 +72,14 @@ class DataExportMixin:
             
             # Get field names for CSV headers
             fields = self.get_export_fields()
+            rows = self.iter_export_rows(queryset, fields)
             
-            response = HttpResponse(content_type='text/csv')
+            response = StreamingHttpResponse(
+                self.stream_csv(fields, rows),
+                content_type='text/csv'
+            )
             response['Content-Disposition'] = f'attachment; filename="{self.get_export_filename()}.csv"'
             
-            writer = csv.writer(response)
-            
-            # Write headers
-            writer.writerow(fields)
-            
-            # Write data rows
-            for obj in queryset:
-                row = []
-                for field in fields:
-                    value = self.get_field_value(obj, field)
-                    row.append(str(value) if value is not None else '')
-                writer.writerow(row)
-            
             return response
         
         except Exception as e:
@@ -62,13 +91,23 @@ class DataExportMixin:
     
     @action(detail=False, methods=['get'])
     def export_json(self, request):
-        """Export data as JSON."""
+        """Export data as a JSON array, or as NDJSON with ``?lines=true``."""
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
+            fields = self.get_export_fields()
+            rows = self.iter_export_rows(queryset, fields)
             
-            response = JsonResponse(serializer.data, safe=False)
-            response['Content-Disposition'] = f'attachment; filename="{self.get_export_filename()}.json"'
+            if request.query_params.get('lines', '').lower() in ('1', 'true', 'yes'):
+                content = self.stream_ndjson(fields, rows)
+                content_type = 'application/x-ndjson'
+                extension = 'ndjson'
+            else:
+                content = self.stream_json(fields, rows)
+                content_type = 'application/json'
+                extension = 'json'
+            
+            response = StreamingHttpResponse(content, content_type=content_type)
+            response['Content-Disposition'] = f'attachment; filename="{self.get_export_filename()}.{extension}"'
             
             return response
         
@@ -84,23 +123,14 @@ class DataExportMixin:
         """Export data as XML."""
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            
-            # Create XML structure
-            root = ET.Element('data')
+            fields = self.get_export_fields()
             model_name = queryset.model.__name__.lower()
+            rows = self.iter_export_rows(queryset, fields)
             
-            for obj in queryset:
-                item = ET.SubElement(root, model_name)
-                
-                for field in self.get_export_fields():
-                    field_elem = ET.SubElement(item, field)
-                    value = self.get_field_value(obj, field)
-                    field_elem.text = str(value) if value is not None else ''
-            
-            # Convert to string
-            xml_str = ET.tostring(root, encoding='unicode')
-            
-            response = HttpResponse(xml_str, content_type='application/xml')
+            response = StreamingHttpResponse(
+                self.stream_xml(fields, rows, model_name),
+                content_type='application/xml'
+            )
             response['Content-Disposition'] = f'attachment; filename="{self.get_export_filename()}.xml"'
             
             return response
@@ -112,61 +142,112 @@ class DataExportMixin:
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    def iter_export_rows(self, queryset, fields):
+        """
+        Yield one tuple of values per object, in ``fields`` order.
+        
+        Fields are projected with ``values_list`` (``author.username`` becomes
+        ``author__username``; foreign keys export their primary key). Fields
+        the ORM cannot resolve, such as properties, fall back to loading
+        objects in chunks and reading them with ``get_field_value``.
+        """
+        lookups = [field.replace('.', '__') for field in fields]
+        try:
+            projected = queryset.values_list(*lookups)
+        except FieldError:
+            return (
+                tuple(self.get_field_value(obj, field) for field in fields)
+                for obj in queryset.iterator(chunk_size=self.export_chunk_size)
+            )
+        return projected.iterator(chunk_size=self.export_chunk_size)
+    
+    def iter_export_chunks(self, rows):
+        """Group rows into lists of ``export_chunk_size``."""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.export_chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def stream_csv(self, fields, rows):
+        """Yield CSV text a chunk of rows at a time."""
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        
+        for chunk in self.iter_export_chunks(rows):
+            yield ''.join(
+                writer.writerow(['' if value is None else str(value) for value in row])
+                for row in chunk
+            )
+    
+    def stream_json(self, fields, rows):
+        """Yield a JSON array of objects incrementally."""
+        yield '['
+        separator = ''
+        for chunk in self.iter_export_chunks(rows):
+            parts = []
+            for row in chunk:
+                parts.append(separator)
+                parts.append(json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder))
+                separator = ','
+            yield ''.join(parts)
+        yield ']'
+    
+    def stream_ndjson(self, fields, rows):
+        """Yield one JSON object per line."""
+        for chunk in self.iter_export_chunks(rows):
+            yield ''.join(
+                json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n'
+                for row in chunk
+            )
+    
+    def stream_xml(self, fields, rows, item_name):
+        """Yield an XML document with an incremental SAX writer."""
+        buffer = ExportStreamBuffer()
+        xml = XMLGenerator(buffer, encoding='utf-8', short_empty_elements=True)
+        xml.startDocument()
+        xml.startElement('data', {})
+        yield buffer.drain()
+        
+        for chunk in self.iter_export_chunks(rows):
+            for row in chunk:
+                xml.startElement(item_name, {})
+                for field, value in zip(fields, row):
+                    xml.startElement(field, {})
+                    if value is not None:
+                        xml.characters(str(value))
+                    xml.endElement(field)
+                xml.endElement(item_name)
+            yield buffer.drain()
+        
+        xml.endElement('data')
+        xml.endDocument()
+        yield buffer.drain()
+    
     @action(detail=False, methods=['get'])
     def export_excel(self, request):
-        """Export data as Excel file."""
+        """Export data as an Excel file.
+        
+        Workbooks cannot be streamed, so the export runs as a background
+        ``ExportJob``: the response is ``202 Accepted`` with the job id, and
+        the file is fetched from the export jobs endpoint once it is ready.
+        """
         try:
             queryset = self.filter_queryset(self.get_queryset())
             fields = self.get_export_fields()
+            job = enqueue_export_job(self, queryset, fields, ExportJob.ExportFormat.EXCEL)
             
-            # Create workbook
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = self.get_export_filename()
-            
-            # Style for headers
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center")
-            
-            # Write headers
-            for col, field in enumerate(fields, 1):
-                cell = ws.cell(row=1, column=col, value=field.replace('_', ' ').title())
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-            
-            # Write data
-            for row, obj in enumerate(queryset, 2):
-                for col, field in enumerate(fields, 1):
-                    value = self.get_field_value(obj, field)
-                    ws.cell(row=row, column=col, value=value)
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            # Save to BytesIO
-            output = BytesIO()
-            wb.save(output)
-            output.seek(0)
-            
-            response = HttpResponse(
-                output.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            return Response(
+                {
+                    'job_id': str(job.id),
+                    'status': job.status,
+                    'message': 'Export started'
+                },
+                status=status.HTTP_202_ACCEPTED
             )
-            response['Content-Disposition'] = f'attachment; filename="{self.get_export_filename()}.xlsx"'
-            
-            return response
         
         except Exception as e:
             logger.error(f"Excel export error: {str(e)}")
@@ -206,177 +287,117 @@ class DataExportMixin:
 
 
 class DataImportMixin:
-    """Mixin to add data import capabilities to ViewSets."""
+    """Mixin to add data import capabilities to ViewSets.
+    
+    Files are read incrementally and imported in batches by ``BulkImporter``:
+    valid rows are bulk inserted, invalid rows are skipped and reported with
+    their row number, so there is no cap on the size of an import.
+    """
     
     parser_classes = [MultiPartParser, FormParser]
+    import_batch_size = None  # Defaults to IMPORT_SETTINGS['BATCH_SIZE']
+    import_slug_fields = {}  # Slug field -> field it is generated from
     
     @action(detail=False, methods=['post'])
     def import_csv(self, request):
         """Import data from CSV file."""
-        if 'file' not in request.FILES:
-            return Response(
-                {'error': 'No file provided'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        try:
-            file_obj = request.FILES['file']
-            
-            # Read CSV data
-            csv_data = file_obj.read().decode('utf-8')
-            csv_reader = csv.DictReader(StringIO(csv_data))
-            
-            return self.process_import_data(list(csv_reader), 'csv')
-        
-        except Exception as e:
-            logger.error(f"CSV import error: {str(e)}")
-            return Response(
-                {'error': f'Import failed: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return self.import_file(request, 'csv')
     
     @action(detail=False, methods=['post'])
     def import_json(self, request):
-        """Import data from JSON file."""
-        if 'file' not in request.FILES:
-            return Response(
-                {'error': 'No file provided'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        try:
-            file_obj = request.FILES['file']
-            json_data = json.load(file_obj)
-            
-            if not isinstance(json_data, list):
-                return Response(
-                    {'error': 'JSON file must contain an array of objects'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            return self.process_import_data(json_data, 'json')
-        
-        except json.JSONDecodeError as e:
-            return Response(
-                {'error': f'Invalid JSON: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        except Exception as e:
-            logger.error(f"JSON import error: {str(e)}")
-            return Response(
-                {'error': f'Import failed: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        """Import data from a JSON array or newline-delimited JSON file."""
+        return self.import_file(request, 'json')
     
     @action(detail=False, methods=['post'])
     def import_excel(self, request):
         """Import data from Excel file."""
+        return self.import_file(request, 'excel')
+    
+    def import_file(self, request, file_format):
+        """Stream the uploaded file through the import pipeline."""
         if 'file' not in request.FILES:
             return Response(
                 {'error': 'No file provided'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            file_obj = request.FILES['file']
-            
-            # Read Excel data
-            wb = openpyxl.load_workbook(file_obj)
-            ws = wb.active
-            
-            # Get headers from first row
-            headers = [cell.value for cell in ws[1]]
-            
-            # Read data rows
-            data = []
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                row_data = dict(zip(headers, row))
-                # Remove None values
-                row_data = {k: v for k, v in row_data.items() if v is not None}
-                if row_data:  # Only add non-empty rows
-                    data.append(row_data)
-            
-            return self.process_import_data(data, 'excel')
+        records = RECORD_READERS[file_format](request.FILES['file'])
+        return self.process_import_data(records, file_format)
+    
+    def process_import_data(self, data, file_format):
+        """Process imported data.
         
-        except Exception as e:
-            logger.error(f"Excel import error: {str(e)}")
+        ``data`` may be any iterable of row dicts; it is consumed batch by
+        batch. Batches are committed as they go, so a failure part-way
+        through reports how many rows were already imported.
+        """
+        importer = BulkImporter(self, file_format)
+        
+        try:
+            result = importer.run(data)
+        except ImportFormatError as e:
             return Response(
-                {'error': f'Import failed: {str(e)}'},
+                {'error': str(e), 'imported_count': importer.result.imported_count},
                 status=status.HTTP_400_BAD_REQUEST
             )
-    
-    def process_import_data(self, data, file_format):
-        """Process imported data."""
-        if not data:
+        except Exception as e:
+            logger.error(f"{file_format.upper()} import error: {str(e)}")
             return Response(
-                {'error': 'No data found in file'},
+                {
+                    'error': f'Import failed: {str(e)}',
+                    'imported_count': importer.result.imported_count
+                },
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate data size
-        if len(data) > 1000:  # Limit import size
+        if not result.total_rows:
             return Response(
-                {'error': 'Maximum 1000 records allowed per import'},
+                {'error': 'No data found in file'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Transform data for serializer
-        transformed_data = []
-        errors = []
-        
-        for i, row in enumerate(data):
-            try:
-                transformed_row = self.transform_import_row(row, file_format)
-                if transformed_row:
-                    transformed_data.append(transformed_row)
-            except Exception as e:
-                errors.append(f"Row {i+1}: {str(e)}")
+        response_data = {
+            'imported_count': result.imported_count,
+            'message': f'Successfully imported {result.imported_count} records'
+        }
         
-        if errors and not transformed_data:
-            return Response(
-                {'errors': errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        if result.error_count:
+            response_data['errors'] = result.errors
+            response_data['error_count'] = result.error_count
         
-        # Validate and save data
-        try:
-            with transaction.atomic():
-                serializer = self.get_serializer(data=transformed_data, many=True)
-                
-                if serializer.is_valid():
-                    instances = serializer.save()
-                    
-                    response_data = {
-                        'imported_count': len(instances),
-                        'message': f'Successfully imported {len(instances)} records'
-                    }
-                    
-                    if errors:
-                        response_data['warnings'] = errors
-                        response_data['warning_count'] = len(errors)
-                    
-                    return Response(response_data, status=status.HTTP_201_CREATED)
-                else:
-                    return Response(
-                        {'validation_errors': serializer.errors},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+        return Response(
+            response_data,
+            status=status.HTTP_201_CREATED if result.imported_count else status.HTTP_400_BAD_REQUEST
+        )
+    
+    def prepare_import_batch(self, rows, file_format):
+        """Hook called with each batch of raw rows before they are transformed.
         
-        except Exception as e:
-            logger.error(f"Import processing error: {str(e)}")
-            return Response(
-                {'error': f'Failed to save data: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        Override to resolve lookups for the whole batch at once.
+        """
+        pass
     
     def transform_import_row(self, row, file_format):
         """Transform import row data."""
         # Default implementation - override in subclasses
         return row
+    
+    def prepare_import_instances(self, instances):
+        """Hook called with each batch of unsaved instances before insert.
+        
+        ``bulk_create`` skips ``save()`` and signals, so override to fill in
+        anything the model would otherwise compute on save.
+        """
+        pass
 
 
 class AdvancedExportMixin:
-    """Advanced export functionality with filtering and customization."""
+    """Advanced export functionality with filtering and customization.
+    
+    Custom exports run as background ``ExportJob``s: the request returns
+    ``202 Accepted`` with the job id straight away, and the file is fetched
+    from the export jobs endpoint once the worker has produced it.
+    """
     
     @action(detail=False, methods=['post'])
     def custom_export(self, request):
@@ -393,28 +414,33 @@ class AdvancedExportMixin:
             
             # Get export format
             export_format = export_config.get('format', 'csv').lower()
-            if export_format not in ['csv', 'json', 'xml', 'excel']:
+            if export_format not in ExportJob.ExportFormat.values:
                 return Response(
                     {'error': 'Unsupported export format'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Apply custom filters
+            # Validate filters and fields up front rather than in the worker
             queryset = self.get_custom_export_queryset(export_config)
+            fields = export_config.get('fields') or self.get_export_fields()
+            self.iter_export_rows(queryset, fields)
             
-            # Get custom fields
-            fields = export_config.get('fields', self.get_export_fields())
+            job = enqueue_export_job(self, queryset, fields, export_format, config=dict(export_config), custom=True)
             
-            # Generate export
-            if export_format == 'csv':
-                return self.generate_custom_csv(queryset, fields, export_config)
-            elif export_format == 'json':
-                return self.generate_custom_json(queryset, fields, export_config)
-            elif export_format == 'xml':
-                return self.generate_custom_xml(queryset, fields, export_config)
-            elif export_format == 'excel':
-                return self.generate_custom_excel(queryset, fields, export_config)
+            return Response(
+                {
+                    'job_id': str(job.id),
+                    'status': job.status,
+                    'message': 'Export started'
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
         
+        except (FieldError, ValidationError, ValueError) as e:
+            return Response(
+                {'error': f'Invalid export configuration: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             logger.error(f"Custom export error: {str(e)}")
             return Response(
@@ -457,89 +483,9 @@ class AdvancedExportMixin:
         # Apply limit
         limit = config.get('limit')
         if limit and isinstance(limit, int) and limit > 0:
-            queryset = queryset[:min(limit, 10000)]  # Max 10k records
+            queryset = queryset[:limit]
         
         return queryset
-    
-    def generate_custom_csv(self, queryset, fields, config):
-        """Generate custom CSV export."""
-        response = HttpResponse(content_type='text/csv')
-        filename = config.get('filename', self.get_export_filename())
-        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        headers = [field.replace('_', ' ').title() for field in fields]
-        writer.writerow(headers)
-        
-        # Write data
-        for obj in queryset:
-            row = [self.get_field_value(obj, field) for field in fields]
-            writer.writerow(row)
-        
-        return response
-    
-    def generate_custom_json(self, queryset, fields, config):
-        """Generate custom JSON export."""
-        data = []
-        
-        for obj in queryset:
-            item = {}
-            for field in fields:
-                item[field] = self.get_field_value(obj, field)
-            data.append(item)
-        
-        response = JsonResponse(data, safe=False)
-        filename = config.get('filename', self.get_export_filename())
-        response['Content-Disposition'] = f'attachment; filename="{filename}.json"'
-        
-        return response
-    
-    def generate_custom_excel(self, queryset, fields, config):
-        """Generate custom Excel export."""
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        
-        filename = config.get('filename', self.get_export_filename())
-        ws.title = filename[:31]  # Excel sheet name limit
-        
-        # Write headers with styling
-        for col, field in enumerate(fields, 1):
-            cell = ws.cell(row=1, column=col, value=field.replace('_', ' ').title())
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-        
-        # Write data
-        for row, obj in enumerate(queryset, 2):
-            for col, field in enumerate(fields, 1):
-                value = self.get_field_value(obj, field)
-                ws.cell(row=row, column=col, value=value)
-        
-        # Auto-adjust columns
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        response = HttpResponse(
-            output.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        
-        return response
 
 
 class ImportValidationMixin:
@@ -0,0 +1,357 @@
+"""
+Background export jobs.
+
+Large exports are enqueued as ``ExportJob`` rows and produced by a Celery
+worker in chunks: CSV, JSON and XML are written through gzip, Excel through
+openpyxl's write-only mode, so neither the request nor the worker holds the
+whole export in memory. The finished file is stored as an artifact with a
+SHA-256 checksum and served with HTTP Range support so downloads can resume.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.files import File
+from django.db import transaction
+from django.http import HttpRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import permissions, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+import logging
+
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_SETTINGS = {
+    'CHUNK_SIZE': 5000,  # Rows per database fetch and progress update
+    'DOWNLOAD_BLOCK_SIZE': 64 * 1024,
+    'RETENTION_HOURS': 24,
+    # Worker limits for run_export_job, in seconds; the global task limits
+    # are sized for request-scale work
+    'SOFT_TIME_LIMIT': 2 * 60 * 60,
+    'TIME_LIMIT': 2 * 60 * 60 + 5 * 60,
+    **getattr(settings, 'EXPORT_JOB_SETTINGS', {}),
+}
+
+ARTIFACT_TYPES = {
+    ExportJob.ExportFormat.CSV: ('csv.gz', 'application/gzip'),
+    ExportJob.ExportFormat.JSON: ('json.gz', 'application/gzip'),
+    ExportJob.ExportFormat.XML: ('xml.gz', 'application/gzip'),
+    ExportJob.ExportFormat.EXCEL: (
+        'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    ),
+}
+
+
+def excel_value(value):
+    """Coerce a value into something openpyxl can write."""
+    if value is None or isinstance(value, (str, int, float, bool, Decimal)):
+        return value
+    if isinstance(value, datetime):
+        # Excel has no notion of time zones
+        if timezone.is_aware(value):
+            value = timezone.make_naive(value)
+        return value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value if hasattr(value, 'isoformat') else str(value)
+
+
+def write_excel_workbook(target, title, fields, rows):
+    """Write ``rows`` into a write-only workbook saved to ``target``."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=title[:31])  # Excel sheet name limit
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header = []
+    for field in fields:
+        cell = WriteOnlyCell(ws, value=field.replace('_', ' ').title())
+        cell.font = header_font
+        cell.fill = header_fill
+        header.append(cell)
+    ws.append(header)
+
+    for row in rows:
+        ws.append([excel_value(value) for value in row])
+
+    wb.save(target)
+
+
+def file_checksum(path, block_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExportJobRunner:
+    """Produce the artifact for one ``ExportJob``."""
+
+    def __init__(self, job, chunk_size=None):
+        self.job = job
+        self.chunk_size = chunk_size or EXPORT_JOB_SETTINGS['CHUNK_SIZE']
+
+    def build_view(self):
+        """Instantiate the exporting ViewSet for the job's user and query parameters."""
+        job = self.job
+        http_request = HttpRequest()
+        http_request.method = 'GET'
+        for key, values in job.query_params.items():
+            http_request.GET.setlist(key, values)
+        request = Request(http_request)
+        request.user = job.user or AnonymousUser()
+
+        viewset_class = import_string(job.viewset_path)
+        view = viewset_class(request=request, args=(), kwargs={}, format_kwarg=None, action='list')
+        view.export_chunk_size = self.chunk_size
+        return view
+
+    def build_queryset(self, view):
+        """Rebuild the filtered queryset the way the exporting request did."""
+        config = self.job.config
+        if config.get('custom_export'):
+            queryset = view.get_custom_export_queryset(config)
+        else:
+            queryset = view.filter_queryset(view.get_queryset())
+        if queryset.model._meta.label != config['model']:
+            raise ValueError(f"{self.job.viewset_path} no longer exports {config['model']}")
+        return queryset
+
+    def track_progress(self, rows):
+        """Pass rows through, recording progress once per chunk."""
+        processed = 0
+        for row in rows:
+            yield row
+            processed += 1
+            if processed % self.chunk_size == 0:
+                ExportJob.objects.filter(pk=self.job.pk).update(processed_rows=processed)
+        self.job.processed_rows = processed
+
+    def run(self):
+        job = self.job
+        job.status = ExportJob.Status.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+
+        try:
+            view = self.build_view()
+            queryset = self.build_queryset(view)
+            fields = job.config['fields']
+
+            job.total_rows = queryset.count()
+            job.save(update_fields=['total_rows'])
+
+            rows = self.track_progress(view.iter_export_rows(queryset, fields))
+            extension, content_type = ARTIFACT_TYPES[job.export_format]
+            base_name = job.config['filename']
+
+            fd, path = tempfile.mkstemp(suffix=f'.{extension}')
+            os.close(fd)
+            try:
+                self.write_artifact(path, view, queryset.model, fields, rows, base_name)
+                job.checksum = file_checksum(path)
+                job.file_size = os.path.getsize(path)
+                job.file_name = f'{base_name}.{extension}'
+                job.content_type = content_type
+                with open(path, 'rb') as fh:
+                    job.file.save(f'{job.id}.{extension}', File(fh), save=False)
+            finally:
+                os.unlink(path)
+
+            job.status = ExportJob.Status.COMPLETED
+            job.completed_at = timezone.now()
+            job.save()
+
+        except Exception as e:
+            logger.error(f"Export job {job.id} failed: {str(e)}")
+            job.status = ExportJob.Status.FAILED
+            job.error = str(e)
+            job.completed_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'completed_at'])
+            raise
+
+        return job
+
+    def write_artifact(self, path, view, model, fields, rows, title):
+        """Write the export file, chunk by chunk."""
+        export_format = self.job.export_format
+        if export_format == ExportJob.ExportFormat.EXCEL:
+            write_excel_workbook(path, title, fields, rows)
+            return
+
+        if export_format == ExportJob.ExportFormat.CSV:
+            chunks = view.stream_csv(fields, rows)
+        elif export_format == ExportJob.ExportFormat.JSON:
+            chunks = view.stream_json(fields, rows)
+        else:
+            chunks = view.stream_xml(fields, rows, model.__name__.lower())
+
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+
+
+def enqueue_export_job(view, queryset, fields, export_format, config=None, custom=False):
+    """
+    Create an ``ExportJob`` for ``queryset`` and hand it to a worker.
+
+    The job records what built ``queryset`` rather than the queryset itself:
+    the request's user and query parameters, and for ``custom`` exports the
+    export config, whose filters ``get_custom_export_queryset`` applies. The
+    worker rebuilds the queryset from them through the same viewset, and
+    fails the job if the viewset no longer exports ``queryset``'s model.
+    """
+    from .tasks import run_export_job
+
+    viewset_class = type(view)
+    config = dict(config or {})
+    config['custom_export'] = custom
+    config['model'] = queryset.model._meta.label
+    config['fields'] = list(fields)
+    config.setdefault('filename', view.get_export_filename())
+
+    job = ExportJob(
+        user=view.request.user if view.request.user.is_authenticated else None,
+        export_format=export_format,
+        viewset_path=f'{viewset_class.__module__}.{viewset_class.__qualname__}',
+        config=config,
+        query_params={key: values for key, values in view.request.query_params.lists()},
+    )
+    job.save()
+    transaction.on_commit(lambda: run_export_job.delay(str(job.id)))
+    return job
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range_header(header, size):
+    """
+    Parse a single ``bytes=`` range into an inclusive (start, end) pair.
+
+    Returns None when the header is absent or not a single byte range (the
+    full file is served), and raises ValueError when it cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+def iter_file_range(fh, start, length, block_size):
+    """Yield ``length`` bytes of ``fh`` from ``start``, then close it."""
+    try:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = fh.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        fh.close()
+
+
+def artifact_response(request, job):
+    """Serve a finished export, honouring ``Range`` and ``If-Range``."""
+    size = job.file_size
+    etag = f'"{job.checksum}"'
+    byte_range = None
+
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range or if_range == etag:
+        try:
+            byte_range = parse_range_header(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = Response(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+
+    response = StreamingHttpResponse(
+        iter_file_range(job.file.open('rb'), start, length, EXPORT_JOB_SETTINGS['DOWNLOAD_BLOCK_SIZE']),
+        content_type=job.content_type,
+        status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+    )
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Content-Disposition'] = f'attachment; filename="{job.file_name}"'
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Status representation of an export job."""
+
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'status', 'export_format', 'progress', 'total_rows',
+            'processed_rows', 'file_name', 'file_size', 'checksum', 'error',
+            'created_at', 'started_at', 'completed_at'
+        ]
+        read_only_fields = fields
+
+
+class ExportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Poll export jobs and download their artifacts."""
+
+    serializer_class = ExportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = ExportJob.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user)
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the export artifact; supports resumable Range requests."""
+        job = self.get_object()
+        if job.status != ExportJob.Status.COMPLETED or not job.file:
+            return Response(
+                {'error': 'Export is not ready', 'status': job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        return artifact_response(request, job)
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_exportjob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='query_params',
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='query',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -392,4 +392,69 @@ class NotificationTemplate(models.Model):
             'color': self.color,
             'sound': self.sound,
             'auto_dismiss_seconds': self.auto_dismiss_seconds
-        }
\ No newline at end of file
+        }
+
+
+class ExportJob(models.Model):
+    """Background data export producing a downloadable file artifact."""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        COMPLETED = 'completed', _('Completed')
+        FAILED = 'failed', _('Failed')
+    
+    class ExportFormat(models.TextChoices):
+        CSV = 'csv', _('CSV (gzip)')
+        JSON = 'json', _('JSON (gzip)')
+        XML = 'xml', _('XML (gzip)')
+        EXCEL = 'excel', _('Excel')
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='export_jobs')
+    
+    # What to export
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    export_format = models.CharField(max_length=10, choices=ExportFormat.choices, default=ExportFormat.CSV)
+    viewset_path = models.CharField(max_length=255)  # Dotted path of the exporting ViewSet
+    config = models.JSONField(default=dict, blank=True)
+    query_params = models.JSONField(default=dict, blank=True)  # Query parameters of the exporting request
+    
+    # Progress
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    
+    # Artifact
+    file = models.FileField(upload_to='exports/%Y/%m/%d/', blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    checksum = models.CharField(max_length=64, blank=True)  # SHA-256 of the stored file
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'core_export_job'
+        verbose_name = _('Export Job')
+        verbose_name_plural = _('Export Jobs')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_export_format_display()} export {self.id} ({self.status})"
+    
+    @property
+    def progress(self):
+        """Completion percentage, or None until the row count is known."""
+        if self.status == self.Status.COMPLETED:
+            return 100.0
+        if not self.total_rows:
+            return None
+        return round(min(self.processed_rows / self.total_rows, 1) * 100, 1)
+
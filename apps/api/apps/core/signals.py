@@ -0,0 +1,10 @@
+"""
+Custom signals sent by core bulk operations.
+"""
+
+from django.db.models.signals import ModelSignal
+
+# Sent once per bulk update in place of a post_save per object, with
+# ``instances`` (the objects that changed) and ``update_fields`` (a dict of
+# primary key -> set of changed field names).
+post_bulk_update = ModelSignal(use_caching=True)
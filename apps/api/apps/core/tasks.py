@@ -0,0 +1,54 @@
+"""
+Celery tasks for core background processing.
+"""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+from .export_jobs import EXPORT_JOB_SETTINGS, ExportJobRunner
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    soft_time_limit=EXPORT_JOB_SETTINGS['SOFT_TIME_LIMIT'],
+    time_limit=EXPORT_JOB_SETTINGS['TIME_LIMIT'],
+)
+def run_export_job(self, job_id):
+    """Produce the artifact for an export job.
+    
+    Exports are chunked and can outlast the global 5/10 minute task limits,
+    so they run under the longer limits in ``EXPORT_JOB_SETTINGS``.
+    """
+    try:
+        job = ExportJob.objects.get(pk=job_id)
+    except ExportJob.DoesNotExist:
+        logger.warning(f"Export job {job_id} no longer exists")
+        return None
+    
+    if job.status == ExportJob.Status.COMPLETED:
+        return str(job.id)
+    
+    ExportJobRunner(job).run()
+    return str(job.id)
+
+
+@shared_task
+def cleanup_expired_export_jobs():
+    """Delete export jobs and artifacts older than the retention window."""
+    cutoff = timezone.now() - timedelta(hours=EXPORT_JOB_SETTINGS['RETENTION_HOURS'])
+    deleted = 0
+    
+    for job in ExportJob.objects.filter(created_at__lt=cutoff).iterator():
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        deleted += 1
+    
+    return deleted
@@ -8,6 +8,8 @@ from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+from .signals import post_bulk_update
+
 
 def broadcast_to_group(group_name, message_type, data):
     """Broadcast message to WebSocket group."""
@@ -79,16 +81,25 @@ def handle_post_save(sender, instance, created, **kwargs):
         
     elif not created:
         # Post updated
-        data = {
-            'id': str(instance.id),
-            'title': instance.title,
-            'slug': instance.slug,
-            'updated_at': instance.updated_at.isoformat(),
-            'status': instance.status
-        }
-        
-        # Broadcast to post group
-        broadcast_to_group(f'post_{instance.id}', 'post_update', data)
+        broadcast_to_group(f'post_{instance.id}', 'post_update', post_update_data(instance))
+
+
+@receiver(post_bulk_update, sender='blog.Post')
+def handle_post_bulk_update(sender, instances, **kwargs):
+    """Handle posts updated together by a bulk operation."""
+    for instance in instances:
+        broadcast_to_group(f'post_{instance.id}', 'post_update', post_update_data(instance))
+
+
+def post_update_data(instance):
+    """Payload broadcast to a post's group when it changes."""
+    return {
+        'id': str(instance.id),
+        'title': instance.title,
+        'slug': instance.slug,
+        'updated_at': instance.updated_at.isoformat(),
+        'status': instance.status
+    }
 
 
 # Comment signals
@@ -153,28 +164,6 @@ def handle_comment_delete(sender, instance, **kwargs):
     broadcast_to_group(f'comments_{instance.post.id}', 'comment_deleted', data)
 
 
-# Analytics signals
-@receiver(post_save, sender='analytics.PageView')
-def handle_page_view(sender, instance, created, **kwargs):
-    """Handle page view events for real-time analytics."""
-    if created and hasattr(instance, 'post') and instance.post:
-        # Update post stats
-        post_stats = {
-            'post_id': str(instance.post.id),
-            'view_count': getattr(instance.post, 'view_count', 0),
-            'timestamp': instance.timestamp.isoformat()
-        }
-        
-        # Broadcast to post group
-        broadcast_to_group(f'post_{instance.post.id}', 'post_stats_update', post_stats)
-        
-        # Broadcast to analytics dashboard
-        broadcast_to_group('analytics_dashboard', 'analytics_update', {
-            'type': 'page_view',
-            'data': post_stats
-        })
-
-
 # User mention signals (if implemented)
 def handle_user_mention(mentioned_user, content_type, object_id, mentioner):
     """Handle user mention notifications."""
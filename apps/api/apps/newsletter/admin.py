@@ -7,8 +7,9 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
-    Subscriber, Campaign, EmailLog, EmailTemplate, ClickTracking
+    Subscriber, AudienceSegment, Campaign, EmailLog, EmailTemplate, ClickTracking
 )
+from .segments import invalidate_segment_counts
 
 
 @admin.register(Subscriber)
@@ -51,12 +52,14 @@ class SubscriberAdmin(admin.ModelAdmin):
     def activate_subscribers(self, request, queryset):
         """Activate selected subscribers."""
         count = queryset.update(is_active=True)
+        invalidate_segment_counts()
         self.message_user(request, f'{count} subscribers activated.')
     activate_subscribers.short_description = 'Activate selected subscribers'
     
     def deactivate_subscribers(self, request, queryset):
         """Deactivate selected subscribers."""
         count = queryset.update(is_active=False)
+        invalidate_segment_counts()
         self.message_user(request, f'{count} subscribers deactivated.')
     deactivate_subscribers.short_description = 'Deactivate selected subscribers'
     
@@ -70,6 +73,16 @@ class SubscriberAdmin(admin.ModelAdmin):
     verify_emails.short_description = 'Verify selected emails'
 
 
+@admin.register(AudienceSegment)
+class AudienceSegmentAdmin(admin.ModelAdmin):
+    """Audience segment admin."""
+    
+    list_display = ('name', 'frequency', 'verification', 'created_at')
+    list_filter = ('frequency', 'verification')
+    search_fields = ('name', 'description')
+    filter_horizontal = ('categories',)
+
+
 @admin.register(Campaign)
 class CampaignAdmin(admin.ModelAdmin):
     """Campaign admin."""
@@ -79,8 +92,9 @@ class CampaignAdmin(admin.ModelAdmin):
     search_fields = ('name', 'subject')
     readonly_fields = (
         'total_recipients', 'emails_sent', 'emails_delivered', 'emails_opened',
-        'emails_clicked', 'emails_bounced', 'emails_unsubscribed',
-        'open_rate', 'click_rate', 'bounce_rate', 'created_at', 'updated_at'
+        'emails_clicked', 'emails_bounced', 'emails_unsubscribed', 'emails_failed',
+        'open_rate', 'click_rate', 'bounce_rate', 'audience_snapshot', 'delivery_cursor',
+        'delivery_heartbeat_at', 'created_at', 'updated_at'
     )
     filter_horizontal = ('target_categories',)
     
@@ -92,7 +106,7 @@ class CampaignAdmin(admin.ModelAdmin):
             'fields': ('content_html', 'content_text')
         }),
         ('Targeting', {
-            'fields': ('target_frequency', 'target_categories')
+            'fields': ('segment', 'target_frequency', 'target_categories')
         }),
         ('Scheduling', {
             'fields': ('scheduled_at', 'sent_at')
@@ -101,10 +115,15 @@ class CampaignAdmin(admin.ModelAdmin):
             'fields': (
                 'total_recipients', 'emails_sent', 'emails_delivered',
                 'emails_opened', 'emails_clicked', 'emails_bounced',
-                'emails_unsubscribed', 'open_rate', 'click_rate', 'bounce_rate'
+                'emails_unsubscribed', 'emails_failed', 'open_rate', 'click_rate',
+                'bounce_rate'
             ),
             'classes': ('collapse',)
         }),
+        ('Delivery', {
+            'fields': ('audience_snapshot', 'delivery_cursor', 'delivery_heartbeat_at'),
+            'classes': ('collapse',)
+        }),
         ('Metadata', {
             'fields': ('created_by', 'created_at', 'updated_at'),
             'classes': ('collapse',)
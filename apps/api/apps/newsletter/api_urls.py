@@ -10,6 +10,7 @@ app_name = 'newsletter-api'
 
 router = DefaultRouter()
 router.register(r'subscribers', api_views.SubscriberViewSet, basename='subscriber')
+router.register(r'segments', api_views.AudienceSegmentViewSet, basename='segment')
 router.register(r'campaigns', api_views.CampaignViewSet, basename='campaign')
 
 urlpatterns = [
@@ -3,18 +3,23 @@ Newsletter API Views
 RESTful API endpoints for newsletter functionality.
 """
 
+import ipaddress
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.shortcuts import get_object_or_404
-from django.utils import timezone
+from django.db.models import Count, Q
+from django.shortcuts import get_object_or_404, redirect
 from django.http import HttpResponse
-from .models import Subscriber, Campaign, EmailLog, ClickTracking
+from .delivery import enqueue_campaign_delivery
+from .models import Subscriber, AudienceSegment, Campaign
+from .segments import get_segment_counts
 from .serializers import (
-    SubscriberSerializer, SubscribeSerializer, CampaignSerializer,
-    CampaignCreateUpdateSerializer
+    SubscriberSerializer, SubscribeSerializer, AudienceSegmentSerializer,
+    CampaignSerializer, CampaignCreateUpdateSerializer
 )
+from .tracking import tracking_buffer
 
 
 class SubscriberViewSet(viewsets.ModelViewSet):
@@ -38,25 +43,62 @@ class SubscriberViewSet(viewsets.ModelViewSet):
         if not request.user.is_staff:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        total_subscribers = Subscriber.objects.count()
-        active_subscribers = Subscriber.objects.active().count()
-        verified_subscribers = Subscriber.objects.filter(email_verified=True).count()
-        
-        # Frequency breakdown
-        frequency_stats = {}
-        for freq_choice in Subscriber.Frequency.choices:
-            freq_code = freq_choice[0]
-            count = Subscriber.objects.active().filter(frequency=freq_code).count()
-            frequency_stats[freq_code] = count
+        active = Q(is_active=True, email_verified=True)
+        counts = Subscriber.objects.aggregate(
+            total_subscribers=Count('pk'),
+            active_subscribers=Count('pk', filter=active),
+            verified_subscribers=Count('pk', filter=Q(email_verified=True)),
+            **{
+                f'frequency_{code}': Count('pk', filter=active & Q(frequency=code))
+                for code in Subscriber.Frequency.values
+            }
+        )
         
         return Response({
-            'total_subscribers': total_subscribers,
-            'active_subscribers': active_subscribers,
-            'verified_subscribers': verified_subscribers,
-            'frequency_breakdown': frequency_stats
+            'total_subscribers': counts['total_subscribers'],
+            'active_subscribers': counts['active_subscribers'],
+            'verified_subscribers': counts['verified_subscribers'],
+            'frequency_breakdown': {
+                code: counts[f'frequency_{code}'] for code in Subscriber.Frequency.values
+            }
         })
 
 
+class AudienceSegmentViewSet(viewsets.ModelViewSet):
+    """ViewSet for managing audience segments (staff only)."""
+    
+    serializer_class = AudienceSegmentSerializer
+    permission_classes = [permissions.IsAdminUser]
+    queryset = AudienceSegment.objects.prefetch_related('categories')
+    
+    def perform_create(self, serializer):
+        """Set creator when creating segment."""
+        serializer.save(created_by=self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        """List segments with member counts from one query or the cache."""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        segments = list(page if page is not None else queryset)
+        
+        serializer = self.get_serializer(
+            segments, many=True,
+            context={**self.get_serializer_context(), 'segment_counts': get_segment_counts(segments)}
+        )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Show a segment with its member count."""
+        segment = self.get_object()
+        serializer = self.get_serializer(
+            segment,
+            context={**self.get_serializer_context(), 'segment_counts': get_segment_counts([segment])}
+        )
+        return Response(serializer.data)
+
+
 class CampaignViewSet(viewsets.ModelViewSet):
     """ViewSet for managing newsletter campaigns."""
     
@@ -108,29 +150,20 @@ class CampaignViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def send_now(self, request, pk=None):
-        """Send campaign immediately."""
+        """Start delivering the campaign in the background."""
         campaign = self.get_object()
         
-        if campaign.status != Campaign.Status.DRAFT:
+        if campaign.status != Campaign.Status.DRAFT or not enqueue_campaign_delivery(campaign):
             return Response(
                 {'error': 'Only draft campaigns can be sent'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get target subscribers
-        subscribers = campaign.get_target_subscribers()
-        campaign.total_recipients = subscribers.count()
-        campaign.status = Campaign.Status.SENDING
-        campaign.save()
-        
-        # Here you would queue the emails for sending
-        # For now, just update the status
-        campaign.status = Campaign.Status.SENT
-        campaign.sent_at = timezone.now()
-        campaign.emails_sent = campaign.total_recipients
-        campaign.save()
-        
-        return Response({'message': f'Campaign sent to {campaign.total_recipients} subscribers'})
+        # The worker freezes the audience, then sets total_recipients
+        return Response({
+            'message': 'Campaign queued for delivery',
+            'status': campaign.status
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
@@ -138,6 +171,8 @@ class CampaignViewSet(viewsets.ModelViewSet):
         campaign = self.get_object()
         
         return Response({
+            'status': campaign.status,
+            'delivery_progress': round(campaign.delivery_progress, 2),
             'total_recipients': campaign.total_recipients,
             'emails_sent': campaign.emails_sent,
             'emails_delivered': campaign.emails_delivered,
@@ -145,6 +180,7 @@ class CampaignViewSet(viewsets.ModelViewSet):
             'emails_clicked': campaign.emails_clicked,
             'emails_bounced': campaign.emails_bounced,
             'emails_unsubscribed': campaign.emails_unsubscribed,
+            'emails_failed': campaign.emails_failed,
             'open_rate': round(campaign.open_rate, 2),
             'click_rate': round(campaign.click_rate, 2),
             'bounce_rate': round(campaign.bounce_rate, 2)
@@ -249,33 +285,20 @@ class VerifyEmailView(APIView):
             return Response({'error': 'Invalid token'}, status=status.HTTP_404_NOT_FOUND)
 
 
+TRACKING_PIXEL = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x04\x01\x00\x3b'
+
+
 class TrackOpenView(APIView):
     """Track email opens."""
     
     permission_classes = [permissions.AllowAny]
     
     def get(self, request, tracking_id):
-        """Track email open with tracking pixel."""
-        try:
-            email_log = EmailLog.objects.get(tracking_id=tracking_id)
-            
-            if email_log.status == EmailLog.Status.DELIVERED:
-                email_log.status = EmailLog.Status.OPENED
-                email_log.opened_at = timezone.now()
-                email_log.save()
-                
-                # Update campaign stats
-                campaign = email_log.campaign
-                campaign.emails_opened += 1
-                campaign.save()
-            
-            # Return 1x1 transparent pixel
-            pixel_data = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x04\x01\x00\x3b'
-            return HttpResponse(pixel_data, content_type='image/gif')
-        except EmailLog.DoesNotExist:
-            # Return pixel anyway to avoid broken images
-            pixel_data = b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff\x21\xf9\x04\x01\x00\x00\x00\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x04\x01\x00\x3b'
-            return HttpResponse(pixel_data, content_type='image/gif')
+        """Record the open in the tracking buffer and return a 1x1 pixel."""
+        tracking_buffer.record_open(tracking_id)
+        response = HttpResponse(TRACKING_PIXEL, content_type='image/gif')
+        response['Cache-Control'] = 'no-store'
+        return response
 
 
 class TrackClickView(APIView):
@@ -284,43 +307,20 @@ class TrackClickView(APIView):
     permission_classes = [permissions.AllowAny]
     
     def get(self, request, tracking_id):
-        """Track email click and redirect."""
+        """Record the click in the tracking buffer and redirect."""
         url = request.GET.get('url')
         if not url:
             return Response({'error': 'URL parameter required'}, status=status.HTTP_400_BAD_REQUEST)
         
+        # Clicks are written later in batches, so only record values the
+        # ClickTracking columns will accept
+        ip = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0].strip()
         try:
-            email_log = EmailLog.objects.get(tracking_id=tracking_id)
-            
-            # Track the click
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                ip = x_forwarded_for.split(',')[0]
-            else:
-                ip = request.META.get('REMOTE_ADDR')
-            
-            ClickTracking.objects.create(
-                email_log=email_log,
-                url=url,
-                ip_address=ip,
-                user_agent=request.META.get('HTTP_USER_AGENT', '')
-            )
-            
-            # Update email log status
-            if email_log.status in [EmailLog.Status.DELIVERED, EmailLog.Status.OPENED]:
-                email_log.status = EmailLog.Status.CLICKED
-                email_log.clicked_at = timezone.now()
-                email_log.save()
-                
-                # Update campaign stats
-                campaign = email_log.campaign
-                campaign.emails_clicked += 1
-                campaign.save()
-            
-            # Redirect to the actual URL
-            from django.shortcuts import redirect
-            return redirect(url)
-        except EmailLog.DoesNotExist:
-            # Redirect anyway
-            from django.shortcuts import redirect
-            return redirect(url)
\ No newline at end of file
+            ipaddress.ip_address(ip)
+        except ValueError:
+            ip = request.META.get('REMOTE_ADDR') or '0.0.0.0'
+        
+        tracking_buffer.record_click(
+            tracking_id, url[:500], ip, request.META.get('HTTP_USER_AGENT', '')
+        )
+        return redirect(url)
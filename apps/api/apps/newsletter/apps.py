@@ -5,3 +5,7 @@ class NewsletterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.newsletter'
     verbose_name = 'Newsletter System'
+    
+    def ready(self):
+        """Connect signals that keep segment counts current."""
+        import apps.newsletter.signals
@@ -0,0 +1,462 @@
+"""
+Campaign delivery engine.
+
+A campaign is delivered by a Celery worker in chunks. The worker first
+freezes the audience into a snapshot; each step then either sends the
+campaign's ``QUEUED`` email logs or, when there are none left, queues the
+next page of its audience snapshot (or, for campaigns resumed from a
+keyset cursor, of a keyset-ordered subscriber query) as ``EmailLog`` rows
+with a single ``bulk_create``. Messages go out over pooled, persistent
+connections per provider, from a fixed number of sender threads and under a
+per-provider rate limit shared through Redis by every worker. Counters are
+written after every chunk, and the heartbeat also while a throttled chunk
+is still sending, so progress is visible while the campaign sends and only
+a crashed worker's campaign is picked up again from its cursor.
+
+Delivery is at-least-once: a worker that dies after the transport accepted
+a message but before the chunk was recorded will send that message again
+when the campaign resumes.
+"""
+
+import queue
+import secrets
+import smtplib
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import cached_property
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+import logging
+import redis
+
+from .models import Campaign, EmailLog, Subscriber
+from .segments import materialize_snapshot, snapshot_page
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_DELIVERY_SETTINGS = {
+    'CHUNK_SIZE': 500,  # Recipients queued, sent and recorded per step
+    'CONCURRENCY': 8,  # Sender threads per worker
+    'HEARTBEAT_TIMEOUT': 300,  # Seconds before a silent campaign is resumed
+    'TRACKING_BASE_URL': '',  # Origin prepended to tracking/unsubscribe links
+    'REDIS_URL': getattr(settings, 'REDIS_URL', 'redis://localhost:6379/0'),  # Shared rate limits
+    'SOFT_TIME_LIMIT': 12 * 60 * 60,  # send_campaign worker limits, in seconds
+    'TIME_LIMIT': 12 * 60 * 60 + 5 * 60,
+    'PROVIDERS': {'default': {}},
+    **getattr(settings, 'NEWSLETTER_DELIVERY_SETTINGS', {}),
+}
+
+PROVIDER_DEFAULTS = {
+    'BACKEND': None,  # Django email backend path, defaults to EMAIL_BACKEND
+    'OPTIONS': {},  # Keyword arguments for the backend (host, port, ...)
+    'CONNECTIONS': 4,  # Persistent connections kept open
+    'RATE': 0,  # Messages per second, 0 for no limit
+    'BURST': 0,  # Messages allowed back to back, defaults to RATE
+    'MAX_MESSAGES_PER_CONNECTION': 0,  # Reconnect after this many, 0 for never
+    'DOMAINS': [],  # Recipient domains routed to this provider
+}
+
+
+class TransportUnavailable(Exception):
+    """A provider could not be reached; the campaign should be retried later."""
+
+
+class TokenBucket:
+    """
+    Token bucket kept in Redis, so one provider's rate holds across workers.
+
+    The bucket is stored as the theoretical arrival time of the next message
+    (GCRA): ``acquire`` reserves the next slot with a WATCH/MULTI update and
+    sleeps until it comes round. Redis' clock is used so hosts need not agree.
+    """
+
+    key_prefix = 'newsletter:throttle:'
+
+    def __init__(self, name, rate, burst=None, client=None):
+        self.key = f'{self.key_prefix}{name}'
+        self.rate = rate
+        self.capacity = max(burst or rate, 1)
+        self._client = client
+
+    @cached_property
+    def client(self):
+        return self._client or redis.Redis.from_url(NEWSLETTER_DELIVERY_SETTINGS['REDIS_URL'])
+
+    def reserve(self):
+        """Claim the next send slot; returns seconds to wait before using it."""
+        interval = 1 / self.rate
+        tolerance = (self.capacity - 1) * interval
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.key)
+                    seconds, microseconds = pipe.time()
+                    now = seconds + microseconds / 1e6
+                    stored = pipe.get(self.key)
+                    arrival = max(float(stored) if stored else now, now)
+                    pipe.multi()
+                    pipe.set(self.key, repr(arrival + interval), px=int((arrival + interval - now + 1) * 1000))
+                    pipe.execute()
+                    return max(arrival - tolerance - now, 0)
+                except redis.WatchError:
+                    continue
+
+    def acquire(self):
+        if not self.rate:
+            return
+        try:
+            wait = self.reserve()
+        except redis.RedisError as e:
+            # Sending unthrottled could get the account blocked; retry later
+            raise TransportUnavailable(f"Rate limiter unavailable: {str(e)}") from e
+        if wait:
+            time.sleep(wait)
+
+
+class PooledConnection:
+    """A persistent email backend connection that reconnects when needed."""
+
+    def __init__(self, backend, options, max_messages=0):
+        self.backend = get_connection(backend, fail_silently=False, **options)
+        self.max_messages = max_messages
+        self.sent = 0
+        self.open()
+
+    def open(self):
+        try:
+            self.backend.open()
+        except Exception as e:
+            raise TransportUnavailable(str(e)) from e
+
+    def reset(self):
+        self.close()
+        self.sent = 0
+        self.open()
+
+    def send(self, message):
+        if self.max_messages and self.sent >= self.max_messages:
+            self.reset()
+        try:
+            self.backend.send_messages([message])
+        except (smtplib.SMTPRecipientsRefused, TransportUnavailable):
+            raise
+        except Exception as e:
+            # The server may have dropped an idle connection; retry once
+            logger.warning(f"Retrying message on a new connection: {str(e)}")
+            self.reset()
+            self.backend.send_messages([message])
+        self.sent += 1
+
+    def close(self):
+        try:
+            self.backend.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded pool of ``PooledConnection`` objects for one provider."""
+
+    def __init__(self, backend, options, size, max_messages=0):
+        self.backend = backend
+        self.options = options
+        self.size = max(size, 1)
+        self.max_messages = max_messages
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def checkout(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            create = self.created < self.size
+            if create:
+                self.created += 1
+        if not create:
+            return self.idle.get()
+        try:
+            return PooledConnection(self.backend, self.options, self.max_messages)
+        except Exception:
+            with self.lock:
+                self.created -= 1
+            raise
+
+    @contextmanager
+    def connection(self):
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            self.idle.put(connection)
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self.created = 0
+
+
+class Provider:
+    """An outbound mail provider with its own connections and rate limit."""
+
+    def __init__(self, name, config):
+        config = {**PROVIDER_DEFAULTS, **config}
+        self.name = name
+        self.domains = [domain.lower() for domain in config['DOMAINS']]
+        self.throttle = TokenBucket(name, config['RATE'], config['BURST'])
+        self.pool = ConnectionPool(
+            config['BACKEND'] or settings.EMAIL_BACKEND,
+            config['OPTIONS'],
+            config['CONNECTIONS'],
+            config['MAX_MESSAGES_PER_CONNECTION']
+        )
+
+    def send(self, message):
+        self.throttle.acquire()
+        with self.pool.connection() as connection:
+            connection.send(message)
+
+
+class CampaignDelivery:
+    """Deliver one campaign to its target subscribers."""
+
+    def __init__(self, campaign, providers=None, chunk_size=None, concurrency=None):
+        self.campaign = campaign
+        self.chunk_size = chunk_size or NEWSLETTER_DELIVERY_SETTINGS['CHUNK_SIZE']
+        self.concurrency = concurrency or NEWSLETTER_DELIVERY_SETTINGS['CONCURRENCY']
+
+        providers = providers or NEWSLETTER_DELIVERY_SETTINGS['PROVIDERS']
+        self.providers = {name: Provider(name, config) for name, config in providers.items()}
+        self.default_provider = self.providers.get('default') or next(iter(self.providers.values()))
+        self.routes = {
+            domain: provider
+            for provider in self.providers.values()
+            for domain in provider.domains
+        }
+
+        base_url = NEWSLETTER_DELIVERY_SETTINGS['TRACKING_BASE_URL'].rstrip('/')
+        self.open_url = base_url + reverse('api:v1:newsletter-api:track-open', args=['__tracking_id__'])
+        self.unsubscribe_url = base_url + reverse('api:v1:newsletter-api:unsubscribe', args=['__token__'])
+
+    @cached_property
+    def targets(self):
+        return self.campaign.get_target_subscribers()
+
+    def provider_for(self, email):
+        return self.routes.get(email.rpartition('@')[2].lower(), self.default_provider)
+
+    def run(self):
+        campaign = self.campaign
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            self.freeze_audience()
+            while not self.cancelled():
+                logs = self.next_queued()
+                if logs:
+                    self.record(self.send_chunk(executor, logs))
+                elif not self.queue_next_chunk():
+                    break
+            else:
+                logger.info(f"Campaign {campaign.id} is no longer sending; stopping delivery")
+                return campaign
+        except Exception as e:
+            # Leave the campaign SENDING so it is resumed from its cursor
+            logger.error(f"Delivery of campaign {campaign.id} failed: {str(e)}")
+            raise
+        finally:
+            executor.shutdown()
+            for provider in self.providers.values():
+                provider.pool.close()
+
+        campaign.status = Campaign.Status.SENT
+        campaign.sent_at = timezone.now()
+        campaign.save(update_fields=['status', 'sent_at'])
+        return campaign
+
+    def freeze_audience(self):
+        """Snapshot the audience before the first chunk, so it is never rescanned."""
+        campaign = self.campaign
+        if campaign.audience_snapshot_id or campaign.delivery_cursor is not None:
+            return
+        snapshot = materialize_snapshot(self.targets, segment=campaign.segment)
+        frozen = Campaign.objects.filter(pk=campaign.pk, audience_snapshot__isnull=True).update(
+            audience_snapshot=snapshot,
+            total_recipients=snapshot.member_count,
+            delivery_heartbeat_at=timezone.now()
+        )
+        if not frozen:
+            # Another worker froze it first; deliver from its snapshot
+            snapshot.delete()
+        campaign.refresh_from_db(fields=['audience_snapshot', 'total_recipients'])
+
+    def send_chunk(self, executor, logs):
+        """Send one chunk, refreshing the heartbeat while the senders wait on the rate limit."""
+        futures = [executor.submit(self.send, log) for log in logs]
+        interval = NEWSLETTER_DELIVERY_SETTINGS['HEARTBEAT_TIMEOUT'] / 3
+        while True:
+            done, pending = wait(futures, timeout=interval, return_when=FIRST_EXCEPTION)
+            if not pending or any(future.exception() for future in done):
+                break
+            self.beat()
+        for future in pending:
+            future.cancel()
+        return [future.result() for future in futures]
+
+    def beat(self):
+        Campaign.objects.filter(pk=self.campaign.pk, status=Campaign.Status.SENDING).update(
+            delivery_heartbeat_at=timezone.now()
+        )
+
+    def cancelled(self):
+        status = Campaign.objects.filter(pk=self.campaign.pk).values_list('status', flat=True).first()
+        return status != Campaign.Status.SENDING
+
+    def next_queued(self):
+        """Return up to one chunk of queued logs, including any left by a crash."""
+        return list(
+            EmailLog.objects.filter(campaign=self.campaign, status=EmailLog.Status.QUEUED)
+            .values('id', 'email_address', 'tracking_id', 'subscriber__unsubscribe_token')
+            [:self.chunk_size]
+        )
+
+    @cached_property
+    def snapshot_ids(self):
+        return bytes(self.campaign.audience_snapshot.subscriber_ids)
+
+    def next_page(self):
+        """Return (last subscriber pk considered, [(pk, email), ...]) after the cursor."""
+        campaign = self.campaign
+        if campaign.audience_snapshot_id:
+            ids = snapshot_page(self.snapshot_ids, campaign.delivery_cursor, self.chunk_size)
+            if not ids:
+                return None, []
+            # Members who unsubscribed since the snapshot are skipped
+            rows = Subscriber.objects.filter(pk__in=ids, is_active=True).values_list('pk', 'email')
+            return ids[-1], list(rows)
+
+        subscribers = self.targets
+        if campaign.delivery_cursor:
+            subscribers = subscribers.filter(pk__gt=campaign.delivery_cursor)
+        rows = list(subscribers.order_by('pk').values_list('pk', 'email')[:self.chunk_size])
+        return (rows[-1][0] if rows else None), rows
+
+    def queue_next_chunk(self):
+        """Queue the next page of subscribers after the cursor; False when done."""
+        campaign = self.campaign
+        cursor, rows = self.next_page()
+        if cursor is None:
+            return False
+
+        logs = [
+            EmailLog(
+                campaign=campaign,
+                subscriber_id=subscriber_id,
+                email_address=email,
+                subject=campaign.subject,
+                tracking_id=secrets.token_urlsafe(32)
+            )
+            for subscriber_id, email in rows
+        ]
+        campaign.delivery_cursor = cursor
+        with transaction.atomic():
+            EmailLog.objects.bulk_create(logs, ignore_conflicts=True)
+            Campaign.objects.filter(pk=campaign.pk).update(
+                delivery_cursor=campaign.delivery_cursor,
+                delivery_heartbeat_at=timezone.now()
+            )
+        return True
+
+    def build_message(self, log):
+        """Build the message for one queued log."""
+        campaign = self.campaign
+        unsubscribe_url = self.unsubscribe_url.replace('__token__', log['subscriber__unsubscribe_token'])
+        pixel = '<img src="{}" width="1" height="1" alt="">'.format(
+            self.open_url.replace('__tracking_id__', log['tracking_id'])
+        )
+        message = EmailMultiAlternatives(
+            subject=campaign.subject,
+            body=campaign.content_text,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[log['email_address']],
+            headers={'List-Unsubscribe': f'<{unsubscribe_url}>'}
+        )
+        message.attach_alternative(campaign.content_html + pixel, 'text/html')
+        return message
+
+    def send(self, log):
+        """Send one message; runs on a sender thread and never touches the database."""
+        try:
+            self.provider_for(log['email_address']).send(self.build_message(log))
+        except smtplib.SMTPRecipientsRefused as e:
+            return log['id'], EmailLog.Status.BOUNCED, str(e.recipients)
+        except TransportUnavailable:
+            # Stop the run rather than failing every remaining recipient
+            raise
+        except Exception as e:
+            logger.warning(f"Sending to {log['email_address']} failed: {str(e)}")
+            return log['id'], EmailLog.Status.FAILED, str(e)
+        return log['id'], EmailLog.Status.SENT, ''
+
+    def record(self, results):
+        """Write the outcome of one chunk and advance the campaign counters."""
+        now = timezone.now()
+        sent = [log_id for log_id, result, error in results if result == EmailLog.Status.SENT]
+        bounced = [
+            EmailLog(id=log_id, status=result, bounce_reason=error)
+            for log_id, result, error in results if result == EmailLog.Status.BOUNCED
+        ]
+        failed = [
+            EmailLog(id=log_id, status=result, error_message=error)
+            for log_id, result, error in results if result == EmailLog.Status.FAILED
+        ]
+
+        with transaction.atomic():
+            if sent:
+                EmailLog.objects.filter(id__in=sent).update(status=EmailLog.Status.SENT, sent_at=now)
+            if bounced:
+                EmailLog.objects.bulk_update(bounced, ['status', 'bounce_reason'])
+            if failed:
+                EmailLog.objects.bulk_update(failed, ['status', 'error_message'])
+            Campaign.objects.filter(pk=self.campaign.pk).update(
+                emails_sent=F('emails_sent') + len(sent),
+                emails_bounced=F('emails_bounced') + len(bounced),
+                emails_failed=F('emails_failed') + len(failed),
+                delivery_heartbeat_at=now
+            )
+
+
+def enqueue_campaign_delivery(campaign):
+    """
+    Move a draft campaign to SENDING and hand it to a worker.
+
+    The worker freezes the audience, so the request does not scan it.
+    Returns False if the campaign was no longer a draft, so concurrent
+    requests cannot start the same campaign twice.
+    """
+    from .tasks import send_campaign
+
+    now = timezone.now()
+    started = Campaign.objects.filter(pk=campaign.pk, status=Campaign.Status.DRAFT).update(
+        status=Campaign.Status.SENDING,
+        delivery_cursor=None,
+        delivery_heartbeat_at=now,
+        updated_at=now
+    )
+    if not started:
+        return False
+
+    campaign.refresh_from_db()
+    transaction.on_commit(lambda: send_campaign.delay(str(campaign.id)))
+    return True
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('newsletter', '0002_campaign_delivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudienceSegment',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('frequency', models.CharField(blank=True, choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('never', 'Never')], help_text='Only subscribers with this frequency preference', max_length=20, null=True)),
+                ('verification', models.CharField(choices=[('verified', 'Verified only'), ('unverified', 'Unverified only'), ('any', 'Any')], default='verified', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('categories', models.ManyToManyField(blank=True, help_text='Only subscribers interested in any of these categories', to='blog.category')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audience_segments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Audience Segment',
+                'verbose_name_plural': 'Audience Segments',
+                'db_table': 'newsletter_audience_segment',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AudienceSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('member_count', models.PositiveIntegerField(default=0)),
+                ('subscriber_ids', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('segment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='snapshots', to='newsletter.audiencesegment')),
+            ],
+            options={
+                'verbose_name': 'Audience Snapshot',
+                'verbose_name_plural': 'Audience Snapshots',
+                'db_table': 'newsletter_audience_snapshot',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='audience_snapshot',
+            field=models.ForeignKey(blank=True, help_text='Recipients frozen when sending started', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='campaigns', to='newsletter.audiencesnapshot'),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='segment',
+            field=models.ForeignKey(blank=True, help_text='Send to this segment instead of the target fields above', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='campaigns', to='newsletter.audiencesegment'),
+        ),
+    ]
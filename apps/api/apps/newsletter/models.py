@@ -96,6 +96,23 @@ class Subscriber(models.Model):
     def __str__(self):
         return self.email
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the segment-relevant state so signals can adjust cached
+        # segment counts by the difference when the subscriber is saved
+        state = instance.segment_state()
+        if state is not None:
+            instance._segment_state = state
+        return instance
+    
+    def segment_state(self):
+        """Return the fields audience segments match on, or None if deferred."""
+        deferred = self.get_deferred_fields()
+        if deferred & {'is_active', 'email_verified', 'frequency'}:
+            return None
+        return (self.is_active, self.email_verified, self.frequency)
+    
     def save(self, *args, **kwargs):
         if not self.unsubscribe_token:
             import secrets
@@ -124,6 +141,81 @@ class Subscriber(models.Model):
         self.save()
 
 
+class AudienceSegment(models.Model):
+    """A reusable audience definition for campaigns."""
+    
+    class Verification(models.TextChoices):
+        VERIFIED = 'verified', _('Verified only')
+        UNVERIFIED = 'unverified', _('Unverified only')
+        ANY = 'any', _('Any')
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    
+    # Definition; unsubscribed subscribers are never members
+    frequency = models.CharField(
+        max_length=20,
+        choices=Subscriber.Frequency.choices,
+        null=True,
+        blank=True,
+        help_text=_('Only subscribers with this frequency preference')
+    )
+    categories = models.ManyToManyField(
+        'blog.Category',
+        blank=True,
+        help_text=_('Only subscribers interested in any of these categories')
+    )
+    verification = models.CharField(
+        max_length=20,
+        choices=Verification.choices,
+        default=Verification.VERIFIED
+    )
+    
+    # Metadata
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='audience_segments'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'newsletter_audience_segment'
+        verbose_name = _('Audience Segment')
+        verbose_name_plural = _('Audience Segments')
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class AudienceSnapshot(models.Model):
+    """
+    The members of an audience frozen at one point in time.
+    
+    Member primary keys are stored sorted, as packed 16-byte UUIDs, so a
+    campaign can page through its recipients without querying the
+    subscribers table for them again.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    segment = models.ForeignKey(
+        AudienceSegment, on_delete=models.SET_NULL, null=True, blank=True, related_name='snapshots'
+    )
+    member_count = models.PositiveIntegerField(default=0)
+    subscriber_ids = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'newsletter_audience_snapshot'
+        verbose_name = _('Audience Snapshot')
+        verbose_name_plural = _('Audience Snapshots')
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.member_count} subscribers at {self.created_at}"
+
+
 class Campaign(models.Model):
     """Newsletter campaign model."""
     
@@ -165,6 +257,22 @@ class Campaign(models.Model):
         blank=True,
         help_text=_('Send to subscribers interested in these categories')
     )
+    segment = models.ForeignKey(
+        AudienceSegment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='campaigns',
+        help_text=_('Send to this segment instead of the target fields above')
+    )
+    audience_snapshot = models.ForeignKey(
+        AudienceSnapshot,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='campaigns',
+        help_text=_('Recipients frozen when sending started')
+    )
     
     # Scheduling
     scheduled_at = models.DateTimeField(null=True, blank=True)
@@ -178,6 +286,15 @@ class Campaign(models.Model):
     emails_clicked = models.PositiveIntegerField(default=0)
     emails_bounced = models.PositiveIntegerField(default=0)
     emails_unsubscribed = models.PositiveIntegerField(default=0)
+    emails_failed = models.PositiveIntegerField(default=0)
+    
+    # Delivery progress
+    delivery_cursor = models.UUIDField(
+        null=True,
+        blank=True,
+        help_text=_('Last subscriber queued for delivery')
+    )
+    delivery_heartbeat_at = models.DateTimeField(null=True, blank=True)
     
     # Metadata
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_campaigns')
@@ -219,17 +336,25 @@ class Campaign(models.Model):
             return 0
         return (self.emails_bounced / self.emails_sent) * 100
     
+    @property
+    def delivery_progress(self):
+        """Percentage of recipients handed to the mail transport."""
+        if self.total_recipients == 0:
+            return 100.0 if self.status == self.Status.SENT else 0.0
+        handled = self.emails_sent + self.emails_bounced + self.emails_failed
+        return min(handled / self.total_recipients * 100, 100.0)
+    
     def get_target_subscribers(self):
         """Get subscribers that match the campaign targeting."""
-        queryset = Subscriber.objects.active()
-        
-        if self.target_frequency:
-            queryset = queryset.filter(frequency=self.target_frequency)
+        from .segments import segment_filter
         
-        if self.target_categories.exists():
-            queryset = queryset.filter(categories__in=self.target_categories.all()).distinct()
+        if self.segment_id:
+            return Subscriber.objects.filter(segment_filter(self.segment))
         
-        return queryset
+        return Subscriber.objects.filter(segment_filter(
+            frequency=self.target_frequency,
+            category_ids=list(self.target_categories.values_list('id', flat=True))
+        ))
 
 
 class EmailLog(models.Model):
@@ -244,6 +369,7 @@ class EmailLog(models.Model):
         BOUNCED = 'bounced', _('Bounced')
         COMPLAINED = 'complained', _('Complained')
         UNSUBSCRIBED = 'unsubscribed', _('Unsubscribed')
+        FAILED = 'failed', _('Failed')
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='email_logs')
@@ -279,6 +405,13 @@ class EmailLog(models.Model):
             models.Index(fields=['subscriber']),
             models.Index(fields=['tracking_id']),
         ]
+        constraints = [
+            # Delivery is resumable; a recipient is only ever queued once
+            models.UniqueConstraint(
+                fields=['campaign', 'subscriber'],
+                name='newsletter_email_log_unique_recipient'
+            ),
+        ]
     
     def __str__(self):
         return f"Email to {self.email_address} for {self.campaign.name}"
@@ -0,0 +1,178 @@
+"""
+Audience segments.
+
+A segment is defined by frequency, categories and verification state.
+Member counts for any number of segments come from one conditional
+aggregation query and are cached per segment; subscriber signals then
+adjust the cached counts by the difference a subscribe, unsubscribe,
+verification or preference change makes, so reads stay cache hits.
+
+When a campaign starts sending, its audience is materialized into an
+``AudienceSnapshot``: the sorted member primary keys packed into one
+binary value, which delivery pages through instead of re-running the
+audience query.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q
+import logging
+
+from .models import AudienceSegment, AudienceSnapshot, Subscriber
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_SEGMENT_SETTINGS = {
+    'COUNT_CACHE_TIMEOUT': 3600,  # Seconds a cached member count is trusted
+    'SNAPSHOT_FETCH_SIZE': 10000,  # Primary keys read per fetch when materializing
+    **getattr(settings, 'NEWSLETTER_SEGMENT_SETTINGS', {}),
+}
+
+COUNT_CACHE_KEY = 'newsletter:segment_count:{}'
+ID_SIZE = 16  # Bytes per packed UUID
+
+
+def segment_definition(segment):
+    """Return (frequency, category ids, verification) for a segment."""
+    return (
+        segment.frequency,
+        frozenset(category.pk for category in segment.categories.all()),
+        segment.verification
+    )
+
+
+def segment_filter(segment=None, frequency=None, category_ids=(),
+                   verification=AudienceSegment.Verification.VERIFIED):
+    """Build the subscriber filter for a segment or an ad-hoc definition."""
+    if segment is not None:
+        frequency, category_ids, verification = segment_definition(segment)
+
+    condition = Q(is_active=True)
+    if verification == AudienceSegment.Verification.VERIFIED:
+        condition &= Q(email_verified=True)
+    elif verification == AudienceSegment.Verification.UNVERIFIED:
+        condition &= Q(email_verified=False)
+    if frequency:
+        condition &= Q(frequency=frequency)
+    if category_ids:
+        # EXISTS keeps one row per subscriber without a DISTINCT
+        interests = Subscriber.categories.through.objects.filter(
+            subscriber_id=OuterRef('pk'),
+            category_id__in=list(category_ids)
+        )
+        condition &= Q(Exists(interests))
+    return condition
+
+
+def segment_matches(definition, state, category_ids):
+    """Whether a subscriber in ``state`` with ``category_ids`` is a member."""
+    if state is None:
+        return False
+    frequency, segment_categories, verification = definition
+    is_active, email_verified, subscriber_frequency = state
+    if not is_active:
+        return False
+    if verification == AudienceSegment.Verification.VERIFIED and not email_verified:
+        return False
+    if verification == AudienceSegment.Verification.UNVERIFIED and email_verified:
+        return False
+    if frequency and frequency != subscriber_frequency:
+        return False
+    return not segment_categories or bool(segment_categories & category_ids)
+
+
+def count_segments(segments):
+    """Count the members of every segment with a single query."""
+    if not segments:
+        return {}
+    aliases = {f'segment_{segment.pk.hex}': segment.pk for segment in segments}
+    counts = Subscriber.objects.aggregate(**{
+        alias: Count('pk', filter=segment_filter(segment))
+        for alias, segment in zip(aliases, segments)
+    })
+    return {aliases[alias]: count for alias, count in counts.items()}
+
+
+def get_segment_counts(segments):
+    """Return {segment pk: member count}, computing only uncached counts."""
+    segments = list(segments)
+    keys = {segment.pk: COUNT_CACHE_KEY.format(segment.pk) for segment in segments}
+    cached = cache.get_many(keys.values())
+
+    counts = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [segment for segment in segments if segment.pk not in counts]
+    if missing:
+        computed = count_segments(missing)
+        cache.set_many(
+            {keys[pk]: count for pk, count in computed.items()},
+            NEWSLETTER_SEGMENT_SETTINGS['COUNT_CACHE_TIMEOUT']
+        )
+        counts.update(computed)
+    return counts
+
+
+def invalidate_segment_counts(segment_ids=None):
+    """Drop cached counts so they are recomputed on the next read."""
+    if segment_ids is None:
+        segment_ids = AudienceSegment.objects.values_list('pk', flat=True)
+    cache.delete_many([COUNT_CACHE_KEY.format(pk) for pk in segment_ids])
+
+
+def adjust_segment_counts(before, after, categories_before=frozenset(), categories_after=None):
+    """
+    Move cached counts by the membership change of one subscriber.
+
+    ``before`` and ``after`` are ``Subscriber.segment_state()`` tuples, or
+    None when the subscriber did not or no longer exists.
+    """
+    if categories_after is None:
+        categories_after = categories_before
+    if before == after and categories_before == categories_after:
+        return
+
+    for segment in AudienceSegment.objects.prefetch_related('categories'):
+        definition = segment_definition(segment)
+        delta = (
+            segment_matches(definition, after, categories_after)
+            - segment_matches(definition, before, categories_before)
+        )
+        if delta:
+            try:
+                cache.incr(COUNT_CACHE_KEY.format(segment.pk), delta)
+            except ValueError:
+                # Not cached; the next read computes it from the database
+                pass
+
+
+def materialize_snapshot(queryset, segment=None):
+    """Freeze the subscribers of ``queryset`` into an ``AudienceSnapshot``."""
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    packed = b''.join(
+        pk.bytes for pk in ids.iterator(chunk_size=NEWSLETTER_SEGMENT_SETTINGS['SNAPSHOT_FETCH_SIZE'])
+    )
+    return AudienceSnapshot.objects.create(
+        segment=segment,
+        member_count=len(packed) // ID_SIZE,
+        subscriber_ids=packed
+    )
+
+
+def snapshot_page(packed, after=None, limit=1000):
+    """Return up to ``limit`` member ids that sort after ``after``."""
+    low, high = 0, len(packed) // ID_SIZE
+    if after is not None:
+        # Binary search for the first id greater than ``after``
+        target = after.bytes
+        while low < high:
+            middle = (low + high) // 2
+            if packed[middle * ID_SIZE:(middle + 1) * ID_SIZE] <= target:
+                low = middle + 1
+            else:
+                high = middle
+    end = min(low + limit, len(packed) // ID_SIZE)
+    return [
+        uuid.UUID(bytes=bytes(packed[index * ID_SIZE:(index + 1) * ID_SIZE]))
+        for index in range(low, end)
+    ]
@@ -4,7 +4,7 @@ Newsletter API Serializers
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Subscriber, Campaign, EmailLog
+from .models import Subscriber, AudienceSegment, Campaign, EmailLog
 
 User = get_user_model()
 
@@ -37,6 +37,24 @@ class SubscribeSerializer(serializers.Serializer):
         return value
 
 
+class AudienceSegmentSerializer(serializers.ModelSerializer):
+    """Serializer for audience segments with their cached member count."""
+    
+    member_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = AudienceSegment
+        fields = [
+            'id', 'name', 'description', 'frequency', 'categories',
+            'verification', 'member_count', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def get_member_count(self, obj):
+        """Read the count computed for the whole page by the view."""
+        return self.context.get('segment_counts', {}).get(obj.pk)
+
+
 class CampaignSerializer(serializers.ModelSerializer):
     """Serializer for newsletter campaigns."""
     
@@ -44,22 +62,23 @@ class CampaignSerializer(serializers.ModelSerializer):
     open_rate = serializers.ReadOnlyField()
     click_rate = serializers.ReadOnlyField()
     bounce_rate = serializers.ReadOnlyField()
+    delivery_progress = serializers.ReadOnlyField()
     
     class Meta:
         model = Campaign
         fields = [
-            'id', 'name', 'subject', 'campaign_type', 'status',
-            'scheduled_at', 'sent_at', 'total_recipients', 'emails_sent',
+            'id', 'name', 'subject', 'campaign_type', 'status', 'segment',
+            'audience_snapshot', 'scheduled_at', 'sent_at', 'total_recipients', 'emails_sent',
             'emails_delivered', 'emails_opened', 'emails_clicked',
-            'emails_bounced', 'emails_unsubscribed', 'open_rate',
-            'click_rate', 'bounce_rate', 'created_by', 'created_at',
-            'updated_at'
+            'emails_bounced', 'emails_unsubscribed', 'emails_failed',
+            'delivery_progress', 'open_rate', 'click_rate', 'bounce_rate',
+            'created_by', 'created_at', 'updated_at'
         ]
         read_only_fields = [
-            'id', 'status', 'sent_at', 'total_recipients', 'emails_sent',
+            'id', 'status', 'audience_snapshot', 'sent_at', 'total_recipients', 'emails_sent',
             'emails_delivered', 'emails_opened', 'emails_clicked',
-            'emails_bounced', 'emails_unsubscribed', 'created_at',
-            'updated_at'
+            'emails_bounced', 'emails_unsubscribed', 'emails_failed',
+            'created_at', 'updated_at'
         ]
 
 
@@ -76,7 +95,7 @@ class CampaignCreateUpdateSerializer(serializers.ModelSerializer):
         model = Campaign
         fields = [
             'name', 'subject', 'content_html', 'content_text',
-            'campaign_type', 'target_frequency', 'target_category_ids',
+            'campaign_type', 'segment', 'target_frequency', 'target_category_ids',
             'scheduled_at'
         ]
     
@@ -0,0 +1,74 @@
+"""
+Newsletter signals keeping cached audience segment counts current.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import AudienceSegment, Subscriber
+from .segments import adjust_segment_counts, invalidate_segment_counts
+
+
+def subscriber_categories(subscriber):
+    return frozenset(subscriber.categories.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Subscriber)
+def update_segment_counts_on_save(sender, instance, created, raw=False, **kwargs):
+    """Adjust segment counts for subscribe, unsubscribe, verify and preference changes."""
+    if raw:
+        return
+    
+    after = instance.segment_state()
+    if created:
+        adjust_segment_counts(None, after)
+    elif hasattr(instance, '_segment_state') and after is not None:
+        before = instance._segment_state
+        if before != after:
+            adjust_segment_counts(before, after, subscriber_categories(instance))
+    else:
+        # Saved without a known previous state (e.g. a detached instance)
+        invalidate_segment_counts()
+    
+    if after is not None:
+        instance._segment_state = after
+
+
+@receiver(pre_delete, sender=Subscriber)
+def remember_subscriber_categories(sender, instance, **kwargs):
+    """Capture categories before their links are deleted with the subscriber."""
+    instance._segment_categories = subscriber_categories(instance)
+
+
+@receiver(post_delete, sender=Subscriber)
+def update_segment_counts_on_delete(sender, instance, **kwargs):
+    """Remove a deleted subscriber from the segments it belonged to."""
+    before = getattr(instance, '_segment_state', instance.segment_state())
+    adjust_segment_counts(before, None, getattr(instance, '_segment_categories', frozenset()))
+
+
+@receiver(m2m_changed, sender=Subscriber.categories.through)
+def update_segment_counts_on_categories(sender, instance, action, reverse, **kwargs):
+    """Adjust segment counts when a subscriber's categories change."""
+    if reverse:
+        # A category's subscribers changed; recount rather than track each one
+        if action.startswith('post_'):
+            invalidate_segment_counts()
+        return
+    
+    if action.startswith('pre_'):
+        instance._segment_categories = subscriber_categories(instance)
+    elif hasattr(instance, '_segment_categories'):
+        state = instance.segment_state()
+        adjust_segment_counts(
+            state, state, instance.__dict__.pop('_segment_categories'), subscriber_categories(instance)
+        )
+
+
+@receiver(m2m_changed, sender=AudienceSegment.categories.through)
+@receiver(post_save, sender=AudienceSegment)
+def invalidate_changed_segment(sender, instance, **kwargs):
+    """Recount a segment whose definition changed."""
+    if isinstance(instance, AudienceSegment):
+        invalidate_segment_counts([instance.pk])
+    else:
+        invalidate_segment_counts()
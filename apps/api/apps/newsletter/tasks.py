@@ -0,0 +1,67 @@
+"""
+Celery tasks for newsletter delivery.
+"""
+
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+from .delivery import NEWSLETTER_DELIVERY_SETTINGS, CampaignDelivery
+from .models import Campaign
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    soft_time_limit=NEWSLETTER_DELIVERY_SETTINGS['SOFT_TIME_LIMIT'],
+    time_limit=NEWSLETTER_DELIVERY_SETTINGS['TIME_LIMIT'],
+)
+def send_campaign(self, campaign_id):
+    """Deliver a campaign that is in the SENDING state.
+    
+    Delivery resumes from the campaign's cursor, so the task is safe to run
+    again after a worker crash. A large campaign sends at a throttled rate
+    for hours, so it runs under the limits in ``NEWSLETTER_DELIVERY_SETTINGS``
+    rather than the global ones; a campaign stopped by them stays SENDING
+    and is picked up again by ``resume_stalled_campaigns``.
+    """
+    try:
+        campaign = Campaign.objects.get(pk=campaign_id)
+    except Campaign.DoesNotExist:
+        logger.warning(f"Campaign {campaign_id} no longer exists")
+        return None
+    
+    if campaign.status != Campaign.Status.SENDING:
+        return str(campaign.id)
+    
+    CampaignDelivery(campaign).run()
+    return str(campaign.id)
+
+
+@shared_task
+def resume_stalled_campaigns():
+    """Re-enqueue SENDING campaigns whose worker stopped reporting progress."""
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=NEWSLETTER_DELIVERY_SETTINGS['HEARTBEAT_TIMEOUT'])
+    resumed = 0
+    
+    stalled = Campaign.objects.filter(
+        status=Campaign.Status.SENDING,
+        delivery_heartbeat_at__lt=cutoff
+    ).values_list('id', 'delivery_heartbeat_at')
+    
+    for campaign_id, heartbeat_at in stalled:
+        # Claim the campaign so overlapping runs do not enqueue it twice
+        claimed = Campaign.objects.filter(
+            pk=campaign_id, delivery_heartbeat_at=heartbeat_at
+        ).update(delivery_heartbeat_at=now)
+        if claimed:
+            logger.warning(f"Resuming stalled delivery of campaign {campaign_id}")
+            send_campaign.delay(str(campaign_id))
+            resumed += 1
+    
+    return resumed
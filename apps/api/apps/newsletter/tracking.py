@@ -0,0 +1,192 @@
+"""
+Buffered open and click tracking.
+
+Tracking pixels and click redirects answer straight away and only append
+the event to a process-wide ``TrackingBuffer``. A background thread drains
+the buffer every ``FLUSH_INTERVAL`` seconds (or sooner once it holds
+``FLUSH_THRESHOLD`` events) and applies it in a handful of statements:
+conditional bulk status updates on ``EmailLog``, one ``bulk_create`` of
+``ClickTracking`` rows and one ``F()`` increment per campaign.
+
+The status updates only match logs still in a state the event can move
+out of, and counters grow by the number of rows actually updated, so
+concurrent flushes from several processes never double count. Events held
+in memory are lost if the process dies before they are flushed.
+"""
+
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+import logging
+
+from .models import Campaign, ClickTracking, EmailLog
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_TRACKING_SETTINGS = {
+    'FLUSH_INTERVAL': 2.0,  # Seconds between background flushes
+    'FLUSH_THRESHOLD': 5000,  # Buffered events that trigger an early flush
+    'MAX_BUFFERED_EVENTS': 200000,  # Events dropped beyond this if flushes fail
+    'BACKGROUND_FLUSH': True,  # Flush from a daemon thread rather than inline
+    **getattr(settings, 'NEWSLETTER_TRACKING_SETTINGS', {}),
+}
+
+# Statuses an open or click can move a log out of
+OPENABLE_STATUSES = [EmailLog.Status.SENT, EmailLog.Status.DELIVERED]
+CLICKABLE_STATUSES = OPENABLE_STATUSES + [EmailLog.Status.OPENED]
+
+
+class TrackingBuffer:
+    """Collect tracking events in memory and write them in batches."""
+
+    def __init__(self, flush_interval=None, flush_threshold=None, max_events=None, background=None):
+        self.flush_interval = flush_interval or NEWSLETTER_TRACKING_SETTINGS['FLUSH_INTERVAL']
+        self.flush_threshold = flush_threshold or NEWSLETTER_TRACKING_SETTINGS['FLUSH_THRESHOLD']
+        self.max_events = max_events or NEWSLETTER_TRACKING_SETTINGS['MAX_BUFFERED_EVENTS']
+        self.background = (
+            NEWSLETTER_TRACKING_SETTINGS['BACKGROUND_FLUSH'] if background is None else background
+        )
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.opens = set()
+        self.clicks = []
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.opens) + len(self.clicks)
+
+    def record_open(self, tracking_id):
+        with self.lock:
+            if len(self) >= self.max_events:
+                self.dropped += 1
+                return
+            # Repeated pixel loads of one message collapse into one event
+            self.opens.add(tracking_id)
+            full = len(self) >= self.flush_threshold
+        self.after_record(full)
+
+    def record_click(self, tracking_id, url, ip_address, user_agent):
+        with self.lock:
+            if len(self) >= self.max_events:
+                self.dropped += 1
+                return
+            self.clicks.append((tracking_id, url, ip_address, user_agent))
+            full = len(self) >= self.flush_threshold
+        self.after_record(full)
+
+    def after_record(self, full):
+        if self.background:
+            self.ensure_started()
+            if full:
+                self.wakeup.set()
+        elif full:
+            self.flush()
+
+    def ensure_started(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(
+                        target=self.run, name='newsletter-tracking-flush', daemon=True
+                    )
+                    self.thread.start()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def drain(self):
+        with self.lock:
+            opens, clicks = self.opens, self.clicks
+            self.opens, self.clicks = set(), []
+        return opens, clicks
+
+    def requeue(self, opens, clicks):
+        """Put events back after a failed flush, within the buffer limit."""
+        with self.lock:
+            self.opens |= opens
+            room = max(self.max_events - len(self), 0)
+            self.dropped += max(len(clicks) - room, 0)
+            self.clicks = clicks[:room] + self.clicks
+
+    def flush(self):
+        """Write buffered events; returns the (opens, clicks) counted."""
+        with self.flush_lock:
+            opens, clicks = self.drain()
+            opens = list(opens)
+            size = self.flush_threshold
+            total_opened = total_clicked = 0
+            for start in range(0, max(len(opens), len(clicks)), size):
+                open_batch, click_batch = set(opens[start:start + size]), clicks[start:start + size]
+                try:
+                    with transaction.atomic():
+                        opened, clicked = self.apply(open_batch, click_batch)
+                except Exception as e:
+                    logger.error(f"Failed to flush newsletter tracking events: {str(e)}")
+                    self.requeue(set(opens[start:]), clicks[start:])
+                    break
+                total_opened += opened
+                total_clicked += clicked
+            return total_opened, total_clicked
+
+    def apply(self, opens, clicks):
+        now = timezone.now()
+        logs = {
+            tracking_id: (log_id, campaign_id)
+            for tracking_id, log_id, campaign_id in EmailLog.objects.filter(
+                tracking_id__in=opens | {click[0] for click in clicks}
+            ).values_list('tracking_id', 'id', 'campaign_id')
+        }
+
+        opened = self.transition(
+            [logs[t] for t in opens if t in logs], OPENABLE_STATUSES,
+            status=EmailLog.Status.OPENED, opened_at=now
+        )
+
+        click_rows = [
+            ClickTracking(email_log_id=logs[t][0], url=url, ip_address=ip, user_agent=user_agent)
+            for t, url, ip, user_agent in clicks if t in logs
+        ]
+        ClickTracking.objects.bulk_create(click_rows)
+        clicked = self.transition(
+            {logs[t] for t, *_ in clicks if t in logs}, CLICKABLE_STATUSES,
+            status=EmailLog.Status.CLICKED, clicked_at=now
+        )
+
+        for campaign_id in opened.keys() | clicked.keys():
+            Campaign.objects.filter(pk=campaign_id).update(
+                emails_opened=F('emails_opened') + opened.get(campaign_id, 0),
+                emails_clicked=F('emails_clicked') + clicked.get(campaign_id, 0)
+            )
+        return sum(opened.values()), sum(clicked.values())
+
+    @staticmethod
+    def transition(log_refs, from_statuses, **values):
+        """Move logs still in ``from_statuses``; returns {campaign_id: rows updated}."""
+        by_campaign = {}
+        for log_id, campaign_id in log_refs:
+            by_campaign.setdefault(campaign_id, []).append(log_id)
+
+        updated = {}
+        for campaign_id, log_ids in by_campaign.items():
+            count = EmailLog.objects.filter(
+                id__in=log_ids, status__in=from_statuses
+            ).update(**values)
+            if count:
+                updated[campaign_id] = count
+        return updated
+
+
+tracking_buffer = TrackingBuffer()
+atexit.register(tracking_buffer.flush)
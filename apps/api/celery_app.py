@@ -37,6 +37,10 @@ app.conf.task_routes = {
     # Low priority tasks (background processing)
     'apps.analytics.tasks.update_analytics': {'queue': 'low_priority'},
     'apps.core.tasks.cleanup_old_sessions': {'queue': 'low_priority'},
+    'apps.core.tasks.run_export_job': {'queue': 'low_priority'},
+    'apps.core.tasks.cleanup_expired_export_jobs': {'queue': 'low_priority'},
+    'apps.newsletter.tasks.send_campaign': {'queue': 'low_priority'},
+    'apps.newsletter.tasks.resume_stalled_campaigns': {'queue': 'low_priority'},
     'apps.blog.tasks.cleanup_expired_preview_tokens': {'queue': 'low_priority'},
     'apps.analytics.tasks.aggregate_daily_stats': {'queue': 'low_priority'},
 }
@@ -123,6 +127,16 @@ app.conf.beat_schedule = {
         'schedule': 86400.0,  # Run daily
         'options': {'queue': 'low_priority', 'priority': 1}
     },
+    'cleanup-expired-export-jobs': {
+        'task': 'apps.core.tasks.cleanup_expired_export_jobs',
+        'schedule': 3600.0,  # Run every hour
+        'options': {'queue': 'low_priority', 'priority': 1}
+    },
+    'resume-stalled-campaigns': {
+        'task': 'apps.newsletter.tasks.resume_stalled_campaigns',
+        'schedule': 60.0,  # Run every minute
+        'options': {'queue': 'low_priority', 'priority': 1}
+    },
     'cleanup-failed-tasks': {
         'task': 'apps.core.tasks.cleanup_failed_tasks',
         'schedule': 3600.0,  # Run every hour
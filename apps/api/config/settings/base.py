@@ -677,6 +677,30 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Shared state for account lockouts, auth sessions and audit events
+AUTH_STATE_STORE = {
+    'BACKEND': 'redis',  # 'redis' shares state between workers; 'memory' is per process
+    'URL': REDIS_URL,
+    'PREFIX': 'auth:',
+}
+
+# Audit events are written by a background thread in batches
+AUTH_AUDIT_LOGGER = {
+    'ASYNC_WRITES': True,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 500,
+    'DROP_SEVERITIES': ['low'],  # Dropped when the queue is full; others wait for room
+    'DATABASE_WRITER': 'apps.accounts.audit.store_auth_audit_events',
+}
+
+# bcrypt runs in a process pool; hashes beyond MAX_PENDING are refused with a 429
+AUTH_PASSWORD_HASHING = {
+    'ROUNDS': 12,
+    'MAX_WORKERS': None,  # one per CPU
+    'MAX_PENDING': None,  # four per worker
+    'TIMEOUT': 5.0,  # seconds a queued hash may wait
+}
+
 # WebSocket Configuration
 WEBSOCKET_SETTINGS = {
     'JWT_AUTH_REQUIRED': True,
@@ -685,6 +709,64 @@ WEBSOCKET_SETTINGS = {
     'MAX_CONNECTIONS_PER_USER': 10,
     'ENABLE_CONNECTION_TRACKING': True,
     'CLEANUP_INTERVAL': 3600,  # 1 hour
+    'DASHBOARD_PUSH_INTERVAL': 2,  # seconds between analytics dashboard deltas
+    'METRICS_FLUSH_INTERVAL': 0.5,  # seconds between batched analytics event publishes
+}
+
+# Background Export Jobs
+EXPORT_JOB_SETTINGS = {
+    'CHUNK_SIZE': 5000,  # rows per fetch and progress update
+    'DOWNLOAD_BLOCK_SIZE': 64 * 1024,  # bytes per streamed download block
+    'RETENTION_HOURS': 24,  # artifacts are deleted after this long
+}
+
+# Bulk Imports
+IMPORT_SETTINGS = {
+    'BATCH_SIZE': 1000,  # rows validated and written per transaction
+    'READ_CHUNK_SIZE': 64 * 1024,  # bytes read at a time from uploaded JSON
+    'MAX_REPORTED_ERRORS': 100,  # per-row errors returned in the response
+    'USE_COPY': True,  # use COPY FROM STDIN on PostgreSQL where possible
+}
+
+# Bulk Operations
+BULK_OPERATION_SETTINGS = {
+    'MAX_UPDATE_ITEMS': 10000,  # items accepted by one bulk_update request
+    'BATCH_SIZE': 500,  # rows per UPDATE/INSERT statement
+}
+
+# Newsletter Delivery
+NEWSLETTER_DELIVERY_SETTINGS = {
+    'CHUNK_SIZE': 500,  # recipients queued, sent and recorded per step
+    'CONCURRENCY': 8,  # sender threads per worker
+    'HEARTBEAT_TIMEOUT': 300,  # must exceed CHUNK_SIZE / slowest provider RATE
+    'TRACKING_BASE_URL': config('NEWSLETTER_TRACKING_BASE_URL', default=''),
+    'REDIS_URL': REDIS_URL,  # provider rate limits are shared by all workers here
+    'SOFT_TIME_LIMIT': 12 * 60 * 60,  # send_campaign limits; must exceed the largest campaign's send time
+    'TIME_LIMIT': 12 * 60 * 60 + 5 * 60,
+    'PROVIDERS': {
+        'default': {
+            'BACKEND': None,  # email backend path; defaults to EMAIL_BACKEND
+            'OPTIONS': {},  # host, port, username, password, use_tls; defaults to EMAIL_*
+            'CONNECTIONS': 4,  # persistent SMTP connections kept open
+            'RATE': 50,  # messages per second
+            'MAX_MESSAGES_PER_CONNECTION': 100,
+            'DOMAINS': [],  # recipient domains routed here; 'default' takes the rest
+        },
+    },
+}
+
+# Newsletter Audience Segments
+NEWSLETTER_SEGMENT_SETTINGS = {
+    'COUNT_CACHE_TIMEOUT': 3600,  # seconds a cached segment member count is trusted
+    'SNAPSHOT_FETCH_SIZE': 10000,  # primary keys read per fetch when freezing an audience
+}
+
+# Newsletter Tracking
+NEWSLETTER_TRACKING_SETTINGS = {
+    'FLUSH_INTERVAL': 2.0,  # seconds between background flushes of open/click events
+    'FLUSH_THRESHOLD': 5000,  # buffered events that trigger an early flush
+    'MAX_BUFFERED_EVENTS': 200000,  # events dropped beyond this while flushes fail
+    'BACKGROUND_FLUSH': True,  # flush from a daemon thread in each process
 }
 
 # Logging Configuration
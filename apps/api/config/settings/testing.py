@@ -39,6 +39,29 @@ CELERY_TASK_EAGER_PROPAGATES = True
 # Email backend for testing
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
+# Flush newsletter tracking events inline so tests see them in their transaction
+NEWSLETTER_TRACKING_SETTINGS = {
+    'BACKGROUND_FLUSH': False,
+}
+
+# Keep lockouts, auth sessions and audit events in process memory
+AUTH_STATE_STORE = {
+    'BACKEND': 'memory',
+}
+
+# Write audit events inline so tests see them in their transaction
+AUTH_AUDIT_LOGGER = {
+    **AUTH_AUDIT_LOGGER,
+    'ASYNC_WRITES': False,
+}
+
+# Hash inline rather than in worker processes
+AUTH_PASSWORD_HASHING = {
+    **AUTH_PASSWORD_HASHING,
+    'ROUNDS': 4,
+    'MAX_WORKERS': 0,
+}
+
 # Password hashers for faster tests
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
@@ -0,0 +1,86 @@
+"""
+Tests for LoginView lockout, sessions and audit events shared across requests.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from auth_package import InMemoryStateStore
+from auth_package.django_integration import configure_state_store
+from apps.accounts import api_views
+from apps.accounts.api_views import LoginView
+from apps.core.models import AuditLog
+
+User = get_user_model()
+
+
+class LoginLockoutTestCase(TestCase):
+    """Each request gets a new LoginView; lockout state must survive it."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.store = configure_state_store(InMemoryStateStore())
+        self.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='testpass123',
+            status=User.UserStatus.ACTIVE
+        )
+
+    def login(self, password, ip='10.0.0.1'):
+        request = self.factory.post(
+            '/auth/login/', {'email': 'reader@example.com', 'password': password},
+            format='json', REMOTE_ADDR=ip
+        )
+        return LoginView.as_view()(request)
+
+    def test_views_share_process_wide_services(self):
+        first, second = LoginView(), LoginView()
+
+        self.assertIs(first.lockout_manager, second.lockout_manager)
+        self.assertIs(first.jwt_strategy, second.jwt_strategy)
+        self.assertIs(first.lockout_manager.store, self.store)
+        self.assertIs(first.session_manager.store, self.store)
+        self.assertIs(first.audit_logger.store, self.store)
+
+    def test_account_locks_after_failed_attempts(self):
+        responses = [self.login('wrong') for _ in range(5)]
+
+        self.assertEqual([r.status_code for r in responses], [401] * 5)
+        self.assertEqual(
+            [r.data.get('attempts_remaining') for r in responses[:4]], [4, 3, 2, 1]
+        )
+
+        locked = self.login('testpass123')
+        self.assertEqual(locked.status_code, 423)
+        self.assertEqual(locked.data['lockout_info']['reason'], 'failed_attempts')
+
+    def test_successful_login_resets_failures_and_creates_session(self):
+        for _ in range(3):
+            self.login('wrong')
+
+        response = self.login('testpass123')
+
+        self.assertEqual(response.status_code, 200)
+        user_id = str(self.user.pk)
+        self.assertEqual(api_views.default_lockout_manager.get_failed_attempts_count(user_id), 0)
+        sessions = api_views.default_session_manager.get_user_sessions(user_id)
+        self.assertEqual([s.session_id for s in sessions], [response.data['session_id']])
+
+        events = api_views.default_audit_logger.get_events(user_id=user_id)
+        self.assertEqual(
+            sorted(event.event_type.value for event in events),
+            ['login_failure'] * 3 + ['login_success']
+        )
+
+    def test_audit_events_are_stored_in_audit_log(self):
+        self.login('wrong', ip='10.0.0.9')
+        self.login('testpass123', ip='10.0.0.9')
+
+        rows = AuditLog.objects.filter(object_type='auth').order_by('object_id')
+        self.assertEqual(
+            [(row.object_id, row.action_type, row.user_id, row.ip_address) for row in rows],
+            [
+                ('login_failure', AuditLog.ActionType.SECURITY_EVENT, self.user.pk, '10.0.0.9'),
+                ('login_success', AuditLog.ActionType.LOGIN, self.user.pk, '10.0.0.9'),
+            ]
+        )
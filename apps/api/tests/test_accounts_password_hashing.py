@@ -0,0 +1,54 @@
+"""
+Tests for the auth package password hasher wired up by the accounts app.
+"""
+
+import json
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.test.client import RequestFactory
+
+from auth_package.django_integration import HashingOverloadMiddleware, configure_password_hasher
+from auth_package.security import HashingOverloaded, HashingUnavailable, default_password_hasher
+
+
+class PasswordHashingConfigTestCase(SimpleTestCase):
+    """AccountsConfig.ready() applies AUTH_PASSWORD_HASHING."""
+
+    def test_ready_configures_default_hasher(self):
+        self.assertEqual(default_password_hasher.rounds, 4)
+        self.assertEqual(default_password_hasher.service.max_workers, 0)
+
+    @override_settings(AUTH_PASSWORD_HASHING={'ROUNDS': 5, 'MAX_WORKERS': 0, 'MAX_PENDING': 2})
+    def test_settings_are_reapplied(self):
+        try:
+            hasher = configure_password_hasher()
+
+            self.assertEqual(hasher.rounds, 5)
+            self.assertEqual(hasher.service.max_pending, 2)
+        finally:
+            configure_password_hasher()
+
+
+class HashingOverloadMiddlewareTestCase(SimpleTestCase):
+    """A saturated hashing service becomes a 429, a failed one a 503."""
+
+    def setUp(self):
+        self.request = RequestFactory().post('/auth/login/')
+        self.middleware = HashingOverloadMiddleware(lambda request: HttpResponse())
+
+    def test_overload_becomes_429(self):
+        response = self.middleware.process_exception(self.request, HashingOverloaded(7))
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertEqual(json.loads(response.content)['retry_after'], 7)
+
+    def test_failed_workers_become_503(self):
+        response = self.middleware.process_exception(self.request, HashingUnavailable(2))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_other_exceptions_pass_through(self):
+        self.assertIsNone(self.middleware.process_exception(self.request, ValueError('boom')))
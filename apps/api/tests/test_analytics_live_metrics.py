@@ -0,0 +1,203 @@
+"""
+Tests for the shared, incrementally updated analytics dashboard metrics.
+"""
+
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.analytics.live_metrics import (
+    DashboardMetricsState, EVENT_BATCH, PAGE_VIEW_EVENT, SESSION_STARTED_EVENT
+)
+from apps.analytics.models import PageView, UserSession
+from apps.analytics.signals import MetricsEventPublisher, send_metrics_event
+
+User = get_user_model()
+
+IN_MEMORY_CHANNEL_LAYERS = {
+    'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}
+}
+
+
+class FakeDashboardSocket:
+    """Collects the frames a dashboard consumer would send."""
+
+    def __init__(self):
+        self.frames = []
+
+    async def send(self, text_data=None):
+        self.frames.append(json.loads(text_data))
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class DashboardMetricsStateTest(TestCase):
+    """Test the process-wide dashboard metrics state."""
+
+    def setUp(self):
+        self.state = DashboardMetricsState()
+        for ip in ['10.0.0.1', '10.0.0.1', '10.0.0.2']:
+            PageView.objects.create(
+                url='https://example.com/posts/a/',
+                ip_address=ip,
+                user_agent='test'
+            )
+        UserSession.objects.create(
+            session_key='session-1',
+            ip_address='10.0.0.1',
+            user_agent='test'
+        )
+
+    def test_seed_uses_constant_queries(self):
+        """Seeding costs three aggregate queries and matches the tables."""
+        with self.assertNumQueries(3):
+            self.state.load_from_database()
+
+        snapshot = self.state.snapshot()
+        self.assertEqual(snapshot['total_views'], 3)
+        self.assertEqual(snapshot['unique_views'], 2)
+        self.assertEqual(snapshot['total_sessions'], 1)
+        self.assertEqual(snapshot['active_visitors'], 2)
+
+    def test_events_update_counters_incrementally(self):
+        """Stream events change the counters without touching the database."""
+        self.state.load_from_database()
+        now = timezone.now().timestamp()
+
+        with self.assertNumQueries(0):
+            self.state.apply_event({'type': PAGE_VIEW_EVENT, 'ip_address': '10.0.0.3', 'ts': now})
+            self.state.apply_event({'type': PAGE_VIEW_EVENT, 'ip_address': '10.0.0.1', 'ts': now})
+            self.state.apply_event({'type': SESSION_STARTED_EVENT, 'ts': now})
+            snapshot = self.state.snapshot()
+
+        self.assertEqual(snapshot['total_views'], 5)
+        self.assertEqual(snapshot['unique_views'], 3)
+        self.assertEqual(snapshot['total_sessions'], 2)
+
+    def test_events_already_in_seed_are_ignored(self):
+        """Events older than the seed are not counted twice."""
+        self.state.load_from_database()
+        stale = (timezone.now() - timedelta(minutes=1)).timestamp()
+
+        self.state.apply_event({'type': PAGE_VIEW_EVENT, 'ip_address': '10.0.0.9', 'ts': stale})
+
+        self.assertEqual(self.state.snapshot()['total_views'], 3)
+
+    def test_batched_events_are_applied(self):
+        """A batch from the stream counts each of its events."""
+        self.state.load_from_database()
+        now = timezone.now().timestamp()
+
+        self.state.apply_event({'type': EVENT_BATCH, 'events': [
+            {'type': PAGE_VIEW_EVENT, 'ip_address': '10.0.0.3', 'ts': now},
+            {'type': SESSION_STARTED_EVENT, 'ts': now},
+        ]})
+
+        snapshot = self.state.snapshot()
+        self.assertEqual(snapshot['total_views'], 4)
+        self.assertEqual(snapshot['total_sessions'], 2)
+
+    def test_active_visitors_expire(self):
+        """Visitors drop out of the active count after the active window."""
+        self.state.load_from_database()
+        later = timezone.now() + timedelta(minutes=6)
+
+        self.state.prune(later.timestamp())
+
+        self.assertEqual(len(self.state._active_visitors), 0)
+        self.assertEqual(len(self.state._visitors), 2)
+
+    def test_delta_contains_only_changed_metrics(self):
+        """Deltas are compact and empty when nothing changed."""
+        self.state.load_from_database()
+        self.state.delta()
+        self.assertIsNone(self.state.delta())
+
+        self.state.apply_event({
+            'type': PAGE_VIEW_EVENT, 'ip_address': '10.0.0.1', 'ts': timezone.now().timestamp()
+        })
+        delta = self.state.delta()
+
+        self.assertEqual(delta['total_views'], 4)
+        self.assertNotIn('unique_views', delta)
+        self.assertNotIn('total_sessions', delta)
+        self.assertIn('timestamp', delta)
+
+    def test_many_dashboards_seed_once(self):
+        """Ten dashboards in one process share a single seed."""
+        sockets = [FakeDashboardSocket() for _ in range(10)]
+
+        async def connect_and_push():
+            snapshots = [await self.state.subscribe(socket) for socket in sockets]
+            self.state.apply_event({
+                'type': PAGE_VIEW_EVENT, 'ip_address': '10.0.0.4',
+                'ts': timezone.now().timestamp()
+            })
+            await self.state.push_delta()
+            for socket in sockets:
+                await self.state.unsubscribe(socket)
+            return snapshots
+
+        with self.assertNumQueries(3):
+            snapshots = async_to_sync(connect_and_push)()
+
+        self.assertTrue(all(s['total_views'] == 3 for s in snapshots))
+        for socket in sockets:
+            self.assertEqual(len(socket.frames), 1)
+            self.assertEqual(socket.frames[0]['type'], 'dashboard_delta')
+            self.assertEqual(socket.frames[0]['data']['total_views'], 4)
+        self.assertFalse(self.state.is_seeded)
+
+    def test_events_dropped_until_a_dashboard_seeds(self):
+        """Without open dashboards events are dropped; while seeding they are capped."""
+        event = {'type': PAGE_VIEW_EVENT, 'ip_address': '10.0.0.5', 'ts': timezone.now().timestamp()}
+        for _ in range(5):
+            self.state.apply_event(event)
+        self.assertEqual(len(self.state._pending_events), 0)
+
+        with patch.object(DashboardMetricsState, 'max_pending_events', 3):
+            state = DashboardMetricsState()
+        state._consumers.add(FakeDashboardSocket())
+        for _ in range(5):
+            state.apply_event(event)
+        self.assertEqual(len(state._pending_events), 3)
+
+
+class MetricsSignalsTest(TestCase):
+    """Test publishing of dashboard metrics events from model saves."""
+
+    def test_events_published_once_on_commit(self):
+        """A saved page view is published once, after its transaction commits."""
+        with patch('apps.analytics.signals.send_metrics_event') as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                PageView.objects.create(
+                    url='https://example.com/posts/a/', ip_address='10.0.0.1', user_agent='test'
+                )
+                send.assert_not_called()
+
+        send.assert_called_once()
+        self.assertEqual(send.call_args[0][0]['type'], PAGE_VIEW_EVENT)
+
+    @override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+    def test_events_are_sent_in_batches_off_the_request(self):
+        """Publishing only queues; a flush sends the queue as one group message."""
+        publisher = MetricsEventPublisher()
+        now = timezone.now().timestamp()
+
+        with patch('apps.analytics.signals.metrics_publisher', publisher), \
+                patch.object(publisher, '_start'), \
+                patch('channels.layers.InMemoryChannelLayer.group_send') as group_send:
+            for ip in ['10.0.0.1', '10.0.0.2', '10.0.0.3']:
+                send_metrics_event({'type': PAGE_VIEW_EVENT, 'ip_address': ip, 'ts': now})
+            group_send.assert_not_called()
+
+            self.assertEqual(publisher.flush(), 3)
+
+        group_send.assert_called_once()
+        message = group_send.call_args[0][1]
+        self.assertEqual(message['type'], EVENT_BATCH)
+        self.assertEqual(len(message['events']), 3)
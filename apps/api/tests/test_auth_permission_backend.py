@@ -0,0 +1,42 @@
+"""
+Tests for the auth package's RBAC permission backend and its caches.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.test import TestCase
+
+from auth_package.django_integration import RoleBasedPermissionBackend
+from auth_package.permissions import default_role_registry
+
+User = get_user_model()
+
+
+class RoleBasedPermissionBackendTestCase(TestCase):
+    """Groups are the user's roles; checks are cached per user instance."""
+
+    def setUp(self):
+        self.backend = RoleBasedPermissionBackend()
+        self.user = User.objects.create_user(
+            username='moderator', email='moderator@example.com', password='testpass123'
+        )
+        self.user.groups.add(Group.objects.create(name='moderator'))
+
+    def test_roles_are_loaded_once_per_user_instance(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.backend.has_perm(self.user, 'blog.delete'))
+            self.assertTrue(self.backend.has_perm(self.user, 'blog.create'))
+            self.assertFalse(self.backend.has_perm(self.user, 'system.manage'))
+            self.assertTrue(self.backend.has_perm(self.user, 'blog.delete'))
+
+    def test_registry_changes_drop_cached_decisions(self):
+        self.assertFalse(self.backend.has_perm(self.user, 'system.manage'))
+
+        role = default_role_registry.get_role('moderator')
+        permission = default_role_registry.get_permission('system.manage')
+        role.add_permission(permission)
+        try:
+            self.assertTrue(self.backend.has_perm(self.user, 'system.manage'))
+        finally:
+            role.remove_permission(permission)
+        self.assertFalse(self.backend.has_perm(self.user, 'system.manage'))
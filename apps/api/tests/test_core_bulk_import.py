@@ -0,0 +1,185 @@
+"""
+Tests for the streaming bulk import pipeline.
+"""
+
+import json
+from io import BytesIO
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from apps.blog.api_views import PostViewSet
+from apps.blog.models import Category, Post, Tag
+from apps.core.bulk_import import ImportFormatError, iter_json_records
+
+User = get_user_model()
+
+
+class BatchedPostViewSet(PostViewSet):
+    """Post viewset importing in small batches."""
+
+    import_batch_size = 3
+
+    def dispatch(self, request, *args, **kwargs):
+        # Response caching plays no part in imports
+        return APIView.dispatch(self, request, *args, **kwargs)
+
+
+class JSONRecordReaderTestCase(TestCase):
+    """Test incremental JSON parsing across chunk boundaries."""
+
+    def read(self, text, chunk_size=4):
+        return list(iter_json_records(BytesIO(text.encode('utf-8')), chunk_size=chunk_size))
+
+    def test_array_split_across_chunks(self):
+        """Objects spanning several reads are decoded once complete."""
+        rows = [{'title': f'Post {i}', 'tags': ['a', 'b'], 'n': 12345} for i in range(5)]
+
+        self.assertEqual(self.read(json.dumps(rows)), rows)
+
+    def test_newline_delimited_json(self):
+        """NDJSON uploads yield one record per line."""
+        text = '{"title": "One"}\n{"title": "Two"}\n'
+
+        self.assertEqual(self.read(text), [{'title': 'One'}, {'title': 'Two'}])
+
+    def test_invalid_documents(self):
+        """Malformed documents and non-object items are rejected."""
+        with self.assertRaises(ImportFormatError):
+            self.read('[{"title": "One"}, {"title": ')
+        with self.assertRaises(ImportFormatError):
+            self.read('[1, 2, 3]')
+        self.assertEqual(self.read('  '), [])
+
+
+class BulkPostImportTestCase(TestCase):
+    """Test importing posts through PostViewSet."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='testpass123', is_staff=True
+        )
+        self.author = User.objects.create_user(
+            username='writer', email='writer@example.com', password='testpass123'
+        )
+        self.category = Category.objects.create(name='News', slug='news')
+        self.tag_python = Tag.objects.create(name='python', slug='python')
+        self.tag_django = Tag.objects.create(name='django', slug='django')
+        Post.objects.create(
+            title='Hello World', slug='hello-world', content='Existing', author=self.author
+        )
+
+    def upload(self, action, content, name, **data):
+        view = BatchedPostViewSet.as_view({'post': action})
+        data['file'] = SimpleUploadedFile(name, content)
+        request = self.factory.post('/import/', data, format='multipart')
+        force_authenticate(request, user=self.staff)
+        return view(request)
+
+    def csv_rows(self, count):
+        lines = ['title,content,author,category,tags,status']
+        for i in range(count):
+            lines.append(f'Imported {i},Body text {i},writer,News,"python, django",published')
+        return '\n'.join(lines).encode('utf-8')
+
+    def test_csv_import_resolves_relations(self):
+        """Authors, categories and tags are resolved from their names."""
+        response = self.upload('import_csv', self.csv_rows(7), 'posts.csv')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['imported_count'], 7)
+        post = Post.objects.get(title='Imported 4')
+        self.assertEqual(post.author, self.author)
+        self.assertEqual(post.category, self.category)
+        self.assertEqual(set(post.tags.values_list('name', flat=True)), {'python', 'django'})
+        self.assertEqual(post.slug, 'imported-4')
+        self.assertIsNotNone(post.published_at)
+        self.assertEqual(post.reading_time, 1)
+
+    def test_queries_scale_with_batches_not_rows(self):
+        """Doubling the rows in a batch does not add queries."""
+        with CaptureQueriesContext(connection) as small:
+            self.upload('import_csv', self.csv_rows(3), 'posts.csv')
+        Post.objects.filter(title__startswith='Imported').delete()
+
+        view = type('WideBatchPostViewSet', (BatchedPostViewSet,), {'import_batch_size': 50})
+        data = {'file': SimpleUploadedFile('posts.csv', self.csv_rows(50))}
+        request = self.factory.post('/import/', data, format='multipart')
+        force_authenticate(request, user=self.staff)
+        with CaptureQueriesContext(connection) as large:
+            response = view.as_view({'post': 'import_csv'})(request)
+
+        self.assertEqual(response.data['imported_count'], 50)
+        self.assertLessEqual(len(large), len(small) + 2)
+
+    def test_generated_slugs_are_unique(self):
+        """Slugs avoid stored posts and duplicates within the import."""
+        rows = [{'title': 'Hello World', 'content': 'x', 'author': 'writer'} for _ in range(4)]
+
+        response = self.upload('import_json', json.dumps(rows).encode('utf-8'), 'posts.json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            set(Post.objects.filter(title='Hello World').values_list('slug', flat=True)),
+            {'hello-world', 'hello-world-1', 'hello-world-2', 'hello-world-3', 'hello-world-4'}
+        )
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        """Bad rows are reported by row number while good rows import."""
+        rows = [
+            {'title': 'Good one', 'content': 'x', 'author': 'writer'},
+            {'content': 'missing title', 'author': 'writer'},
+            {'title': 'Bad status', 'content': 'x', 'author': 'writer', 'status': 'nope'},
+            {'title': 'Taken slug', 'slug': 'hello-world', 'content': 'x', 'author': 'writer'},
+            {'title': 'Dup slug', 'slug': 'dup', 'content': 'x', 'author': 'writer'},
+            {'title': 'Dup slug again', 'slug': 'dup', 'content': 'x', 'author': 'writer'},
+        ]
+
+        response = self.upload('import_json', json.dumps(rows).encode('utf-8'), 'posts.json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['imported_count'], 2)
+        self.assertEqual(response.data['error_count'], 4)
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(set(errors), {2, 3, 4, 6})
+        self.assertIn('status', errors[3])
+        self.assertIn('slug', errors[4])
+        self.assertIn('slug', errors[6])
+
+    def test_excel_import(self):
+        """Excel sheets are read row by row in read-only mode."""
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['title', 'content', 'author'])
+        ws.append(['From Excel', 'Sheet body', 'writer'])
+        ws.append([None, None, None])
+        buffer = BytesIO()
+        wb.save(buffer)
+
+        response = self.upload('import_excel', buffer.getvalue(), 'posts.xlsx')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Post.objects.filter(title='From Excel', author=self.author).exists())
+
+    def test_bulk_import_uses_pipeline(self):
+        """BulkImportExportMixin.bulk_import shares the batched pipeline."""
+        response = self.upload('bulk_import', self.csv_rows(4), 'posts.csv', format='csv')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['imported_count'], 4)
+
+    def test_empty_and_malformed_files(self):
+        """Empty files and broken JSON are rejected."""
+        response = self.upload('import_csv', b'title,content\n', 'posts.csv')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.upload('import_json', b'[{"title": ', 'posts.json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid JSON', response.data['error'])
@@ -0,0 +1,179 @@
+"""
+Tests for set-based bulk updates and bulk queries.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers, viewsets
+from rest_framework.test import APIRequestFactory
+
+from apps.blog.models import Post, Tag
+from apps.core.bulk_operations import BulkOperationMixin, BulkQueryManager
+from apps.core.signals import post_bulk_update
+
+User = get_user_model()
+
+
+class TagBulkSerializer(serializers.ModelSerializer):
+    """Tag serializer without computed fields."""
+
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'slug', 'description', 'color', 'updated_at']
+        read_only_fields = ['updated_at']
+
+
+class TagBulkViewSet(BulkOperationMixin, viewsets.ModelViewSet):
+    """Bulk operations over tags."""
+
+    queryset = Tag.objects.all()
+    serializer_class = TagBulkSerializer
+    authentication_classes = []
+    permission_classes = []
+
+
+class BulkUpdateTestCase(TestCase):
+    """Test BulkOperationMixin.bulk_update."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.tags = [
+            Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}', color='#000000')
+            for i in range(150)
+        ]
+        self.signals = []
+        post_bulk_update.connect(self.record_signal, sender=Tag)
+        self.addCleanup(post_bulk_update.disconnect, self.record_signal, sender=Tag)
+
+    def record_signal(self, sender, instances, update_fields, **kwargs):
+        self.signals.append((instances, update_fields))
+
+    def bulk_update(self, data):
+        view = TagBulkViewSet.as_view({'patch': 'bulk_update'})
+        return view(self.factory.patch('/bulk_update/', data, format='json'))
+
+    def test_updates_more_than_one_hundred_items(self):
+        """Large updates succeed and only changed rows are reported."""
+        data = [{'id': str(tag.id), 'color': '#ffffff'} for tag in self.tags]
+        data[0]['description'] = 'First'
+
+        response = self.bulk_update(data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 150)
+        self.assertEqual(Tag.objects.filter(color='#ffffff').count(), 150)
+        self.assertEqual(Tag.objects.get(slug='tag-0').description, 'First')
+
+        self.assertEqual(len(self.signals), 1)
+        instances, update_fields = self.signals[0]
+        self.assertEqual(len(instances), 150)
+        self.assertEqual(update_fields[self.tags[0].id], {'color', 'description', 'updated_at'})
+        self.assertEqual(update_fields[self.tags[1].id], {'color', 'updated_at'})
+
+    def test_query_count_does_not_grow_with_items(self):
+        """Reads and writes are batched rather than issued per item."""
+        with CaptureQueriesContext(connection) as few:
+            self.bulk_update([{'id': str(tag.id), 'color': '#111111'} for tag in self.tags[:5]])
+        with CaptureQueriesContext(connection) as many:
+            self.bulk_update([{'id': str(tag.id), 'color': '#222222'} for tag in self.tags[5:105]])
+
+        self.assertEqual(len(few), len(many))
+
+    def test_unchanged_items_are_not_written(self):
+        """Items whose values do not change produce no update or signal."""
+        tag = self.tags[0]
+
+        response = self.bulk_update([{'id': str(tag.id), 'color': tag.color}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.signals, [])
+        tag_before = tag.updated_at
+        tag.refresh_from_db()
+        self.assertEqual(tag.updated_at, tag_before)
+
+    def test_invalid_items_abort_the_update(self):
+        """Any invalid item rejects the request without writing anything."""
+        data = [
+            {'id': str(self.tags[0].id), 'color': '#333333'},
+            {'color': '#333333'},
+            {'id': '00000000-0000-0000-0000-000000000000', 'color': '#333333'},
+            {'id': str(self.tags[1].id), 'name': 'x' * 100},
+            {'id': str(self.tags[2].id), 'slug': 'tag-3'},
+            {'id': str(self.tags[4].id), 'slug': 'same'},
+            {'id': str(self.tags[5].id), 'slug': 'same'},
+        ]
+
+        response = self.bulk_update(data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['errors']), 5)
+        self.assertFalse(Tag.objects.filter(color='#333333').exists())
+
+    def test_swapping_to_own_unique_value_is_allowed(self):
+        """An item may keep its own unique value."""
+        tag = self.tags[0]
+
+        response = self.bulk_update([{'id': str(tag.id), 'slug': tag.slug, 'name': 'Renamed'}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Tag.objects.get(pk=tag.pk).name, 'Renamed')
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class BulkQueryManagerTestCase(TestCase):
+    """Test BulkQueryManager helpers."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='writer', email='writer@example.com', password='testpass123'
+        )
+        self.python = Tag.objects.create(name='python', slug='python')
+        self.django = Tag.objects.create(name='django', slug='django')
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', slug=f'post-{i}', content='Body', author=self.user)
+            for i in range(3)
+        ]
+        self.posts[0].tags.add(self.python)
+
+    def test_bulk_update_instances_replaces_many_to_many(self):
+        """M2M values replace existing links and count as changes."""
+        updates = [
+            (self.posts[0], {'tags': [self.django]}),
+            (self.posts[1], {'tags': [self.python, self.django]}),
+            (self.posts[2], {'tags': []}),
+        ]
+
+        BulkQueryManager.bulk_update_instances(Post, updates)
+
+        self.assertEqual(list(self.posts[0].tags.all()), [self.django])
+        self.assertEqual(self.posts[1].tags.count(), 2)
+        self.assertEqual(self.posts[2].tags.count(), 0)
+
+    def test_bulk_update_instances_runs_prepare_hook(self):
+        """Fields set by the prepare hook are written too."""
+        def prepare(instances):
+            for post in instances:
+                post.update_derived_fields()
+
+        BulkQueryManager.bulk_update_instances(
+            Post, [(self.posts[0], {'status': Post.PostStatus.PUBLISHED})], prepare=prepare
+        )
+
+        post = Post.objects.get(pk=self.posts[0].pk)
+        self.assertEqual(post.status, Post.PostStatus.PUBLISHED)
+        self.assertIsNotNone(post.published_at)
+
+    def test_bulk_get_or_create_deduplicates(self):
+        """Existing and repeated keys are only created once."""
+        data = [
+            {'name': 'python', 'slug': 'python'},
+            {'name': 'rust', 'slug': 'rust'},
+            {'name': 'rust', 'slug': 'rust'},
+        ]
+
+        created, existing = BulkQueryManager.bulk_get_or_create(Tag, data, ['slug'])
+
+        self.assertEqual((created, existing), (1, 1))
+        self.assertEqual(Tag.objects.filter(slug='rust').count(), 1)
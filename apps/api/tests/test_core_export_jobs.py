@@ -0,0 +1,293 @@
+"""
+Tests for background export jobs and resumable artifact downloads.
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import filters, viewsets
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.blog.models import Tag
+from apps.blog.serializers import TagSerializer
+from apps.core.export_import import AdvancedExportMixin, DataExportMixin
+from apps.core.export_jobs import EXPORT_JOB_SETTINGS, ExportJobRunner, ExportJobViewSet, parse_range_header
+from apps.core.models import ExportJob
+from apps.core.tasks import run_export_job
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class TagJobExportViewSet(DataExportMixin, AdvancedExportMixin, viewsets.ReadOnlyModelViewSet):
+    """Export viewset over tags used to build export jobs."""
+
+    queryset = Tag.objects.order_by('name')
+    serializer_class = TagSerializer
+    filter_backends = [filters.SearchFilter]
+    search_fields = ['name']
+
+    def get_export_fields(self):
+        return ['name', 'slug']
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ExportJobTestCase(TestCase):
+    """Test enqueueing, producing and downloading export jobs."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='exporter', email='exporter@example.com', password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='other', email='other@example.com', password='testpass123'
+        )
+        for i in range(7):
+            Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}')
+
+    def create_job(self, export_format='csv', filters=None, query_params=None):
+        return ExportJob.objects.create(
+            user=self.user,
+            export_format=export_format,
+            viewset_path=f'{__name__}.TagJobExportViewSet',
+            config={
+                'fields': ['name', 'slug'], 'filename': 'tags', 'model': 'blog.Tag',
+                'custom_export': filters is not None, 'filters': filters or {},
+            },
+            query_params=query_params or {},
+        )
+
+    def test_custom_export_returns_job_immediately(self):
+        """custom_export answers 202 with a job id and defers the work."""
+        view = TagJobExportViewSet.as_view({'post': 'custom_export'})
+        request = APIRequestFactory().post('/export/', {'format': 'csv'}, format='json')
+        force_authenticate(request, user=self.user)
+
+        with patch.object(run_export_job, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = view(request)
+
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, ExportJob.Status.PENDING)
+        self.assertEqual(job.user, self.user)
+        delay.assert_called_once_with(str(job.id))
+
+    def test_job_exports_the_filtered_queryset(self):
+        """Custom export filters are stored as data and applied again by the worker."""
+        view = TagJobExportViewSet.as_view({'post': 'custom_export'})
+        request = APIRequestFactory().post(
+            '/export/',
+            {'format': 'json', 'filters': {'slug__in': ['tag-4', 'tag-5']}, 'fields': ['slug']},
+            format='json'
+        )
+        force_authenticate(request, user=self.user)
+
+        with patch.object(run_export_job, 'delay'):
+            response = view(request)
+        job = ExportJob.objects.get(pk=response.data['job_id'])
+
+        self.assertEqual(job.config['filters'], {'slug__in': ['tag-4', 'tag-5']})
+        self.assertEqual(job.config['model'], 'blog.Tag')
+        ExportJobRunner(job).run()
+        job.refresh_from_db()
+        self.assertEqual(json.loads(gzip.decompress(job.file.read())), [{'slug': 'tag-4'}, {'slug': 'tag-5'}])
+
+    def test_export_excel_runs_as_job(self):
+        """export_excel answers 202 instead of building the workbook inline."""
+        view = TagJobExportViewSet.as_view({'get': 'export_excel'})
+        request = APIRequestFactory().get('/export_excel/')
+        force_authenticate(request, user=self.user)
+
+        with patch.object(run_export_job, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = view(request)
+
+        self.assertEqual(response.status_code, 202)
+        job = ExportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.export_format, ExportJob.ExportFormat.EXCEL)
+        self.assertEqual(job.config['fields'], ['name', 'slug'])
+        delay.assert_called_once_with(str(job.id))
+
+    def test_worker_applies_the_request_query_params(self):
+        """List filters are rebuilt from the stored query parameters for the job's user."""
+        view = TagJobExportViewSet.as_view({'get': 'export_excel'})
+        request = APIRequestFactory().get('/export_excel/', {'search': 'Tag 3'})
+        force_authenticate(request, user=self.user)
+
+        with patch.object(run_export_job, 'delay'):
+            response = view(request)
+        job = ExportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.query_params, {'search': ['Tag 3']})
+
+        users = []
+        get_queryset = TagJobExportViewSet.get_queryset
+
+        def recording_get_queryset(view):
+            users.append(view.request.user)
+            return get_queryset(view)
+
+        with patch.object(TagJobExportViewSet, 'get_queryset', recording_get_queryset):
+            ExportJobRunner(job).run()
+        job.refresh_from_db()
+
+        self.assertEqual(users, [self.user])
+
+        ws = openpyxl.load_workbook(BytesIO(job.file.read())).active
+        self.assertEqual(list(ws.iter_rows(values_only=True))[1:], [('Tag 3', 'tag-3')])
+
+    def test_job_fails_when_the_viewset_exports_another_model(self):
+        """A job queued before a deploy that changed the viewset fails instead of exporting the wrong rows."""
+        job = self.create_job()
+        ExportJob.objects.filter(pk=job.pk).update(config=dict(job.config, model='blog.Category'))
+        job.refresh_from_db()
+
+        with self.assertRaises(ValueError):
+            ExportJobRunner(job).run()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.Status.FAILED)
+
+    def test_task_has_explicit_time_limits(self):
+        """Export jobs run under their own limits rather than the global ones."""
+        self.assertEqual(run_export_job.soft_time_limit, EXPORT_JOB_SETTINGS['SOFT_TIME_LIMIT'])
+        self.assertEqual(run_export_job.time_limit, EXPORT_JOB_SETTINGS['TIME_LIMIT'])
+        self.assertGreater(run_export_job.time_limit, run_export_job.soft_time_limit)
+
+    def test_custom_export_rejects_bad_filters(self):
+        """Invalid filters fail in the request, not later in the worker."""
+        view = TagJobExportViewSet.as_view({'post': 'custom_export'})
+        request = APIRequestFactory().post(
+            '/export/', {'format': 'csv', 'filters': {'missing_field': 1}}, format='json'
+        )
+        force_authenticate(request, user=self.user)
+
+        response = view(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_runner_writes_gzipped_csv_with_checksum(self):
+        """The worker writes a gzip CSV artifact and records progress."""
+        job = self.create_job(filters={'slug__in': ['tag-1', 'tag-2', 'tag-3']})
+
+        ExportJobRunner(job, chunk_size=2).run()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, ExportJob.Status.COMPLETED)
+        self.assertEqual(job.total_rows, 3)
+        self.assertEqual(job.processed_rows, 3)
+        self.assertEqual(job.progress, 100.0)
+        self.assertTrue(job.file_name.endswith('.csv.gz'))
+
+        raw = job.file.read()
+        self.assertEqual(hashlib.sha256(raw).hexdigest(), job.checksum)
+        self.assertEqual(len(raw), job.file_size)
+        rows = list(csv.reader(StringIO(gzip.decompress(raw).decode('utf-8'))))
+        self.assertEqual(rows, [['name', 'slug'], ['Tag 1', 'tag-1'], ['Tag 2', 'tag-2'], ['Tag 3', 'tag-3']])
+
+    def test_runner_writes_excel_in_write_only_mode(self):
+        """Excel artifacts are readable workbooks with a header row."""
+        job = self.create_job(export_format='excel')
+
+        ExportJobRunner(job, chunk_size=3).run()
+        job.refresh_from_db()
+
+        ws = openpyxl.load_workbook(BytesIO(job.file.read())).active
+        values = list(ws.iter_rows(values_only=True))
+        self.assertEqual(values[0], ('Name', 'Slug'))
+        self.assertEqual(len(values), 8)
+
+    def test_failed_job_records_error(self):
+        """A failing export marks the job failed with the error message."""
+        job = self.create_job()
+
+        with patch.object(ExportJobRunner, 'write_artifact', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                ExportJobRunner(job).run()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, ExportJob.Status.FAILED)
+        self.assertIn('disk full', job.error)
+
+    def test_download_supports_ranges(self):
+        """Artifacts are served whole, as byte ranges, or rejected as 416."""
+        job = self.create_job()
+        ExportJobRunner(job).run()
+        job.refresh_from_db()
+        raw = job.file.read()
+        job.file.close()
+
+        view = ExportJobViewSet.as_view({'get': 'download'})
+
+        def download(**headers):
+            request = APIRequestFactory().get('/', **headers)
+            force_authenticate(request, user=self.user)
+            return view(request, pk=str(job.id))
+
+        response = download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), raw)
+
+        response = download(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(raw)}')
+        self.assertEqual(b''.join(response.streaming_content), raw[10:20])
+
+        response = download(HTTP_RANGE='bytes=20-')
+        self.assertEqual(b''.join(response.streaming_content), raw[20:])
+
+        response = download(HTTP_RANGE=f'bytes={len(raw)}-')
+        self.assertEqual(response.status_code, 416)
+
+        response = download(HTTP_RANGE='bytes=0-4', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_jobs_are_private_to_their_owner(self):
+        """Other users cannot see or download someone else's export."""
+        job = self.create_job()
+        for action in ('retrieve', 'download'):
+            view = ExportJobViewSet.as_view({'get': action})
+            request = APIRequestFactory().get('/')
+            force_authenticate(request, user=self.other_user)
+
+            response = view(request, pk=str(job.id))
+
+            self.assertEqual(response.status_code, 404)
+
+    def test_download_before_completion_conflicts(self):
+        """Pending jobs report 409 instead of an empty file."""
+        job = self.create_job()
+        view = ExportJobViewSet.as_view({'get': 'download'})
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.user)
+
+        response = view(request, pk=str(job.id))
+
+        self.assertEqual(response.status_code, 409)
+
+    def test_parse_range_header(self):
+        """Range parsing covers open, closed and suffix ranges."""
+        self.assertEqual(parse_range_header('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range_header('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range_header('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range_header('bytes=50-500', 100), (50, 99))
+        self.assertIsNone(parse_range_header('bytes=0-1,5-6', 100))
+        self.assertIsNone(parse_range_header(None, 100))
+        with self.assertRaises(ValueError):
+            parse_range_header('bytes=100-', 100)
@@ -451,7 +451,8 @@ class DataExportImportTestCase(APITestCase):
         }
         
         response = self.client.post(url, export_config, format='json')
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 202)
+        self.assertIn('job_id', response.data)
 
 
 class PermissionsTestCase(APITestCase):
@@ -0,0 +1,261 @@
+"""
+Tests for the newsletter campaign delivery engine.
+"""
+
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import fakeredis
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.blog.models import Category
+from apps.newsletter.api_views import CampaignViewSet
+from apps.newsletter.delivery import (
+    NEWSLETTER_DELIVERY_SETTINGS, CampaignDelivery, TokenBucket, TransportUnavailable
+)
+from apps.newsletter.models import Campaign, EmailLog, Subscriber
+from apps.newsletter.tasks import resume_stalled_campaigns, send_campaign
+
+from .smtp_server import FakeSMTPServer
+
+User = get_user_model()
+
+LOCMEM = {'default': {'BACKEND': 'django.core.mail.backends.locmem.EmailBackend'}}
+
+
+class DeliveryTestCase(TestCase):
+    """Shared fixtures for delivery tests."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='editor', email='editor@example.com', password='testpass123', is_staff=True
+        )
+        self.subscribers = [
+            Subscriber.objects.create(email=f'reader{i}@example.com', email_verified=True)
+            for i in range(25)
+        ]
+        self.campaign = Campaign.objects.create(
+            name='Weekly', subject='This week', content_html='<p>News</p>',
+            content_text='News', campaign_type=Campaign.CampaignType.NEWSLETTER,
+            created_by=self.staff
+        )
+
+    def start(self, campaign=None):
+        campaign = campaign or self.campaign
+        campaign.status = Campaign.Status.SENDING
+        campaign.total_recipients = campaign.get_target_subscribers().count()
+        campaign.save()
+        return campaign
+
+    def deliver(self, providers=LOCMEM, **kwargs):
+        kwargs.setdefault('chunk_size', 7)
+        return CampaignDelivery(self.start(), providers=providers, **kwargs).run()
+
+
+class SendNowTestCase(DeliveryTestCase):
+    """Test CampaignViewSet.send_now."""
+
+    def send_now(self, campaign):
+        factory = APIRequestFactory()
+        request = factory.post(f'/campaigns/{campaign.pk}/send_now/')
+        force_authenticate(request, user=self.staff)
+        view = CampaignViewSet.as_view({'post': 'send_now'})
+        return view(request, pk=str(campaign.pk))
+
+    def test_send_now_queues_and_delivers(self):
+        """The request returns 202 and the worker sends one email per subscriber."""
+        with patch.object(send_campaign, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.send_now(self.campaign)
+
+        self.assertEqual(response.status_code, 202)
+        delay.assert_called_once_with(str(self.campaign.id))
+        # The audience is frozen by the worker, not the request
+        self.campaign.refresh_from_db()
+        self.assertIsNone(self.campaign.audience_snapshot_id)
+
+        with patch('apps.newsletter.delivery.redis.Redis', fakeredis.FakeRedis):
+            send_campaign(str(self.campaign.id))
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, Campaign.Status.SENT)
+        self.assertEqual(self.campaign.total_recipients, 25)
+        self.assertEqual(self.campaign.emails_sent, 25)
+        self.assertEqual(self.campaign.delivery_progress, 100.0)
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertEqual(
+            EmailLog.objects.filter(campaign=self.campaign, status=EmailLog.Status.SENT).count(), 25
+        )
+
+    def test_only_drafts_can_be_sent(self):
+        """A campaign that is already sending is rejected."""
+        self.start()
+
+        response = self.send_now(self.campaign)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class CampaignDeliveryTestCase(DeliveryTestCase):
+    """Test CampaignDelivery against locmem and a local SMTP server."""
+
+    def setUp(self):
+        super().setUp()
+        self.server = FakeSMTPServer().start()
+        self.addCleanup(self.server.stop)
+
+    def test_messages_share_persistent_connections(self):
+        """All messages go over at most CONNECTIONS SMTP sessions."""
+        self.deliver({'default': self.server.provider(CONNECTIONS=2)}, concurrency=4)
+
+        self.assertEqual(len(self.server.messages), 25)
+        self.assertLessEqual(self.server.connections, 2)
+        self.assertEqual({r[0] for r, _ in self.server.messages}, {s.email for s in self.subscribers})
+
+    def test_messages_carry_tracking_and_unsubscribe_links(self):
+        """Each message embeds its own tracking pixel and unsubscribe URL."""
+        self.deliver()
+
+        log = EmailLog.objects.get(subscriber=self.subscribers[0])
+        message = next(m for m in mail.outbox if m.to == [log.email_address])
+        self.assertIn(f'/newsletter/track/open/{log.tracking_id}/', message.alternatives[0][0])
+        self.assertIn(self.subscribers[0].unsubscribe_token, message.extra_headers['List-Unsubscribe'])
+
+    def test_refused_recipients_are_recorded_as_bounces(self):
+        """Recipients the server refuses are bounced, the rest still go out."""
+        Subscriber.objects.create(email='bounce@example.com', email_verified=True)
+
+        campaign = self.deliver({'default': self.server.provider()})
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, Campaign.Status.SENT)
+        self.assertEqual(campaign.emails_sent, 25)
+        self.assertEqual(campaign.emails_bounced, 1)
+        bounced = EmailLog.objects.get(email_address='bounce@example.com')
+        self.assertEqual(bounced.status, EmailLog.Status.BOUNCED)
+
+    def test_providers_are_chosen_by_recipient_domain(self):
+        """Recipients of a routed domain go through that provider only."""
+        other = FakeSMTPServer().start()
+        self.addCleanup(other.stop)
+        for i in range(3):
+            Subscriber.objects.create(email=f'reader{i}@example.org', email_verified=True)
+
+        self.deliver({
+            'default': self.server.provider(),
+            'org': other.provider(DOMAINS=['example.org']),
+        })
+
+        self.assertEqual(len(self.server.messages), 25)
+        self.assertEqual(len(other.messages), 3)
+
+    def test_provider_rate_is_respected(self):
+        """A throttled provider does not exceed its messages per second."""
+        start = time.monotonic()
+        with patch('apps.newsletter.delivery.redis.Redis', fakeredis.FakeRedis):
+            self.deliver({'default': {**LOCMEM['default'], 'RATE': 50, 'BURST': 1}}, concurrency=8)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertGreaterEqual(elapsed, 24 / 50)
+
+    def test_provider_rate_is_shared_between_workers(self):
+        """Buckets for the same provider draw from one allowance in Redis."""
+        server = fakeredis.FakeServer()
+        first, second, other = (
+            TokenBucket(name, 10, 3, client=fakeredis.FakeRedis(server=server))
+            for name in ('default', 'default', 'bulk')
+        )
+
+        self.assertEqual([first.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(second.reserve(), 0.1, delta=0.02)
+        self.assertAlmostEqual(first.reserve(), 0.2, delta=0.02)
+        self.assertEqual(other.reserve(), 0)
+
+    def test_targeting_by_category_sends_once_per_subscriber(self):
+        """Subscribers interested in several target categories get one email."""
+        python = Category.objects.create(name='Python', slug='python')
+        django = Category.objects.create(name='Django', slug='django')
+        self.subscribers[0].categories.add(python, django)
+        self.subscribers[1].categories.add(django)
+        self.subscribers[2].categories.add(python)
+        self.subscribers[2].unsubscribe()
+        self.campaign.target_categories.add(python, django)
+
+        self.deliver()
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['reader0@example.com', 'reader1@example.com'])
+
+    def test_delivery_resumes_after_a_crash(self):
+        """A new run sends logs left queued and continues from the cursor."""
+        campaign = self.start()
+        crashed = CampaignDelivery(campaign, providers=LOCMEM, chunk_size=10)
+        crashed.queue_next_chunk()
+        crashed.queue_next_chunk()
+        first = list(EmailLog.objects.filter(campaign=campaign).values_list('subscriber_id', flat=True))
+        crashed.record([crashed.send(log) for log in crashed.next_queued()[:4]])
+
+        campaign = Campaign.objects.get(pk=campaign.pk)
+        CampaignDelivery(campaign, providers=LOCMEM, chunk_size=10).run()
+
+        self.assertEqual(len(first), 20)
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertEqual(len({m.to[0] for m in mail.outbox}), 25)
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.emails_sent, 25)
+        self.assertEqual(campaign.status, Campaign.Status.SENT)
+
+    def test_unreachable_provider_leaves_campaign_resumable(self):
+        """Connection failures stop the run instead of failing every recipient."""
+        provider = self.server.provider()
+        self.server.stop()
+
+        with self.assertRaises(TransportUnavailable):
+            self.deliver({'default': provider})
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, Campaign.Status.SENDING)
+        self.assertFalse(EmailLog.objects.exclude(status=EmailLog.Status.QUEUED).exists())
+
+    def test_heartbeat_is_refreshed_while_a_chunk_sends(self):
+        """A chunk slowed by the rate limit does not look like a stalled worker."""
+        send, beat = CampaignDelivery.send, CampaignDelivery.beat
+        beats = []
+
+        def slow_send(delivery, log):
+            time.sleep(0.05)
+            return send(delivery, log)
+
+        def counted_beat(delivery):
+            beats.append(timezone.now())
+            beat(delivery)
+
+        with patch.dict(NEWSLETTER_DELIVERY_SETTINGS, {'HEARTBEAT_TIMEOUT': 0.03}), \
+                patch.object(CampaignDelivery, 'send', slow_send), \
+                patch.object(CampaignDelivery, 'beat', counted_beat):
+            self.deliver(chunk_size=25, concurrency=1)
+
+        self.assertGreater(len(beats), 10)
+        self.assertEqual(len(mail.outbox), 25)
+        self.campaign.refresh_from_db()
+        self.assertGreaterEqual(self.campaign.delivery_heartbeat_at, beats[-1])
+
+    def test_stalled_campaigns_are_resumed(self):
+        """Campaigns without a recent heartbeat are sent again by the beat task."""
+        campaign = self.start()
+        Campaign.objects.filter(pk=campaign.pk).update(
+            delivery_heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+
+        with patch.object(send_campaign, 'delay') as delay:
+            self.assertEqual(resume_stalled_campaigns(), 1)
+            self.assertEqual(resume_stalled_campaigns(), 0)
+
+        delay.assert_called_once_with(str(campaign.id))
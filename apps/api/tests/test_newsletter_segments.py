@@ -0,0 +1,191 @@
+"""
+Tests for subscriber statistics, audience segments and snapshots.
+"""
+
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.blog.models import Category
+from apps.newsletter.api_views import AudienceSegmentViewSet, CampaignViewSet, SubscriberViewSet
+from apps.newsletter.delivery import CampaignDelivery
+from apps.newsletter.models import AudienceSegment, Campaign, Subscriber
+from apps.newsletter.segments import (
+    count_segments, get_segment_counts, materialize_snapshot, snapshot_page
+)
+from apps.newsletter.tasks import send_campaign
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class SegmentTestCase(TestCase):
+    """Shared subscribers, categories and segments."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.staff = User.objects.create_user(
+            username='editor', email='editor@example.com', password='testpass123', is_staff=True
+        )
+        self.python = Category.objects.create(name='Python', slug='python')
+        self.django = Category.objects.create(name='Django', slug='django')
+
+        self.daily = Subscriber.objects.create(
+            email='daily@example.com', email_verified=True, frequency=Subscriber.Frequency.DAILY
+        )
+        self.daily.categories.add(self.python, self.django)
+        self.weekly = Subscriber.objects.create(email='weekly@example.com', email_verified=True)
+        self.weekly.categories.add(self.django)
+        self.unverified = Subscriber.objects.create(email='new@example.com')
+        self.inactive = Subscriber.objects.create(
+            email='gone@example.com', email_verified=True, is_active=False
+        )
+
+        self.everyone = AudienceSegment.objects.create(name='Everyone')
+        self.pythonistas = AudienceSegment.objects.create(name='Python')
+        self.pythonistas.categories.add(self.python)
+        self.pending = AudienceSegment.objects.create(
+            name='Pending', verification=AudienceSegment.Verification.UNVERIFIED
+        )
+        self.weekly_django = AudienceSegment.objects.create(
+            name='Weekly Django', frequency=Subscriber.Frequency.WEEKLY
+        )
+        self.weekly_django.categories.add(self.django)
+        self.segments = [self.everyone, self.pythonistas, self.pending, self.weekly_django]
+
+    def expected_counts(self):
+        return {
+            self.everyone.pk: 2, self.pythonistas.pk: 1,
+            self.pending.pk: 1, self.weekly_django.pk: 1,
+        }
+
+
+class SubscriberStatsTestCase(SegmentTestCase):
+    """Test SubscriberViewSet.stats."""
+
+    def test_stats_use_one_query(self):
+        request = self.factory.get('/subscribers/stats/')
+        force_authenticate(request, user=self.staff)
+
+        with self.assertNumQueries(1):
+            response = SubscriberViewSet.as_view({'get': 'stats'})(request)
+
+        self.assertEqual(response.data['total_subscribers'], 4)
+        self.assertEqual(response.data['active_subscribers'], 2)
+        self.assertEqual(response.data['verified_subscribers'], 3)
+        self.assertEqual(response.data['frequency_breakdown'], {
+            'daily': 1, 'weekly': 1, 'monthly': 0, 'never': 0
+        })
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SegmentCountTestCase(SegmentTestCase):
+    """Test cached segment counts and their incremental maintenance."""
+
+    def test_all_segments_are_counted_in_one_query(self):
+        segments = list(AudienceSegment.objects.prefetch_related('categories'))
+
+        with self.assertNumQueries(1):
+            counts = count_segments(segments)
+
+        self.assertEqual(counts, self.expected_counts())
+
+    def test_counts_are_served_from_cache(self):
+        get_segment_counts(self.segments)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_segment_counts(self.segments), self.expected_counts())
+
+    def test_counts_follow_subscriber_changes(self):
+        """Subscribe, verify, unsubscribe and preference changes adjust the cache."""
+        get_segment_counts(self.segments)
+
+        self.unverified.verify_email()
+        self.daily.unsubscribe()
+        self.weekly.categories.add(self.python)
+        newcomer = Subscriber.objects.create(email='newcomer@example.com')
+        self.inactive.resubscribe()
+        self.weekly.frequency = Subscriber.Frequency.MONTHLY
+        self.weekly.save()
+        Subscriber.objects.get(pk=newcomer.pk).delete()
+
+        segments = list(AudienceSegment.objects.prefetch_related('categories'))
+        with self.assertNumQueries(0):
+            cached = get_segment_counts(self.segments)
+        self.assertEqual(cached, count_segments(segments))
+
+    def test_changing_a_segment_recounts_it(self):
+        get_segment_counts(self.segments)
+
+        self.everyone.verification = AudienceSegment.Verification.ANY
+        self.everyone.save()
+
+        self.assertEqual(get_segment_counts([self.everyone])[self.everyone.pk], 3)
+
+    def test_segment_list_includes_member_counts(self):
+        request = self.factory.get('/segments/')
+        force_authenticate(request, user=self.staff)
+
+        response = AudienceSegmentViewSet.as_view({'get': 'list'})(request)
+
+        results = response.data.get('results', response.data)
+        counts = {segment['name']: segment['member_count'] for segment in results}
+        self.assertEqual(counts, {'Everyone': 2, 'Python': 1, 'Pending': 1, 'Weekly Django': 1})
+
+
+class SnapshotTestCase(SegmentTestCase):
+    """Test audience snapshots and campaigns sending from them."""
+
+    def test_snapshot_pages_in_primary_key_order(self):
+        ids = sorted(uuid.uuid4() for _ in range(10))
+        packed = b''.join(pk.bytes for pk in ids)
+
+        self.assertEqual(snapshot_page(packed, limit=4), ids[:4])
+        self.assertEqual(snapshot_page(packed, ids[3], 4), ids[4:8])
+        self.assertEqual(snapshot_page(packed, ids[8], 4), ids[9:])
+        self.assertEqual(snapshot_page(packed, ids[9], 4), [])
+        self.assertEqual(snapshot_page(packed, uuid.UUID(int=0), 2), ids[:2])
+
+    def test_materialized_snapshot_matches_segment(self):
+        snapshot = materialize_snapshot(
+            Subscriber.objects.filter(pk__in=[self.daily.pk, self.weekly.pk]), segment=self.everyone
+        )
+        snapshot.refresh_from_db()
+
+        self.assertEqual(snapshot.member_count, 2)
+        self.assertEqual(
+            snapshot_page(bytes(snapshot.subscriber_ids)),
+            sorted([self.daily.pk, self.weekly.pk])
+        )
+
+    def test_campaign_sends_to_its_frozen_segment(self):
+        """Recipients are fixed when delivery starts; later unsubscribes are still honoured."""
+        campaign = Campaign.objects.create(
+            name='Weekly', subject='This week', content_html='<p>News</p>', content_text='News',
+            campaign_type=Campaign.CampaignType.NEWSLETTER, segment=self.everyone,
+            created_by=self.staff
+        )
+        request = self.factory.post('/send_now/')
+        force_authenticate(request, user=self.staff)
+        with patch.object(send_campaign, 'delay'):
+            response = CampaignViewSet.as_view({'post': 'send_now'})(request, pk=str(campaign.pk))
+
+        self.assertEqual(response.status_code, 202)
+        campaign.refresh_from_db()
+        delivery = CampaignDelivery(campaign, providers={
+            'default': {'BACKEND': 'django.core.mail.backends.locmem.EmailBackend'}
+        })
+        delivery.freeze_audience()
+        self.assertEqual(campaign.total_recipients, 2)
+        self.assertEqual(campaign.audience_snapshot.segment, self.everyone)
+
+        Subscriber.objects.create(email='late@example.com', email_verified=True)
+        self.weekly.unsubscribe()
+        delivery.run()
+
+        self.assertEqual([message.to for message in mail.outbox], [['daily@example.com']])
@@ -0,0 +1,171 @@
+"""
+Tests for buffered newsletter open and click tracking.
+"""
+
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.newsletter.api_views import TrackClickView, TrackOpenView
+from apps.newsletter.models import Campaign, ClickTracking, EmailLog, Subscriber
+from apps.newsletter.tracking import TrackingBuffer
+
+User = get_user_model()
+
+
+def create_campaign_logs(count, status=EmailLog.Status.SENT):
+    """Create a campaign with ``count`` sent email logs."""
+    user = User.objects.create_user(username='editor', email='editor@example.com')
+    campaign = Campaign.objects.create(
+        name='Weekly', subject='This week', content_html='<p>News</p>', content_text='News',
+        campaign_type=Campaign.CampaignType.NEWSLETTER, status=Campaign.Status.SENT,
+        created_by=user
+    )
+    logs = []
+    for i in range(count):
+        subscriber = Subscriber.objects.create(email=f'reader{i}@example.com', email_verified=True)
+        logs.append(EmailLog.objects.create(
+            campaign=campaign, subscriber=subscriber, email_address=subscriber.email,
+            subject=campaign.subject, status=status
+        ))
+    return campaign, logs
+
+
+class TrackingViewTestCase(TestCase):
+    """Test TrackOpenView and TrackClickView."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.campaign, self.logs = create_campaign_logs(3)
+        self.buffer = TrackingBuffer(background=False)
+        patcher = patch('apps.newsletter.api_views.tracking_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open(self, tracking_id):
+        return TrackOpenView.as_view()(self.factory.get('/'), tracking_id=tracking_id)
+
+    def click(self, tracking_id, url='https://example.com/post'):
+        request = self.factory.get('/', {'url': url}, REMOTE_ADDR='10.0.0.1')
+        return TrackClickView.as_view()(request, tracking_id=tracking_id)
+
+    def test_views_answer_without_database_queries(self):
+        """Pixels and redirects are served from memory."""
+        with self.assertNumQueries(0):
+            pixel = self.open(self.logs[0].tracking_id)
+            redirect = self.click(self.logs[0].tracking_id)
+
+        self.assertEqual(pixel.status_code, 200)
+        self.assertEqual(pixel['Content-Type'], 'image/gif')
+        self.assertEqual(redirect.status_code, 302)
+        self.assertEqual(redirect['Location'], 'https://example.com/post')
+        self.assertEqual(len(self.buffer), 2)
+
+    def test_flush_applies_opens_once(self):
+        """Repeated opens count once and unknown tracking ids are ignored."""
+        for _ in range(5):
+            self.open(self.logs[0].tracking_id)
+        self.open(self.logs[1].tracking_id)
+        self.open('unknown')
+
+        self.assertEqual(self.buffer.flush(), (2, 0))
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_opened, 2)
+        self.assertEqual(
+            EmailLog.objects.filter(status=EmailLog.Status.OPENED).count(), 2
+        )
+
+    def test_flush_records_clicks(self):
+        """Every click is stored; an opened-then-clicked log counts for both."""
+        self.open(self.logs[0].tracking_id)
+        self.click(self.logs[0].tracking_id)
+        self.click(self.logs[0].tracking_id, 'https://example.com/other')
+        self.click(self.logs[1].tracking_id)
+
+        self.assertEqual(self.buffer.flush(), (1, 2))
+
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.emails_opened, self.campaign.emails_clicked), (1, 2))
+        self.assertEqual(ClickTracking.objects.count(), 3)
+        self.assertEqual(ClickTracking.objects.filter(ip_address='10.0.0.1').count(), 3)
+        self.assertEqual(EmailLog.objects.get(pk=self.logs[0].pk).status, EmailLog.Status.CLICKED)
+
+    def test_missing_url_is_rejected(self):
+        """Clicks need a destination."""
+        response = TrackClickView.as_view()(self.factory.get('/'), tracking_id='x')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.buffer), 0)
+
+
+class TrackingBufferTestCase(TestCase):
+    """Test TrackingBuffer flushing."""
+
+    def setUp(self):
+        self.campaign, self.logs = create_campaign_logs(4)
+
+    def test_concurrent_buffers_do_not_double_count(self):
+        """Two processes seeing the same open only count it once."""
+        first, second = TrackingBuffer(background=False), TrackingBuffer(background=False)
+        first.record_open(self.logs[0].tracking_id)
+        second.record_open(self.logs[0].tracking_id)
+
+        first.flush()
+        second.flush()
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_opened, 1)
+
+    def test_threshold_triggers_flush(self):
+        """Reaching the threshold flushes without waiting for the interval."""
+        buffer = TrackingBuffer(background=False, flush_threshold=3)
+        for log in self.logs[:3]:
+            buffer.record_open(log.tracking_id)
+
+        self.assertEqual(len(buffer), 0)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.emails_opened, 3)
+
+    def test_failed_flush_keeps_events(self):
+        """Events survive a failed flush and are applied by the next one."""
+        buffer = TrackingBuffer(background=False)
+        buffer.record_open(self.logs[0].tracking_id)
+
+        with patch.object(TrackingBuffer, 'apply', side_effect=RuntimeError('database down')):
+            self.assertEqual(buffer.flush(), (0, 0))
+        self.assertEqual(len(buffer), 1)
+
+        self.assertEqual(buffer.flush(), (1, 0))
+
+    def test_buffer_is_bounded(self):
+        """Events beyond the limit are dropped and counted."""
+        buffer = TrackingBuffer(background=False, max_events=2)
+        for log in self.logs:
+            buffer.record_open(log.tracking_id)
+
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual(buffer.dropped, 2)
+
+
+class BackgroundFlushTestCase(TransactionTestCase):
+    """Test the background flusher thread."""
+
+    def test_events_are_flushed_in_the_background(self):
+        campaign, logs = create_campaign_logs(2)
+        buffer = TrackingBuffer(background=True, flush_interval=0.05)
+
+        for log in logs:
+            buffer.record_open(log.tracking_id)
+
+        deadline = time.monotonic() + 5
+        while len(buffer) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with buffer.flush_lock:  # wait for a flush in progress to finish
+            pass
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.emails_opened, 2)
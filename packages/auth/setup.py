@@ -58,9 +58,13 @@ setup(
         "aws": [
             "boto3>=1.28.0",
         ],
+        "redis": [
+            "redis>=4.5.0",
+        ],
         "all": [
             "twilio>=8.5.0",
             "boto3>=1.28.0",
+            "redis>=4.5.0",
         ],
     },
     entry_points={
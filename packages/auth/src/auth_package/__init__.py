@@ -7,6 +7,7 @@ OAuth2 integration, and role-based access control (RBAC) for enterprise applicat
 
 from .strategies import (
     JWTStrategy, 
+    JWTConfig,
     OAuth2Strategy,
     setup_google_oauth2,
     setup_github_oauth2,
@@ -15,12 +16,18 @@ from .strategies import (
     setup_linkedin_oauth2
 )
 from .mfa import TOTPProvider, SMSProvider, EmailProvider
-from .security import PasswordHasher, TokenManager
+from .security import PasswordHasher, TokenManager, HashingService, HashingOverloaded, HashingUnavailable
 from .permissions import RoleBasedPermission, Permission, Role
 from .models import User, UserRole, UserRepository
 from .session_management import SessionManager, DeviceInfo, Session
-from .audit_logging import AuditLogger, AuditEvent, AuditEventType, AuditSeverity
+from .audit_logging import (
+    AuditLogger, AuditEvent, AuditEventType, AuditSeverity, AuditEventStore, AuditSegmentLog,
+    AuditSink
+)
 from .password_policies import PasswordValidator, PasswordPolicy, AccountLockoutManager
+from .breached_passwords import BreachedPasswordList
+from .storage import StateStore, InMemoryStateStore, RedisStateStore, create_state_store
+from .token_state import TokenStateStore, RevocationFilter
 
 # Django integration (optional)
 DJANGO_INTEGRATION_AVAILABLE = False
@@ -46,6 +53,7 @@ __version__ = "1.0.0"
 __all__ = [
     # Core authentication
     "JWTStrategy",
+    "JWTConfig",
     "OAuth2Strategy",
     "setup_google_oauth2",
     "setup_github_oauth2", 
@@ -61,6 +69,9 @@ __all__ = [
     # Security utilities
     "PasswordHasher",
     "TokenManager",
+    "HashingService",
+    "HashingOverloaded",
+    "HashingUnavailable",
     
     # RBAC system
     "RoleBasedPermission",
@@ -82,11 +93,23 @@ __all__ = [
     "AuditEvent",
     "AuditEventType",
     "AuditSeverity",
+    "AuditEventStore",
+    "AuditSegmentLog",
+    "AuditSink",
     
     # Password policies
     "PasswordValidator",
     "PasswordPolicy",
     "AccountLockoutManager",
+    "BreachedPasswordList",
+    
+    # Shared state storage
+    "StateStore",
+    "InMemoryStateStore",
+    "RedisStateStore",
+    "create_state_store",
+    "TokenStateStore",
+    "RevocationFilter",
 ]
 
 # Add Django integration to __all__ if available
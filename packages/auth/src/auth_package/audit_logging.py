@@ -2,13 +2,23 @@
 Security audit logging and compliance reporting system.
 """
 
+import atexit
 import json
 import hashlib
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Union
+import heapq
+import queue
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Any, Iterator, Optional, List, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
+import os
+
+from .storage import InMemoryStateStore, StateStore, TimeBucketedCounters
 
 
 class AuditEventType(Enum):
@@ -117,6 +127,455 @@ class AuditEvent:
     def to_json(self) -> str:
         """Convert audit event to JSON string."""
         return json.dumps(self.to_dict(), default=str)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditEvent":
+        """Create audit event from dictionary."""
+        return cls(
+            event_id=data["event_id"],
+            event_type=AuditEventType(data["event_type"]),
+            severity=AuditSeverity(data["severity"]),
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            user_id=data["user_id"],
+            session_id=data["session_id"],
+            ip_address=data["ip_address"],
+            user_agent=data["user_agent"],
+            resource=data["resource"],
+            action=data["action"],
+            result=data["result"],
+            details=data["details"],
+            metadata=data["metadata"]
+        )
+
+
+def _epoch(moment: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are taken as UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _matches(event: AuditEvent,
+             start_time: Optional[datetime] = None,
+             end_time: Optional[datetime] = None,
+             event_types: Optional[List[AuditEventType]] = None,
+             user_id: Optional[str] = None,
+             ip_address: Optional[str] = None,
+             severity: Optional[AuditSeverity] = None) -> bool:
+    """Check an event against the ``get_events`` filters."""
+    return not (
+        (start_time and event.timestamp < start_time) or
+        (end_time and event.timestamp > end_time) or
+        (event_types and event.event_type not in event_types) or
+        (user_id and event.user_id != user_id) or
+        (ip_address and event.ip_address != ip_address) or
+        (severity and event.severity != severity)
+    )
+
+
+class AuditEventStore:
+    """
+    Bounded, indexed store of recent audit events.
+    
+    Events sit in a ring buffer of ``capacity`` slots addressed by their
+    arrival number, with secondary indexes from user, event type and IP
+    address to arrival numbers. A time bound is a binary search over the
+    ring and the other filters are index lookups, so a query costs
+    O(log n) plus the events it walks. When the ring is full the oldest
+    event leaves the ring and the head of each index it appears in.
+    
+    Arrival order is time order except for an event logged by another
+    process with a slightly earlier clock; it is placed at its arrival, so
+    time bounds are exact up to that skew.
+    """
+    
+    INDEXED_FIELDS = ("user_id", "event_type", "ip_address")
+    
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._events: List[Optional[AuditEvent]] = [None] * capacity
+        # Latest timestamp seen up to each event, so the ring is sorted by it
+        self._times = array("d", [0.0]) * capacity
+        self._first = 0
+        self._next = 0
+        self._latest = float("-inf")
+        self._indexes: Dict[str, Dict[Any, deque]] = {name: {} for name in self.INDEXED_FIELDS}
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return self._next - self._first
+    
+    def add(self, event: AuditEvent):
+        """Append an event, evicting the oldest if the ring is full."""
+        with self._lock:
+            if len(self) == self.capacity:
+                self._evict()
+            number, slot = self._next, self._next % self.capacity
+            self._latest = max(self._latest, _epoch(event.timestamp))
+            self._events[slot] = event
+            self._times[slot] = self._latest
+            for name, index in self._indexes.items():
+                value = getattr(event, name)
+                if value is not None:
+                    index.setdefault(value, deque()).append(number)
+            self._next += 1
+    
+    def oldest(self) -> Optional[datetime]:
+        """Timestamp of the oldest event held, or None if empty."""
+        with self._lock:
+            return self._events[self._first % self.capacity].timestamp if len(self) else None
+    
+    def expire(self, before: datetime) -> int:
+        """Drop events older than before from the front of the ring."""
+        with self._lock:
+            expired = 0
+            while len(self) and self._events[self._first % self.capacity].timestamp < before:
+                self._evict()
+                expired += 1
+            return expired
+    
+    def query(self,
+              start_time: Optional[datetime] = None,
+              end_time: Optional[datetime] = None,
+              event_types: Optional[List[AuditEventType]] = None,
+              user_id: Optional[str] = None,
+              ip_address: Optional[str] = None,
+              severity: Optional[AuditSeverity] = None,
+              limit: int = 1000) -> List[AuditEvent]:
+        """
+        Return matching events, newest first.
+        
+        The most selective index among the given filters drives the walk
+        (several event types are merged by arrival number); the remaining
+        filters are checked on each event it yields.
+        """
+        with self._lock:
+            low = self._first if start_time is None else self._search(_epoch(start_time), False)
+            high = self._next if end_time is None else self._search(_epoch(end_time), True)
+            
+            candidates = []
+            if user_id:
+                candidates.append([self._indexes["user_id"].get(user_id, ())])
+            if ip_address:
+                candidates.append([self._indexes["ip_address"].get(ip_address, ())])
+            if event_types:
+                candidates.append([self._indexes["event_type"].get(t, ()) for t in set(event_types)])
+            
+            if candidates:
+                smallest = min(candidates, key=lambda lists: sum(map(len, lists)))
+                numbers = heapq.merge(*(reversed(numbers) for numbers in smallest), reverse=True)
+            else:
+                numbers = range(high - 1, low - 1, -1)
+            
+            events = []
+            for number in numbers:
+                if number >= high:
+                    continue
+                if number < low or len(events) >= limit:
+                    break
+                event = self._events[number % self.capacity]
+                if _matches(event, start_time, end_time, event_types, user_id, ip_address, severity):
+                    events.append(event)
+            return events
+    
+    def _search(self, moment: float, right: bool) -> int:
+        """First arrival number whose time is past moment (at or past unless right)."""
+        low, high = self._first, self._next
+        while low < high:
+            middle = (low + high) // 2
+            time_seen = self._times[middle % self.capacity]
+            if time_seen < moment or (right and time_seen == moment):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def _evict(self):
+        slot = self._first % self.capacity
+        event, self._events[slot] = self._events[slot], None
+        for name, index in self._indexes.items():
+            value = getattr(event, name)
+            if value is not None:
+                numbers = index[value]
+                numbers.popleft()
+                if not numbers:
+                    del index[value]
+        self._first += 1
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid is running on this host."""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Running as another user
+    return True
+
+
+class AuditSegmentLog:
+    """
+    Append-only on-disk history of audit events.
+    
+    Events are appended as JSON lines to an open segment named
+    ``<first>-<pid>-<n>.open`` after the epoch milliseconds of its first
+    event. After ``max_events`` events the segment is sealed by renaming
+    it to ``<first>-<last>-<pid>-<n>.seg``, so a query opens only the
+    segments whose time span overlaps it and retention deletes whole
+    files. Processes can share a directory since each appends to its own
+    segments. An open segment ends at its last write (its mtime); one left
+    open by a process that died without sealing it is removed by retention
+    like a sealed one.
+    """
+    
+    def __init__(self, directory: str, max_events: int = 10000):
+        self.directory = directory
+        self.max_events = max_events
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._path = None
+        self._span = [0, 0]
+        self._count = 0
+        self._serial = 0
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def append(self, events: List[AuditEvent]):
+        """Append events to the open segment, sealing it when full."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked child leaves its parent's segment to the parent
+                self._file = None
+            for event in events:
+                millis = int(_epoch(event.timestamp) * 1000)
+                if self._file is None:
+                    self._open(millis)
+                self._file.write(event.to_json() + "\n")
+                self._span[1] = max(self._span[1], millis)
+                self._count += 1
+                if self._count >= self.max_events:
+                    self._seal()
+            if self._file is not None:
+                self._file.flush()
+    
+    def read(self, start_time: Optional[datetime] = None,
+             end_time: Optional[datetime] = None) -> Iterator[AuditEvent]:
+        """Yield events from the segments that overlap the time range."""
+        start = _epoch(start_time) * 1000 if start_time else None
+        end = _epoch(end_time) * 1000 if end_time else None
+        for path, first, last, _ in self._segments():
+            if (end is not None and first > end) or (start is not None and last < start):
+                continue
+            try:
+                with open(path, encoding="utf-8") as segment:
+                    for line in segment:
+                        try:
+                            yield AuditEvent.from_dict(json.loads(line))
+                        except ValueError:
+                            continue  # A line still being written
+            except FileNotFoundError:
+                continue  # Sealed or removed since listing
+    
+    def remove_before(self, cutoff: datetime) -> int:
+        """Delete sealed or abandoned segments whose newest event is older than cutoff."""
+        removed = 0
+        for path, _, last, pid in self._segments():
+            if last < _epoch(cutoff) * 1000 and (pid is None or not _pid_alive(pid)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+        return removed
+    
+    def close(self):
+        """Seal the open segment."""
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._seal()
+    
+    def _segments(self):
+        """(path, first millis, last millis, writer pid or None once sealed) of each segment."""
+        for name in os.listdir(self.directory):
+            stem, _, suffix = name.partition(".")
+            parts = stem.split("-")
+            path = os.path.join(self.directory, name)
+            if suffix == "seg" and len(parts) == 4:
+                yield path, int(parts[0]), int(parts[1]), None
+            elif suffix == "open" and len(parts) == 3:
+                try:
+                    last = os.stat(path).st_mtime * 1000
+                except FileNotFoundError:
+                    continue  # Sealed since listing
+                yield path, int(parts[0]), last, int(parts[1])
+    
+    def _open(self, millis: int):
+        self._pid = os.getpid()
+        self._serial += 1
+        self._span = [millis, millis]
+        self._count = 0
+        self._path = os.path.join(self.directory, f"{millis:013d}-{os.getpid()}-{self._serial}.open")
+        self._file = open(self._path, "a", encoding="utf-8")
+    
+    def _seal(self):
+        self._file.close()
+        first, last = self._span
+        os.rename(self._path, os.path.join(
+            self.directory, f"{first:013d}-{last:013d}-{os.getpid()}-{self._serial}.seg"
+        ))
+        self._file = None
+
+
+class AuditSink:
+    """
+    Background pipeline that writes audit events in batches.
+    
+    ``submit`` only puts the event on a bounded queue; a daemon writer
+    thread takes up to ``batch_size`` events at a time and hands them to
+    ``write_batch``. When the queue is full, events whose severity is in
+    ``drop_severities`` are dropped and counted, and any other event waits
+    up to ``block_timeout`` seconds for room before being written on the
+    caller's thread, so important events are never lost. Pending events
+    are flushed at interpreter exit. A process forked after the writer
+    started gets a fresh queue and writer of its own.
+    """
+    
+    def __init__(self,
+                 write_batch: Callable[[List[AuditEvent]], None],
+                 queue_size: int = 10000,
+                 batch_size: int = 500,
+                 drop_severities: List[str] = ("low",),
+                 block_timeout: float = 5.0):
+        self.write_batch = write_batch
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.drop_severities = set(drop_severities)
+        self.block_timeout = block_timeout
+        self.stats = {
+            "enqueued": 0, "dropped": 0, "blocked": 0, "written_inline": 0,
+            "written": 0, "batches": 0, "failed": 0, "write_seconds": 0.0
+        }
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._exit_hook = False
+    
+    def submit(self, event: AuditEvent) -> bool:
+        """
+        Queue an event for the writer thread.
+        
+        Returns:
+            False if the event was dropped under backpressure
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            if event.severity.value in self.drop_severities:
+                self._count("dropped")
+                return False
+            self._count("blocked")
+            try:
+                self._queue.put(event, timeout=self.block_timeout)
+            except queue.Full:
+                self._count("written_inline")
+                self._write([event])
+                return True
+        self._count("enqueued")
+        return True
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued event has been written.
+        
+        Returns:
+            Whether the queue drained within timeout
+        """
+        pending = self._queue
+        if pending is None or self._pid != os.getpid():
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with pending.all_tasks_done:
+            while pending.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                pending.all_tasks_done.wait(remaining)
+        return True
+    
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush pending events and stop the writer thread."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self.flush(timeout)
+        try:
+            self._queue.put(None, timeout=timeout)  # Tells the writer to stop
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, drop counts and write throughput."""
+        metrics = dict(self.stats)
+        metrics["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        metrics["events_per_second"] = metrics["written"] / max(time.monotonic() - self._started_at, 1e-9)
+        metrics["average_batch_size"] = metrics["written"] / metrics["batches"] if metrics["batches"] else 0
+        return metrics
+    
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(target=self._run, args=(self._queue,), name="audit-sink", daemon=True)
+            self._thread.start()
+            if not self._exit_hook:
+                atexit.register(self.close)
+                self._exit_hook = True
+    
+    def _run(self, pending: queue.Queue):
+        while True:
+            # Whatever queued up while the last batch was written forms the next one
+            batch = [pending.get()]
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            try:
+                if len(batch) > stop:
+                    self._write(batch[:-1] if stop else batch)
+            finally:
+                for _ in batch:
+                    pending.task_done()
+            if stop:
+                return
+    
+    def _write(self, batch: List[AuditEvent]):
+        started = time.perf_counter()
+        try:
+            self.write_batch(batch)
+        except Exception:
+            self._count("failed", len(batch))
+            logging.getLogger(__name__).exception("Failed to write %d audit events", len(batch))
+        else:
+            self._count("written", len(batch))
+            self._count("batches")
+        self._count("write_seconds", time.perf_counter() - started)
+    
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.stats[name] += amount
 
 
 class AuditLogger:
@@ -124,10 +583,24 @@ class AuditLogger:
     Security audit logging system.
     
     Provides comprehensive audit logging for security events,
-    compliance reporting, and forensic analysis.
+    compliance reporting, and forensic analysis. Recent events and alert
+    counters are kept in a ``StateStore`` so a Redis store gives every
+    process the same view. Each logger follows the stored events as a
+    feed into an indexed ``AuditEventStore`` and keeps sliding-window
+    failed-login counts as events arrive, so queries and anomaly
+    detection only touch new events. With ``segment_dir`` set, events are
+    also written to an ``AuditSegmentLog`` that answers queries reaching
+    past the events held in memory.
+    
+    With ``async_writes`` on, ``log_event`` only builds the event and
+    hands it to an ``AuditSink``; a writer thread does the logging, state
+    store and database writes and alert checks in batches, off the
+    request path. Queries flush pending events first.
     """
     
-    def __init__(self, config: Dict[str, Any] = None):
+    EVENTS_KEY = "audit:events"
+    
+    def __init__(self, config: Dict[str, Any] = None, store: Optional[StateStore] = None):
         default_config = {
             "log_level": "INFO",
             "log_format": "json",  # json, text
@@ -138,6 +611,17 @@ class AuditLogger:
             "syslog_facility": "LOG_AUTH",
             "enable_database": False,
             "retention_days": 365,
+            "max_events": 10000,  # Recent events kept in the state store and index
+            "alert_window": 3600,  # Seconds an alert counter accumulates
+            "anomaly_window": 3600,  # Seconds of failed logins counted for detect_anomalies
+            "segment_dir": None,  # Directory for on-disk event history
+            "segment_max_events": 10000,
+            "async_writes": True,  # Write from a background AuditSink
+            "queue_size": 10000,
+            "batch_size": 500,
+            "drop_severities": ["low"],  # Dropped instead of waited for when the queue is full
+            "block_timeout": 5.0,  # Seconds other events wait for room before writing inline
+            "database_writer": None,  # Callable taking a list of events, for enable_database
             "enable_real_time_alerts": True,
             "alert_thresholds": {
                 "failed_logins": 5,
@@ -150,9 +634,51 @@ class AuditLogger:
             default_config.update(config)
         
         self.config = default_config
+        self.store = store if store is not None else InMemoryStateStore()
+        self.events = AuditEventStore(self.config["max_events"])
+        self.history = (
+            AuditSegmentLog(self.config["segment_dir"], self.config["segment_max_events"])
+            if self.config["segment_dir"] else None
+        )
+        if self.history is not None:
+            # Registered before the sink's hook, so it runs after the sink
+            # has written its last events
+            atexit.register(self.history.close)
+        self._failed_logins = TimeBucketedCounters(self.config["anomaly_window"])
+        self._suspects = set()
+        self._synced = 0
+        self._sync_lock = threading.Lock()
+        self._sink = None
         self._setup_logging()
-        self._events: List[AuditEvent] = []  # In-memory storage for analysis
-        self._alert_counters: Dict[str, int] = {}
+    
+    @property
+    def sink(self) -> AuditSink:
+        """The background writer, created from the current config on first use."""
+        if self._sink is None:
+            self._sink = AuditSink(
+                self._write_events,
+                queue_size=self.config["queue_size"],
+                batch_size=self.config["batch_size"],
+                drop_severities=self.config["drop_severities"],
+                block_timeout=self.config["block_timeout"]
+            )
+        return self._sink
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued events to be written."""
+        return self._sink.flush(timeout) if self._sink is not None else True
+    
+    def close(self):
+        """Flush and stop the background writer and seal the history segment; the next event starts new ones."""
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        if self.history is not None:
+            self.history.close()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Throughput and backpressure counters of the background writer."""
+        return self._sink.metrics() if self._sink is not None else {}
     
     def _setup_logging(self):
         """Setup logging configuration."""
@@ -160,8 +686,12 @@ class AuditLogger:
         self.logger = logging.getLogger("audit")
         self.logger.setLevel(getattr(logging, self.config["log_level"]))
         
-        # File handler with rotation
+        # File handler with rotation, added once per file for the shared logger
         from logging.handlers import RotatingFileHandler
+        log_file = os.path.abspath(self.config["log_file"])
+        if any(getattr(handler, "baseFilename", None) == log_file for handler in self.logger.handlers):
+            return
+        
         file_handler = RotatingFileHandler(
             self.config["log_file"],
             maxBytes=self.config["max_log_size"],
@@ -238,27 +768,40 @@ class AuditLogger:
             metadata=metadata or {}
         )
         
-        # Log to file/syslog
-        if self.config["log_format"] == "json":
-            self.logger.info(event.to_json())
+        if self.config["async_writes"]:
+            self.sink.submit(event)
         else:
-            log_message = f"[{event.event_type.value}] User: {user_id}, Result: {result}"
-            if details:
-                log_message += f", Details: {details}"
-            self.logger.info(log_message)
+            self._write_events([event])
         
-        # Store in memory for analysis
-        self._events.append(event)
+        return event
+    
+    def _write_events(self, events: List[AuditEvent]):
+        """Log, store and alert on a batch of events."""
+        # Log to file/syslog
+        for event in events:
+            if self.config["log_format"] == "json":
+                self.logger.info(event.to_json())
+            else:
+                log_message = f"[{event.event_type.value}] User: {event.user_id}, Result: {event.result}"
+                if event.details:
+                    log_message += f", Details: {event.details}"
+                self.logger.info(log_message)
+        
+        # Store recent events for analysis
+        self.store.push_many(
+            self.EVENTS_KEY, [event.to_dict() for event in events], max_length=self.config["max_events"]
+        )
+        if self.history is not None:
+            self.history.append(events)
         
         # Database storage (if enabled)
         if self.config["enable_database"]:
-            self._store_to_database(event)
+            self._store_to_database(events)
         
         # Real-time alerts (if enabled)
         if self.config["enable_real_time_alerts"]:
-            self._check_alert_conditions(event)
-        
-        return event
+            for event in events:
+                self._check_alert_conditions(event)
     
     def log_authentication_event(self, 
                                 event_type: AuditEventType,
@@ -323,7 +866,8 @@ class AuditLogger:
                    event_types: Optional[List[AuditEventType]] = None,
                    user_id: Optional[str] = None,
                    severity: Optional[AuditSeverity] = None,
-                   limit: int = 1000) -> List[AuditEvent]:
+                   limit: int = 1000,
+                   ip_address: Optional[str] = None) -> List[AuditEvent]:
         """
         Retrieve audit events with filtering.
         
@@ -334,31 +878,28 @@ class AuditLogger:
             user_id: User ID filter
             severity: Severity filter
             limit: Maximum number of events to return
+            ip_address: Client IP address filter
             
         Returns:
-            List of matching audit events
+            List of matching audit events, newest first
         """
-        filtered_events = self._events.copy()
-        
-        # Apply filters
-        if start_time:
-            filtered_events = [e for e in filtered_events if e.timestamp >= start_time]
-        
-        if end_time:
-            filtered_events = [e for e in filtered_events if e.timestamp <= end_time]
+        self._sync()
+        filters = (event_types, user_id, ip_address, severity)
+        events = self.events.query(start_time, end_time, *filters, limit=limit)
         
-        if event_types:
-            filtered_events = [e for e in filtered_events if e.event_type in event_types]
+        # Reach into on-disk history for what is older than the index holds
+        horizon = self.events.oldest()
+        if (self.history is not None and len(events) < limit and
+                (horizon is None or start_time is None or start_time < horizon)):
+            older = [
+                event for event in self.history.read(start_time, end_time)
+                if (horizon is None or event.timestamp < horizon) and
+                _matches(event, start_time, end_time, *filters)
+            ]
+            older.sort(key=lambda e: e.timestamp, reverse=True)
+            events.extend(older[:limit - len(events)])
         
-        if user_id:
-            filtered_events = [e for e in filtered_events if e.user_id == user_id]
-        
-        if severity:
-            filtered_events = [e for e in filtered_events if e.severity == severity]
-        
-        # Sort by timestamp (newest first) and limit
-        filtered_events.sort(key=lambda e: e.timestamp, reverse=True)
-        return filtered_events[:limit]
+        return events
     
     def generate_security_report(self, 
                                start_time: datetime,
@@ -445,34 +986,45 @@ class AuditLogger:
         """
         Detect security anomalies in recent events.
         
+        Over the configured ``anomaly_window`` this reads the sliding-window
+        counts kept as events arrive, checking only the users and IPs that
+        have crossed the threshold. Other windows count the failed logins
+        found through the event type index.
+        
         Args:
             time_window: Time window to analyze
             
         Returns:
             List of detected anomalies
         """
-        end_time = datetime.utcnow()
-        start_time = end_time - time_window
-        recent_events = self.get_events(start_time=start_time, end_time=end_time)
-        
-        anomalies = []
-        
-        # Detect brute force attempts
+        self._sync()
+        threshold = self.config["alert_thresholds"]["failed_logins"]
         failed_logins_by_user = {}
         failed_logins_by_ip = {}
         
-        for event in recent_events:
-            if event.event_type == AuditEventType.LOGIN_FAILURE:
-                # By user
+        if time_window.total_seconds() == self._failed_logins.window:
+            for key in list(self._suspects):
+                count = self._failed_logins.count(key)
+                if count < threshold:
+                    self._suspects.discard(key)
+                    continue
+                kind, _, value = key.partition(":")
+                counts = failed_logins_by_user if kind == "user" else failed_logins_by_ip
+                counts[value] = count
+        else:
+            end_time = datetime.utcnow()
+            failed_logins = self.events.query(
+                end_time - time_window, end_time, [AuditEventType.LOGIN_FAILURE],
+                limit=len(self.events)
+            )
+            for event in failed_logins:
                 user_id = event.user_id or "unknown"
                 failed_logins_by_user[user_id] = failed_logins_by_user.get(user_id, 0) + 1
                 
-                # By IP
                 ip_address = event.ip_address or "unknown"
                 failed_logins_by_ip[ip_address] = failed_logins_by_ip.get(ip_address, 0) + 1
         
-        # Check thresholds
-        threshold = self.config["alert_thresholds"]["failed_logins"]
+        anomalies = []
         
         for user_id, count in failed_logins_by_user.items():
             if count >= threshold:
@@ -497,11 +1049,27 @@ class AuditLogger:
         
         return anomalies
     
-    def _store_to_database(self, event: AuditEvent):
-        """Store audit event to database (placeholder)."""
-        # This would implement database storage
-        # Could use SQLAlchemy, MongoDB, or other database systems
-        pass
+    def _sync(self):
+        """Index the events logged by any process since the last sync."""
+        self.flush()
+        with self._sync_lock:
+            self._synced, new_events = self.store.items_since(self.EVENTS_KEY, self._synced)
+            threshold = self.config["alert_thresholds"]["failed_logins"]
+            for data in new_events:
+                event = AuditEvent.from_dict(data)
+                self.events.add(event)
+                if event.event_type != AuditEventType.LOGIN_FAILURE:
+                    continue
+                for key in (f"user:{event.user_id or 'unknown'}", f"ip:{event.ip_address or 'unknown'}"):
+                    if self._failed_logins.add(key, at=_epoch(event.timestamp)) >= threshold:
+                        self._suspects.add(key)
+    
+    def _store_to_database(self, events: List[AuditEvent]):
+        """Store a batch of audit events with the configured ``database_writer``."""
+        # The writer is expected to bulk insert, e.g. Django's bulk_create
+        # or SQLAlchemy's insert().values(...)
+        if self.config["database_writer"] is not None:
+            self.config["database_writer"](events)
     
     def _check_alert_conditions(self, event: AuditEvent):
         """Check if event triggers real-time alerts."""
@@ -510,18 +1078,23 @@ class AuditLogger:
             self._send_alert(event, "Critical security event detected")
         
         # Count-based alerts
-        event_key = f"{event.event_type.value}:{event.user_id}"
-        self._alert_counters[event_key] = self._alert_counters.get(event_key, 0) + 1
-        
         thresholds = self.config["alert_thresholds"]
         
+        if event.event_type not in (AuditEventType.LOGIN_FAILURE, AuditEventType.SUSPICIOUS_ACTIVITY):
+            return
+        
+        count = self.store.incr(
+            f"audit:alerts:{event.event_type.value}:{event.user_id}",
+            ttl=self.config["alert_window"]
+        )
+        
         if (event.event_type == AuditEventType.LOGIN_FAILURE and
-            self._alert_counters[event_key] >= thresholds["failed_logins"]):
-            self._send_alert(event, f"Multiple failed login attempts: {self._alert_counters[event_key]}")
+            count >= thresholds["failed_logins"]):
+            self._send_alert(event, f"Multiple failed login attempts: {count}")
         
         if (event.event_type == AuditEventType.SUSPICIOUS_ACTIVITY and
-            self._alert_counters[event_key] >= thresholds["suspicious_activities"]):
-            self._send_alert(event, f"Multiple suspicious activities: {self._alert_counters[event_key]}")
+            count >= thresholds["suspicious_activities"]):
+            self._send_alert(event, f"Multiple suspicious activities: {count}")
     
     def _send_alert(self, event: AuditEvent, message: str):
         """Send real-time security alert."""
@@ -546,10 +1119,18 @@ class AuditLogger:
         retention_days = self.config["retention_days"]
         cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
         
-        initial_count = len(self._events)
-        self._events = [e for e in self._events if e.timestamp > cutoff_date]
+        # Events are stored oldest first, so expired ones form a prefix
+        expired = 0
+        for data in self.store.items(self.EVENTS_KEY):
+            if datetime.fromisoformat(data["timestamp"]) > cutoff_date:
+                break
+            expired += 1
         
-        return initial_count - len(self._events)
+        self.store.trim(self.EVENTS_KEY, expired)
+        self.events.expire(cutoff_date)
+        if self.history is not None:
+            self.history.remove_before(cutoff_date)
+        return expired
 
 
 # Global audit logger instance
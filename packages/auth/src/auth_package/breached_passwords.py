@@ -0,0 +1,173 @@
+"""
+Memory-mapped breached password lists.
+
+A breach corpus is compiled once into a file of sorted 64-bit hashes of
+the lowercased passwords. Lookups binary search the file through mmap,
+so only the pages a search touches are read and a 10M-entry list costs
+80 MB of disk and a few KB of resident memory instead of a Python set
+of strings. With 64-bit hashes, a false match needs a collision with
+odds around one in 10^12 for such a list.
+"""
+
+import array
+import bisect
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import sys
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+MAGIC = b"AUTHBPL1"
+HEADER_SIZE = 16  # Magic and entry count
+
+
+def password_hash(password: str) -> int:
+    """64-bit hash of a lowercased password, as stored in the list."""
+    return int.from_bytes(hashlib.blake2b(password.lower().encode(), digest_size=8).digest(), "little")
+
+
+class _Entries:
+    """Hashes in a mapped file, indexable for bisect on big-endian hosts."""
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self._buffer) // 8
+
+    def __getitem__(self, index: int) -> int:
+        return int.from_bytes(self._buffer[index * 8:index * 8 + 8], "little")
+
+
+class BreachedPasswordList:
+    """
+    Read-only set of breached passwords backed by a compiled hash file.
+
+    Build the file with ``BreachedPasswordList.build`` (or the
+    ``build-breach-list`` CLI command) from a text file with one
+    password per line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a compiled breached password list")
+        self._count = int.from_bytes(self._mmap[8:HEADER_SIZE], "little")
+        self._view = memoryview(self._mmap)
+        self._buffer = self._view[HEADER_SIZE:HEADER_SIZE + self._count * 8]
+        # Native unsigned 64-bit view lets bisect run in C
+        self._entries = self._buffer.cast("Q") if sys.byteorder == "little" else _Entries(self._buffer)
+        self._window = 4 * math.isqrt(self._count) + 16
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, password: str) -> bool:
+        value = password_hash(password)
+        entries, count = self._entries, self._count
+        # Hashes are uniform, so an entry sits within a few standard
+        # deviations of its proportional position; search that window
+        # first, touching a handful of pages instead of the whole file
+        guess = (value * count) >> 64
+        low, high = max(0, guess - self._window), min(count, guess + self._window)
+        if (low and entries[low] > value) or (high < count and entries[high - 1] < value):
+            low, high = 0, count
+        index = bisect.bisect_left(entries, value, low, high)
+        return index < count and entries[index] == value
+
+    def close(self):
+        for view in (self._entries, self._buffer, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    @classmethod
+    def build(cls, passwords: Iterable[str], path: str, chunk_size: int = 1000000) -> int:
+        """
+        Compile passwords into a sorted hash file.
+
+        Hashes are sorted in chunks of ``chunk_size`` spilled to temporary
+        files and merged, so building from a large corpus needs memory
+        for one chunk only.
+
+        Args:
+            passwords: Passwords, e.g. the lines of a breach corpus
+            path: File to write
+            chunk_size: Hashes sorted in memory at a time
+
+        Returns:
+            Number of distinct entries written
+        """
+        runs: List[BinaryIO] = []
+        try:
+            chunk = []
+            for password in passwords:
+                password = password.strip()
+                if password:
+                    chunk.append(password_hash(password))
+                if len(chunk) >= chunk_size:
+                    runs.append(cls._spill(chunk))
+                    chunk = []
+            if chunk or not runs:
+                runs.append(cls._spill(chunk))
+
+            count = 0
+            with open(path, "wb") as out:
+                out.write(MAGIC + bytes(8))
+                previous, batch = None, array.array("Q")
+                for value in heapq.merge(*(cls._read_run(run) for run in runs)):
+                    if value != previous:
+                        batch.append(value)
+                        previous = value
+                    if len(batch) >= 65536:
+                        count += cls._write(out, batch)
+                        batch = array.array("Q")
+                count += cls._write(out, batch)
+                out.seek(8)
+                out.write(count.to_bytes(8, "little"))
+            return count
+        finally:
+            for run in runs:
+                run.close()
+
+    @staticmethod
+    def _spill(chunk: List[int]) -> BinaryIO:
+        run = tempfile.TemporaryFile()
+        values = array.array("Q", sorted(chunk))
+        if sys.byteorder != "little":
+            values.byteswap()
+        values.tofile(run)
+        run.seek(0)
+        return run
+
+    @staticmethod
+    def _read_run(run: BinaryIO) -> Iterator[int]:
+        while True:
+            block = run.read(8 * 65536)
+            if not block:
+                return
+            values = array.array("Q")
+            values.frombytes(block)
+            if sys.byteorder != "little":
+                values.byteswap()
+            yield from values
+
+    @staticmethod
+    def _write(out: BinaryIO, batch: array.array) -> int:
+        if sys.byteorder != "little":
+            batch.byteswap()
+        batch.tofile(out)
+        return len(batch)
+
+
+def open_breached_password_list(path: Optional[str]) -> Optional[BreachedPasswordList]:
+    """Open a compiled list, or return None when no path is configured or the file is missing."""
+    if not path or not os.path.exists(path):
+        return None
+    return BreachedPasswordList(path)
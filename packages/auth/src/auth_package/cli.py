@@ -18,6 +18,7 @@ from .permissions import default_role_registry, Permission, PermissionAction, Pe
 from .security import PasswordHasher
 from .strategies import JWTStrategy, JWTConfig
 from .mfa import TOTPProvider
+from .breached_passwords import BreachedPasswordList
 
 
 def create_user_command(args):
@@ -306,6 +307,20 @@ def validate_password_command(args):
     return 0 if result['valid'] else 1
 
 
+def build_breach_list_command(args):
+    """Compile a breached password list into a memory-mappable hash file."""
+    with open(args.source, 'r', encoding='utf-8', errors='ignore') as f:
+        count = BreachedPasswordList.build(f, args.output)
+    
+    if args.json:
+        print(json.dumps({"output": args.output, "entries": count}, indent=2))
+    else:
+        print(f"Wrote {count} entries to {args.output}")
+        print(f"Set PasswordPolicy(breached_passwords_file={args.output!r}) to use it")
+    
+    return 0
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -367,6 +382,13 @@ def main():
     validate_password_parser.add_argument("--username", help="Username for validation context")
     validate_password_parser.add_argument("--email", help="Email for validation context")
     
+    # Build breached password list command
+    build_breach_list_parser = subparsers.add_parser(
+        "build-breach-list", help="Compile a breached password list (one password per line)"
+    )
+    build_breach_list_parser.add_argument("source", help="Text file with one password per line")
+    build_breach_list_parser.add_argument("output", help="Compiled list to write")
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -383,6 +405,7 @@ def main():
         "generate-token": generate_token_command,
         "setup-totp": setup_totp_command,
         "validate-password": validate_password_command,
+        "build-breach-list": build_breach_list_command,
     }
     
     command_func = commands.get(args.command)
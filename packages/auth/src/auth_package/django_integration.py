@@ -35,13 +35,15 @@ except ImportError:
         pass
 
 from .strategies import JWTStrategy, JWTConfig
-from .security import PasswordHasher
-from .permissions import RoleBasedPermission, default_role_registry
+from .security import HashingOverloaded, HashingService, HashingUnavailable, PasswordHasher, default_password_hasher
+from .permissions import PermissionAction, RoleBasedPermission, default_role_registry
 from .models import User as AuthUser, UserStatus, AuthProvider
 from .session_management import SessionManager, DeviceInfo, default_session_manager
 from .audit_logging import AuditLogger, AuditEventType, AuditSeverity, default_audit_logger
 from .password_policies import PasswordValidator, AccountLockoutManager, default_password_validator, default_lockout_manager
 from .mfa import TOTPProvider, SMSProvider, EmailProvider
+from .storage import StateStore, create_state_store
+from .token_state import default_token_state
 
 logger = logging.getLogger(__name__)
 
@@ -154,8 +156,8 @@ class JWTAuthenticationBackend(BaseBackend):
             issuer=getattr(settings, 'JWT_ISSUER', 'django-app'),
             audience=getattr(settings, 'JWT_AUDIENCE', 'api')
         )
-        self.jwt_strategy = JWTStrategy(jwt_config)
-        self.password_hasher = PasswordHasher()
+        self.jwt_strategy = JWTStrategy(jwt_config, token_state=default_token_state)
+        self.password_hasher = default_password_hasher
         self.session_manager = default_session_manager
         self.audit_logger = default_audit_logger
         self.lockout_manager = default_lockout_manager
@@ -296,11 +298,18 @@ class JWTAuthenticationBackend(BaseBackend):
                 return None
             
             # Verify password
-            password_hash = getattr(user, 'password_hash', user.password)
+            hash_field = 'password_hash' if hasattr(user, 'password_hash') else 'password'
+            password_hash = getattr(user, hash_field)
+            matched, new_hash = self.password_hasher.verify_and_update(password, password_hash)
             
-            if self.password_hasher.verify_password(password, password_hash):
+            if matched:
                 # Successful authentication
                 
+                # Rehash with the current cost
+                if new_hash:
+                    setattr(user, hash_field, new_hash)
+                    user.save(update_fields=[hash_field])
+                
                 # Record successful login
                 self.lockout_manager.record_login_attempt(
                     user_id, ip_address, True, user_agent
@@ -354,6 +363,9 @@ class JWTAuthenticationBackend(BaseBackend):
                 
                 return None
                 
+        except HashingOverloaded:
+            # Surfaced as a 429 or 503 by HashingOverloadMiddleware
+            raise
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             self.audit_logger.log_authentication_event(
@@ -387,6 +399,26 @@ class JWTAuthenticationBackend(BaseBackend):
             return None
 
 
+# Django permission verbs and their RBAC actions
+DJANGO_ACTION_MAPPING = {
+    'add': PermissionAction.CREATE,
+    'create': PermissionAction.CREATE,
+    'view': PermissionAction.READ,
+    'read': PermissionAction.READ,
+    'change': PermissionAction.UPDATE,
+    'update': PermissionAction.UPDATE,
+    'delete': PermissionAction.DELETE,
+    'execute': PermissionAction.EXECUTE,
+    'manage': PermissionAction.MANAGE,
+}
+
+
+def parse_permission(perm: str):
+    """Split 'resource.action' into the resource and its RBAC action (read by default)."""
+    resource, _, action_str = perm.partition('.')
+    return resource, DJANGO_ACTION_MAPPING.get(action_str or 'read', PermissionAction.READ)
+
+
 class RoleBasedPermissionBackend(BaseBackend):
     """
     Django permission backend using role-based access control.
@@ -406,6 +438,11 @@ class RoleBasedPermissionBackend(BaseBackend):
         """
         Check if user has permission.
         
+        The user's roles and decisions are cached on the user object, so
+        repeated checks during a request cost a dict lookup; like Django's
+        ``ModelBackend`` caches, they last as long as the user instance
+        and are dropped when the role registry changes.
+        
         Args:
             user_obj: Django User instance
             perm: Permission string (e.g., 'blog.create')
@@ -417,31 +454,11 @@ class RoleBasedPermissionBackend(BaseBackend):
         if not user_obj or not user_obj.is_active:
             return False
         
-        # Convert Django user to auth user
-        auth_user = DjangoUserAdapter.from_django_user(user_obj)
-        
-        # Parse permission string
-        if '.' in perm:
-            resource, action_str = perm.split('.', 1)
-        else:
-            resource = perm
-            action_str = 'read'
-        
-        # Map action string to PermissionAction
-        from .permissions import PermissionAction
-        action_mapping = {
-            'add': PermissionAction.CREATE,
-            'create': PermissionAction.CREATE,
-            'view': PermissionAction.READ,
-            'read': PermissionAction.READ,
-            'change': PermissionAction.UPDATE,
-            'update': PermissionAction.UPDATE,
-            'delete': PermissionAction.DELETE,
-            'execute': PermissionAction.EXECUTE,
-            'manage': PermissionAction.MANAGE,
-        }
+        cache = self._get_perm_cache(user_obj)
+        if obj is None and perm in cache['decisions']:
+            return cache['decisions'][perm]
         
-        action = action_mapping.get(action_str, PermissionAction.READ)
+        resource, action = parse_permission(perm)
         
         # Build context for permission checking
         context = {}
@@ -449,12 +466,25 @@ class RoleBasedPermissionBackend(BaseBackend):
             context['resource_id'] = getattr(obj, 'id', None)
             context['owner_id'] = getattr(obj, 'owner_id', getattr(obj, 'user_id', None))
         
-        return self.permission_checker.check_permission(
-            list(auth_user.roles),
-            resource,
-            action,
-            context
-        )
+        allowed = self.permission_checker.check_permission(cache['roles'], resource, action, context)
+        if obj is None:
+            cache['decisions'][perm] = allowed
+        return allowed
+    
+    def _get_perm_cache(self, user_obj) -> Dict[str, Any]:
+        """The user's roles (their group names) and decisions for this registry version."""
+        version = self.permission_checker.role_registry.version
+        cache = getattr(user_obj, '_auth_perm_cache', None)
+        if cache is None or cache['version'] != version:
+            roles = cache['roles'] if cache is not None else None
+            if roles is None:
+                roles = frozenset(
+                    user_obj.groups.values_list('name', flat=True)
+                    if hasattr(user_obj, 'groups') else ()
+                )
+            cache = {'version': version, 'roles': roles, 'decisions': {}}
+            user_obj._auth_perm_cache = cache
+        return cache
     
     def has_module_perms(self, user_obj, app_label):
         """Check if user has any permissions for app."""
@@ -476,7 +506,7 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
                 secret_key=getattr(settings, 'JWT_SECRET_KEY', settings.SECRET_KEY),
                 algorithm=getattr(settings, 'JWT_ALGORITHM', 'HS256')
             )
-            self.jwt_strategy = JWTStrategy(jwt_config)
+            self.jwt_strategy = JWTStrategy(jwt_config, token_state=default_token_state)
     
     def process_request(self, request):
         """Process incoming request for JWT authentication."""
@@ -521,6 +551,34 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
         return request.COOKIES.get(cookie_name)
 
 
+class HashingOverloadMiddleware(MiddlewareMixin):
+    """
+    Django middleware turning a saturated password hashing service into a
+    429, and one whose workers failed into a 503.
+    
+    List it after any middleware that converts unhandled exceptions into
+    500 responses, so it sees ``HashingOverloaded`` first.
+    """
+    
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingOverloaded):
+            return None
+        
+        from django.http import JsonResponse
+        if isinstance(exception, HashingUnavailable):
+            response = JsonResponse({
+                'error': 'Password checks are temporarily unavailable',
+                'retry_after': exception.retry_after
+            }, status=503)
+        else:
+            response = JsonResponse({
+                'error': 'Too many login attempts in progress',
+                'retry_after': exception.retry_after
+            }, status=429)
+        response['Retry-After'] = str(exception.retry_after)
+        return response
+
+
 class PasswordValidationMixin:
     """
     Mixin for Django password validation using auth package.
@@ -602,11 +660,91 @@ def setup_django_integration():
         else:
             middleware.append(jwt_middleware)
     
+    # Last, so its process_exception runs before generic error handlers
+    overload_middleware = 'auth_package.django_integration.HashingOverloadMiddleware'
+    if overload_middleware not in middleware:
+        middleware.append(overload_middleware)
+    
     settings.MIDDLEWARE = middleware
     
     logger.info("Django integration for auth package configured successfully")
 
 
+def configure_state_store(store: Optional[StateStore] = None) -> StateStore:
+    """
+    Share one state store between the default managers.
+    
+    Builds the store from the ``AUTH_STATE_STORE`` setting unless one is
+    given, e.g. ``{'BACKEND': 'redis', 'URL': REDIS_URL, 'PREFIX': 'auth:'}``,
+    and points the default lockout manager, session manager, audit
+    logger and JWT token state at it so every worker sees the same
+    lockouts, sessions and refresh tokens.
+    """
+    if store is None:
+        store_settings = getattr(settings, 'AUTH_STATE_STORE', {})
+        store = create_state_store({key.lower(): value for key, value in store_settings.items()})
+    
+    default_lockout_manager.store = store
+    default_session_manager.store = store
+    default_audit_logger.store = store
+    default_token_state.store = store
+    return store
+
+
+def configure_audit_logger(config: Optional[Dict[str, Any]] = None) -> AuditLogger:
+    """
+    Apply the ``AUTH_AUDIT_LOGGER`` setting to the default audit logger.
+    
+    Keys are ``AuditLogger`` config keys in upper case, e.g.
+    ``{'ASYNC_WRITES': True, 'DATABASE_WRITER': 'myapp.audit.store_events'}``.
+    A dotted ``DATABASE_WRITER`` path is imported and turns on database
+    storage; the writer receives each batch of events to bulk insert.
+    """
+    if config is None:
+        audit_settings = getattr(settings, 'AUTH_AUDIT_LOGGER', {})
+        config = {key.lower(): value for key, value in audit_settings.items()}
+    
+    if isinstance(config.get('database_writer'), str):
+        from django.utils.module_loading import import_string
+        config['database_writer'] = import_string(config['database_writer'])
+        config.setdefault('enable_database', True)
+    
+    # Pending events are written with the old settings before switching
+    default_audit_logger.close()
+    default_audit_logger.config.update(config)
+    return default_audit_logger
+
+
+def configure_password_hasher(config: Optional[Dict[str, Any]] = None) -> PasswordHasher:
+    """
+    Apply the ``AUTH_PASSWORD_HASHING`` setting to the default password hasher.
+    
+    Keys are ``ROUNDS`` or ``TARGET_LATENCY`` (seconds per hash, tuned on
+    this host) and the ``HashingService`` options ``MAX_WORKERS``,
+    ``MAX_PENDING`` and ``TIMEOUT``, e.g.
+    ``{'TARGET_LATENCY': 0.25, 'MAX_PENDING': 32}``. Hashes made with
+    another cost are replaced on the next successful login.
+    """
+    if config is None:
+        hashing_settings = getattr(settings, 'AUTH_PASSWORD_HASHING', {})
+        config = {key.lower(): value for key, value in hashing_settings.items()}
+    
+    if config.get('target_latency') is not None:
+        from .security import tune_bcrypt_rounds
+        default_password_hasher.rounds = tune_bcrypt_rounds(config['target_latency'])
+    elif config.get('rounds') is not None:
+        default_password_hasher.rounds = config['rounds']
+    
+    if default_password_hasher.service is not None:
+        default_password_hasher.service.shutdown()
+    default_password_hasher.service = HashingService(
+        max_workers=config.get('max_workers'),
+        max_pending=config.get('max_pending'),
+        timeout=config.get('timeout', 5.0)
+    )
+    return default_password_hasher
+
+
 # Django management command helpers
 def create_default_roles():
     """Create default roles in the role registry."""
@@ -2,7 +2,6 @@
 Advanced password policies and account lockout mechanisms.
 """
 
-import re
 import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Set
@@ -10,6 +9,9 @@ from dataclasses import dataclass, field
 from enum import Enum
 import json
 
+from .breached_passwords import BreachedPasswordList, open_breached_password_list
+from .storage import InMemoryStateStore, StateStore
+
 
 class PasswordStrength(Enum):
     """Password strength levels."""
@@ -63,6 +65,7 @@ class PasswordPolicy:
     
     # Common password lists
     common_passwords_file: Optional[str] = None
+    breached_passwords_file: Optional[str] = None  # Compiled by BreachedPasswordList.build
     custom_blacklist: List[str] = field(default_factory=list)
     
     # Expiration
@@ -117,6 +120,31 @@ class AccountLockout:
         
         remaining = self.locked_until - datetime.utcnow()
         return remaining if remaining.total_seconds() > 0 else timedelta(0)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert lockout to dictionary."""
+        return {
+            "user_id": self.user_id,
+            "reason": self.reason.value,
+            "locked_at": self.locked_at.isoformat(),
+            "locked_until": self.locked_until.isoformat() if self.locked_until else None,
+            "attempt_count": self.attempt_count,
+            "ip_addresses": sorted(self.ip_addresses),
+            "metadata": self.metadata
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AccountLockout":
+        """Create lockout from dictionary."""
+        return cls(
+            user_id=data["user_id"],
+            reason=LockoutReason(data["reason"]),
+            locked_at=datetime.fromisoformat(data["locked_at"]),
+            locked_until=datetime.fromisoformat(data["locked_until"]) if data["locked_until"] else None,
+            attempt_count=data["attempt_count"],
+            ip_addresses=set(data["ip_addresses"]),
+            metadata=data["metadata"]
+        )
 
 
 @dataclass
@@ -130,18 +158,93 @@ class LoginAttempt:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Simple dictionary check (in production, use a proper dictionary)
+COMMON_WORDS = [
+    "password", "admin", "user", "login", "welcome", "hello",
+    "computer", "internet", "security", "system", "database"
+]
+
+# Pattern kinds reported by PatternMatcher.scan
+KEYBOARD_PATTERN = 1
+REVERSED_KEYBOARD_PATTERN = 2
+DICTIONARY_WORD = 4
+
+
+class PatternMatcher:
+    """
+    Aho-Corasick automaton finding many substrings in one pass.
+    
+    Each pattern carries a bit flag; ``scan`` returns the union of the
+    flags of every pattern occurring in the text.
+    """
+    
+    def __init__(self, patterns: Dict[str, int]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._flags: List[int] = [0]
+        for pattern, flag in patterns.items():
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._flags.append(0)
+                node = next_node
+            self._flags[node] |= flag
+        
+        # Breadth-first failure links; a node also reports its fallbacks' flags
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._flags[child] |= self._flags[self._fail[child]]
+                queue.append(child)
+    
+    def scan(self, text: str) -> int:
+        goto, fail, flags = self._goto, self._fail, self._flags
+        node = found = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found |= flags[node]
+        return found
+
+
 class PasswordValidator:
     """
     Advanced password validation with comprehensive policy enforcement.
     
     Provides password strength analysis, policy compliance checking,
-    and security recommendations.
+    and security recommendations. Character classes, runs and repeats are
+    gathered in one pass over the password, keyboard patterns and
+    dictionary words are found by one ``PatternMatcher`` scan, and a
+    compiled ``breached_passwords_file`` is searched through mmap rather
+    than loaded into memory.
     """
     
     def __init__(self, policy: PasswordPolicy = None):
         self.policy = policy or PasswordPolicy()
         self._common_passwords = self._load_common_passwords()
+        self._breached_passwords: Optional[BreachedPasswordList] = open_breached_password_list(
+            self.policy.breached_passwords_file
+        )
         self._keyboard_patterns = self._generate_keyboard_patterns()
+        patterns = {}
+        for pattern in self._keyboard_patterns:
+            patterns[pattern[::-1]] = patterns.get(pattern[::-1], 0) | REVERSED_KEYBOARD_PATTERN
+        for pattern in self._keyboard_patterns:
+            patterns[pattern] = patterns.get(pattern, 0) | KEYBOARD_PATTERN
+        for word in COMMON_WORDS:
+            patterns[word] = patterns.get(word, 0) | DICTIONARY_WORD
+        self._pattern_matcher = PatternMatcher(patterns)
+        self._special_chars = frozenset(self.policy.special_chars)
     
     def validate_password(self, 
                          password: str, 
@@ -179,11 +282,12 @@ class PasswordValidator:
         if len(password) > self.policy.max_length:
             errors.append(f"Password must not exceed {self.policy.max_length} characters")
         
-        # Character type validation
-        has_upper = bool(re.search(r'[A-Z]', password))
-        has_lower = bool(re.search(r'[a-z]', password))
-        has_digit = bool(re.search(r'\d', password))
-        has_special = bool(re.search(f'[{re.escape(self.policy.special_chars)}]', password))
+        # Character classes, runs and repeats in one pass
+        stats = self._scan(password)
+        has_upper, has_lower = stats["has_upper"], stats["has_lower"]
+        has_digit, has_special = stats["has_digit"], stats["has_special"]
+        password_lower = password.lower()
+        found_patterns = self._pattern_matcher.scan(password_lower)
         
         if self.policy.require_uppercase and not has_upper:
             errors.append("Password must contain at least one uppercase letter")
@@ -202,28 +306,18 @@ class PasswordValidator:
             suggestions.append("Add special characters (!@#$%^&*)")
         
         # Pattern validation
-        consecutive_errors = self._check_consecutive_chars(password)
-        if consecutive_errors:
-            errors.extend(consecutive_errors)
-        
-        repeated_errors = self._check_repeated_chars(password)
-        if repeated_errors:
-            errors.extend(repeated_errors)
+        errors.extend(self._check_consecutive_chars(stats["max_consecutive"]))
+        errors.extend(self._check_repeated_chars(stats["max_repeated"]))
         
         if self.policy.prevent_keyboard_patterns:
-            keyboard_errors = self._check_keyboard_patterns(password)
-            if keyboard_errors:
-                errors.extend(keyboard_errors)
+            errors.extend(self._check_keyboard_patterns(found_patterns))
         
         # Dictionary and common password checks
         if self.policy.prevent_dictionary_words:
-            dictionary_errors = self._check_dictionary_words(password)
-            if dictionary_errors:
-                errors.extend(dictionary_errors)
+            errors.extend(self._check_dictionary_words(found_patterns))
         
-        common_password_errors = self._check_common_passwords(password)
-        if common_password_errors:
-            errors.extend(common_password_errors)
+        is_common = self._is_common_password(password_lower)
+        errors.extend(self._check_common_passwords(password, is_common))
         
         # User information checks
         if self.policy.prevent_user_info and user_info:
@@ -238,13 +332,15 @@ class PasswordValidator:
                 errors.extend(reuse_errors)
         
         # Calculate complexity score
-        complexity_score = self._calculate_complexity_score(password)
+        complexity_score = self._calculate_complexity_score(password, stats)
         
         if complexity_score < self.policy.min_complexity_score:
             errors.append(f"Password complexity score ({complexity_score}) is below minimum ({self.policy.min_complexity_score})")
         
         # Determine strength
-        strength = self._determine_strength(password, complexity_score)
+        strength = self._determine_strength(
+            complexity_score, is_common or bool(found_patterns & KEYBOARD_PATTERN)
+        )
         
         # Generate suggestions for improvement
         if not suggestions and strength.value < 4:
@@ -291,74 +387,74 @@ class PasswordValidator:
             "age_days": age.days
         }
     
-    def _check_consecutive_chars(self, password: str) -> List[str]:
-        """Check for consecutive identical characters."""
-        errors = []
-        consecutive_count = 1
-        max_consecutive = 1
+    def _scan(self, password: str) -> Dict[str, Any]:
+        """Gather character classes, the longest run and the most repeated character."""
+        special_chars = self._special_chars
+        has_upper = has_lower = has_digit = has_special = False
+        counts: Dict[str, int] = {}
+        run = max_consecutive = 0
+        previous = None
         
-        for i in range(1, len(password)):
-            if password[i] == password[i-1]:
-                consecutive_count += 1
-                max_consecutive = max(max_consecutive, consecutive_count)
-            else:
-                consecutive_count = 1
+        for char in password:
+            if "a" <= char <= "z":
+                has_lower = True
+            elif "A" <= char <= "Z":
+                has_upper = True
+            elif char.isdecimal():
+                has_digit = True
+            if char in special_chars:
+                has_special = True
+            
+            counts[char] = counts.get(char, 0) + 1
+            run = run + 1 if char == previous else 1
+            if run > max_consecutive:
+                max_consecutive = run
+            previous = char
         
+        return {
+            "has_upper": has_upper,
+            "has_lower": has_lower,
+            "has_digit": has_digit,
+            "has_special": has_special,
+            "max_consecutive": max_consecutive,
+            "max_repeated": max(counts.values()) if counts else 0,
+            "unique_chars": len(counts)
+        }
+    
+    def _check_consecutive_chars(self, max_consecutive: int) -> List[str]:
+        """Check for consecutive identical characters."""
         if max_consecutive > self.policy.max_consecutive_chars:
-            errors.append(f"Password contains {max_consecutive} consecutive identical characters (max allowed: {self.policy.max_consecutive_chars})")
-        
-        return errors
+            return [f"Password contains {max_consecutive} consecutive identical characters (max allowed: {self.policy.max_consecutive_chars})"]
+        return []
     
-    def _check_repeated_chars(self, password: str) -> List[str]:
+    def _check_repeated_chars(self, max_repeated: int) -> List[str]:
         """Check for repeated characters throughout password."""
-        errors = []
-        char_counts = {}
-        
-        for char in password:
-            char_counts[char] = char_counts.get(char, 0) + 1
-        
-        max_repeated = max(char_counts.values()) if char_counts else 0
-        
         if max_repeated > self.policy.max_repeated_chars:
-            errors.append(f"Password contains characters repeated {max_repeated} times (max allowed: {self.policy.max_repeated_chars})")
-        
-        return errors
+            return [f"Password contains characters repeated {max_repeated} times (max allowed: {self.policy.max_repeated_chars})"]
+        return []
     
-    def _check_keyboard_patterns(self, password: str) -> List[str]:
-        """Check for keyboard patterns."""
-        errors = []
-        password_lower = password.lower()
-        
-        for pattern in self._keyboard_patterns:
-            if pattern in password_lower or pattern[::-1] in password_lower:
-                errors.append("Password contains keyboard patterns (e.g., qwerty, asdf)")
-                break
-        
-        return errors
+    def _check_keyboard_patterns(self, found_patterns: int) -> List[str]:
+        """Check for keyboard patterns, forwards or reversed."""
+        if found_patterns & (KEYBOARD_PATTERN | REVERSED_KEYBOARD_PATTERN):
+            return ["Password contains keyboard patterns (e.g., qwerty, asdf)"]
+        return []
     
-    def _check_dictionary_words(self, password: str) -> List[str]:
+    def _check_dictionary_words(self, found_patterns: int) -> List[str]:
         """Check for dictionary words."""
-        errors = []
-        password_lower = password.lower()
-        
-        # Simple dictionary check (in production, use a proper dictionary)
-        common_words = [
-            "password", "admin", "user", "login", "welcome", "hello",
-            "computer", "internet", "security", "system", "database"
-        ]
-        
-        for word in common_words:
-            if word in password_lower:
-                errors.append("Password contains common dictionary words")
-                break
-        
-        return errors
+        if found_patterns & DICTIONARY_WORD:
+            return ["Password contains common dictionary words"]
+        return []
     
-    def _check_common_passwords(self, password: str) -> List[str]:
+    def _is_common_password(self, password_lower: str) -> bool:
+        if password_lower in self._common_passwords:
+            return True
+        return self._breached_passwords is not None and password_lower in self._breached_passwords
+    
+    def _check_common_passwords(self, password: str, is_common: bool) -> List[str]:
         """Check against common password lists."""
         errors = []
         
-        if password.lower() in self._common_passwords:
+        if is_common:
             errors.append("Password is too common and easily guessable")
         
         if password in self.policy.custom_blacklist:
@@ -394,7 +490,7 @@ class PasswordValidator:
         
         return errors
     
-    def _calculate_complexity_score(self, password: str) -> int:
+    def _calculate_complexity_score(self, password: str, stats: Dict[str, Any]) -> int:
         """Calculate password complexity score."""
         score = 0
         
@@ -402,16 +498,16 @@ class PasswordValidator:
         score += min(len(password), 20)  # Cap at 20 for length
         
         # Character type bonuses
-        if re.search(r'[a-z]', password):
+        if stats["has_lower"]:
             score += self.policy.bonus_mixed_case
         
-        if re.search(r'[A-Z]', password):
+        if stats["has_upper"]:
             score += self.policy.bonus_mixed_case
         
-        if re.search(r'\d', password):
+        if stats["has_digit"]:
             score += self.policy.bonus_numbers
         
-        if re.search(f'[{re.escape(self.policy.special_chars)}]', password):
+        if stats["has_special"]:
             score += self.policy.bonus_special_chars
         
         # Length bonus
@@ -419,13 +515,12 @@ class PasswordValidator:
             score += 2
         
         # Diversity bonus
-        unique_chars = len(set(password))
-        if unique_chars >= len(password) * 0.7:  # 70% unique characters
+        if stats["unique_chars"] >= len(password) * 0.7:  # 70% unique characters
             score += 2
         
         return score
     
-    def _determine_strength(self, password: str, complexity_score: int) -> PasswordStrength:
+    def _determine_strength(self, complexity_score: int, has_common_pattern: bool) -> PasswordStrength:
         """Determine password strength based on various factors."""
         # Base strength from complexity score
         if complexity_score >= 20:
@@ -441,12 +536,8 @@ class PasswordValidator:
         else:
             base_strength = PasswordStrength.VERY_WEAK
         
-        # Adjust for common patterns
-        password_lower = password.lower()
-        
-        # Penalize common patterns
-        if (password_lower in self._common_passwords or
-            any(pattern in password_lower for pattern in self._keyboard_patterns)):
+        # Penalize common passwords and keyboard patterns
+        if has_common_pattern:
             base_strength = PasswordStrength(max(0, base_strength.value - 2))
         
         return base_strength
@@ -523,10 +614,13 @@ class AccountLockoutManager:
     Advanced account lockout management with progressive penalties.
     
     Provides brute force protection, suspicious activity detection,
-    and flexible lockout policies.
+    and flexible lockout policies. Per-user and per-IP failure windows
+    are time-bucketed sliding-window counters in a ``StateStore``, so
+    recording and checking an attempt is O(1) however many attempts were
+    made, and a Redis store shares lockouts between worker processes.
     """
     
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, store: Optional[StateStore] = None):
         default_config = {
             "max_failed_attempts": 5,
             "lockout_duration": 1800,  # 30 minutes
@@ -538,6 +632,7 @@ class AccountLockoutManager:
             "max_ip_attempts": 20,
             "ip_lockout_duration": 3600,  # 1 hour
             "suspicious_activity_threshold": 10,
+            "suspicious_activity_window": 3600,  # 1 hour
             "enable_captcha_after": 3
         }
         
@@ -545,9 +640,7 @@ class AccountLockoutManager:
             default_config.update(config)
         
         self.config = default_config
-        self._lockouts: Dict[str, AccountLockout] = {}
-        self._login_attempts: List[LoginAttempt] = []
-        self._ip_attempts: Dict[str, List[datetime]] = {}
+        self.store = store if store is not None else InMemoryStateStore()
     
     def record_login_attempt(self, 
                            user_id: str, 
@@ -568,20 +661,6 @@ class AccountLockoutManager:
         Returns:
             Dictionary with lockout status and recommendations
         """
-        attempt = LoginAttempt(
-            user_id=user_id,
-            ip_address=ip_address,
-            timestamp=datetime.utcnow(),
-            success=success,
-            user_agent=user_agent,
-            metadata=metadata or {}
-        )
-        
-        self._login_attempts.append(attempt)
-        
-        # Clean old attempts
-        self._cleanup_old_attempts()
-        
         result = {
             "locked": False,
             "lockout_reason": None,
@@ -591,17 +670,19 @@ class AccountLockoutManager:
             "suspicious_activity": False
         }
         
+        suspicious = self._detect_suspicious_activity(user_id, ip_address)
+        
         if success:
             # Successful login - reset counters
             self._reset_user_attempts(user_id)
             return result
         
-        # Failed login - check for lockout conditions
-        user_attempts = self._get_recent_failed_attempts(user_id)
-        ip_attempts = self._get_recent_ip_attempts(ip_address)
+        # Failed login - count it in the user and IP windows
+        window = self.config["reset_attempts_after"]
+        user_failures = self.store.incr_window(self._failures_key(user_id), window)
         
         # Check if user should be locked
-        if len(user_attempts) >= self.config["max_failed_attempts"]:
+        if user_failures >= self.config["max_failed_attempts"]:
             lockout_duration = self._calculate_lockout_duration(user_id)
             self._lock_account(user_id, LockoutReason.FAILED_ATTEMPTS, lockout_duration, ip_address)
             
@@ -611,31 +692,33 @@ class AccountLockoutManager:
                 "lockout_duration": lockout_duration
             })
         else:
-            remaining = self.config["max_failed_attempts"] - len(user_attempts)
+            remaining = self.config["max_failed_attempts"] - user_failures
             result["attempts_remaining"] = remaining
             
             # Check if captcha should be required
-            if len(user_attempts) >= self.config["enable_captcha_after"]:
+            if user_failures >= self.config["enable_captcha_after"]:
                 result["require_captcha"] = True
         
         # Check IP-based lockout
-        if self.config["track_ip_attempts"] and len(ip_attempts) >= self.config["max_ip_attempts"]:
-            result["suspicious_activity"] = True
+        if self.config["track_ip_attempts"]:
+            ip_failures = self.store.incr_window(f"lockout:failures:ip:{ip_address}", window)
+            if ip_failures >= self.config["max_ip_attempts"]:
+                result["suspicious_activity"] = True
         
         # Check for suspicious activity patterns
-        if self._detect_suspicious_activity(user_id, ip_address):
+        if suspicious:
             result["suspicious_activity"] = True
         
         return result
     
     def is_account_locked(self, user_id: str) -> bool:
         """Check if account is currently locked."""
-        lockout = self._lockouts.get(user_id)
+        lockout = self._get_lockout(user_id)
         return lockout is not None and lockout.is_locked
     
     def get_lockout_info(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get lockout information for user."""
-        lockout = self._lockouts.get(user_id)
+        lockout = self._get_lockout(user_id)
         
         if not lockout or not lockout.is_locked:
             return None
@@ -659,14 +742,7 @@ class AccountLockoutManager:
         Returns:
             True if account was unlocked
         """
-        if user_id in self._lockouts:
-            lockout = self._lockouts[user_id]
-            lockout.locked_until = datetime.utcnow()
-            lockout.metadata["unlocked_reason"] = reason
-            lockout.metadata["unlocked_at"] = datetime.utcnow().isoformat()
-            return True
-        
-        return False
+        return self.store.delete(self._lockout_key(user_id)) > 0
     
     def lock_account(self, 
                     user_id: str, 
@@ -689,7 +765,19 @@ class AccountLockoutManager:
     
     def get_failed_attempts_count(self, user_id: str) -> int:
         """Get number of recent failed attempts for user."""
-        return len(self._get_recent_failed_attempts(user_id))
+        return self.store.count_window(self._failures_key(user_id), self.config["reset_attempts_after"])
+    
+    @staticmethod
+    def _failures_key(user_id: str) -> str:
+        return f"lockout:failures:user:{user_id}"
+    
+    @staticmethod
+    def _lockout_key(user_id: str) -> str:
+        return f"lockout:user:{user_id}"
+    
+    def _get_lockout(self, user_id: str) -> Optional[AccountLockout]:
+        data = self.store.get(self._lockout_key(user_id))
+        return AccountLockout.from_dict(data) if data else None
     
     def _lock_account(self, 
                      user_id: str, 
@@ -707,14 +795,16 @@ class AccountLockoutManager:
             reason=reason,
             locked_at=datetime.utcnow(),
             locked_until=locked_until,
-            attempt_count=len(self._get_recent_failed_attempts(user_id)),
+            attempt_count=self.get_failed_attempts_count(user_id),
             metadata=metadata or {}
         )
         
         if ip_address:
             lockout.ip_addresses.add(ip_address)
         
-        self._lockouts[user_id] = lockout
+        # The record expires with the lockout; the failure window restarts after it
+        self.store.set(self._lockout_key(user_id), lockout.to_dict(), ttl=duration)
+        self.store.delete(self._failures_key(user_id))
         return True
     
     def _calculate_lockout_duration(self, user_id: str) -> int:
@@ -724,105 +814,42 @@ class AccountLockoutManager:
         if not self.config["progressive_lockout"]:
             return base_duration
         
-        # Check previous lockouts
-        previous_lockouts = 0
-        for attempt in self._login_attempts:
-            if (attempt.user_id == user_id and 
-                not attempt.success and 
-                attempt.timestamp > datetime.utcnow() - timedelta(days=1)):
-                previous_lockouts += 1
+        # Count lockouts in the last day
+        previous_lockouts = self.store.incr(f"lockout:count:{user_id}", ttl=86400) - 1
         
         # Progressive penalty
-        multiplier = self.config["lockout_multiplier"] ** (previous_lockouts // self.config["max_failed_attempts"])
+        multiplier = self.config["lockout_multiplier"] ** previous_lockouts
         duration = min(base_duration * multiplier, self.config["max_lockout_duration"])
         
         return int(duration)
     
-    def _get_recent_failed_attempts(self, user_id: str) -> List[LoginAttempt]:
-        """Get recent failed login attempts for user."""
-        cutoff_time = datetime.utcnow() - timedelta(seconds=self.config["reset_attempts_after"])
-        
-        return [
-            attempt for attempt in self._login_attempts
-            if (attempt.user_id == user_id and 
-                not attempt.success and 
-                attempt.timestamp > cutoff_time)
-        ]
-    
-    def _get_recent_ip_attempts(self, ip_address: str) -> List[LoginAttempt]:
-        """Get recent login attempts from IP address."""
-        cutoff_time = datetime.utcnow() - timedelta(seconds=self.config["reset_attempts_after"])
-        
-        return [
-            attempt for attempt in self._login_attempts
-            if (attempt.ip_address == ip_address and 
-                not attempt.success and 
-                attempt.timestamp > cutoff_time)
-        ]
-    
     def _reset_user_attempts(self, user_id: str):
-        """Reset failed attempt counters for user."""
-        # Remove recent failed attempts
-        cutoff_time = datetime.utcnow() - timedelta(seconds=self.config["reset_attempts_after"])
-        self._login_attempts = [
-            attempt for attempt in self._login_attempts
-            if not (attempt.user_id == user_id and 
-                   not attempt.success and 
-                   attempt.timestamp > cutoff_time)
-        ]
-        
-        # Remove lockout if exists
-        if user_id in self._lockouts:
-            del self._lockouts[user_id]
+        """Reset failed attempt counters and any lockout for user."""
+        self.store.delete(self._failures_key(user_id), self._lockout_key(user_id))
     
     def _detect_suspicious_activity(self, user_id: str, ip_address: str) -> bool:
-        """Detect suspicious activity patterns."""
-        recent_time = datetime.utcnow() - timedelta(hours=1)
-        
-        # Check for rapid attempts from multiple IPs
-        user_attempts = [
-            attempt for attempt in self._login_attempts
-            if (attempt.user_id == user_id and 
-                attempt.timestamp > recent_time)
-        ]
+        """Detect suspicious activity patterns.
         
-        unique_ips = set(attempt.ip_address for attempt in user_attempts)
+        Distinct IPs per user and users per IP are counted in sets that
+        cover a fixed window from their first member and stop growing one
+        past their threshold, so a long attack cannot keep them alive or
+        make them large.
+        """
+        window = self.config["suspicious_activity_window"]
         
         # Suspicious if attempts from many different IPs
-        if len(unique_ips) > 5:
+        max_ips = 5
+        unique_ips = self.store.add_capped(f"lockout:ips:{user_id}", ip_address, max_ips + 1, ttl=window)
+        if unique_ips > max_ips:
             return True
         
-        # Check for distributed attacks
-        ip_attempts = [
-            attempt for attempt in self._login_attempts
-            if (attempt.ip_address == ip_address and 
-                attempt.timestamp > recent_time)
-        ]
-        
-        unique_users = set(attempt.user_id for attempt in ip_attempts)
-        
-        # Suspicious if many different users from same IP
-        if len(unique_users) > 10:
+        # Suspicious if many different users from same IP (distributed attacks)
+        max_users = self.config["suspicious_activity_threshold"]
+        unique_users = self.store.add_capped(f"lockout:users:{ip_address}", user_id, max_users + 1, ttl=window)
+        if unique_users > max_users:
             return True
         
         return False
-    
-    def _cleanup_old_attempts(self):
-        """Remove old login attempts to prevent memory bloat."""
-        cutoff_time = datetime.utcnow() - timedelta(days=7)
-        self._login_attempts = [
-            attempt for attempt in self._login_attempts
-            if attempt.timestamp > cutoff_time
-        ]
-        
-        # Clean up expired lockouts
-        expired_lockouts = []
-        for user_id, lockout in self._lockouts.items():
-            if not lockout.is_locked:
-                expired_lockouts.append(user_id)
-        
-        for user_id in expired_lockouts:
-            del self._lockouts[user_id]
 
 
 # Global instances
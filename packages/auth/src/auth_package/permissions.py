@@ -1,10 +1,15 @@
 """
 Role-based access control (RBAC) system with permissions and roles.
+
+Permission checks run against ``CompiledPermissions``: the flattened
+permissions of a set of roles turned into a resource → action bitmask
+table. Tables are built once per role set and thrown away whenever the
+role registry changes.
 """
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, List, Set, Any, Optional, Union
+from typing import Callable, Dict, FrozenSet, Iterable, List, Set, Any, Optional, Tuple, Union
 from enum import Enum
 import json
 
@@ -19,6 +24,11 @@ class PermissionAction(Enum):
     MANAGE = "manage"
 
 
+# One bit per action; MANAGE grants every action
+ACTION_BITS = {action: 1 << index for index, action in enumerate(PermissionAction)}
+ALL_ACTIONS = sum(ACTION_BITS.values())
+
+
 class PermissionScope(Enum):
     """Permission scopes."""
     GLOBAL = "global"
@@ -128,14 +138,22 @@ class Role:
     description: str = ""
     is_system_role: bool = False
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Set by the registry holding the role so compiled permissions are rebuilt
+    on_change: Optional[Callable[[], None]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
     
     def add_permission(self, permission: Permission):
         """Add permission to role."""
         self.permissions.add(permission)
+        self._changed()
     
     def remove_permission(self, permission: Permission):
         """Remove permission from role."""
         self.permissions.discard(permission)
+        self._changed()
     
     def has_permission(self, permission: Permission) -> bool:
         """Check if role has specific permission."""
@@ -144,10 +162,12 @@ class Role:
     def add_parent_role(self, role_name: str):
         """Add parent role for inheritance."""
         self.parent_roles.add(role_name)
+        self._changed()
     
     def remove_parent_role(self, role_name: str):
         """Remove parent role."""
         self.parent_roles.discard(role_name)
+        self._changed()
     
     def get_all_permissions(self, role_registry: 'RoleRegistry' = None) -> Set[Permission]:
         """
@@ -215,21 +235,105 @@ class Role:
         )
 
 
+class CompiledPermissions:
+    """
+    Flattened permissions of a set of roles as resource → action bitmasks.
+    
+    ``exact`` holds what is granted unconditionally and ``loose`` also
+    what conditional permissions grant, since a condition only applies
+    when there is context to evaluate it against. Resource ``"*"`` is the
+    wildcard row. Checks without context are two dict lookups and a mask
+    test; with context, only the conditional permissions for the resource
+    are evaluated.
+    """
+    
+    def __init__(self, permissions: Iterable[Permission]):
+        self.exact: Dict[str, int] = {}
+        self.loose: Dict[str, int] = {}
+        self.conditional: Dict[str, List[Tuple[int, Permission]]] = {}
+        for permission in permissions:
+            mask = ALL_ACTIONS if permission.action == PermissionAction.MANAGE else ACTION_BITS[permission.action]
+            resource = permission.resource
+            self.loose[resource] = self.loose.get(resource, 0) | mask
+            if permission.conditions:
+                self.conditional.setdefault(resource, []).append((mask, permission))
+            else:
+                self.exact[resource] = self.exact.get(resource, 0) | mask
+    
+    def allows(self, resource: str, action: PermissionAction, context: Dict[str, Any] = None) -> bool:
+        """Check the table the way ``Permission.matches`` checks each permission."""
+        bit = ACTION_BITS[action]
+        if not context:
+            return bool((self.loose.get(resource, 0) | self.loose.get("*", 0)) & bit)
+        if (self.exact.get(resource, 0) | self.exact.get("*", 0)) & bit:
+            return True
+        for key in (resource, "*"):
+            for mask, permission in self.conditional.get(key, ()):
+                if mask & bit and permission._evaluate_conditions(context):
+                    return True
+        return False
+
+
 class RoleRegistry:
     """
     Registry for managing roles and permissions.
     
     Provides centralized role management with inheritance support.
+    ``version`` increases on every change made through the registry or a
+    registered role's methods, which drops every cached flattening and
+    compiled permission table. Call ``invalidate`` after changing a
+    role's ``permissions`` or ``parent_roles`` sets directly.
     """
     
+    MAX_COMPILED = 4096  # Distinct role sets kept compiled
+    
     def __init__(self):
         self.roles: Dict[str, Role] = {}
         self.permissions: Dict[str, Permission] = {}
+        self.version = 0
+        self._flattened: Dict[str, FrozenSet[Permission]] = {}
+        self._compiled: Dict[FrozenSet[str], CompiledPermissions] = {}
         self._setup_default_roles()
     
+    def invalidate(self):
+        """Forget flattened roles and compiled tables after a change."""
+        self.version += 1
+        self._flattened = {}
+        self._compiled = {}
+    
+    def compile(self, role_names: Iterable[str]) -> CompiledPermissions:
+        """Return the compiled permission table for a set of roles."""
+        key = frozenset(role_names)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            permissions = set()
+            for role_name in key:
+                permissions |= self._flatten(role_name)
+            if len(self._compiled) >= self.MAX_COMPILED:
+                self._compiled = {}
+            compiled = self._compiled[key] = CompiledPermissions(permissions)
+        return compiled
+    
+    def _flatten(self, role_name: str) -> FrozenSet[Permission]:
+        """A role's own and inherited permissions, resolved once per version."""
+        flattened = self._flattened.get(role_name)
+        if flattened is None:
+            permissions, seen, pending = set(), set(), [role_name]
+            while pending:
+                name = pending.pop()
+                role = self.roles.get(name)
+                if name in seen or role is None:
+                    continue
+                seen.add(name)
+                permissions |= role.permissions
+                pending.extend(role.parent_roles)
+            flattened = self._flattened[role_name] = frozenset(permissions)
+        return flattened
+    
     def register_permission(self, permission: Permission):
         """Register a permission."""
         self.permissions[permission.name] = permission
+        self.invalidate()
     
     def get_permission(self, name: str) -> Optional[Permission]:
         """Get permission by name."""
@@ -238,6 +342,8 @@ class RoleRegistry:
     def register_role(self, role: Role):
         """Register a role."""
         self.roles[role.name] = role
+        role.on_change = self.invalidate
+        self.invalidate()
     
     def get_role(self, name: str) -> Optional[Role]:
         """Get role by name."""
@@ -280,6 +386,8 @@ class RoleRegistry:
                 raise ValueError(f"Cannot delete system role: {name}")
             
             del self.roles[name]
+            role.on_change = None
+            self.invalidate()
             return True
         
         return False
@@ -302,10 +410,7 @@ class RoleRegistry:
     
     def get_role_permissions(self, role_name: str) -> Set[Permission]:
         """Get all permissions for a role including inherited ones."""
-        role = self.get_role(role_name)
-        if role:
-            return role.get_all_permissions(self)
-        return set()
+        return set(self._flatten(role_name))
     
     def _setup_default_roles(self):
         """Setup default system roles."""
@@ -371,10 +476,16 @@ class RoleBasedPermission:
     Role-based permission checker.
     
     Provides permission checking functionality for users with roles.
+    Checks use the registry's compiled tables, and decisions that need no
+    context are cached per process until the registry changes.
     """
     
+    MAX_DECISIONS = 100000  # Context-free decisions kept per process
+    
     def __init__(self, role_registry: RoleRegistry = None):
         self.role_registry = role_registry or RoleRegistry()
+        self._decisions: Dict[Tuple[FrozenSet[str], str, PermissionAction], bool] = {}
+        self._decisions_version = -1
     
     def check_permission(self, 
                         user_roles: List[str], 
@@ -393,14 +504,21 @@ class RoleBasedPermission:
         Returns:
             True if user has permission
         """
-        for role_name in user_roles:
-            role_permissions = self.role_registry.get_role_permissions(role_name)
-            
-            for permission in role_permissions:
-                if permission.matches(resource, action, context):
-                    return True
-        
-        return False
+        roles = frozenset(user_roles)
+        if context:
+            return self.role_registry.compile(roles).allows(resource, action, context)
+        
+        # Decisions without context only change with the registry
+        if self._decisions_version != self.role_registry.version:
+            self._decisions = {}
+            self._decisions_version = self.role_registry.version
+        key = (roles, resource, action)
+        decision = self._decisions.get(key)
+        if decision is None:
+            if len(self._decisions) >= self.MAX_DECISIONS:
+                self._decisions = {}
+            decision = self._decisions[key] = self.role_registry.compile(roles).allows(resource, action)
+        return decision
     
     def get_user_permissions(self, user_roles: List[str]) -> Set[Permission]:
         """
@@ -5,8 +5,15 @@ Security utilities for password hashing and token management.
 import secrets
 import hashlib
 import hmac
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 
 import bcrypt
@@ -31,25 +38,209 @@ class PasswordPolicy:
     prevent_user_info: bool = True
 
 
+class HashingOverloaded(Exception):
+    """Raised instead of queueing a hash when the hashing service is saturated."""
+    
+    def __init__(self, retry_after: int = 1):
+        super().__init__(f"Password hashing is overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class HashingUnavailable(HashingOverloaded):
+    """Raised when the hashing workers keep dying, so a hash can't be computed."""
+    
+    def __init__(self, retry_after: int = 1):
+        Exception.__init__(self, f"Password hashing is unavailable, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _bcrypt_hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _bcrypt_check(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def tune_bcrypt_rounds(target_latency: float = 0.25, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    """
+    Pick the highest bcrypt cost that hashes within ``target_latency`` here.
+    
+    Each extra round doubles the work, so one cheap measurement at cost 6
+    is scaled up rather than timing expensive hashes.
+    
+    Args:
+        target_latency: Seconds one hash may take on this host
+        min_rounds: Lowest cost returned, however slow the host
+        max_rounds: Highest cost returned, however fast the host
+        
+    Returns:
+        bcrypt rounds
+    """
+    probe_rounds = 6
+    elapsed = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        _bcrypt_hash(b"tune-bcrypt-rounds", probe_rounds)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    
+    rounds = probe_rounds + int(math.floor(math.log2(target_latency / max(elapsed, 1e-6))))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+class HashingService:
+    """
+    Runs bcrypt in a bounded process pool with admission control.
+    
+    At most ``max_pending`` hashes are queued or running; beyond that,
+    callers get ``HashingOverloaded`` straight away (an HTTP 429) instead
+    of stalling a request thread behind a burst of logins. With
+    ``max_workers=0`` hashes run inline on the calling thread, still
+    subject to ``max_pending``.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 timeout: float = 5.0):
+        """
+        Initialize hashing service.
+        
+        Args:
+            max_workers: Worker processes (default: one per CPU)
+            max_pending: Hashes queued or running before new ones are refused
+                (default: four per worker)
+            timeout: Seconds to wait for a queued hash before giving up
+        """
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_pending = max(self.max_workers, 1) * 4 if max_pending is None else max_pending
+        self.timeout = timeout
+        self.stats = {"completed": 0, "rejected": 0, "timeouts": 0}
+        self._pending = 0
+        self._latency = 0.25  # Moving average of seconds per hash
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+    
+    @property
+    def pending(self) -> int:
+        return self._pending
+    
+    def hash_password(self, password: bytes, rounds: int) -> bytes:
+        return self._run(_bcrypt_hash, password, rounds)
+    
+    def verify_password(self, password: bytes, hashed: bytes) -> bool:
+        return self._run(_bcrypt_check, password, hashed)
+    
+    def shutdown(self):
+        """Stop the worker processes; they are restarted on the next hash."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _run(self, function, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise HashingOverloaded(self._retry_after())
+            self._pending += 1
+            executor = self._pool() if self.max_workers > 0 else None
+        
+        start = time.perf_counter()
+        if executor is None:
+            try:
+                result = function(*args)
+            finally:
+                self._release()
+        else:
+            try:
+                result = self._submit(executor, function, args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM killed), which breaks the whole
+                # pool for good: start a new one and try once more
+                with self._lock:
+                    self._pending += 1
+                    executor = self._pool(replace=executor)
+                try:
+                    result = self._submit(executor, function, args)
+                except BrokenProcessPool as e:
+                    with self._lock:
+                        if self._executor is executor:
+                            self._executor = None
+                    raise HashingUnavailable(self._retry_after()) from e
+        
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats["completed"] += 1
+            self._latency += (elapsed - self._latency) * 0.1
+        return result
+    
+    def _submit(self, executor: ProcessPoolExecutor, function, args):
+        try:
+            future = executor.submit(function, *args)
+        except BaseException:
+            self._release()
+            raise
+        # A running hash can't be cancelled, so its slot is freed when
+        # the worker finishes rather than when the caller stops waiting
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise HashingOverloaded(self._retry_after())
+    
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+    
+    def _pool(self, replace: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+        # Workers are spawned rather than forked, so they do not inherit
+        # the threads and locks of a web worker; a forked web worker
+        # starts its own pool, as does one whose pool broke (``replace``)
+        if replace is not None and self._executor is replace:
+            replace.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self._pid = os.getpid()
+        return self._executor
+    
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        return max(1, math.ceil(self._pending / max(self.max_workers, 1) * self._latency))
+
+
 class PasswordHasher:
     """
     Secure password hashing using bcrypt with configurable rounds.
     
     Provides password hashing, verification, and strength validation
-    with enterprise-grade security standards.
+    with enterprise-grade security standards. Given a ``HashingService``,
+    bcrypt runs in its worker processes instead of the calling thread.
     """
     
-    def __init__(self, rounds: int = 12):
+    def __init__(self, rounds: int = 12, service: Optional[HashingService] = None,
+                 target_latency: Optional[float] = None):
         """
         Initialize password hasher.
         
         Args:
             rounds: bcrypt rounds (4-31, default 12)
+            service: Hashing service to run bcrypt in (default: inline)
+            target_latency: Tune rounds to hash in this many seconds on
+                this host instead of using ``rounds``
         """
+        if target_latency is not None:
+            rounds = tune_bcrypt_rounds(target_latency)
         if not 4 <= rounds <= 31:
             raise ValueError("bcrypt rounds must be between 4 and 31")
         
         self.rounds = rounds
+        self.service = service
         self.policy = PasswordPolicy()
     
     def hash_password(self, password: str) -> str:
@@ -69,8 +260,10 @@ class PasswordHasher:
         password_bytes = password.encode('utf-8')
         
         # Generate salt and hash
-        salt = bcrypt.gensalt(rounds=self.rounds)
-        hashed = bcrypt.hashpw(password_bytes, salt)
+        if self.service is not None:
+            hashed = self.service.hash_password(password_bytes, self.rounds)
+        else:
+            hashed = _bcrypt_hash(password_bytes, self.rounds)
         
         return hashed.decode('utf-8')
     
@@ -84,6 +277,11 @@ class PasswordHasher:
             
         Returns:
             True if password matches hash
+            
+        Raises:
+            HashingOverloaded: If the hashing service refused the check
+            HashingUnavailable: If the hashing workers failed, so the
+                password could not be checked
         """
         if not isinstance(password, str) or not isinstance(hashed_password, str):
             return False
@@ -92,9 +290,49 @@ class PasswordHasher:
             password_bytes = password.encode('utf-8')
             hashed_bytes = hashed_password.encode('utf-8')
             
-            return bcrypt.checkpw(password_bytes, hashed_bytes)
-        except Exception:
+            if self.service is not None:
+                return self.service.verify_password(password_bytes, hashed_bytes)
+            return _bcrypt_check(password_bytes, hashed_bytes)
+        except (ValueError, TypeError):
+            # Malformed hash (or a password bcrypt can't take): no match.
+            # Service failures propagate rather than read as a wrong password
+            return False
+    
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Check whether a hash was made with a different cost than the current one.
+        
+        Args:
+            hashed_password: bcrypt hash, e.g. ``$2b$12$...``
+            
+        Returns:
+            True if the hash should be replaced on the next successful login
+        """
+        parts = hashed_password.split('$') if isinstance(hashed_password, str) else []
+        if len(parts) < 4 or not parts[2].isdigit():
             return False
+        return int(parts[2]) != self.rounds
+    
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify password and rehash it if the cost has changed since it was hashed.
+        
+        Args:
+            password: Plain text password
+            hashed_password: Hashed password to verify against
+            
+        Returns:
+            Tuple of (password matches, new hash to store or None)
+            
+        Raises:
+            HashingOverloaded: If the hashing service refused the check
+            HashingUnavailable: If the hashing workers failed
+        """
+        if not self.verify_password(password, hashed_password):
+            return False, None
+        if self.needs_rehash(hashed_password):
+            return True, self.hash_password(password)
+        return True, None
     
     def validate_password_strength(self, password: str, user_info: Dict[str, str] = None) -> Dict[str, Any]:
         """
@@ -432,4 +670,8 @@ class TokenManager:
     
     def constant_time_compare(self, a: str, b: str) -> bool:
         """Constant-time string comparison to prevent timing attacks."""
-        return hmac.compare_digest(a.encode('utf-8'), b.encode('utf-8'))
\ No newline at end of file
+        return hmac.compare_digest(a.encode('utf-8'), b.encode('utf-8'))
+
+
+# Global password hasher instance
+default_password_hasher = PasswordHasher()
@@ -2,14 +2,17 @@
 Advanced session management with concurrent login handling and security features.
 """
 
+import heapq
 import secrets
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Set
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import hashlib
 
+from .storage import InMemoryStateStore, StateStore
+
 
 class SessionStatus(Enum):
     """Session status enumeration."""
@@ -37,6 +40,20 @@ class DeviceInfo:
         return hashlib.sha256(data.encode()).hexdigest()[:16]
 
 
+# Security events that raise a session's risk score
+SUSPICIOUS_EVENT_TYPES = frozenset({"failed_mfa", "suspicious_activity", "location_change"})
+
+# Most recent security events kept on a session
+MAX_SECURITY_EVENTS = 50
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(moment: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime."""
+    return (moment - _EPOCH).total_seconds()
+
+
 @dataclass
 class Session:
     """User session with security tracking."""
@@ -52,10 +69,14 @@ class Session:
     login_method: str = "password"  # password, mfa, oauth2, etc.
     risk_score: float = 0.0  # 0.0 = low risk, 1.0 = high risk
     security_events: List[Dict[str, Any]] = field(default_factory=list)
+    suspicious_event_count: int = 0  # Kept as events are added, including dropped ones
     
     # Session metadata
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # (status, suspicious) as last written to the manager's indexes
+    _indexed: Optional[Tuple[SessionStatus, bool]] = field(default=None, init=False, repr=False, compare=False)
+    
     @property
     def is_active(self) -> bool:
         """Check if session is active."""
@@ -77,13 +98,17 @@ class Session:
         self.last_activity = datetime.utcnow()
     
     def add_security_event(self, event_type: str, details: Dict[str, Any]):
-        """Add security event to session."""
+        """Add security event to session, keeping the most recent MAX_SECURITY_EVENTS."""
         event = {
             "type": event_type,
             "timestamp": datetime.utcnow().isoformat(),
             "details": details
         }
         self.security_events.append(event)
+        if len(self.security_events) > MAX_SECURITY_EVENTS:
+            del self.security_events[:-MAX_SECURITY_EVENTS]
+        if event_type in SUSPICIOUS_EVENT_TYPES:
+            self.suspicious_event_count += 1
     
     def calculate_risk_score(self) -> float:
         """Calculate session risk score based on various factors."""
@@ -103,12 +128,8 @@ class Session:
             risk_factors.append(0.1)
         
         # Security events risk
-        suspicious_events = [
-            event for event in self.security_events
-            if event["type"] in ["failed_mfa", "suspicious_activity", "location_change"]
-        ]
-        if suspicious_events:
-            risk_factors.append(min(0.3, len(suspicious_events) * 0.1))
+        if self.suspicious_event_count:
+            risk_factors.append(min(0.3, self.suspicious_event_count * 0.1))
         
         # Calculate final risk score
         self.risk_score = min(1.0, sum(risk_factors))
@@ -136,8 +157,33 @@ class Session:
             "login_method": self.login_method,
             "risk_score": self.risk_score,
             "security_events": self.security_events,
+            "suspicious_event_count": self.suspicious_event_count,
             "metadata": self.metadata
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Session":
+        """Create session from dictionary."""
+        suspicious_event_count = data.get("suspicious_event_count")
+        if suspicious_event_count is None:
+            # Stored before the count was kept
+            suspicious_event_count = sum(
+                event["type"] in SUSPICIOUS_EVENT_TYPES for event in data["security_events"]
+            )
+        return cls(
+            session_id=data["session_id"],
+            user_id=data["user_id"],
+            device_info=DeviceInfo(**data["device_info"]),
+            status=SessionStatus(data["status"]),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            last_activity=datetime.fromisoformat(data["last_activity"]),
+            expires_at=datetime.fromisoformat(data["expires_at"]) if data["expires_at"] else None,
+            login_method=data["login_method"],
+            risk_score=data["risk_score"],
+            security_events=data["security_events"],
+            suspicious_event_count=suspicious_event_count,
+            metadata=data["metadata"]
+        )
 
 
 class SessionManager:
@@ -145,10 +191,20 @@ class SessionManager:
     Advanced session management with concurrent login handling.
     
     Provides session creation, validation, and security monitoring
-    with support for concurrent sessions and device tracking.
+    with support for concurrent sessions and device tracking. Sessions
+    and their user/device indexes live in a ``StateStore`` and expire
+    with the session, so a Redis store shares them between processes.
+    
+    Two more indexes spare full scans: a sorted set of session ids
+    scored by when each session stops being active, so cleanup pops the
+    due ones off its low end, and a set of suspicious sessions. Both are
+    written only when a session's status or flag changes.
     """
     
-    def __init__(self, config: Dict[str, Any] = None):
+    EXPIRY_INDEX = "session:expiry"
+    SUSPICIOUS_INDEX = "session:suspicious"
+    
+    def __init__(self, config: Dict[str, Any] = None, store: Optional[StateStore] = None):
         default_config = {
             "max_concurrent_sessions": 5,
             "session_timeout": 3600,  # 1 hour
@@ -165,9 +221,7 @@ class SessionManager:
             default_config.update(config)
         
         self.config = default_config
-        self._sessions: Dict[str, Session] = {}
-        self._user_sessions: Dict[str, Set[str]] = {}  # user_id -> session_ids
-        self._device_sessions: Dict[str, Set[str]] = {}  # device_id -> session_ids
+        self.store = store if store is not None else InMemoryStateStore()
     
     def create_session(self, 
                       user_id: str, 
@@ -210,32 +264,25 @@ class SessionManager:
         # Check concurrent session limits
         self._enforce_concurrent_session_limits(user_id)
         
-        # Store session
-        self._sessions[session_id] = session
-        
-        # Update user sessions index
-        if user_id not in self._user_sessions:
-            self._user_sessions[user_id] = set()
-        self._user_sessions[user_id].add(session_id)
-        
-        # Update device sessions index
-        device_id = device_info.device_id
-        if device_id not in self._device_sessions:
-            self._device_sessions[device_id] = set()
-        self._device_sessions[device_id].add(session_id)
-        
         # Calculate initial risk score
         session.calculate_risk_score()
         
+        # Store session and update the user and device indexes
+        self._save_session(session)
+        index_ttl = max(self.config["remember_me_duration"], self.config["session_timeout"])
+        self.store.add(f"session:user:{user_id}", session_id, ttl=index_ttl)
+        self.store.add(f"session:device:{device_info.device_id}", session_id, ttl=index_ttl)
+        
         return session
     
     def get_session(self, session_id: str) -> Optional[Session]:
         """Get session by ID."""
-        session = self._sessions.get(session_id)
+        session = self._load_session(session_id)
         
         if session and session.is_active:
             # Update activity and check for suspicious behavior
             self._update_session_activity(session)
+            self._save_session(session)
             return session
         
         return None
@@ -264,6 +311,7 @@ class SessionManager:
                     "actual_device": device_info.device_id
                 })
                 session.status = SessionStatus.SUSPICIOUS
+                self._save_session(session)
                 return False
         
         # Check session timeout
@@ -285,6 +333,7 @@ class SessionManager:
                 "risk_score": session.risk_score,
                 "threshold": self.config["risk_threshold"]
             })
+            self._save_session(session)
             return False
         
         return True
@@ -297,11 +346,12 @@ class SessionManager:
             session_id: Session to revoke
             reason: Reason for revocation
         """
-        session = self._sessions.get(session_id)
+        session = self._load_session(session_id)
         
         if session:
             session.status = SessionStatus.REVOKED
             session.add_security_event("session_revoked", {"reason": reason})
+            self._save_session(session)
             
             # Remove from indexes
             self._remove_session_from_indexes(session)
@@ -317,7 +367,7 @@ class SessionManager:
         Returns:
             Number of sessions revoked
         """
-        user_session_ids = self._user_sessions.get(user_id, set()).copy()
+        user_session_ids = self.store.members(f"session:user:{user_id}")
         revoked_count = 0
         
         for session_id in user_session_ids:
@@ -338,7 +388,7 @@ class SessionManager:
         Returns:
             Number of sessions revoked
         """
-        device_session_ids = self._device_sessions.get(device_id, set()).copy()
+        device_session_ids = self.store.members(f"session:device:{device_id}")
         revoked_count = 0
         
         for session_id in device_session_ids:
@@ -350,12 +400,14 @@ class SessionManager:
     
     def get_user_sessions(self, user_id: str) -> List[Session]:
         """Get all active sessions for a user."""
-        session_ids = self._user_sessions.get(user_id, set())
+        index_key = f"session:user:{user_id}"
         sessions = []
         
-        for session_id in session_ids:
-            session = self._sessions.get(session_id)
-            if session and session.is_active:
+        for session_id, session in self._load_sessions(self.store.members(index_key)).items():
+            if session is None:
+                # Expired from the store; drop the stale index entry
+                self.store.discard(index_key, session_id)
+            elif session.is_active:
                 sessions.append(session)
         
         return sessions
@@ -364,41 +416,97 @@ class SessionManager:
         """Get all sessions flagged as suspicious."""
         suspicious_sessions = []
         
-        for session in self._sessions.values():
-            if (session.status == SessionStatus.SUSPICIOUS or 
-                session.risk_score > self.config["risk_threshold"]):
+        for session_id, session in self._load_sessions(self.store.members(self.SUSPICIOUS_INDEX)).items():
+            if session is None:
+                self.store.discard(self.SUSPICIOUS_INDEX, session_id)
+            elif self._is_suspicious(session):
                 suspicious_sessions.append(session)
         
         return suspicious_sessions
     
-    def cleanup_expired_sessions(self) -> int:
-        """Remove expired sessions and return count."""
-        current_time = datetime.utcnow()
-        expired_sessions = []
-        
-        for session_id, session in self._sessions.items():
-            if not session.is_active:
-                expired_sessions.append(session_id)
-        
-        for session_id in expired_sessions:
-            session = self._sessions[session_id]
-            self._remove_session_from_indexes(session)
-            del self._sessions[session_id]
+    def cleanup_expired_sessions(self, batch_size: int = 1000) -> int:
+        """
+        Remove expired and ended sessions and return count.
         
-        return len(expired_sessions)
+        Only sessions whose expiry-index score has passed are touched,
+        ``batch_size`` at a time, however many sessions are live.
+        """
+        expired_sessions = 0
+        now = _epoch(datetime.utcnow())
+        
+        while True:
+            session_ids = self.store.zpop_by_score(self.EXPIRY_INDEX, now, batch_size)
+            if not session_ids:
+                return expired_sessions
+            for session_id, session in self._load_sessions(session_ids).items():
+                if session is not None:
+                    self._remove_session_from_indexes(session)
+                self.store.discard(self.SUSPICIOUS_INDEX, session_id)
+            self.store.delete(*[f"session:{session_id}" for session_id in session_ids])
+            expired_sessions += len(session_ids)
+    
+    def _load_session(self, session_id: str) -> Optional[Session]:
+        data = self.store.get(f"session:{session_id}")
+        if not data:
+            return None
+        session = Session.from_dict(data)
+        session._indexed = (session.status, self._is_suspicious(session))
+        return session
+    
+    def _load_sessions(self, session_ids) -> Dict[str, Optional[Session]]:
+        """Load sessions with one store round trip; missing ones map to None."""
+        session_ids = list(session_ids)
+        stored = self.store.get_many(f"session:{session_id}" for session_id in session_ids)
+        sessions = {}
+        for session_id in session_ids:
+            data = stored.get(f"session:{session_id}")
+            sessions[session_id] = session = Session.from_dict(data) if data else None
+            if session is not None:
+                session._indexed = (session.status, self._is_suspicious(session))
+        return sessions
+    
+    def _save_session(self, session: Session):
+        """Store session until it expires and bring the indexes up to date."""
+        ttl = None
+        if session.expires_at:
+            ttl = max(int((session.expires_at - datetime.utcnow()).total_seconds()) + 1, 1)
+        self.store.set(f"session:{session.session_id}", session.to_dict(), ttl=ttl)
+        
+        indexed_status, indexed_suspicious = session._indexed or (None, False)
+        if session.status != indexed_status:
+            # An ended session is due for cleanup straight away
+            if session.status != SessionStatus.ACTIVE:
+                due = _epoch(datetime.utcnow())
+            elif session.expires_at:
+                due = _epoch(session.expires_at)
+            else:
+                due = float("inf")
+            self.store.zadd(self.EXPIRY_INDEX, session.session_id, due)
+        suspicious = self._is_suspicious(session)
+        if suspicious and not indexed_suspicious:
+            self.store.add(self.SUSPICIOUS_INDEX, session.session_id)
+        elif indexed_suspicious and not suspicious:
+            self.store.discard(self.SUSPICIOUS_INDEX, session.session_id)
+        session._indexed = (session.status, suspicious)
+    
+    def _is_suspicious(self, session: Session) -> bool:
+        return (session.status == SessionStatus.SUSPICIOUS or
+                session.risk_score > self.config["risk_threshold"])
     
     def _enforce_concurrent_session_limits(self, user_id: str):
         """Enforce concurrent session limits for user."""
-        user_sessions = self.get_user_sessions(user_id)
         max_sessions = self.config["max_concurrent_sessions"]
         
+        # The index size bounds the active count, so most logins stop here
+        if len(self.store.members(f"session:user:{user_id}")) < max_sessions:
+            return
+        
+        user_sessions = self.get_user_sessions(user_id)
         if len(user_sessions) >= max_sessions:
-            # Sort by last activity and revoke oldest sessions
-            user_sessions.sort(key=lambda s: s.last_activity)
+            # Revoke the least recently used sessions
             sessions_to_revoke = len(user_sessions) - max_sessions + 1
-            
-            for i in range(sessions_to_revoke):
-                self.revoke_session(user_sessions[i].session_id, "concurrent_limit_exceeded")
+            for session in heapq.nsmallest(sessions_to_revoke, user_sessions, key=lambda s: s.last_activity):
+                self.revoke_session(session.session_id, "concurrent_limit_exceeded")
     
     def _update_session_activity(self, session: Session):
         """Update session activity and check for suspicious behavior."""
@@ -434,35 +542,23 @@ class SessionManager:
         return True
     
     def _remove_session_from_indexes(self, session: Session):
-        """Remove session from all indexes."""
-        session_id = session.session_id
-        user_id = session.user_id
-        device_id = session.device_info.device_id
-        
-        # Remove from user sessions
-        if user_id in self._user_sessions:
-            self._user_sessions[user_id].discard(session_id)
-            if not self._user_sessions[user_id]:
-                del self._user_sessions[user_id]
-        
-        # Remove from device sessions
-        if device_id in self._device_sessions:
-            self._device_sessions[device_id].discard(session_id)
-            if not self._device_sessions[device_id]:
-                del self._device_sessions[device_id]
+        """Remove session from the user and device indexes."""
+        self.store.discard(f"session:user:{session.user_id}", session.session_id)
+        self.store.discard(f"session:device:{session.device_info.device_id}", session.session_id)
     
     def get_session_statistics(self) -> Dict[str, Any]:
         """Get session statistics."""
-        total_sessions = len(self._sessions)
-        active_sessions = len([s for s in self._sessions.values() if s.is_active])
+        session_ids = [session_id for session_id, _ in self.store.zrange_by_score(self.EXPIRY_INDEX, float("inf"))]
+        sessions = [session for session in self._load_sessions(session_ids).values() if session is not None]
+        active_sessions = [session for session in sessions if session.is_active]
         suspicious_sessions = len(self.get_suspicious_sessions())
         
         return {
-            "total_sessions": total_sessions,
-            "active_sessions": active_sessions,
+            "total_sessions": len(sessions),
+            "active_sessions": len(active_sessions),
             "suspicious_sessions": suspicious_sessions,
-            "total_users": len(self._user_sessions),
-            "total_devices": len(self._device_sessions)
+            "total_users": len({session.user_id for session in active_sessions}),
+            "total_devices": len({session.device_info.device_id for session in active_sessions})
         }
 
 
@@ -0,0 +1,789 @@
+"""
+Shared state storage for lockout counters, sessions and audit events.
+
+Managers keep their state in a ``StateStore`` instead of instance
+attributes so that one store can back every worker process. Values are
+JSON-serializable and keys may carry a time-to-live, which is how
+session lifetimes expire without any scanning. Failure windows are
+sliding-window counters split into time buckets, so recording and
+reading a count costs the same however many attempts a key has seen.
+Sorted sets keep members ordered by a score such as an expiry time, so
+the members that are due come off the low end without a scan.
+"""
+
+import heapq
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class TimeBucketedCounters:
+    """
+    Sliding-window counters for many keys.
+
+    Each key keeps a ring of ``buckets`` counts covering ``window``
+    seconds plus a running total, so an update or a read only clears the
+    buckets that time has moved past: O(1) amortized and never more than
+    ``buckets`` steps. Counts cover the last ``window`` seconds at bucket
+    granularity. Keys are kept in least-recently-updated order and the
+    idlest key is evicted once more than ``max_keys`` are tracked.
+    """
+
+    def __init__(self, window: float, buckets: int = 12, max_keys: int = 100000, clock=time.time):
+        self.window = window
+        self.buckets = buckets
+        self.width = window / buckets
+        self.max_keys = max_keys
+        self.clock = clock
+        self.evictions = 0
+        self._counters: "OrderedDict[str, list]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._counters
+
+    def add(self, key: str, amount: int = 1, at: Optional[float] = None) -> int:
+        """
+        Add amount to the counter at key and return its windowed total.
+
+        ``at`` records the hit at an earlier time than now; hits that are
+        already outside the window are not counted.
+        """
+        now = int(self.clock() // self.width)
+        bucket = now if at is None else min(int(at // self.width), now)
+        counter = self._counters.get(key)
+        if counter is None:
+            # [last bucket, total, ring of bucket counts]
+            counter = self._counters[key] = [now, 0, [0] * self.buckets]
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._counters.move_to_end(key)
+            self._advance(counter, now)
+        if bucket <= now - self.buckets:
+            return counter[1]
+        counter[2][bucket % self.buckets] += amount
+        counter[1] += amount
+        return counter[1]
+
+    def count(self, key: str) -> int:
+        """Return the windowed total at key."""
+        counter = self._counters.get(key)
+        if counter is None:
+            return 0
+        self._advance(counter, int(self.clock() // self.width))
+        return counter[1]
+
+    def reset(self, key: str) -> bool:
+        """Forget the counter at key; returns whether it existed."""
+        return self._counters.pop(key, None) is not None
+
+    def _advance(self, counter: list, bucket: int):
+        """Zero the buckets between the counter's last update and now."""
+        last, _, counts = counter
+        if bucket <= last:
+            return
+        if bucket - last >= self.buckets:
+            counts[:] = [0] * self.buckets
+            counter[1] = 0
+        else:
+            for expired in range(last + 1, bucket + 1):
+                index = expired % self.buckets
+                counter[1] -= counts[index]
+                counts[index] = 0
+        counter[0] = bucket
+
+
+class SortedSet:
+    """
+    Members ordered by score, backed by a min-heap.
+
+    A member's current score lives in a dict and the heap holds
+    (score, member) entries; entries whose score no longer matches, or
+    that repeat a member already read, are stale and skipped when they
+    surface. Adding or removing a member is
+    O(log n), and reading the k lowest members is O(k log n). The heap is
+    rebuilt once stale entries outnumber live ones, so it stays within
+    twice the set size.
+    """
+
+    def __init__(self):
+        self.scores: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add(self, member: str, score: float):
+        if self.scores.get(member) == score:
+            return
+        self.scores[member] = score
+        heapq.heappush(self._heap, (score, member))
+        if len(self._heap) > 2 * len(self.scores) + 64:
+            self._heap = [(score, member) for member, score in self.scores.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, member: str) -> bool:
+        return self.scores.pop(member, None) is not None
+
+    def lowest(self, max_score: float, limit: Optional[int] = None, remove: bool = False) -> List[Tuple[str, float]]:
+        """Return up to limit (member, score) pairs scoring at most max_score, lowest first."""
+        heap, scores, found, seen = self._heap, self.scores, [], set()
+        while heap and heap[0][0] <= max_score and (limit is None or len(found) < limit):
+            score, member = heapq.heappop(heap)
+            # A member that returned to an earlier score has one entry per
+            # visit; the first is kept and the duplicates dropped
+            if scores.get(member) == score and member not in seen:
+                seen.add(member)
+                found.append((member, score))
+        if remove:
+            for member, _ in found:
+                del scores[member]
+        else:
+            for member, score in found:
+                heapq.heappush(heap, (score, member))
+        return found
+
+
+class StateStore(ABC):
+    """
+    Key/value store interface used by the authentication managers.
+
+    Counters, sets and lists mirror the Redis primitives of the same
+    name so that every operation is O(1) (or O(n) in the items returned).
+    Sorted set operations are O(log n) in the set size.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored at key, or None."""
+        pass
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return {key: value} for the keys that exist."""
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store value at key, expiring after ttl seconds if given."""
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str) -> int:
+        """Delete keys and return how many existed."""
+        pass
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        """
+        Increment a counter and return its new value.
+
+        The ttl only applies when the increment creates the counter, so a
+        counter covers a fixed window starting at its first increment.
+        """
+        pass
+
+    @abstractmethod
+    def incr_window(self, key: str, window: int, amount: int = 1) -> int:
+        """Add amount to a sliding-window counter and return its count over window seconds."""
+        pass
+
+    @abstractmethod
+    def count_window(self, key: str, window: int) -> int:
+        """Return a sliding-window counter's count over window seconds."""
+        pass
+
+    @abstractmethod
+    def add(self, key: str, member: str, ttl: Optional[int] = None) -> int:
+        """Add member to the set at key and return the set size."""
+        pass
+
+    @abstractmethod
+    def add_capped(self, key: str, member: str, max_members: int, ttl: Optional[int] = None) -> int:
+        """
+        Add member to a set that stops growing at max_members; return its size.
+
+        Like ``incr``, the ttl only applies when the add creates the set, so
+        the set covers a fixed window and its size never exceeds the cap.
+        """
+        pass
+
+    @abstractmethod
+    def discard(self, key: str, member: str):
+        """Remove member from the set at key."""
+        pass
+
+    @abstractmethod
+    def members(self, key: str) -> Set[str]:
+        """Return the members of the set at key."""
+        pass
+
+    @abstractmethod
+    def zadd(self, key: str, member: str, score: float, ttl: Optional[int] = None) -> int:
+        """Add member to the sorted set at key, or update its score; returns the set size."""
+        pass
+
+    @abstractmethod
+    def zrem(self, key: str, member: str) -> bool:
+        """Remove member from the sorted set at key; returns whether it was there."""
+        pass
+
+    @abstractmethod
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        """Return member's score in the sorted set at key, or None."""
+        pass
+
+    @abstractmethod
+    def zcard(self, key: str) -> int:
+        """Return the size of the sorted set at key."""
+        pass
+
+    @abstractmethod
+    def zrange_by_score(self, key: str, max_score: float, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return up to limit (member, score) pairs scoring at most max_score, lowest first."""
+        pass
+
+    @abstractmethod
+    def zpop_by_score(self, key: str, max_score: float, limit: Optional[int] = None) -> List[str]:
+        """
+        Remove and return up to limit members scoring at most max_score.
+
+        A member is returned to one caller only, so several processes can
+        drain the same set without handling a member twice.
+        """
+        pass
+
+    @abstractmethod
+    def push(self, key: str, value: Any, max_length: Optional[int] = None) -> int:
+        """
+        Append value to the list at key, keeping the last max_length items.
+
+        Returns:
+            The item's sequence number: how many items have ever been
+            pushed to the list, counting this one
+        """
+        pass
+
+    def push_many(self, key: str, values: List[Any], max_length: Optional[int] = None) -> int:
+        """Append values to the list at key in one step; returns the last one's sequence number."""
+        sequence = 0
+        for value in values:
+            sequence = self.push(key, value, max_length)
+        return sequence
+
+    @abstractmethod
+    def items(self, key: str) -> List[Any]:
+        """Return the list at key, oldest first."""
+        pass
+
+    @abstractmethod
+    def items_since(self, key: str, sequence: int) -> Tuple[int, List[Any]]:
+        """
+        Return the items pushed to the list at key after sequence.
+
+        Lets a reader follow a list as a feed, reading only what is new.
+        Items already trimmed from the list are skipped.
+
+        Returns:
+            (sequence of the newest item, new items oldest first)
+        """
+        pass
+
+    @abstractmethod
+    def trim(self, key: str, start: int):
+        """Drop the first start items of the list at key."""
+        pass
+
+
+class InMemoryStateStore(StateStore):
+    """
+    Thread-safe store held in process memory.
+
+    Suitable for tests and single-process deployments. Values are kept
+    JSON-encoded like in Redis, so callers never share mutable state with
+    the store. Memory is bounded: keys are kept in least-recently-used
+    order and the idlest is evicted beyond ``max_keys``, and expired keys
+    are dropped a few at a time on each write from an expiry heap that
+    holds one entry per key. Sliding-window counters live in one
+    ``TimeBucketedCounters`` per window length, each bounded to
+    ``max_counters`` keys.
+    """
+
+    def __init__(self, max_keys: int = 1000000, clock=time.time, window_buckets: int = 12,
+                 max_counters: int = 100000, sweep_batch: int = 100):
+        self.max_keys = max_keys
+        self.clock = clock
+        self.window_buckets = window_buckets
+        self.max_counters = max_counters
+        self.sweep_batch = sweep_batch
+        self.evictions = 0
+        self.windows: Dict[int, TimeBucketedCounters] = {}
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._expiry_heap: List = []
+        self._sequences: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if self._expired(key) or key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            value = self._data[key]
+            return json.loads(value) if isinstance(value, str) else value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        with self._lock:
+            self._store(key, json.dumps(value, default=str))
+            self._expire(key, ttl)
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            deleted = 0
+            for key in keys:
+                if not self._expired(key) and key in self._data:
+                    deleted += 1
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+                for counters in self.windows.values():
+                    deleted += counters.reset(key)
+            return deleted
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        with self._lock:
+            if self._expired(key) or key not in self._data:
+                self._store(key, 0)
+                self._expire(key, ttl)
+            else:
+                self._data.move_to_end(key)
+            self._data[key] += amount
+            return self._data[key]
+
+    def incr_window(self, key: str, window: int, amount: int = 1) -> int:
+        with self._lock:
+            return self._window(window).add(key, amount)
+
+    def count_window(self, key: str, window: int) -> int:
+        with self._lock:
+            counters = self.windows.get(window)
+            return counters.count(key) if counters is not None else 0
+
+    def add(self, key: str, member: str, ttl: Optional[int] = None) -> int:
+        with self._lock:
+            if self._expired(key) or key not in self._data:
+                self._store(key, set())
+            else:
+                self._data.move_to_end(key)
+            self._data[key].add(member)
+            if ttl is not None:
+                self._expire(key, ttl)
+            return len(self._data[key])
+
+    def add_capped(self, key: str, member: str, max_members: int, ttl: Optional[int] = None) -> int:
+        with self._lock:
+            if self._expired(key) or key not in self._data:
+                self._store(key, set())
+                self._expire(key, ttl)
+            else:
+                self._data.move_to_end(key)
+            members = self._data[key]
+            if len(members) < max_members:
+                members.add(member)
+            return len(members)
+
+    def discard(self, key: str, member: str):
+        with self._lock:
+            if not self._expired(key) and key in self._data:
+                self._data[key].discard(member)
+                if not self._data[key]:
+                    self.delete(key)
+
+    def members(self, key: str) -> Set[str]:
+        with self._lock:
+            if self._expired(key):
+                return set()
+            return set(self._data.get(key, ()))
+
+    def zadd(self, key: str, member: str, score: float, ttl: Optional[int] = None) -> int:
+        with self._lock:
+            if self._expired(key) or key not in self._data:
+                self._store(key, SortedSet())
+            else:
+                self._data.move_to_end(key)
+            self._data[key].add(member, float(score))
+            if ttl is not None:
+                self._expire(key, ttl)
+            return len(self._data[key])
+
+    def zrem(self, key: str, member: str) -> bool:
+        with self._lock:
+            if self._expired(key) or key not in self._data:
+                return False
+            removed = self._data[key].discard(member)
+            if not self._data[key]:
+                self.delete(key)
+            return removed
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        with self._lock:
+            sorted_set = self._sorted_set(key)
+            return sorted_set.scores.get(member) if sorted_set is not None else None
+
+    def zcard(self, key: str) -> int:
+        with self._lock:
+            sorted_set = self._sorted_set(key)
+            return len(sorted_set) if sorted_set is not None else 0
+
+    def zrange_by_score(self, key: str, max_score: float, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        with self._lock:
+            sorted_set = self._sorted_set(key)
+            return sorted_set.lowest(max_score, limit) if sorted_set is not None else []
+
+    def zpop_by_score(self, key: str, max_score: float, limit: Optional[int] = None) -> List[str]:
+        with self._lock:
+            sorted_set = self._sorted_set(key)
+            if sorted_set is None:
+                return []
+            members = [member for member, _ in sorted_set.lowest(max_score, limit, remove=True)]
+            if not sorted_set:
+                self.delete(key)
+            return members
+
+    def push(self, key: str, value: Any, max_length: Optional[int] = None) -> int:
+        return self.push_many(key, [value], max_length)
+
+    def push_many(self, key: str, values: List[Any], max_length: Optional[int] = None) -> int:
+        with self._lock:
+            if self._expired(key) or key not in self._data:
+                self._store(key, [])
+            else:
+                self._data.move_to_end(key)
+            items = self._data[key]
+            items.extend(json.dumps(value, default=str) for value in values)
+            if max_length is not None and len(items) > max_length:
+                del items[:len(items) - max_length]
+            self._sequences[key] = sequence = self._sequences.get(key, 0) + len(values)
+            self._sweep()
+            return sequence
+
+    def items(self, key: str) -> List[Any]:
+        with self._lock:
+            if self._expired(key):
+                return []
+            return [json.loads(value) for value in self._data.get(key, ())]
+
+    def items_since(self, key: str, sequence: int) -> Tuple[int, List[Any]]:
+        with self._lock:
+            latest = self._sequences.get(key, 0)
+            items = [] if self._expired(key) else self._data.get(key, [])
+            count = min(latest - sequence, len(items))
+            if count <= 0:
+                return latest, []
+            return latest, [json.loads(value) for value in items[-count:]]
+
+    def trim(self, key: str, start: int):
+        with self._lock:
+            if start > 0 and key in self._data:
+                del self._data[key][:start]
+
+    def _sorted_set(self, key: str) -> Optional[SortedSet]:
+        if self._expired(key) or key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def _window(self, window: int) -> TimeBucketedCounters:
+        counters = self.windows.get(window)
+        if counters is None:
+            counters = self.windows[window] = TimeBucketedCounters(
+                window, self.window_buckets, self.max_counters, self.clock
+            )
+        return counters
+
+    def _store(self, key: str, value: Any):
+        """Write key as the most recently used, evicting the idlest key if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_keys:
+            evicted, _ = self._data.popitem(last=False)
+            self._expires.pop(evicted, None)
+            self.evictions += 1
+
+    def _expire(self, key: str, ttl: Optional[int]):
+        if ttl is None:
+            self._expires.pop(key, None)
+        else:
+            if key not in self._expires:
+                heapq.heappush(self._expiry_heap, (self.clock() + ttl, key))
+            self._expires[key] = self.clock() + ttl
+        self._sweep()
+
+    def _expired(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= self.clock():
+            self._data.pop(key, None)
+            del self._expires[key]
+            return True
+        return False
+
+    def _sweep(self):
+        """Drop up to sweep_batch keys whose expiry has passed."""
+        heap, now = self._expiry_heap, self.clock()
+        for _ in range(self.sweep_batch):
+            if not heap or heap[0][0] > now:
+                return
+            _, key = heapq.heappop(heap)
+            expires_at = self._expires.get(key)
+            if expires_at is None:
+                continue  # deleted, evicted or made persistent since
+            if expires_at <= now:
+                self._data.pop(key, None)
+                del self._expires[key]
+            else:
+                # The ttl was extended; keep the key's single heap entry current
+                heapq.heappush(heap, (expires_at, key))
+
+
+class RedisStateStore(StateStore):
+    """
+    Store backed by Redis, shared by every process using the same server.
+
+    Requires the optional ``redis`` dependency. Keys are namespaced with
+    ``prefix`` and values are stored as JSON. A sliding-window counter is
+    a hash of bucket number to count that expires one window after its
+    last update, so idle counters free themselves.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "auth:", client=None,
+                 window_buckets: int = 12, clock=time.time):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError(
+                    "RedisStateStore requires the redis package: "
+                    "pip install enterprise-auth-package[redis]"
+                )
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.window_buckets = window_buckets
+        self.clock = clock
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _decode(value):
+        return json.loads(value) if value is not None else None
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._decode(self.client.get(self._key(key)))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget([self._key(key) for key in keys])
+        return {
+            key: self._decode(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self.client.set(self._key(key), json.dumps(value, default=str), ex=ttl)
+
+    def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        return self.client.delete(*[self._key(key) for key in keys])
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        key = self._key(key)
+        pipe = self.client.pipeline()
+        if ttl is not None:
+            # Create the counter with its window expiry only if it is new
+            pipe.set(key, 0, ex=ttl, nx=True)
+        pipe.incrby(key, amount)
+        return int(pipe.execute()[-1])
+
+    def incr_window(self, key: str, window: int, amount: int = 1) -> int:
+        key = self._key(key)
+        width = window / self.window_buckets
+        bucket = int(self.clock() // width)
+        pipe = self.client.pipeline()
+        pipe.hincrby(key, bucket, amount)
+        pipe.expire(key, int(window + width) + 1)
+        pipe.hgetall(key)
+        return self._window_total(key, pipe.execute()[-1], bucket)
+
+    def count_window(self, key: str, window: int) -> int:
+        key = self._key(key)
+        bucket = int(self.clock() // (window / self.window_buckets))
+        return self._window_total(key, self.client.hgetall(key), bucket)
+
+    def _window_total(self, key: str, counts: Dict, bucket: int) -> int:
+        """Sum the buckets still inside the window and drop the rest."""
+        total, expired = 0, []
+        for field, count in counts.items():
+            if int(field) > bucket - self.window_buckets:
+                total += int(count)
+            else:
+                expired.append(field)
+        if expired:
+            self.client.hdel(key, *expired)
+        return total
+
+    def add(self, key: str, member: str, ttl: Optional[int] = None) -> int:
+        key = self._key(key)
+        pipe = self.client.pipeline()
+        pipe.sadd(key, member)
+        if ttl is not None:
+            pipe.expire(key, ttl)
+        pipe.scard(key)
+        return int(pipe.execute()[-1])
+
+    def add_capped(self, key: str, member: str, max_members: int, ttl: Optional[int] = None) -> int:
+        key = self._key(key)
+        size = int(self.client.scard(key))
+        if size >= max_members:
+            return size
+        pipe = self.client.pipeline()
+        pipe.sadd(key, member)
+        pipe.scard(key)
+        pipe.ttl(key)
+        _, size, remaining = pipe.execute()
+        if ttl is not None and remaining == -1:
+            # The set was just created: its window starts now
+            self.client.expire(key, ttl)
+        return int(size)
+
+    def discard(self, key: str, member: str):
+        self.client.srem(self._key(key), member)
+
+    def members(self, key: str) -> Set[str]:
+        return {
+            member.decode() if isinstance(member, bytes) else member
+            for member in self.client.smembers(self._key(key))
+        }
+
+    def zadd(self, key: str, member: str, score: float, ttl: Optional[int] = None) -> int:
+        key = self._key(key)
+        pipe = self.client.pipeline()
+        pipe.zadd(key, {member: score})
+        if ttl is not None:
+            pipe.expire(key, ttl)
+        pipe.zcard(key)
+        return int(pipe.execute()[-1])
+
+    def zrem(self, key: str, member: str) -> bool:
+        return bool(self.client.zrem(self._key(key), member))
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        return self.client.zscore(self._key(key), member)
+
+    def zcard(self, key: str) -> int:
+        return int(self.client.zcard(self._key(key)))
+
+    def zrange_by_score(self, key: str, max_score: float, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        page = {} if limit is None else {"start": 0, "num": limit}
+        return [
+            (member.decode() if isinstance(member, bytes) else member, float(score))
+            for member, score in self.client.zrangebyscore(
+                self._key(key), "-inf", max_score, withscores=True, **page
+            )
+        ]
+
+    def zpop_by_score(self, key: str, max_score: float, limit: Optional[int] = None) -> List[str]:
+        members = [member for member, _ in self.zrange_by_score(key, max_score, limit)]
+        if not members:
+            return []
+        # ZREM reports which removals this process won
+        pipe = self.client.pipeline()
+        for member in members:
+            pipe.zrem(self._key(key), member)
+        return [member for member, removed in zip(members, pipe.execute()) if removed]
+
+    def push(self, key: str, value: Any, max_length: Optional[int] = None) -> int:
+        return self.push_many(key, [value], max_length)
+
+    def push_many(self, key: str, values: List[Any], max_length: Optional[int] = None) -> int:
+        if not values:
+            return int(self.client.get(self._key(f"{key}:sequence")) or 0)
+        # One transaction, so sequence numbers follow list order across processes
+        pipe = self.client.pipeline()
+        pipe.rpush(self._key(key), *[json.dumps(value, default=str) for value in values])
+        pipe.incrby(self._key(f"{key}:sequence"), len(values))
+        if max_length is not None:
+            pipe.ltrim(self._key(key), -max_length, -1)
+        return int(pipe.execute()[1])
+
+    def items(self, key: str) -> List[Any]:
+        return [self._decode(value) for value in self.client.lrange(self._key(key), 0, -1)]
+
+    def items_since(self, key: str, sequence: int) -> Tuple[int, List[Any]]:
+        list_key, sequence_key = self._key(key), self._key(f"{key}:sequence")
+        count = int(self.client.get(sequence_key) or 0) - sequence
+        while True:
+            if count <= 0:
+                return sequence, []
+            pipe = self.client.pipeline()
+            pipe.get(sequence_key)
+            pipe.lrange(list_key, -count, -1)
+            latest, values = pipe.execute()
+            latest = int(latest)
+            if latest - sequence <= count or len(values) < count:
+                break
+            # Pushes landed between the two reads; widen to cover them
+            count = latest - sequence
+        new = min(latest - sequence, len(values))
+        return latest, [self._decode(value) for value in values[len(values) - new:]]
+
+    def trim(self, key: str, start: int):
+        if start > 0:
+            self.client.ltrim(self._key(key), start, -1)
+
+
+def create_state_store(config: Dict[str, Any] = None) -> StateStore:
+    """
+    Build a state store from configuration.
+
+    Args:
+        config: ``{"backend": "memory" | "redis", "url": ..., "prefix": ...,
+            "window_buckets": ..., "max_keys": ..., "max_counters": ...}``
+
+    Returns:
+        Configured state store
+    """
+    config = config or {}
+    backend = config.get("backend", "memory")
+    window_buckets = config.get("window_buckets", 12)
+
+    if backend == "memory":
+        return InMemoryStateStore(
+            max_keys=config.get("max_keys", 1000000),
+            window_buckets=window_buckets,
+            max_counters=config.get("max_counters", 100000)
+        )
+    if backend == "redis":
+        return RedisStateStore(
+            url=config.get("url", "redis://localhost:6379/0"),
+            prefix=config.get("prefix", "auth:"),
+            window_buckets=window_buckets
+        )
+    raise ValueError(f"Unknown state store backend: {backend}")
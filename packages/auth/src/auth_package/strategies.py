@@ -4,6 +4,9 @@ Authentication strategies for JWT and OAuth2 implementations.
 
 import jwt
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Union
 from dataclasses import dataclass
@@ -14,6 +17,9 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 
+from .storage import StateStore
+from .token_state import TokenStateStore
+
 
 @dataclass
 class TokenPair:
@@ -33,6 +39,7 @@ class JWTConfig:
     refresh_token_lifetime: timedelta = timedelta(days=7)
     issuer: str = "auth-package"
     audience: str = "api"
+    verified_token_cache_size: int = 10000
 
 
 class JWTStrategy:
@@ -41,11 +48,31 @@ class JWTStrategy:
     
     Provides secure JWT token generation, validation, and refresh capabilities
     with configurable expiration times and security settings.
+    
+    Refresh token metadata and access token revocations are kept in a
+    ``TokenStateStore`` over ``store``, or in ``token_state`` when given,
+    e.g. the process-wide ``default_token_state`` that Django integration
+    points at the shared state store. Access tokens are verified
+    locally: the prepared key is built once, recently verified tokens are
+    cached until they expire, and revocation is checked against a local
+    filter that only goes to the store on a hit.
     """
     
-    def __init__(self, config: JWTConfig):
+    def __init__(self, config: JWTConfig, store: Optional[StateStore] = None,
+                 token_state: Optional[TokenStateStore] = None):
         self.config = config
-        self._refresh_tokens = {}  # In production, use Redis or database
+        self.tokens = token_state if token_state is not None else TokenStateStore(store)
+        self._signing_key, self._verifying_key = self._prepare_keys()
+        self._verified = OrderedDict()  # Access token -> payload, in LRU order
+        self._verified_lock = threading.Lock()
+    
+    def _prepare_keys(self):
+        """Parse the configured key once instead of on every encode and decode."""
+        algorithm = jwt.get_algorithm_by_name(self.config.algorithm)
+        signing_key = algorithm.prepare_key(self.config.secret_key)
+        # Asymmetric private keys verify with their public half
+        verifying_key = signing_key.public_key() if hasattr(signing_key, "public_key") else signing_key
+        return signing_key, verifying_key
     
     def generate_tokens(self, user_id: Union[str, int], user_data: Dict[str, Any] = None) -> TokenPair:
         """
@@ -69,12 +96,13 @@ class JWTStrategy:
             "iss": self.config.issuer,
             "aud": self.config.audience,
             "type": "access",
+            "jti": secrets.token_urlsafe(16),
             **user_data
         }
         
         access_token = jwt.encode(
             access_payload,
-            self.config.secret_key,
+            self._signing_key,
             algorithm=self.config.algorithm
         )
         
@@ -92,17 +120,17 @@ class JWTStrategy:
         
         refresh_token = jwt.encode(
             refresh_payload,
-            self.config.secret_key,
+            self._signing_key,
             algorithm=self.config.algorithm
         )
         
         # Store refresh token metadata
-        self._refresh_tokens[refresh_token_id] = {
-            "user_id": user_id,
-            "created_at": now,
-            "expires_at": now + self.config.refresh_token_lifetime,
-            "is_active": True
-        }
+        self.tokens.save_refresh_token(
+            refresh_token_id,
+            user_id,
+            now + self.config.refresh_token_lifetime,
+            int(self.config.refresh_token_lifetime.total_seconds())
+        )
         
         return TokenPair(
             access_token=access_token,
@@ -125,10 +153,16 @@ class JWTStrategy:
         Raises:
             jwt.InvalidTokenError: If token is invalid or expired
         """
+        if token_type == "access":
+            payload = self._verified_payload(token)
+            if payload is not None:
+                self._check_revocation(payload)
+                return dict(payload)
+        
         try:
             payload = jwt.decode(
                 token,
-                self.config.secret_key,
+                self._verifying_key,
                 algorithms=[self.config.algorithm],
                 audience=self.config.audience,
                 issuer=self.config.issuer
@@ -140,12 +174,15 @@ class JWTStrategy:
             # Additional validation for refresh tokens
             if token_type == "refresh":
                 token_id = payload.get("token_id")
-                if not token_id or token_id not in self._refresh_tokens:
+                token_meta = self.tokens.get_refresh_token(token_id) if token_id else None
+                if token_meta is None:
                     raise jwt.InvalidTokenError("Refresh token not found")
                 
-                token_meta = self._refresh_tokens[token_id]
                 if not token_meta["is_active"]:
                     raise jwt.InvalidTokenError("Refresh token has been revoked")
+            else:
+                self._remember(token, payload)
+                self._check_revocation(payload)
             
             return payload
             
@@ -154,6 +191,30 @@ class JWTStrategy:
         except jwt.InvalidTokenError:
             raise
     
+    def _verified_payload(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload of an already verified, unexpired access token."""
+        with self._verified_lock:
+            payload = self._verified.get(token)
+            if payload is None:
+                return None
+            if payload["exp"] <= time.time():
+                del self._verified[token]
+                return None
+            self._verified.move_to_end(token)
+            return payload
+    
+    def _remember(self, token: str, payload: Dict[str, Any]):
+        if self.config.verified_token_cache_size <= 0:
+            return
+        with self._verified_lock:
+            self._verified[token] = dict(payload)
+            while len(self._verified) > self.config.verified_token_cache_size:
+                self._verified.popitem(last=False)
+    
+    def _check_revocation(self, payload: Dict[str, Any]):
+        if self.tokens.is_access_token_revoked(payload.get("jti"), payload["exp"]):
+            raise jwt.InvalidTokenError("Token has been revoked")
+    
     def refresh_access_token(self, refresh_token: str) -> TokenPair:
         """
         Generate new access token using refresh token.
@@ -185,17 +246,39 @@ class JWTStrategy:
         """
         try:
             payload = self.validate_token(refresh_token, "refresh")
-            token_id = payload["token_id"]
-            
-            if token_id in self._refresh_tokens:
-                self._refresh_tokens[token_id]["is_active"] = False
-                return True
+            return self.tokens.revoke_refresh_token(payload["token_id"])
                 
         except jwt.InvalidTokenError:
             pass
         
         return False
     
+    def revoke_access_token(self, access_token: str) -> bool:
+        """
+        Revoke an access token for the rest of its lifetime.
+        
+        Other processes reject the token once they next sync their
+        revocation filter, within ``TokenStateStore.sync_interval`` seconds.
+        
+        Args:
+            access_token: Access token to revoke
+            
+        Returns:
+            True if token was successfully revoked
+        """
+        try:
+            payload = self.validate_token(access_token, "access")
+        except jwt.InvalidTokenError:
+            return False
+        
+        if not payload.get("jti"):
+            return False
+        
+        self.tokens.revoke_access_token(payload["jti"], payload["exp"])
+        with self._verified_lock:
+            self._verified.pop(access_token, None)
+        return True
+    
     def revoke_all_user_tokens(self, user_id: Union[str, int]) -> int:
         """
         Revoke all refresh tokens for a specific user.
@@ -206,13 +289,7 @@ class JWTStrategy:
         Returns:
             Number of tokens revoked
         """
-        revoked_count = 0
-        for token_id, token_meta in self._refresh_tokens.items():
-            if token_meta["user_id"] == user_id and token_meta["is_active"]:
-                token_meta["is_active"] = False
-                revoked_count += 1
-        
-        return revoked_count
+        return self.tokens.revoke_user_refresh_tokens(user_id)
 
 
 class OAuth2Strategy:
@@ -0,0 +1,190 @@
+"""
+Shared token state for JWTStrategy.
+
+Refresh token metadata lives in a ``StateStore`` under keys that expire
+with the token, so every worker sees the same refresh tokens and nothing
+outlives its token. Revoked access token ids are written to the store and
+announced on a feed; each process folds the feed into local Bloom filters
+every ``sync_interval`` seconds, so validating a token that was never
+revoked (the common case) needs no network I/O. A filter hit is
+confirmed against the store before a token is rejected.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from .storage import InMemoryStateStore, StateStore
+
+
+class RevocationFilter:
+    """
+    Bloom filter of revoked token ids.
+
+    Sized for ``capacity`` ids at ``error_rate`` false positives, about
+    1.8 KB per thousand ids at 0.1%. Positions come from one BLAKE2b
+    digest split into two hashes (double hashing).
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        position = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        bits, size = self._bits, self.size
+        # Stop at the first clear bit, usually within two probes for a miss
+        for _ in range(self.hashes):
+            wrapped = position % size
+            if not bits[wrapped >> 3] & (1 << (wrapped & 7)):
+                return False
+            position += second
+        return True
+
+
+class TokenStateStore:
+    """
+    Refresh token metadata and access token revocations.
+
+    Revocations are filed in one filter per ``bucket_seconds`` of token
+    expiry, so a whole filter is dropped once every token it covers has
+    expired and no filter grows past the revocations of its window.
+    """
+
+    REVOCATIONS_KEY = "jwt:revocations"
+
+    def __init__(self, store: Optional[StateStore] = None, sync_interval: float = 5.0,
+                 filter_capacity: int = 100000, error_rate: float = 0.001,
+                 bucket_seconds: int = 900, max_revocations: int = 100000):
+        self.sync_interval = sync_interval
+        self.filter_capacity = filter_capacity
+        self.error_rate = error_rate
+        self.bucket_seconds = bucket_seconds
+        self.max_revocations = max_revocations
+        self.stats = {"checks": 0, "filter_hits": 0, "confirmed": 0, "syncs": 0}
+        self._lock = threading.Lock()
+        self.store = store if store is not None else InMemoryStateStore()
+
+    @property
+    def store(self) -> StateStore:
+        return self._store
+
+    @store.setter
+    def store(self, store: StateStore):
+        """Switch stores and rebuild the local filters from the new store's feed."""
+        with self._lock:
+            self._store = store
+            self._filters: Dict[int, RevocationFilter] = {}
+            self._synced = 0
+            self._synced_at = float("-inf")
+
+    # Refresh tokens
+
+    def save_refresh_token(self, token_id: str, user_id: Union[str, int], expires_at: datetime, ttl: int):
+        """Record an active refresh token and index it under its user."""
+        self.store.set(f"jwt:refresh:{token_id}", {
+            "user_id": user_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "expires_at": expires_at.isoformat(),
+            "is_active": True
+        }, ttl=max(ttl, 1))
+        self.store.add(f"jwt:user:{user_id}", token_id, ttl=max(ttl, 1))
+
+    def get_refresh_token(self, token_id: str) -> Optional[Dict[str, Any]]:
+        """Return a refresh token's metadata, or None once unknown or expired."""
+        return self.store.get(f"jwt:refresh:{token_id}")
+
+    def revoke_refresh_token(self, token_id: str) -> bool:
+        """Mark a refresh token revoked for the rest of its lifetime."""
+        token_meta = self.get_refresh_token(token_id)
+        if token_meta is None:
+            return False
+        self._deactivate(token_id, token_meta)
+        return True
+
+    def revoke_user_refresh_tokens(self, user_id: Union[str, int]) -> int:
+        """Revoke a user's active refresh tokens; returns how many were active."""
+        user_key = f"jwt:user:{user_id}"
+        token_ids = self.store.members(user_key)
+        token_metas = self.store.get_many(f"jwt:refresh:{token_id}" for token_id in token_ids)
+        revoked = 0
+        for token_id in token_ids:
+            token_meta = token_metas.get(f"jwt:refresh:{token_id}")
+            if token_meta is None:
+                self.store.discard(user_key, token_id)  # Expired
+            elif token_meta["is_active"]:
+                self._deactivate(token_id, token_meta)
+                revoked += 1
+        return revoked
+
+    def _deactivate(self, token_id: str, token_meta: Dict[str, Any]):
+        token_meta["is_active"] = False
+        remaining = datetime.fromisoformat(token_meta["expires_at"]) - datetime.utcnow()
+        self.store.set(f"jwt:refresh:{token_id}", token_meta, ttl=max(int(remaining.total_seconds()), 1))
+
+    # Access token revocation
+
+    def revoke_access_token(self, jti: str, expires_at: float):
+        """Revoke an access token id until its expiry (epoch seconds)."""
+        ttl = max(int(expires_at - time.time()) + 1, 1)
+        self.store.set(f"jwt:revoked:{jti}", True, ttl=ttl)
+        self.store.push(self.REVOCATIONS_KEY, {"jti": jti, "exp": expires_at}, max_length=self.max_revocations)
+        with self._lock:
+            self._file(jti, expires_at)
+
+    def is_access_token_revoked(self, jti: Optional[str], expires_at: float) -> bool:
+        """Check the local filter, going to the store only on a filter hit."""
+        if not jti:
+            return False
+        self.stats["checks"] += 1
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+        revocations = self._filters.get(int(expires_at // self.bucket_seconds))
+        if revocations is None or jti not in revocations:
+            return False
+        self.stats["filter_hits"] += 1
+        revoked = bool(self.store.get(f"jwt:revoked:{jti}"))
+        self.stats["confirmed"] += revoked
+        return revoked
+
+    def sync(self):
+        """Fold revocations made by other processes into the local filters."""
+        with self._lock:
+            self._synced, revocations = self.store.items_since(self.REVOCATIONS_KEY, self._synced)
+            for revocation in revocations:
+                self._file(revocation["jti"], revocation["exp"])
+            # Drop filters whose tokens have all expired
+            current = int(time.time() // self.bucket_seconds)
+            for bucket in [bucket for bucket in self._filters if bucket < current]:
+                del self._filters[bucket]
+            self._synced_at = time.monotonic()
+            self.stats["syncs"] += 1
+
+    def _file(self, jti: str, expires_at: float):
+        bucket = int(expires_at // self.bucket_seconds)
+        revocations = self._filters.get(bucket)
+        if revocations is None:
+            revocations = self._filters[bucket] = RevocationFilter(self.filter_capacity, self.error_rate)
+        revocations.add(jti)
+
+
+# Shared by the Django backend, middleware and views
+default_token_state = TokenStateStore()
@@ -10,11 +10,13 @@ from unittest.mock import Mock, patch
 from auth_package import (
     SessionManager, DeviceInfo, Session,
     AuditLogger, AuditEventType, AuditSeverity,
-    PasswordValidator, PasswordPolicy, AccountLockoutManager,
+    PasswordValidator, PasswordPolicy, AccountLockoutManager, BreachedPasswordList,
     TOTPProvider, SMSProvider, EmailProvider
 )
 from auth_package.session_management import SessionStatus
-from auth_package.password_policies import PasswordStrength, LockoutReason
+from auth_package.password_policies import (
+    DICTIONARY_WORD, KEYBOARD_PATTERN, PasswordStrength, LockoutReason, PatternMatcher
+)
 from auth_package.mfa.base import MFAStatus
 
 
@@ -102,6 +104,55 @@ class TestSessionManagement:
         assert risk_score > 0
         assert session.risk_score == risk_score
 
+    
+    def test_risk_score_survives_dropped_events(self):
+        """Risk counts every suspicious event, even once old events are dropped."""
+        session = self.session_manager.create_session("user123", self.device_info)
+        session.add_security_event("failed_mfa", {})
+        for _ in range(100):
+            session.add_security_event("rapid_requests", {})
+        
+        restored = Session.from_dict(session.to_dict())
+        
+        assert len(restored.security_events) == 50
+        assert restored.suspicious_event_count == 1
+        assert restored.calculate_risk_score() == session.calculate_risk_score()
+    
+    def test_cleanup_only_touches_ended_sessions(self):
+        """Cleanup pops ended sessions off the expiry index without loading live ones."""
+        sessions = [
+            self.session_manager.create_session(f"user{i}", self.device_info) for i in range(3)
+        ]
+        self.session_manager.revoke_session(sessions[0].session_id)
+        store, loaded = self.session_manager.store, []
+        
+        def get_many(keys):
+            loaded.append(list(keys))
+            return type(store).get_many(store, loaded[-1])
+        store.get_many = get_many
+        
+        assert self.session_manager.cleanup_expired_sessions() == 1
+        assert self.session_manager.cleanup_expired_sessions() == 0
+        assert loaded == [[f"session:{sessions[0].session_id}"]]
+        assert self.session_manager.get_session_statistics()["total_sessions"] == 2
+    
+    def test_suspicious_sessions_are_indexed(self):
+        """Sessions are flagged in a secondary index as they turn suspicious."""
+        session = self.session_manager.create_session("user123", self.device_info)
+        other = self.session_manager.create_session("user456", self.device_info)
+        other_device = DeviceInfo(device_id="other", user_agent="Other Browser", ip_address="10.0.0.1")
+        
+        assert self.session_manager.get_suspicious_sessions() == []
+        assert not self.session_manager.validate_session(session.session_id, other_device)
+        
+        assert self.session_manager.store.members("session:suspicious") == {session.session_id}
+        assert [s.session_id for s in self.session_manager.get_suspicious_sessions()] == [session.session_id]
+        assert self.session_manager.validate_session(other.session_id, self.device_info)
+        
+        # Suspicious sessions are no longer active and are cleaned up with their flag
+        assert self.session_manager.cleanup_expired_sessions() == 1
+        assert self.session_manager.get_suspicious_sessions() == []
+
 
 class TestAuditLogging:
     """Test audit logging functionality."""
@@ -220,6 +271,35 @@ class TestPasswordPolicies:
         result = self.password_validator.validate_password("SecureP@ss123", user_info)
         assert result["valid"]
     
+    def test_keyboard_patterns_and_dictionary_words(self):
+        """Test pattern checks, including reversed keyboard runs."""
+        result = self.password_validator.validate_password("Zx!9trewq#Lm")
+        assert "Password contains keyboard patterns (e.g., qwerty, asdf)" in result["errors"]
+        # Only forward runs lower the strength
+        assert result["strength"] == PasswordStrength.VERY_STRONG
+        
+        result = self.password_validator.validate_password("Zx!9Welcome#L")
+        assert "Password contains common dictionary words" in result["errors"]
+    
+    def test_pattern_matcher_finds_overlapping_patterns(self):
+        """Test one scan reports every pattern kind present."""
+        matcher = PatternMatcher({"she": KEYBOARD_PATTERN, "hers": DICTIONARY_WORD, "he": KEYBOARD_PATTERN})
+        
+        assert matcher.scan("ushers") == KEYBOARD_PATTERN | DICTIONARY_WORD
+        assert matcher.scan("ahishe") == KEYBOARD_PATTERN
+        assert matcher.scan("hxrs") == 0
+    
+    def test_breached_password_list(self, tmp_path):
+        """Test passwords from a compiled breach list are rejected."""
+        path = str(tmp_path / "breached.bin")
+        breached = ["Tr0ub4dor&3!x", "C0rrect#Horse9"] + [f"leaked{i}" for i in range(1000)]
+        assert BreachedPasswordList.build(breached, path, chunk_size=100) == 1002
+        
+        validator = PasswordValidator(PasswordPolicy(breached_passwords_file=path))
+        result = validator.validate_password("tr0ub4dor&3!X")
+        assert "Password is too common and easily guessable" in result["errors"]
+        assert validator.validate_password("Unl1sted#Phrase")["valid"]
+    
     def test_account_lockout(self):
         """Test account lockout functionality."""
         user_id = "user123"
@@ -0,0 +1,129 @@
+"""
+Tests for the background audit sink: batching, backpressure and shutdown flush.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from auth_package import AuditEvent, AuditEventType, AuditLogger, AuditSeverity, AuditSink, InMemoryStateStore
+
+
+def make_event(severity=AuditSeverity.MEDIUM):
+    return AuditEvent(
+        event_id="", event_type=AuditEventType.LOGIN_SUCCESS, severity=severity,
+        timestamp=datetime.utcnow(), user_id="user1"
+    )
+
+
+class GatedWriter:
+    """Batch writer that holds the writer thread until released."""
+
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def __call__(self, batch):
+        self.entered.set()
+        self.gate.wait(5)
+        self.batches.append(batch)
+
+
+class TestAuditSink:
+    """Events are written off the caller's thread, in batches."""
+
+    def test_events_are_written_in_batches(self):
+        writer = GatedWriter()
+        sink = AuditSink(writer, batch_size=50)
+
+        sink.submit(make_event())
+        writer.entered.wait(5)
+        for _ in range(120):
+            sink.submit(make_event())
+        writer.gate.set()
+
+        assert sink.flush(5)
+        assert [len(batch) for batch in writer.batches] == [1, 50, 50, 20]
+        metrics = sink.metrics()
+        assert (metrics["written"], metrics["batches"], metrics["queue_depth"]) == (121, 4, 0)
+        sink.close()
+
+    def test_full_queue_drops_low_and_waits_for_critical(self):
+        writer = GatedWriter()
+        sink = AuditSink(writer, queue_size=2, block_timeout=0.05)
+        sink.submit(make_event())
+        writer.entered.wait(5)
+        sink.submit(make_event())
+        sink.submit(make_event())
+
+        assert not sink.submit(make_event(AuditSeverity.LOW))
+        # With the writer stuck, a critical event is written on the caller's thread
+        writer.gate.set()
+        assert sink.submit(make_event(AuditSeverity.CRITICAL))
+
+        sink.flush(5)
+        metrics = sink.metrics()
+        assert (metrics["dropped"], metrics["blocked"], metrics["written"]) == (1, 1, 4)
+        sink.close()
+
+    def test_writer_errors_are_counted(self):
+        def failing_writer(batch):
+            raise RuntimeError("database down")
+
+        sink = AuditSink(failing_writer)
+        sink.submit(make_event())
+
+        assert sink.flush(5)
+        assert sink.metrics()["failed"] == 1
+        sink.close()
+
+    def test_close_flushes_and_restarts_on_demand(self):
+        writer = GatedWriter()
+        writer.gate.set()
+        sink = AuditSink(writer)
+        for _ in range(10):
+            sink.submit(make_event())
+
+        sink.close()
+        assert sum(map(len, writer.batches)) == 10
+
+        sink.submit(make_event())
+        sink.close()
+        assert sum(map(len, writer.batches)) == 11
+
+
+class TestAsyncAuditLogger:
+    """log_event returns before the event is written."""
+
+    def test_log_event_does_not_wait_for_slow_writes(self, tmp_path):
+        def slow_database(events):
+            time.sleep(0.2)
+            written.extend(events)
+
+        written = []
+        logger = AuditLogger({
+            "log_file": str(tmp_path / "audit.log"),
+            "enable_database": True,
+            "database_writer": slow_database
+        }, store=InMemoryStateStore())
+
+        started = time.perf_counter()
+        for i in range(20):
+            logger.log_authentication_event(AuditEventType.LOGIN_FAILURE, f"user{i}", "10.0.0.1", result="failure")
+        assert time.perf_counter() - started < 0.2
+
+        # Queries wait for pending writes
+        assert len(logger.get_events()) == 20
+        assert len(written) == 20
+        assert logger.metrics()["batches"] < 20
+        logger.close()
+
+    def test_synchronous_writes(self, tmp_path):
+        logger = AuditLogger(
+            {"log_file": str(tmp_path / "audit.log"), "async_writes": False}, store=InMemoryStateStore()
+        )
+        logger.log_authentication_event(AuditEventType.LOGIN_SUCCESS, "user1", "10.0.0.1")
+
+        assert len(logger.store.items(AuditLogger.EVENTS_KEY)) == 1
+        assert logger.metrics() == {}
@@ -0,0 +1,185 @@
+"""
+Tests for the indexed audit event store, on-disk history and incremental anomaly detection.
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+from auth_package import (
+    AuditEvent, AuditEventStore, AuditEventType, AuditLogger, AuditSegmentLog,
+    AuditSeverity, InMemoryStateStore
+)
+
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def make_event(minute, event_type=AuditEventType.LOGIN_FAILURE, user_id="user1",
+               ip_address="10.0.0.1", severity=AuditSeverity.HIGH):
+    return AuditEvent(
+        event_id=f"event{minute}-{user_id}",
+        event_type=event_type,
+        severity=severity,
+        timestamp=START + timedelta(minutes=minute),
+        user_id=user_id,
+        ip_address=ip_address
+    )
+
+
+class TestAuditEventStore:
+    """Index lookups return what a full scan would."""
+
+    def setup_method(self):
+        self.store = AuditEventStore(capacity=100)
+        for minute in range(60):
+            self.store.add(make_event(
+                minute,
+                event_type=AuditEventType.LOGIN_FAILURE if minute % 2 else AuditEventType.LOGIN_SUCCESS,
+                user_id=f"user{minute % 3}",
+                ip_address=f"10.0.0.{minute % 5}"
+            ))
+
+    def scan(self, **filters):
+        minutes = [
+            minute for minute in range(59, -1, -1)
+            if (not filters.get("start") or minute >= filters["start"]) and
+            (not filters.get("end") or minute <= filters["end"]) and
+            (not filters.get("failures") or minute % 2) and
+            (not filters.get("user") or f"user{minute % 3}" == filters["user"]) and
+            (not filters.get("ip") or f"10.0.0.{minute % 5}" == filters["ip"])
+        ]
+        return [START + timedelta(minutes=minute) for minute in minutes]
+
+    def test_time_range_is_a_binary_search(self):
+        events = self.store.query(START + timedelta(minutes=10), START + timedelta(minutes=20))
+
+        assert [e.timestamp for e in events] == self.scan(start=10, end=20)
+
+    def test_filters_combine_indexes(self):
+        events = self.store.query(
+            start_time=START + timedelta(minutes=5),
+            event_types=[AuditEventType.LOGIN_FAILURE],
+            user_id="user1",
+            ip_address="10.0.0.3"
+        )
+
+        assert [e.timestamp for e in events] == self.scan(start=5, failures=True, user="user1", ip="10.0.0.3")
+
+    def test_several_event_types_are_merged_newest_first(self):
+        events = self.store.query(
+            event_types=[AuditEventType.LOGIN_FAILURE, AuditEventType.LOGIN_SUCCESS], limit=5
+        )
+
+        assert [e.timestamp for e in events] == self.scan()[:5]
+
+    def test_ring_evicts_oldest_from_indexes(self):
+        store = AuditEventStore(capacity=3)
+        for minute in range(5):
+            store.add(make_event(minute, user_id=f"user{minute % 2}"))
+
+        assert len(store) == 3
+        assert store.oldest() == START + timedelta(minutes=2)
+        assert [e.timestamp.minute for e in store.query(user_id="user0")] == [4, 2]
+        assert store.query(user_id="missing") == []
+
+    def test_expire_drops_old_events(self):
+        assert self.store.expire(START + timedelta(minutes=50)) == 50
+        assert [e.timestamp.minute for e in self.store.query(user_id="user0")] == [57, 54, 51]
+
+
+class TestAuditSegmentLog:
+    """Segments are append-only files skipped by time span."""
+
+    def test_segments_seal_and_filter_by_time(self, tmp_path):
+        log = AuditSegmentLog(str(tmp_path), max_events=10)
+        log.append([make_event(minute) for minute in range(25)])
+
+        names = sorted(path.name for path in tmp_path.iterdir())
+        assert [name.rsplit(".", 1)[1] for name in names] == ["seg", "seg", "open"]
+
+        events = list(log.read(START + timedelta(minutes=12), START + timedelta(minutes=15)))
+        # Only the second sealed segment overlaps the range
+        assert [e.timestamp.minute for e in events] == list(range(10, 20))
+
+        assert log.remove_before(START + timedelta(minutes=15)) == 1
+        log.close()
+        assert all(name.endswith(".seg") for name in (path.name for path in tmp_path.iterdir()))
+
+
+    def test_segments_of_dead_processes_are_retired(self, tmp_path):
+        dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                              capture_output=True, text=True, check=True)
+        first = int((START - datetime(1970, 1, 1)).total_seconds() * 1000)
+        abandoned = tmp_path / f"{first:013d}-{int(dead.stdout)}-1.open"
+        abandoned.write_text(make_event(0).to_json() + "\n")
+        written = (START + timedelta(minutes=1) - datetime(1970, 1, 1)).total_seconds()
+        os.utime(abandoned, (written, written))
+
+        log = AuditSegmentLog(str(tmp_path), max_events=10)
+        log.append([make_event(5)])
+
+        # Its span ends at its last write, so later ranges skip it
+        assert [e.timestamp.minute for e in log.read(START + timedelta(minutes=2))] == [5]
+        assert log.remove_before(datetime.now() + timedelta(days=1)) == 1
+        assert not abandoned.exists()
+        # This process's open segment stays until sealed
+        assert [path.suffix for path in tmp_path.iterdir()] == [".open"]
+        log.close()
+
+
+class TestIndexedAuditLogger:
+    """AuditLogger queries through the index and follows the shared feed."""
+
+    def setup_method(self):
+        self.store = InMemoryStateStore()
+
+    def test_events_past_the_index_come_from_history(self, tmp_path):
+        config = {
+            "log_file": str(tmp_path / "audit.log"), "max_events": 5,
+            "segment_dir": str(tmp_path / "segments")
+        }
+        logger = AuditLogger(config, store=self.store)
+        for i in range(8):
+            logger.log_authentication_event(
+                AuditEventType.LOGIN_FAILURE, f"user{i}", "10.0.0.1", result="failure"
+            )
+
+        events = logger.get_events(limit=100)
+        assert [event.user_id for event in events] == [f"user{i}" for i in range(7, -1, -1)]
+        assert len(logger.events) == 5
+
+        logger.close()
+        assert [path.suffix for path in (tmp_path / "segments").iterdir()] == [".seg"]
+
+    def test_loggers_index_each_others_events(self, tmp_path):
+        config = {"log_file": str(tmp_path / "audit.log")}
+        writer, reader = AuditLogger(config, store=self.store), AuditLogger(config, store=self.store)
+
+        writer.log_authentication_event(AuditEventType.LOGIN_FAILURE, "user1", "10.0.0.1", result="failure")
+        writer.flush()
+        assert [e.user_id for e in reader.get_events(ip_address="10.0.0.1")] == ["user1"]
+
+        writer.log_authentication_event(AuditEventType.LOGIN_SUCCESS, "user2", "10.0.0.2")
+        writer.flush()
+        assert len(reader.get_events()) == 2
+        assert len(reader.events) == 2
+
+    def test_anomalies_are_counted_incrementally(self, tmp_path):
+        logger = AuditLogger({"log_file": str(tmp_path / "audit.log")}, store=self.store)
+        for _ in range(5):
+            logger.log_authentication_event(
+                AuditEventType.LOGIN_FAILURE, "user1", "10.0.0.1", result="failure"
+            )
+        logger.log_authentication_event(AuditEventType.LOGIN_FAILURE, "user2", "10.0.0.2", result="failure")
+
+        anomalies = logger.detect_anomalies(timedelta(hours=1))
+
+        assert {(a["type"], a.get("user_id") or a.get("ip_address"), a["failed_attempts"]) for a in anomalies} == {
+            ("brute_force_user", "user1", 5), ("brute_force_ip", "10.0.0.1", 5)
+        }
+        # Other windows are answered from the event type index
+        assert len(logger.detect_anomalies(timedelta(minutes=10))) == 2
+        # Later calls only take in new events
+        assert logger.detect_anomalies(timedelta(hours=1)) == anomalies
@@ -23,4 +23,58 @@ class TestPermission:
         )
         
         assert permission.name == "user.read"
-        assert per
\ No newline at end of file
+        assert per
+
+class TestCompiledPermissions:
+    """Compiled tables decide like walking each role's permissions."""
+    
+    def setup_method(self):
+        self.registry = RoleRegistry()
+        self.rbac = RoleBasedPermission(self.registry)
+    
+    def legacy_check(self, roles, resource, action, context=None):
+        return any(
+            permission.matches(resource, action, context)
+            for role_name in roles
+            for permission in (self.registry.get_role(role_name) or Role("missing")).get_all_permissions(self.registry)
+        )
+    
+    def test_decisions_match_permission_walk(self):
+        owned = Permission(
+            "post.edit_own", PermissionAction.UPDATE, "post", conditions={"owner_id": "user1"}
+        )
+        wildcard = Permission("audit.read", PermissionAction.READ, "*")
+        self.registry.register_permission(owned)
+        author = self.registry.create_role("author", parent_roles=["user"])
+        author.add_permission(owned)
+        auditor = self.registry.create_role("auditor")
+        auditor.add_permission(wildcard)
+        
+        role_sets = [[], ["guest"], ["user"], ["author"], ["admin"], ["auditor", "guest"], ["missing"]]
+        contexts = [None, {"owner_id": "user1"}, {"owner_id": "user2"}]
+        for roles in role_sets:
+            for resource in ["user", "blog", "comment", "system", "post", "other"]:
+                for action in PermissionAction:
+                    for context in contexts:
+                        assert self.rbac.check_permission(roles, resource, action, context) == \
+                            self.legacy_check(roles, resource, action, context), (roles, resource, action, context)
+    
+    def test_role_changes_invalidate_compiled_tables(self):
+        role = self.registry.create_role("reviewer")
+        assert not self.rbac.check_permission(["reviewer"], "blog", PermissionAction.UPDATE)
+        
+        role.add_permission(self.registry.get_permission("blog.update"))
+        assert self.rbac.check_permission(["reviewer"], "blog", PermissionAction.UPDATE)
+        
+        role.add_parent_role("admin")
+        assert self.rbac.check_permission(["reviewer"], "system", PermissionAction.DELETE)
+        
+        self.registry.delete_role("reviewer")
+        assert not self.rbac.check_permission(["reviewer"], "blog", PermissionAction.UPDATE)
+    
+    def test_cyclic_hierarchy_is_flattened_once(self):
+        first = self.registry.create_role("first", parent_roles=["second"])
+        self.registry.create_role("second", parent_roles=["first"])
+        first.add_permission(self.registry.get_permission("blog.read"))
+        
+        assert self.registry.get_role_permissions("second") == {self.registry.get_permission("blog.read")}
@@ -2,12 +2,20 @@
 Tests for security utilities (password hashing and token management).
 """
 
+import os
 import pytest
 import bcrypt
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
-from auth_package.security import PasswordHasher, PasswordPolicy, TokenManager
+from auth_package.security import (
+    HashingOverloaded, HashingService, HashingUnavailable, PasswordHasher, PasswordPolicy,
+    TokenManager, tune_bcrypt_rounds
+)
 
 
 class TestPasswordHasher:
@@ -136,6 +144,128 @@ class TestPasswordHasher:
         
         with pytest.raises(ValueError):
             PasswordHasher(rounds=32)  # Too high
+    
+    def test_hash_rehashed_when_cost_changes(self):
+        """Test verify_and_update returns a new hash made with the current cost."""
+        hashed = self.hasher.hash_password("TestPassword123!")
+        assert self.hasher.verify_and_update("TestPassword123!", hashed) == (True, None)
+        
+        self.hasher.rounds = 5
+        matched, new_hash = self.hasher.verify_and_update("TestPassword123!", hashed)
+        
+        assert matched is True
+        assert new_hash.startswith("$2b$05$")
+        assert self.hasher.verify_password("TestPassword123!", new_hash)
+        assert self.hasher.verify_and_update("wrong", hashed) == (False, None)
+    
+    def test_tuned_rounds_stay_in_bounds(self):
+        """Test cost tuning to a target latency."""
+        assert tune_bcrypt_rounds(0.000001, min_rounds=4) == 4
+        assert tune_bcrypt_rounds(1000, max_rounds=14) == 14
+        assert 4 <= PasswordHasher(target_latency=0.01).rounds <= 31
+
+
+class TestHashingService:
+    """Test bcrypt offload and admission control."""
+    
+    def test_hashes_in_worker_processes(self):
+        service = HashingService(max_workers=1)
+        hasher = PasswordHasher(rounds=4, service=service)
+        try:
+            hashed = hasher.hash_password("TestPassword123!")
+            assert hasher.verify_password("TestPassword123!", hashed)
+            assert not hasher.verify_password("wrong", hashed)
+            assert not hasher.verify_password("TestPassword123!", "dummy_hash")
+        finally:
+            service.shutdown()
+        # Checking against the malformed hash fails and is not counted
+        assert service.stats["completed"] == 3
+    
+    def test_saturated_service_refuses_work(self):
+        service = HashingService(max_workers=0, max_pending=1)
+        hasher = PasswordHasher(rounds=4, service=service)
+        started, release = threading.Event(), threading.Event()
+        
+        def slow_hash(password, rounds):
+            started.set()
+            release.wait(5)
+            return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+        
+        with patch("auth_package.security._bcrypt_hash", slow_hash):
+            worker = threading.Thread(target=hasher.hash_password, args=("TestPassword123!",))
+            worker.start()
+            started.wait(5)
+            try:
+                with pytest.raises(HashingOverloaded) as overloaded:
+                    hasher.verify_password("TestPassword123!", "$2b$04$" + "a" * 53)
+            finally:
+                release.set()
+                worker.join()
+        
+        assert overloaded.value.retry_after >= 1
+        assert service.stats["rejected"] == 1
+        assert service.pending == 0
+    
+    def test_timed_out_hash_keeps_its_slot_until_it_finishes(self):
+        service = HashingService(max_workers=1, max_pending=1, timeout=0.05)
+        executor = ThreadPoolExecutor(1)
+        release = threading.Event()
+        
+        def slow_hash(password, rounds):
+            release.wait(5)
+            return b"hashed"
+        
+        with patch.object(service, "_pool", return_value=executor):
+            with pytest.raises(HashingOverloaded):
+                service._run(slow_hash, b"password", 4)
+            # The hash still occupies the worker, so new work is refused
+            assert service.pending == 1
+            with pytest.raises(HashingOverloaded):
+                service._run(slow_hash, b"password", 4)
+            release.set()
+            executor.shutdown(wait=True)
+        
+        assert service.pending == 0
+        assert service.stats == {"completed": 0, "rejected": 1, "timeouts": 1}
+    
+    def test_dead_worker_is_replaced(self):
+        service = HashingService(max_workers=1)
+        hasher = PasswordHasher(rounds=4, service=service)
+        try:
+            hashed = hasher.hash_password("TestPassword123!")
+            for pid in list(service._executor._processes):
+                os.kill(pid, signal.SIGKILL)
+            
+            # The broken pool is replaced instead of failing every check
+            assert hasher.verify_password("TestPassword123!", hashed)
+            assert hasher.verify_and_update("TestPassword123!", hashed) == (True, None)
+        finally:
+            service.shutdown()
+        assert service.pending == 0
+    
+    def test_failing_workers_are_not_a_wrong_password(self):
+        service = HashingService(max_workers=1)
+        hasher = PasswordHasher(rounds=4, service=service)
+        
+        with patch.object(service, "_submit", side_effect=BrokenProcessPool("worker died")):
+            with pytest.raises(HashingUnavailable):
+                hasher.verify_password("TestPassword123!", "$2b$04$" + "a" * 53)
+            with pytest.raises(HashingUnavailable):
+                hasher.verify_and_update("TestPassword123!", "$2b$04$" + "a" * 53)
+        service.shutdown()
+    
+    def test_only_successful_hashes_are_counted(self):
+        service = HashingService(max_workers=0)
+        
+        def failing_hash(password, rounds):
+            raise ValueError("bad salt")
+        
+        with pytest.raises(ValueError):
+            service._run(failing_hash, b"password", 4)
+        service._run(lambda password, rounds: b"hashed", b"password", 4)
+        
+        assert service.stats["completed"] == 1
+        assert service.pending == 0
 
 
 class TestTokenManager:
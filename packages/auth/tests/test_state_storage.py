@@ -0,0 +1,322 @@
+"""
+Tests for shared state storage behind lockouts, sessions and audit events.
+"""
+
+import pytest
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+from auth_package import (
+    AccountLockoutManager, AuditEventType, AuditLogger, DeviceInfo,
+    InMemoryStateStore, RedisStateStore, SessionManager, create_state_store
+)
+from auth_package.storage import StateStore, TimeBucketedCounters
+
+
+class FakeClock:
+    """Controllable time source for expiry tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+STORE_FACTORIES = [
+    pytest.param(InMemoryStateStore, id="memory"),
+    pytest.param(
+        lambda **kwargs: RedisStateStore(client=fakeredis.FakeRedis(), prefix="test:", **kwargs),
+        id="redis",
+        marks=pytest.mark.skipif(fakeredis is None, reason="fakeredis not installed")
+    ),
+]
+
+
+class TestStateStores:
+    """Both backends behave the same way."""
+
+    @pytest.mark.parametrize("make_store", STORE_FACTORIES)
+    def test_operations(self, make_store):
+        store = make_store()
+        store.set("value", {"a": [1, 2]})
+        assert store.get("value") == {"a": [1, 2]}
+        assert store.get_many(["value", "missing"]) == {"value": {"a": [1, 2]}}
+
+        assert store.incr("counter", ttl=60) == 1
+        assert store.incr("counter", 2, ttl=60) == 3
+
+        assert store.add("set", "x") == 1
+        assert store.add("set", "y") == 2
+        store.discard("set", "x")
+        assert store.members("set") == {"y"}
+
+        for i in range(5):
+            store.push("list", {"i": i}, max_length=3)
+        assert [item["i"] for item in store.items("list")] == [2, 3, 4]
+        store.trim("list", 2)
+        assert store.items("list") == [{"i": 4}]
+
+        assert store.delete("value", "counter", "missing") == 2
+        assert store.get("value") is None
+
+    @pytest.mark.parametrize("make_store", STORE_FACTORIES)
+    def test_sliding_window_counters(self, make_store):
+        clock = FakeClock()
+        store = make_store(clock=clock)
+
+        assert store.incr_window("failures", 60) == 1
+        clock.now += 30
+        assert store.incr_window("failures", 60, 2) == 3
+        clock.now += 35
+        # The first hit has left the window; the later two have not
+        assert store.count_window("failures", 60) == 2
+        clock.now += 30
+        assert store.count_window("failures", 60) == 0
+
+        store.incr_window("failures", 60)
+        assert store.delete("failures") == 1
+        assert store.count_window("failures", 60) == 0
+
+    @pytest.mark.parametrize("make_store", STORE_FACTORIES)
+    def test_list_can_be_followed_as_a_feed(self, make_store):
+        store = make_store()
+        assert store.items_since("feed", 0) == (0, [])
+
+        sequences = [store.push("feed", {"i": i}, max_length=3) for i in range(5)]
+        assert sequences == [1, 2, 3, 4, 5]
+
+        assert store.items_since("feed", 3) == (5, [{"i": 3}, {"i": 4}])
+        # Items trimmed before they were read are skipped
+        assert store.items_since("feed", 0) == (5, [{"i": 2}, {"i": 3}, {"i": 4}])
+        assert store.items_since("feed", 5) == (5, [])
+
+    @pytest.mark.parametrize("make_store", STORE_FACTORIES)
+    def test_sorted_sets(self, make_store):
+        store = make_store()
+        for member, score in [("c", 30), ("a", 10), ("b", 20), ("d", 40)]:
+            store.zadd("expiry", member, score)
+        assert store.zadd("expiry", "a", 35) == 4
+        store.zrem("expiry", "d")
+
+        assert store.zcard("expiry") == 3
+        assert store.zscore("expiry", "a") == 35
+        assert store.zscore("expiry", "d") is None
+        assert store.zrange_by_score("expiry", 30) == [("b", 20.0), ("c", 30.0)]
+        assert store.zrange_by_score("expiry", float("inf"), limit=1) == [("b", 20.0)]
+
+        assert store.zpop_by_score("expiry", 30, limit=1) == ["b"]
+        assert store.zpop_by_score("expiry", 30) == ["c"]
+        assert store.zpop_by_score("expiry", 30) == []
+        assert store.zrange_by_score("expiry", float("inf")) == [("a", 35.0)]
+
+    @pytest.mark.parametrize("make_store", STORE_FACTORIES)
+    def test_sorted_set_member_back_at_an_earlier_score(self, make_store):
+        store = make_store()
+        store.zadd("expiry", "m", 1)
+        store.zadd("expiry", "other", 50)
+        store.zrem("expiry", "m")
+        store.zadd("expiry", "m", 1)
+        store.zadd("expiry", "n", 2)
+        store.zadd("expiry", "n", 3)
+        store.zadd("expiry", "n", 2)
+
+        assert store.zrange_by_score("expiry", 10) == [("m", 1.0), ("n", 2.0)]
+        assert store.zpop_by_score("expiry", 10) == ["m", "n"]
+        assert store.zrange_by_score("expiry", float("inf")) == [("other", 50.0)]
+
+    def test_sorted_set_heap_stays_compact(self):
+        """Rescoring a member leaves stale heap entries that are bounded by a rebuild."""
+        store = InMemoryStateStore()
+        for score in range(10000):
+            store.zadd("activity", "session", score)
+
+        assert len(store._data["activity"]._heap) <= 66
+        assert store.zrange_by_score("activity", float("inf")) == [("session", 9999.0)]
+
+    @pytest.mark.parametrize("make_store", STORE_FACTORIES)
+    def test_capped_sets_keep_their_first_ttl(self, make_store):
+        clock = FakeClock()
+        store = make_store(clock=clock)
+
+        sizes = [store.add_capped("ips", f"10.0.0.{i}", 3, ttl=60) for i in range(5)]
+
+        assert sizes == [1, 2, 3, 3, 3]
+        assert len(store.members("ips")) == 3
+        if isinstance(store, InMemoryStateStore):
+            clock.now += 61
+            assert store.members("ips") == set()
+        else:
+            assert 0 < store.client.ttl("test:ips") <= 60
+
+    def test_in_memory_values_are_copies(self):
+        store = InMemoryStateStore()
+        value = {"events": []}
+        store.set("key", value)
+        value["events"].append("changed")
+
+        assert store.get("key") == {"events": []}
+
+    def test_counter_window_expires(self):
+        clock = FakeClock()
+        store = InMemoryStateStore(clock=clock)
+        store.incr("counter", ttl=60)
+
+        clock.now += 30
+        assert store.incr("counter", ttl=60) == 2
+
+        clock.now += 31
+        assert store.get("counter") is None
+        assert store.incr("counter", ttl=60) == 1
+
+    def test_writes_sweep_expired_keys(self):
+        clock = FakeClock()
+        store = InMemoryStateStore(clock=clock)
+        for i in range(50):
+            store.add(f"ips:user{i}", "10.0.0.1", ttl=5)
+        store.add("ips:user0", "10.0.0.2", ttl=10)
+
+        clock.now += 6
+        store.incr("fresh", ttl=5)
+
+        assert len(store) == 2
+        assert store.members("ips:user0") == {"10.0.0.1", "10.0.0.2"}
+
+    def test_idle_keys_are_evicted(self):
+        store = InMemoryStateStore(max_keys=3)
+        for key in ["a", "b", "c"]:
+            store.set(key, key)
+        store.get("a")
+
+        store.set("d", "d")
+
+        assert store.get("b") is None
+        assert [store.get(key) for key in ["a", "c", "d"]] == ["a", "c", "d"]
+        assert store.evictions == 1
+
+    def test_bucketed_counters_evict_idle_keys(self):
+        clock = FakeClock()
+        counters = TimeBucketedCounters(window=60, buckets=6, max_keys=3, clock=clock)
+        for key in ["a", "b", "c"]:
+            counters.add(key)
+        counters.add("a")
+
+        counters.add("d")
+
+        assert len(counters) == 3
+        assert "b" not in counters
+        assert counters.count("a") == 2
+        assert counters.evictions == 1
+
+    def test_bucketed_counter_updates_are_constant_time(self):
+        """Bucket work per update is bounded by the ring size, not the hit count."""
+        clock = FakeClock()
+        counters = TimeBucketedCounters(window=60, buckets=6, clock=clock)
+        for _ in range(10000):
+            counters.add("user")
+            clock.now += 0.001
+
+        assert counters.count("user") == 10000
+        clock.now += 3600
+        assert counters.count("user") == 0
+
+    def test_create_state_store(self):
+        assert isinstance(create_state_store(), InMemoryStateStore)
+        assert isinstance(create_state_store({"backend": "redis"}), RedisStateStore)
+        with pytest.raises(ValueError):
+            create_state_store({"backend": "memcached"})
+        with pytest.raises(TypeError):
+            StateStore()
+
+
+class TestSharedManagers:
+    """Managers sharing a store behave like one process-wide service."""
+
+    def setup_method(self):
+        self.store = InMemoryStateStore()
+
+    def test_lockout_is_shared_between_workers(self):
+        workers = [AccountLockoutManager(store=self.store) for _ in range(5)]
+
+        for worker in workers:
+            worker.record_login_attempt("user123", "10.0.0.1", False)
+
+        fresh_worker = AccountLockoutManager(store=self.store)
+        assert fresh_worker.is_account_locked("user123")
+        assert fresh_worker.get_lockout_info("user123")["attempt_count"] == 5
+        assert fresh_worker.unlock_account("user123")
+        assert not workers[0].is_account_locked("user123")
+
+    def test_failure_window_expires(self):
+        clock = FakeClock()
+        manager = AccountLockoutManager(
+            {"reset_attempts_after": 60}, store=InMemoryStateStore(clock=clock)
+        )
+        for _ in range(4):
+            manager.record_login_attempt("user123", "10.0.0.1", False)
+
+        clock.now += 61
+        result = manager.record_login_attempt("user123", "10.0.0.1", False)
+
+        assert not result["locked"]
+        assert result["attempts_remaining"] == 4
+
+    def test_progressive_lockout_doubles(self):
+        manager = AccountLockoutManager(store=self.store)
+        durations = []
+        for _ in range(2):
+            for _ in range(5):
+                result = manager.record_login_attempt("user123", "10.0.0.1", False)
+            durations.append(result["lockout_duration"])
+            manager.unlock_account("user123")
+
+        assert durations == [1800, 3600]
+
+    def test_ip_and_distributed_attempts_are_flagged(self):
+        manager = AccountLockoutManager({"max_ip_attempts": 3}, store=self.store)
+
+        results = [
+            manager.record_login_attempt(f"user{i}", "10.0.0.1", False) for i in range(3)
+        ]
+
+        assert [result["suspicious_activity"] for result in results] == [False, False, True]
+
+    def test_distinct_ip_sets_stay_bounded(self):
+        manager = AccountLockoutManager(
+            {"max_failed_attempts": 1000, "max_ip_attempts": 1000, "suspicious_activity_threshold": 4}, store=self.store
+        )
+
+        for i in range(50):
+            manager.record_login_attempt("user123", f"10.0.0.{i}", False)
+            manager.record_login_attempt(f"user{i}", "10.0.1.1", False)
+
+        assert len(self.store.members("lockout:ips:user123")) == 6
+        assert len(self.store.members("lockout:users:10.0.1.1")) == 5
+
+    def test_sessions_are_shared_between_workers(self):
+        device = DeviceInfo(device_id="device", user_agent="Browser", ip_address="10.0.0.1")
+        session = SessionManager(store=self.store).create_session("user123", device)
+
+        other_worker = SessionManager(store=self.store)
+        assert other_worker.validate_session(session.session_id, device)
+        assert [s.session_id for s in other_worker.get_user_sessions("user123")] == [session.session_id]
+
+        other_worker.revoke_session(session.session_id)
+        assert SessionManager(store=self.store).get_session(session.session_id) is None
+
+    def test_audit_events_are_shared_and_bounded(self, tmp_path):
+        config = {"log_file": str(tmp_path / "audit.log"), "max_events": 3}
+        loggers = [AuditLogger(config, store=self.store) for _ in range(2)]
+
+        for i in range(4):
+            loggers[i % 2].log_authentication_event(
+                AuditEventType.LOGIN_FAILURE, f"user{i}", "10.0.0.1", result="failure"
+            )
+        for logger in loggers:
+            logger.flush()
+
+        events = AuditLogger(config, store=self.store).get_events()
+        assert sorted(event.user_id for event in events) == ["user1", "user2", "user3"]
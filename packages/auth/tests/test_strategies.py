@@ -7,11 +7,13 @@ import jwt
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 
+from auth_package.storage import InMemoryStateStore
 from auth_package.strategies import (
     JWTStrategy, JWTConfig, OAuth2Strategy, TokenPair,
     setup_google_oauth2, setup_github_oauth2, setup_facebook_oauth2,
     setup_microsoft_oauth2, setup_linkedin_oauth2
 )
+from auth_package.token_state import RevocationFilter, TokenStateStore
 
 
 class TestJWTStrategy:
@@ -135,6 +137,114 @@ class TestJWTStrategy:
         
         with pytest.raises(jwt.InvalidTokenError):
             self.jwt_strategy.validate_token(tokens2.refresh_token, "refresh")
+    
+    def test_revoke_access_token(self):
+        """Test access token revocation."""
+        tokens = self.jwt_strategy.generate_tokens("user123")
+        assert self.jwt_strategy.validate_token(tokens.access_token)["user_id"] == "user123"
+        
+        assert self.jwt_strategy.revoke_access_token(tokens.access_token) is True
+        
+        with pytest.raises(jwt.InvalidTokenError, match="revoked"):
+            self.jwt_strategy.validate_token(tokens.access_token)
+        assert self.jwt_strategy.revoke_access_token(tokens.access_token) is False
+    
+    def test_verified_tokens_are_cached_until_expiry(self):
+        """Test repeated validation skips signature verification."""
+        tokens = self.jwt_strategy.generate_tokens("user123")
+        first = self.jwt_strategy.validate_token(tokens.access_token)
+        first["user_id"] = "changed"
+        
+        with patch("auth_package.strategies.jwt.decode") as decode:
+            payload = self.jwt_strategy.validate_token(tokens.access_token)
+        
+        decode.assert_not_called()
+        assert payload["user_id"] == "user123"
+    
+    def test_tampered_token_is_not_served_from_cache(self):
+        """Test only the exact verified token string hits the cache."""
+        tokens = self.jwt_strategy.generate_tokens("user123")
+        self.jwt_strategy.validate_token(tokens.access_token)
+        
+        with pytest.raises(jwt.InvalidTokenError):
+            self.jwt_strategy.validate_token(tokens.access_token[:-2] + "xx")
+
+
+class TestSharedTokenState:
+    """Strategies sharing a store behave like one token service."""
+    
+    def setup_method(self):
+        self.store = InMemoryStateStore()
+        self.config = JWTConfig(secret_key="test-secret-key")
+    
+    def test_refresh_tokens_are_shared_between_workers(self):
+        issuer = JWTStrategy(self.config, store=self.store)
+        tokens = issuer.generate_tokens("user123")
+        
+        other_worker = JWTStrategy(self.config, store=self.store)
+        assert other_worker.refresh_access_token(tokens.refresh_token).access_token
+        assert other_worker.revoke_all_user_tokens("user123") == 2
+        
+        with pytest.raises(jwt.InvalidTokenError, match="revoked"):
+            issuer.validate_token(tokens.refresh_token, "refresh")
+    
+    def test_refresh_metadata_expires_with_the_token(self):
+        clock = Mock(return_value=1000.0)
+        strategy = JWTStrategy(self.config, store=InMemoryStateStore(clock=clock))
+        tokens = strategy.generate_tokens("user123")
+        token_id = jwt.decode(tokens.refresh_token, options={"verify_signature": False})["token_id"]
+        assert strategy.tokens.get_refresh_token(token_id)["is_active"]
+        
+        clock.return_value += self.config.refresh_token_lifetime.total_seconds() + 1
+        assert strategy.tokens.get_refresh_token(token_id) is None
+    
+    def test_access_revocation_reaches_other_workers_on_sync(self):
+        issuer = JWTStrategy(self.config, token_state=TokenStateStore(self.store, sync_interval=3600))
+        other_worker = JWTStrategy(self.config, token_state=TokenStateStore(self.store, sync_interval=3600))
+        tokens = issuer.generate_tokens("user123")
+        other_worker.validate_token(tokens.access_token)
+        
+        issuer.revoke_access_token(tokens.access_token)
+        # Not seen until the next sync; validation stayed local
+        other_worker.validate_token(tokens.access_token)
+        
+        other_worker.tokens.sync()
+        with pytest.raises(jwt.InvalidTokenError, match="revoked"):
+            other_worker.validate_token(tokens.access_token)
+    
+    def test_unrevoked_tokens_are_checked_without_the_store(self):
+        token_state = TokenStateStore(self.store, sync_interval=3600)
+        strategy = JWTStrategy(self.config, token_state=token_state)
+        revoked = strategy.generate_tokens("user1")
+        strategy.revoke_access_token(revoked.access_token)
+        tokens = [strategy.generate_tokens(f"user{i}") for i in range(50)]
+        
+        with patch.object(self.store, "get") as store_get:
+            for pair in tokens:
+                strategy.validate_token(pair.access_token)
+        
+        store_get.assert_not_called()
+        assert token_state.stats["checks"] >= 50
+
+
+class TestRevocationFilter:
+    """Test the revoked token id filter."""
+    
+    def test_added_ids_are_always_found(self):
+        revocations = RevocationFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            revocations.add(f"jti{i}")
+        
+        assert all(f"jti{i}" in revocations for i in range(1000))
+        assert revocations.count == 1000
+    
+    def test_false_positive_rate_is_near_target(self):
+        revocations = RevocationFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            revocations.add(f"jti{i}")
+        
+        false_positives = sum(f"other{i}" in revocations for i in range(10000))
+        assert false_positives < 300
 
 
 class TestOAuth2Strategy:
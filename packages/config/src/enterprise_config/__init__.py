@@ -13,7 +13,9 @@ from .exceptions import (
     FeatureFlagError,
 )
 from .feature_flags import FeatureFlagManager
+from .propagation import ConfigChangePropagator
 from .secrets import SecretsManager
+from .snapshot import ConfigSnapshot
 from .validators import ConfigValidator
 
 __version__ = "1.0.0"
@@ -29,6 +31,8 @@ __all__ = [
     "SecretNotFoundError",
     "FeatureFlagError",
     "FeatureFlagManager",
+    "ConfigChangePropagator",
     "SecretsManager",
+    "ConfigSnapshot",
     "ConfigValidator",
 ]
\ No newline at end of file
@@ -3,7 +3,7 @@ Base backend interface for configuration storage.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 
 class BaseBackend(ABC):
@@ -82,6 +82,43 @@ class BaseBackend(ABC):
         """
         return []
 
+    def get_version(self) -> int:
+        """
+        Get the latest change version written to this backend.
+
+        Returns:
+            Version counter (0 if the backend does not version changes)
+        """
+        return 0
+
+    def get_config_versions(self) -> Dict[str, int]:
+        """
+        Get the version of each configuration's latest change.
+
+        Returns:
+            Dictionary mapping config names to versions (empty if not supported)
+        """
+        return {}
+
+    def subscribe(
+        self,
+        on_change: Callable[[Dict[str, Any]], None],
+        on_resync: Callable[[], None],
+        resync_interval: float = 30.0,
+    ) -> Optional[Any]:
+        """
+        Listen for change events pushed by the backend.
+
+        Args:
+            on_change: Called with each event: {"config", "version", "data"}
+            on_resync: Called when events may have been missed
+            resync_interval: Seconds between catch-up checks
+
+        Returns:
+            Subscription with a close() method, or None if not supported
+        """
+        return None
+
     def health_check(self) -> bool:
         """
         Check if backend is healthy and accessible.
@@ -126,6 +126,8 @@ class BackendFactory:
             "retry_delay": kwargs.get("retry_delay", 1.0),
             "ssl_enabled": kwargs.get("ssl_enabled", False),
             "password": kwargs.get("password"),
+            "client": kwargs.get("client"),
+            "publish_changes": kwargs.get("publish_changes", True),
         }
 
         # Add any additional Redis parameters
@@ -3,7 +3,9 @@ Redis-based configuration backend.
 """
 
 import json
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 try:
     import redis
@@ -22,6 +24,11 @@ class RedisBackend(BaseBackend):
     
     Configuration is stored as JSON strings in Redis with configurable key prefixes.
     Supports Redis clustering and SSL connections.
+    
+    Every write bumps a version counter and publishes a change event
+    carrying the config name, its new version and its new data, so
+    processes that ``subscribe`` apply changes as they happen instead of
+    polling.
     """
 
     def __init__(
@@ -33,6 +40,8 @@ class RedisBackend(BaseBackend):
         retry_delay: float = 1.0,
         ssl_enabled: bool = False,
         password: Optional[str] = None,
+        client: Optional[Any] = None,
+        publish_changes: bool = True,
         **redis_kwargs,
     ):
         """
@@ -46,6 +55,9 @@ class RedisBackend(BaseBackend):
             retry_delay: Delay between retries in seconds
             ssl_enabled: Whether to use SSL connection
             password: Redis password
+            client: Existing Redis client to use instead of connecting to url;
+                it must decode responses
+            publish_changes: Whether writes publish change events
             **redis_kwargs: Additional Redis connection parameters
         """
         if redis is None:
@@ -56,10 +68,17 @@ class RedisBackend(BaseBackend):
         self.connection_timeout = connection_timeout
         self.retry_attempts = retry_attempts
         self.retry_delay = retry_delay
+        self.publish_changes = publish_changes
+
+        # Change tracking lives outside key_prefix so list_configs and
+        # clear_all_configs never see it
+        self.version_key = f"changes:{key_prefix}version"
+        self.versions_key = f"changes:{key_prefix}versions"
+        self.changes_channel = f"changes:{key_prefix}events"
 
         # Parse Redis URL and create connection
         try:
-            self.redis_client = redis.from_url(
+            self.redis_client = client or redis.from_url(
                 url,
                 socket_timeout=connection_timeout,
                 socket_connect_timeout=connection_timeout,
@@ -140,7 +159,8 @@ class RedisBackend(BaseBackend):
             data = json.dumps(config_data, ensure_ascii=False, separators=(',', ':'))
             
             def _save():
-                return self.redis_client.set(key, data)
+                versions = self._versioned_write(lambda pipe: ([config_name], lambda pipe: pipe.set(key, data)))
+                self._publish_changes(versions, {config_name: config_data})
                 
             self._execute_with_retry(_save)
             
@@ -164,8 +184,15 @@ class RedisBackend(BaseBackend):
         try:
             key = self._get_key(config_name)
             
+            def _prepare(pipe):
+                if not pipe.exists(key):
+                    return [], lambda pipe: None
+                return [config_name], lambda pipe: pipe.delete(key)
+
             def _delete():
-                return self.redis_client.delete(key) > 0
+                versions = self._versioned_write(_prepare, watch=[key])
+                self._publish_changes(versions, {})
+                return bool(versions)
                 
             return self._execute_with_retry(_delete)
             
@@ -309,34 +336,26 @@ class RedisBackend(BaseBackend):
         """
         key = self._get_key(config_name)
         
+        updated = {}
+
+        def _prepare(pipe):
+            # Get current value while the key is watched
+            current_data = pipe.get(key)
+            if current_data:
+                current_config = json.loads(current_data)
+            else:
+                current_config = {}
+            
+            # Apply update function
+            updated[config_name] = update_func(current_config)
+            data = json.dumps(updated[config_name], ensure_ascii=False)
+            return [config_name], lambda pipe: pipe.set(key, data)
+
         def _atomic_update():
-            with self.redis_client.pipeline() as pipe:
-                while True:
-                    try:
-                        # Watch the key for changes
-                        pipe.watch(key)
-                        
-                        # Get current value
-                        current_data = pipe.get(key)
-                        if current_data:
-                            current_config = json.loads(current_data)
-                        else:
-                            current_config = {}
-                        
-                        # Apply update function
-                        updated_config = update_func(current_config)
-                        
-                        # Start transaction
-                        pipe.multi()
-                        pipe.set(key, json.dumps(updated_config, ensure_ascii=False))
-                        
-                        # Execute transaction
-                        pipe.execute()
-                        return updated_config
-                        
-                    except redis.WatchError:
-                        # Key was modified, retry
-                        continue
+            # Retried by _versioned_write if the key is modified meanwhile
+            versions = self._versioned_write(_prepare, watch=[key])
+            self._publish_changes(versions, updated)
+            return updated[config_name]
                         
         try:
             return self._execute_with_retry(_atomic_update)
@@ -389,13 +408,16 @@ class RedisBackend(BaseBackend):
             configs: Dictionary mapping config names to their data
         """
         try:
+            data = {
+                self._get_key(config_name): json.dumps(config_data, ensure_ascii=False)
+                for config_name, config_data in configs.items()
+            }
+
             def _bulk_save():
-                pipe = self.redis_client.pipeline()
-                for config_name, config_data in configs.items():
-                    key = self._get_key(config_name)
-                    data = json.dumps(config_data, ensure_ascii=False)
-                    pipe.set(key, data)
-                pipe.execute()
+                if not configs:
+                    return
+                versions = self._versioned_write(lambda pipe: (list(configs), lambda pipe: pipe.mset(data)))
+                self._publish_changes(versions, configs)
                 
             self._execute_with_retry(_bulk_save)
             
@@ -417,11 +439,19 @@ class RedisBackend(BaseBackend):
         try:
             pattern = f"{self.key_prefix}*"
             
+            def _prepare(pipe):
+                keys = pipe.keys(pattern)
+                if not keys:
+                    return [], lambda pipe: None
+                config_names = [key[len(self.key_prefix):] for key in keys]
+                return config_names, lambda pipe: pipe.delete(*keys)
+
             def _clear_all():
-                keys = self.redis_client.keys(pattern)
-                if keys:
-                    return self.redis_client.delete(*keys)
-                return 0
+                # Deleted configs get versions and events like delete_config,
+                # so subscribers drop them too
+                versions = self._versioned_write(_prepare)
+                self._publish_changes(versions, {})
+                return len(versions)
                 
             return self._execute_with_retry(_clear_all)
             
@@ -431,4 +461,183 @@ class RedisBackend(BaseBackend):
                 backend_type="redis",
                 operation="clear_all",
                 original_error=e,
-            )
\ No newline at end of file
+            )
+
+    def _versioned_write(
+        self,
+        prepare: Callable[[Any], Tuple[List[str], Callable[[Any], Any]]],
+        watch: Iterable[str] = (),
+    ) -> Dict[str, int]:
+        """
+        Run a write in one transaction with the versions it creates.
+
+        ``prepare`` is called with a pipeline watching ``watch`` and the
+        version counter, so it may read them, and returns the names of the
+        configs the write changes and a function queueing the write. The
+        write, the counter and each config's new version in the versions
+        hash are set in the same MULTI, so versions follow write order and
+        the versions hash never lags the data. The transaction is retried
+        if a watched key changes first.
+
+        Returns:
+            Dictionary mapping the changed config names to their versions
+        """
+        with self.redis_client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(*watch, self.version_key)
+                    config_names, queue = prepare(pipe)
+                    version = int(pipe.get(self.version_key) or 0)
+                    versions = {name: version + i for i, name in enumerate(config_names, 1)}
+                    pipe.multi()
+                    queue(pipe)
+                    if self.publish_changes and versions:
+                        pipe.set(self.version_key, version + len(versions))
+                        pipe.hset(self.versions_key, mapping=versions)
+                    pipe.execute()
+                    return versions
+                except redis.WatchError:
+                    continue
+
+    def _publish_changes(self, versions: Dict[str, int], configs: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Announce written configs; names missing from configs were deleted.
+
+        Pub/sub delivery is best effort; subscribers catch up from the
+        versions hash.
+        """
+        if not self.publish_changes or not versions:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        for config_name, version in versions.items():
+            event = json.dumps(
+                {"config": config_name, "version": version, "data": configs.get(config_name)},
+                ensure_ascii=False,
+                separators=(',', ':'),
+                default=str,
+            )
+            pipe.publish(self.changes_channel, event)
+        pipe.execute()
+
+    def get_version(self) -> int:
+        """
+        Get the latest change version written to this backend.
+
+        Returns:
+            Version counter, 0 if nothing was written since versioning began
+        """
+        return int(self._execute_with_retry(self.redis_client.get, self.version_key) or 0)
+
+    def get_config_versions(self) -> Dict[str, int]:
+        """
+        Get the version of each configuration's latest change.
+
+        Returns:
+            Dictionary mapping config names to versions
+        """
+        versions = self._execute_with_retry(self.redis_client.hgetall, self.versions_key)
+        return {config_name: int(version) for config_name, version in versions.items()}
+
+    def subscribe(
+        self,
+        on_change: Callable[[Dict[str, Any]], None],
+        on_resync: Callable[[], None],
+        resync_interval: float = 30.0,
+    ) -> "RedisChangeSubscription":
+        """
+        Start listening for change events in a background thread.
+
+        Args:
+            on_change: Called with each event: {"config", "version", "data"}
+            on_resync: Called on (re)connecting and every resync_interval
+                seconds, to catch up on events that were missed
+            resync_interval: Seconds between catch-up checks
+
+        Returns:
+            Running subscription; close() it to stop
+        """
+        subscription = RedisChangeSubscription(self, on_change, on_resync, resync_interval)
+        subscription.start()
+        return subscription
+
+
+class RedisChangeSubscription:
+    """
+    Background listener for a RedisBackend's change events.
+
+    Runs on a daemon thread. Connection errors are retried with backoff,
+    and every (re)connection triggers a resync, since events published
+    while disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        backend: RedisBackend,
+        on_change: Callable[[Dict[str, Any]], None],
+        on_resync: Callable[[], None],
+        resync_interval: float = 30.0,
+        poll_timeout: float = 1.0,
+    ):
+        self.backend = backend
+        self.on_change = on_change
+        self.on_resync = on_resync
+        self.resync_interval = resync_interval
+        self.poll_timeout = poll_timeout
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the listener thread."""
+        self._running.set()
+        self._thread = threading.Thread(target=self._listen, name="config-changes", daemon=True)
+        self._thread.start()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the listener thread, waiting for it to exit unless wait is False."""
+        self._running.clear()
+        if wait and self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.poll_timeout + 1.0)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def _listen(self) -> None:
+        backoff = 0.1
+        while self._running.is_set():
+            pubsub = self.backend.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.backend.changes_channel)
+                self._resync()
+                resynced_at = time.monotonic()
+                backoff = 0.1
+                while self._running.is_set():
+                    message = pubsub.get_message(timeout=self.poll_timeout)
+                    if message and message.get("type") == "message":
+                        self._dispatch(message["data"])
+                    if time.monotonic() - resynced_at >= self.resync_interval:
+                        self._resync()
+                        resynced_at = time.monotonic()
+            except (RedisError, BackendError) as e:
+                print(f"Config change subscription error, reconnecting: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+    def _dispatch(self, data: str) -> None:
+        try:
+            self.on_change(json.loads(data))
+        except Exception as e:
+            print(f"Error applying config change: {e}")
+
+    def _resync(self) -> None:
+        try:
+            self.on_resync()
+        except BackendError:
+            raise
+        except Exception as e:
+            print(f"Error resyncing config changes: {e}")
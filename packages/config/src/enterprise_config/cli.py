@@ -132,6 +132,9 @@ def create_parser() -> argparse.ArgumentParser:
         help="Show decrypted values (dangerous!)",
     )
 
+    # Version command
+    subparsers.add_parser("version", help="Show configuration change versions")
+
     # Export command
     export_parser = subparsers.add_parser("export", help="Export configuration")
     export_parser.add_argument(
@@ -367,6 +370,18 @@ def handle_secret(args) -> int:
         return 1
 
 
+def handle_version(args) -> int:
+    """Handle version command."""
+    try:
+        config = create_config_manager(args)
+        print(json.dumps(config.get_version_info(), indent=2, sort_keys=True))
+        return 0
+
+    except Exception as e:
+        print(f"Error getting configuration version: {e}")
+        return 1
+
+
 def handle_export(args) -> int:
     """Handle export command."""
     try:
@@ -476,6 +491,8 @@ def main() -> int:
             return handle_feature_flag(args)
         elif args.command == "secret":
             return handle_secret(args)
+        elif args.command == "version":
+            return handle_version(args)
         elif args.command == "export":
             return handle_export(args)
         elif args.command == "import":
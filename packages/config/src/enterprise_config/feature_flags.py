@@ -1,15 +1,142 @@
 """
 Feature flag management system.
+
+Flags are compiled when they are loaded or changed: environments and
+user groups become sets, time windows become epoch bounds and context
+rules become predicates, so ``is_enabled`` only compares precomputed
+values. Percentage rollouts bucket users with CRC32; flags stored
+before CRC32 bucketing keep MD5 (``metadata["bucketing"]``) so their
+users stay in the same buckets.
 """
 
+import calendar
+import contextvars
 import hashlib
-import random
-from typing import Any, Dict, List, Optional
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 from .models import Environment, FeatureFlag
 from .exceptions import FeatureFlagError
 
+# Flag evaluations cached for the current request, see FeatureFlagManager.request_cache
+_request_cache: "contextvars.ContextVar[Optional[Dict[Tuple, bool]]]" = contextvars.ContextVar(
+    "feature_flag_request_cache", default=None
+)
+
+
+def _epoch(moment: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are UTC, as utcnow() returns."""
+    if moment.tzinfo is None:
+        return calendar.timegm(moment.timetuple()) + moment.microsecond / 1e6
+    return moment.timestamp()
+
+
+def _compile_rule(rule: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Turn a context rule into a predicate over the context; unknown rule types always pass."""
+    rule_type = rule.get("type")
+    key = rule.get("key")
+
+    if rule_type == "equals":
+        expected_value = rule.get("value")
+        return lambda context: context.get(key) == expected_value
+
+    if rule_type == "in":
+        values = rule.get("values", [])
+        try:
+            allowed_values = frozenset(values)
+        except TypeError:
+            allowed_values = tuple(values)
+
+        def is_allowed(context: Dict[str, Any]) -> bool:
+            try:
+                return context.get(key) in allowed_values
+            except TypeError:  # Unhashable value, so not one of the hashable allowed values
+                return False
+
+        return is_allowed
+
+    if rule_type == "greater_than":
+        threshold = rule.get("value")
+        return lambda context: context.get(key, 0) > threshold
+
+    if rule_type == "less_than":
+        threshold = rule.get("value")
+        return lambda context: context.get(key, 0) < threshold
+
+    return None
+
+
+class CompiledFlag:
+    """
+    A feature flag prepared for evaluation.
+
+    Built from a ``FeatureFlag`` with everything that does not depend on
+    the caller worked out up front. A flag without a time window never
+    reads the clock.
+    """
+
+    __slots__ = (
+        "enabled", "environments", "user_groups", "starts_at", "ends_at",
+        "percentage", "bucket", "rules",
+    )
+
+    def __init__(self, flag: FeatureFlag):
+        self.enabled = flag.enabled
+        # Environments are stored as values; Environment members hash by
+        # name, so the set holds both to match either without converting
+        values = {getattr(env, "value", env) for env in flag.environments}
+        members = {env for env in Environment if env.value in values}
+        self.environments = frozenset(values | members) or None
+        self.user_groups = frozenset(flag.user_groups) or None
+        self.starts_at = _epoch(flag.start_date) if flag.start_date else None
+        self.ends_at = _epoch(flag.end_date) if flag.end_date else None
+        self.percentage = flag.percentage
+
+        prefix = f"{flag.name}:".encode("utf-8")
+        if flag.metadata.get("bucketing", "md5") == "crc32":
+            seed = zlib.crc32(prefix)
+            self.bucket = lambda user_id: zlib.crc32(str(user_id).encode("utf-8"), seed) % 10000
+        else:
+            # Same buckets as int(md5(...).hexdigest()[:8], 16) % 10000
+            self.bucket = lambda user_id: int.from_bytes(
+                hashlib.md5(prefix + str(user_id).encode("utf-8")).digest()[:4], "big"
+            ) % 10000
+
+        rules = [_compile_rule(rule) for rule in flag.metadata.get("context_rules") or []]
+        self.rules = tuple(rule for rule in rules if rule is not None) or None
+
+    def evaluate(
+        self,
+        environment: Optional[Environment],
+        user_group: Optional[str],
+        user_id: Optional[str],
+        context: Optional[Dict[str, Any]],
+    ) -> bool:
+        """Decide the flag for one caller, in the order ``FeatureFlag.is_active`` checks."""
+        if not self.enabled:
+            return False
+        if environment and self.environments is not None and environment not in self.environments:
+            return False
+        if user_group and self.user_groups is not None and user_group not in self.user_groups:
+            return False
+        if self.starts_at is not None or self.ends_at is not None:
+            now = time.time()
+            if self.starts_at is not None and now < self.starts_at:
+                return False
+            if self.ends_at is not None and now > self.ends_at:
+                return False
+        if self.percentage is not None and user_id:
+            if self.bucket(user_id) / 100.0 >= self.percentage:
+                return False
+        if context and self.rules is not None:
+            for rule in self.rules:
+                if not rule(context):
+                    return False
+        return True
+
 
 class FeatureFlagManager:
     """
@@ -21,39 +148,85 @@ class FeatureFlagManager:
     - A/B testing support
     """
 
-    def __init__(self, backend):
-        """Initialize feature flag manager with backend."""
+    def __init__(self, backend, bucketing: str = "crc32"):
+        """
+        Initialize feature flag manager with backend.
+
+        Args:
+            backend: Configuration backend holding the flags
+            bucketing: Rollout hash recorded on flags created by set_flag,
+                "crc32" or "md5" (the original bucketing)
+        """
+        if bucketing not in ("crc32", "md5"):
+            raise FeatureFlagError(f"Unknown bucketing: {bucketing}")
         self.backend = backend
+        self.bucketing = bucketing
         self._flag_cache: Dict[str, FeatureFlag] = {}
+        self._compiled: Dict[str, CompiledFlag] = {}
+        self._flag_data: Dict[str, Any] = {}
         self._load_flags()
 
     def _load_flags(self) -> None:
         """Load feature flags from backend."""
         try:
             flags_data = self.backend.load_config("feature_flags") or {}
-            self._flag_cache = {}
-            
-            for flag_name, flag_config in flags_data.items():
-                try:
-                    self._flag_cache[flag_name] = FeatureFlag(
-                        name=flag_name,
-                        **flag_config
-                    )
-                except Exception as e:
-                    print(f"Warning: Invalid feature flag '{flag_name}': {e}")
-
         except Exception as e:
             print(f"Warning: Failed to load feature flags: {e}")
-            self._flag_cache = {}
+            flags_data = {}
+
+        self.apply_flags(flags_data)
+
+    def apply_flags(self, flags_data: Optional[Dict[str, Any]]) -> None:
+        """
+        Replace the flag definitions, e.g. with a change pushed by the backend.
+
+        Flags whose definition did not change keep their parsed and
+        compiled form. The new flag sets are built aside and swapped in
+        whole, so concurrent evaluations see either the old or new flags.
+
+        Args:
+            flags_data: Flag name to flag configuration, None if deleted
+        """
+        flags_data = flags_data or {}
+        previous, previous_compiled = self._flag_cache, self._compiled
+        flag_cache, compiled = {}, {}
+
+        for flag_name, flag_config in flags_data.items():
+            if flag_name in previous_compiled and self._flag_data.get(flag_name) == flag_config:
+                flag_cache[flag_name] = previous[flag_name]
+                compiled[flag_name] = previous_compiled[flag_name]
+                continue
+            try:
+                flag = FeatureFlag(name=flag_name, **flag_config)
+                compiled[flag_name] = CompiledFlag(flag)
+                flag_cache[flag_name] = flag
+            except Exception as e:
+                print(f"Warning: Invalid feature flag '{flag_name}': {e}")
+
+        self._flag_data = dict(flags_data)
+        self._flag_cache, self._compiled = flag_cache, compiled
+
+    def _compile_flags(self) -> None:
+        """Rebuild the compiled flags after the flag definitions changed."""
+        compiled = {}
+        for flag_name, flag in self._flag_cache.items():
+            try:
+                compiled[flag_name] = CompiledFlag(flag)
+            except Exception as e:
+                print(f"Warning: Invalid feature flag '{flag_name}': {e}")
+        # Swapped in whole, so concurrent evaluations see the old or new set
+        self._compiled = compiled
 
     def _save_flags(self) -> None:
         """Save feature flags to backend."""
+        self._compile_flags()
         flags_data = {}
         for flag_name, flag in self._flag_cache.items():
             flag_dict = flag.dict()
             flag_dict.pop("name", None)  # Remove name as it's the key
             flags_data[flag_name] = flag_dict
 
+        self._flag_data = flags_data
         self.backend.save_config("feature_flags", flags_data)
 
     def is_enabled(
@@ -79,86 +252,49 @@ class FeatureFlagManager:
         Returns:
             True if feature is enabled, False otherwise
         """
-        try:
-            flag = self._flag_cache.get(flag_name)
-            if not flag:
-                return default
-
-            # Check basic activation
-            if not flag.is_active(
-                environment=environment,
-                user_group=user_group,
-                current_time=datetime.utcnow(),
-            ):
-                return False
-
-            # Check percentage rollout
-            if flag.percentage is not None and user_id:
-                if not self._is_user_in_percentage(flag_name, user_id, flag.percentage):
-                    return False
-
-            # Apply context-based rules if any
-            if context and flag.metadata.get("context_rules"):
-                return self._evaluate_context_rules(flag, context)
-
-            return flag.enabled
-
-        except Exception as e:
-            print(f"Error evaluating feature flag '{flag_name}': {e}")
-            return default
-
-    def _is_user_in_percentage(
-        self, flag_name: str, user_id: str, percentage: float
-    ) -> bool:
-        """
-        Determine if user is in percentage rollout using consistent hashing.
-        
-        This ensures the same user always gets the same result for a flag.
+        cache = _request_cache.get()
+        cached = cache is not None and not context
+        if cached:
+            key = (flag_name, environment, user_group, user_id, default)
+            enabled = cache.get(key)
+            if enabled is not None:
+                return enabled
+
+        compiled = self._compiled.get(flag_name)
+        if compiled is None:
+            enabled = default
+        else:
+            try:
+                enabled = compiled.evaluate(environment, user_group, user_id, context)
+            except Exception as e:
+                print(f"Error evaluating feature flag '{flag_name}': {e}")
+                enabled = default
+
+        if cached:
+            cache[key] = enabled
+        return enabled
+
+    @staticmethod
+    @contextmanager
+    def request_cache() -> Iterator[Dict[Tuple, bool]]:
         """
-        # Create a hash of flag_name + user_id for consistency
-        hash_input = f"{flag_name}:{user_id}".encode("utf-8")
-        hash_value = hashlib.md5(hash_input).hexdigest()
-        
-        # Convert first 8 characters to integer and get percentage
-        hash_int = int(hash_value[:8], 16)
-        user_percentage = (hash_int % 10000) / 100.0  # 0-99.99%
-        
-        return user_percentage < percentage
+        Cache flag evaluations for the duration of a request.
 
-    def _evaluate_context_rules(
-        self, flag: FeatureFlag, context: Dict[str, Any]
-    ) -> bool:
-        """Evaluate context-based rules for feature flag."""
-        rules = flag.metadata.get("context_rules", [])
-        
-        for rule in rules:
-            rule_type = rule.get("type")
-            
-            if rule_type == "equals":
-                key = rule.get("key")
-                expected_value = rule.get("value")
-                if context.get(key) != expected_value:
-                    return False
-                    
-            elif rule_type == "in":
-                key = rule.get("key")
-                allowed_values = rule.get("values", [])
-                if context.get(key) not in allowed_values:
-                    return False
-                    
-            elif rule_type == "greater_than":
-                key = rule.get("key")
-                threshold = rule.get("value")
-                if context.get(key, 0) <= threshold:
-                    return False
-                    
-            elif rule_type == "less_than":
-                key = rule.get("key")
-                threshold = rule.get("value")
-                if context.get(key, 0) >= threshold:
-                    return False
+        Within the block, evaluating the same flag for the same caller
+        returns the first answer, so a request sees consistent flags even
+        if they are reloaded meanwhile. Evaluations with a context are
+        not cached. The cache is held in a context variable, so threads
+        and asyncio tasks each get their own.
 
-        return True
+        Example:
+            with FeatureFlagManager.request_cache():
+                render(request)
+        """
+        token = _request_cache.set({})
+        try:
+            yield _request_cache.get()
+        finally:
+            _request_cache.reset(token)
 
     def set_flag(
         self,
@@ -186,6 +322,14 @@ class FeatureFlagManager:
             end_date: When the flag becomes inactive
             metadata: Additional metadata for the flag
         """
+        metadata = dict(metadata or {})
+        if "bucketing" not in metadata:
+            # Keep an existing flag's buckets; new flags use the manager's hash
+            existing = self._flag_cache.get(flag_name)
+            metadata["bucketing"] = (
+                existing.metadata.get("bucketing", "md5") if existing else self.bucketing
+            )
+
         try:
             flag = FeatureFlag(
                 name=flag_name,
@@ -196,7 +340,7 @@ class FeatureFlagManager:
                 percentage=percentage,
                 start_date=start_date,
                 end_date=end_date,
-                metadata=metadata or {},
+                metadata=metadata,
             )
 
             self._flag_cache[flag_name] = flag
@@ -2,6 +2,7 @@
 Main configuration manager implementation.
 """
 
+import copy
 import os
 import re
 from typing import Any, Dict, List, Optional, Type, TypeVar, Callable, Union
@@ -14,6 +15,8 @@ from .feature_flags import FeatureFlagManager
 from .secrets import SecretsManager
 from .validators import ConfigValidator
 from .hot_reload import HotReloadWatcher
+from .propagation import ConfigChangePropagator
+from .snapshot import ConfigSnapshot
 from .exceptions import ConfigurationError, ValidationError
 
 T = TypeVar("T", bound=ConfigModel)
@@ -29,7 +32,12 @@ class ConfigManager:
     - Secure secrets management
     - Configuration validation
     - Hot reloading
+    - Push updates from backends that publish changes (Redis)
     - Multiple backends
+
+    The configuration is published as an immutable ``ConfigSnapshot``.
+    Every reload or change builds a new snapshot and swaps it in, so
+    ``get`` is a lock-free lookup in the snapshot's flattened keys.
     """
 
     def __init__(
@@ -39,6 +47,7 @@ class ConfigManager:
         config_path: Optional[str] = None,
         enable_hot_reload: bool = False,
         validation_schema: Optional[str] = None,
+        enable_push_updates: bool = False,
         **backend_kwargs,
     ):
         """
@@ -50,6 +59,8 @@ class ConfigManager:
             config_path: Path to configuration files (for file backend)
             enable_hot_reload: Enable automatic configuration reloading
             validation_schema: Path to validation schema file
+            enable_push_updates: Apply changes published by the backend as
+                they happen (Redis backend)
             **backend_kwargs: Additional backend-specific configuration
         """
         # Set environment
@@ -65,14 +76,21 @@ class ConfigManager:
             **backend_kwargs,
         )
 
+        # Versions are marked before anything loads, so a change made
+        # while loading is applied again rather than missed
+        self.changes = ConfigChangePropagator(self.backend)
+        if enable_push_updates:
+            self.changes.mark_loaded()
+
         # Initialize managers
         self.feature_flags = FeatureFlagManager(self.backend)
         self.secrets = SecretsManager(self.backend)
         self.validator = ConfigValidator(validation_schema)
 
-        # Configuration cache
-        self._config_cache: Dict[str, Any] = {}
+        # Configuration snapshot
+        self._snapshot = ConfigSnapshot({})
         self._cache_timestamps: Dict[str, datetime] = {}
+        self._sources: Dict[str, Optional[Dict[str, Any]]] = {}
 
         # Hot reload setup
         self.hot_reload_enabled = enable_hot_reload
@@ -85,6 +103,18 @@ class ConfigManager:
         # Load initial configuration
         self._load_configuration()
 
+        if enable_push_updates:
+            self._setup_push_updates()
+
+    def _setup_push_updates(self) -> None:
+        """Subscribe the configuration, flags and secrets to backend changes."""
+        for source in ("base", self.environment.value):
+            self.changes.listen(source, lambda data, source=source: self._apply_source(source, data))
+        self.changes.listen("feature_flags", self.feature_flags.apply_flags)
+        self.changes.listen("secrets", self.secrets.apply_secrets)
+        if not self.changes.start():
+            print("Warning: Configuration backend does not publish changes; push updates disabled")
+
     def _setup_hot_reload(self) -> None:
         """Set up hot reload watcher."""
         if hasattr(self.backend, "get_watch_paths"):
@@ -96,29 +126,48 @@ class ConfigManager:
                 )
                 self._hot_reload_watcher.start()
 
+    @property
+    def _config_cache(self) -> Dict[str, Any]:
+        """Merged configuration of the current snapshot."""
+        return self._snapshot.data
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Current configuration snapshot; never modified once published."""
+        return self._snapshot
+
+    def _publish(self, config: Dict[str, Any]) -> ConfigSnapshot:
+        """Swap in a new snapshot of config; returns the previous one."""
+        old_snapshot = self._snapshot
+        self._snapshot = ConfigSnapshot(config, old_snapshot.version + 1)
+        return old_snapshot
+
+    def _build_config(self) -> Dict[str, Any]:
+        """Merge the cached sources into a new configuration."""
+        config: Dict[str, Any] = {}
+        for name in ("base", self.environment.value):
+            if self._sources.get(name):
+                self._merge_config(config, copy.deepcopy(self._sources[name]))
+        return self._substitute_env_vars(config)
+
     def _load_configuration(self) -> None:
         """Load configuration from backend."""
         try:
-            # Load base configuration
-            base_config = self.backend.load_config("base")
-            if base_config:
-                self._config_cache.update(base_config)
-
-            # Load environment-specific configuration
-            env_config = self.backend.load_config(self.environment.value)
-            if env_config:
-                self._merge_config(self._config_cache, env_config)
+            # Load base and environment-specific configuration
+            for name in ("base", self.environment.value):
+                self._sources[name] = self.backend.load_config(name)
 
-            # Process environment variable substitutions
-            self._process_env_substitutions()
+            config = self._build_config()
 
             # Validate configuration
             if self.validator.has_schema():
-                self.validator.validate(self._config_cache)
+                self.validator.validate(config)
 
         except Exception as e:
             raise ConfigurationError(f"Failed to load configuration: {str(e)}")
 
+        self._publish(config)
+
     def _merge_config(self, base: Dict[str, Any], override: Dict[str, Any]) -> None:
         """Recursively merge configuration dictionaries."""
         for key, value in override.items():
@@ -127,8 +176,8 @@ class ConfigManager:
             else:
                 base[key] = value
 
-    def _process_env_substitutions(self) -> None:
-        """Process environment variable substitutions in configuration values."""
+    def _substitute_env_vars(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Return config with ${VAR} and ${VAR:default} references substituted."""
         env_pattern = re.compile(r"\$\{([^}]+)\}")
 
         def substitute_value(value: Any) -> Any:
@@ -150,12 +199,38 @@ class ConfigManager:
                 return [substitute_value(item) for item in value]
             return value
 
-        self._config_cache = substitute_value(self._config_cache)
+        return substitute_value(config)
+
+    def _apply_source(self, source: str, data: Optional[Dict[str, Any]]) -> None:
+        """
+        Rebuild the configuration after a pushed change to one source.
+
+        The merged configuration is built from the cached sources, without
+        reading the backend, and swapped in whole. A change that fails
+        validation is not applied.
+        """
+        self._sources[source] = data
+        config = self._build_config()
+
+        if self.validator.has_schema():
+            try:
+                self.validator.validate(config)
+            except ValidationError as e:
+                print(f"Rejected pushed configuration change to '{source}': {e}")
+                return
+
+        old_config = self._publish(config).data
+
+        for callback in self._change_callbacks:
+            try:
+                callback(source, old_config, config)
+            except Exception as e:
+                print(f"Error in config change callback: {e}")
 
     def _handle_config_change(self, file_path: str) -> None:
         """Handle configuration file changes."""
         try:
-            old_config = self._config_cache.copy()
+            old_config = self._config_cache
             self._load_configuration()
             
             # Notify change callbacks
@@ -181,18 +256,8 @@ class ConfigManager:
             Configuration value or default
         """
         try:
-            keys = key.split(".")
-            value = self._config_cache
-
-            for k in keys:
-                if isinstance(value, dict) and k in value:
-                    value = value[k]
-                else:
-                    return default
-
-            return value
-
-        except Exception:
+            return self._snapshot.flat.get(key, default)
+        except TypeError:
             return default
 
     def set(self, key: str, value: Any, persist: bool = True) -> None:
@@ -205,7 +270,8 @@ class ConfigManager:
             persist: Whether to persist the change to backend
         """
         keys = key.split(".")
-        config = self._config_cache
+        new_config = copy.deepcopy(self._config_cache)
+        config = new_config
 
         # Navigate to parent dictionary
         for k in keys[:-1]:
@@ -217,18 +283,15 @@ class ConfigManager:
         old_value = config.get(keys[-1])
         config[keys[-1]] = value
 
-        # Persist if requested
+        # Persist if requested; the current snapshot stays on failure
         if persist:
             try:
-                self.backend.save_config(self.environment.value, self._config_cache)
+                self.backend.save_config(self.environment.value, new_config)
             except Exception as e:
-                # Rollback on failure
-                if old_value is not None:
-                    config[keys[-1]] = old_value
-                else:
-                    config.pop(keys[-1], None)
                 raise ConfigurationError(f"Failed to persist configuration: {str(e)}")
 
+        self._publish(new_config)
+
         # Notify change callbacks
         for callback in self._change_callbacks:
             try:
@@ -245,23 +308,31 @@ class ConfigManager:
             key: Configuration key
 
         Returns:
-            Validated model instance
+            Validated model instance, shared by all callers until the
+            configuration changes
 
         Raises:
             ValidationError: If configuration doesn't match model schema
         """
-        config_data = self.get(key)
+        snapshot = self._snapshot
+        instance = snapshot.cached_model(model_class, key)
+        if instance is not None:
+            return instance
+
+        config_data = snapshot.get(key)
         if config_data is None:
             raise ConfigurationError(f"Configuration key '{key}' not found")
 
         try:
-            return model_class(**config_data)
+            instance = model_class(**config_data)
         except Exception as e:
             raise ValidationError(
                 f"Failed to validate configuration for key '{key}'",
                 key=key,
                 validation_errors={"model_validation": str(e)},
             )
+        snapshot.cache_model(model_class, key, instance)
+        return instance
 
     def has(self, key: str) -> bool:
         """Check if configuration key exists."""
@@ -279,7 +350,8 @@ class ConfigManager:
             True if key was deleted, False if key didn't exist
         """
         keys = key.split(".")
-        config = self._config_cache
+        new_config = copy.deepcopy(self._config_cache)
+        config = new_config
 
         # Navigate to parent dictionary
         try:
@@ -292,15 +364,15 @@ class ConfigManager:
         if keys[-1] in config:
             old_value = config.pop(keys[-1])
             
-            # Persist if requested
+            # Persist if requested; the current snapshot stays on failure
             if persist:
                 try:
-                    self.backend.save_config(self.environment.value, self._config_cache)
+                    self.backend.save_config(self.environment.value, new_config)
                 except Exception as e:
-                    # Rollback on failure
-                    config[keys[-1]] = old_value
                     raise ConfigurationError(f"Failed to persist configuration: {str(e)}")
 
+            self._publish(new_config)
+
             # Notify change callbacks
             for callback in self._change_callbacks:
                 try:
@@ -360,6 +432,10 @@ class ConfigManager:
         """Get decrypted secret value."""
         return self.secrets.get_secret(secret_name, self.environment)
 
+    def get_secrets(self, secret_names: List[str]) -> Dict[str, str]:
+        """Get several decrypted secret values."""
+        return self.secrets.get_secrets(secret_names, self.environment)
+
     def set_secret(
         self,
         secret_name: str,
@@ -387,9 +463,21 @@ class ConfigManager:
         """Manually reload configuration from backend."""
         self._load_configuration()
 
+    def get_version_info(self) -> Dict[str, Any]:
+        """
+        Get the configuration versions this process has applied.
+
+        Returns:
+            Dictionary with the highest applied "version", per-config
+            versions ("configs"), the backend's latest version
+            ("backend_version") and whether push updates are "subscribed".
+            A process is up to date when version equals backend_version.
+        """
+        return self.changes.get_version_info()
+
     def get_all(self) -> Dict[str, Any]:
         """Get all configuration as dictionary."""
-        return self._config_cache.copy()
+        return copy.deepcopy(self._config_cache)
 
     def get_environment_config(self, environment: Environment) -> Dict[str, Any]:
         """Get configuration for specific environment."""
@@ -453,8 +541,11 @@ class ConfigManager:
         """Context manager exit - cleanup resources."""
         if self._hot_reload_watcher:
             self._hot_reload_watcher.stop()
+        self.changes.stop()
 
     def __del__(self):
         """Cleanup on deletion."""
         if hasattr(self, "_hot_reload_watcher") and self._hot_reload_watcher:
-            self._hot_reload_watcher.stop()
\ No newline at end of file
+            self._hot_reload_watcher.stop()
+        if hasattr(self, "changes"):
+            self.changes.stop()
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Push-based propagation of configuration changes.
+
+Backends that version their writes (the Redis backend) publish a change
+event per write. A ``ConfigChangePropagator`` subscribes to them and
+hands each config's new data to the managers listening for that config,
+which build a new snapshot and swap it in, so readers never see a
+half-applied change and nothing is reloaded from the backend. Events
+are applied only if newer than the config's last applied version;
+missed events are caught up from the backend's per-config versions.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+Listener = Callable[[Optional[Dict[str, Any]]], None]
+
+
+class ConfigChangePropagator:
+    """
+    Applies a backend's change events to registered listeners.
+
+    Listeners are called from the subscription thread with the config's
+    new data, or None when it was deleted.
+    """
+
+    def __init__(self, backend, resync_interval: float = 30.0):
+        """
+        Initialize propagator.
+
+        Args:
+            backend: Configuration backend to follow
+            resync_interval: Seconds between checks for missed events
+        """
+        self.backend = backend
+        self.resync_interval = resync_interval
+        self.versions: Dict[str, int] = {}
+        self.version = 0
+        self.stats = {"applied": 0, "skipped": 0, "resyncs": 0}
+        self._listeners: Dict[str, List[Listener]] = {}
+        self._lock = threading.Lock()
+        self._subscription = None
+
+    def listen(self, config_name: str, listener: Listener) -> None:
+        """Call listener with the new data whenever config_name changes."""
+        self._listeners.setdefault(config_name, []).append(listener)
+
+    def mark_loaded(self) -> None:
+        """
+        Record the backend's current versions as already applied.
+
+        Call before the managers load their data: a change landing
+        between this call and the load is applied again, never lost.
+        """
+        with self._lock:
+            self.versions = dict(self.backend.get_config_versions())
+            self.version = max(self.versions.values(), default=0)
+
+    def start(self) -> bool:
+        """
+        Subscribe to the backend's change events.
+
+        Returns:
+            False if the backend cannot push changes
+        """
+        if self._subscription is None:
+            self._subscription = self.backend.subscribe(self.apply, self.resync, self.resync_interval)
+        return self._subscription is not None
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop following changes; wait=False returns without joining the listener."""
+        if self._subscription is not None:
+            self._subscription.close(wait=wait)
+            self._subscription = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._subscription is not None
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """
+        Apply one change event if it is newer than what was applied.
+
+        Returns:
+            True if the change was applied
+        """
+        config_name, version = event["config"], int(event["version"])
+        with self._lock:
+            if version <= self.versions.get(config_name, 0):
+                self.stats["skipped"] += 1
+                return False
+            for listener in self._listeners.get(config_name, ()):
+                try:
+                    listener(event.get("data"))
+                except Exception as e:
+                    print(f"Error applying change to '{config_name}': {e}")
+            self.versions[config_name] = version
+            self.version = max(self.version, version)
+            self.stats["applied"] += 1
+            return True
+
+    def resync(self) -> int:
+        """
+        Catch up on changes whose events were missed.
+
+        Compares the backend's per-config versions with the applied ones
+        and loads only the configs that moved.
+
+        Returns:
+            Number of configs updated
+        """
+        self.stats["resyncs"] += 1
+        stale = {
+            config_name: version
+            for config_name, version in self.backend.get_config_versions().items()
+            if version > self.versions.get(config_name, 0)
+        }
+        if not stale:
+            return 0
+        if hasattr(self.backend, "bulk_load"):
+            loaded = self.backend.bulk_load(list(stale))
+        else:
+            loaded = {config_name: self.backend.load_config(config_name) for config_name in stale}
+        return sum(
+            self.apply({"config": config_name, "version": version, "data": loaded.get(config_name)})
+            for config_name, version in stale.items()
+        )
+
+    def get_version_info(self) -> Dict[str, Any]:
+        """Versions applied in this process next to the backend's latest."""
+        return {
+            "version": self.version,
+            "configs": dict(self.versions),
+            "backend_version": self.backend.get_version(),
+            "subscribed": self.is_running,
+        }
@@ -4,7 +4,9 @@ Secure secrets management system.
 
 import base64
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
@@ -14,6 +16,28 @@ from .models import Environment, SecretConfig
 from .exceptions import SecretNotFoundError, EncryptionError
 
 
+class _DecryptedSecret:
+    """A decrypted value held in the cache until it expires."""
+
+    __slots__ = ("value", "encrypted_value", "expires_at")
+
+    def __init__(self, value: Union[str, bytearray], encrypted_value: str, expires_at: float):
+        self.value = value
+        self.encrypted_value = encrypted_value
+        self.expires_at = expires_at
+
+    def plaintext(self) -> str:
+        if isinstance(self.value, bytearray):
+            return self.value.decode()
+        return self.value
+
+    def wipe(self) -> None:
+        """Overwrite the value if it is held in a bytearray."""
+        if isinstance(self.value, bytearray):
+            self.value[:] = bytes(len(self.value))
+        self.value = ""
+
+
 class SecretsManager:
     """
     Secure secrets management with encryption and environment isolation.
@@ -22,19 +46,39 @@ class SecretsManager:
     - AES encryption for secret values
     - Environment-specific secret access
     - Key rotation support
+    - Decrypted value cache with per-secret TTL
     - Audit logging
     """
 
-    def __init__(self, backend, encryption_key: Optional[str] = None):
+    def __init__(
+        self,
+        backend,
+        encryption_key: Optional[str] = None,
+        cache_ttl: float = 300.0,
+        cache_max_age: float = 3600.0,
+        zeroize_cache: bool = False,
+    ):
         """
         Initialize secrets manager.
 
         Args:
             backend: Configuration backend for storage
             encryption_key: Master encryption key (uses env var if not provided)
+            cache_ttl: Seconds a decrypted value is cached; a secret's
+                metadata["cache_ttl"] overrides it, 0 disables caching
+            cache_max_age: Upper bound on any secret's cache TTL, so a
+                rotation missed by this process is picked up in time
+            zeroize_cache: Hold cached values in bytearrays that are
+                overwritten when evicted
         """
         self.backend = backend
         self._secrets_cache: Dict[str, SecretConfig] = {}
+        self.cache_ttl = cache_ttl
+        self.cache_max_age = cache_max_age
+        self.zeroize_cache = zeroize_cache
+        self._decrypted: Dict[str, _DecryptedSecret] = {}
+        self._decrypted_lock = threading.Lock()
+        self.cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
         
         # Initialize encryption
         self._encryption_key = encryption_key or os.getenv("CONFIG_ENCRYPTION_KEY")
@@ -70,20 +114,39 @@ class SecretsManager:
         """Load secrets from backend."""
         try:
             secrets_data = self.backend.load_config("secrets") or {}
-            self._secrets_cache = {}
-            
-            for secret_name, secret_config in secrets_data.items():
-                try:
-                    self._secrets_cache[secret_name] = SecretConfig(
-                        name=secret_name,
-                        **secret_config
-                    )
-                except Exception as e:
-                    print(f"Warning: Invalid secret config '{secret_name}': {e}")
-
         except Exception as e:
             print(f"Warning: Failed to load secrets: {e}")
-            self._secrets_cache = {}
+            secrets_data = {}
+
+        self.apply_secrets(secrets_data)
+
+    def apply_secrets(self, secrets_data: Optional[Dict[str, Any]]) -> None:
+        """
+        Replace the stored secrets, e.g. with a change pushed by the backend.
+
+        The new cache is built aside and swapped in whole.
+
+        Args:
+            secrets_data: Secret name to secret configuration, None if deleted
+        """
+        secrets_cache = {}
+        for secret_name, secret_config in (secrets_data or {}).items():
+            try:
+                secrets_cache[secret_name] = SecretConfig(
+                    name=secret_name,
+                    **secret_config
+                )
+            except Exception as e:
+                print(f"Warning: Invalid secret config '{secret_name}': {e}")
+
+        self._secrets_cache = secrets_cache
+
+        # Drop decrypted values whose secret changed or disappeared
+        with self._decrypted_lock:
+            for secret_name, entry in list(self._decrypted.items()):
+                secret_config = secrets_cache.get(secret_name)
+                if secret_config is None or secret_config.encrypted_value != entry.encrypted_value:
+                    self._evict(secret_name)
 
     def _save_secrets(self) -> None:
         """Save secrets to backend."""
@@ -141,6 +204,7 @@ class SecretsManager:
             )
 
             self._secrets_cache[secret_name] = secret_config
+            self.invalidate_cached(secret_name)
             self._save_secrets()
 
         except Exception as e:
@@ -176,8 +240,20 @@ class SecretsManager:
                 f"Secret '{secret_name}' not accessible in environment '{environment.value}'"
             )
 
+        with self._decrypted_lock:
+            entry = self._decrypted.get(secret_name)
+            if entry is not None:
+                if (
+                    entry.expires_at > time.monotonic()
+                    and entry.encrypted_value == secret_config.encrypted_value
+                ):
+                    self.cache_stats["hits"] += 1
+                    return entry.plaintext()
+                self._evict(secret_name, expired=True)
+            self.cache_stats["misses"] += 1
+
         try:
-            return self._decrypt_value(secret_config.encrypted_value)
+            value = self._decrypt_value(secret_config.encrypted_value)
         except Exception as e:
             raise EncryptionError(
                 f"Failed to decrypt secret '{secret_name}': {str(e)}",
@@ -185,6 +261,101 @@ class SecretsManager:
                 secret_name,
             )
 
+        self._cache_decrypted(secret_name, secret_config, value)
+        return value
+
+    def get_secrets(
+        self,
+        secret_names: List[str],
+        environment: Optional[Environment] = None,
+    ) -> Dict[str, str]:
+        """
+        Get several decrypted secret values.
+
+        Secrets unknown to this process are looked up by reloading the
+        secrets once, rather than once per name.
+
+        Args:
+            secret_names: Names of the secrets
+            environment: Current environment for access control
+
+        Returns:
+            Dictionary of secret names to decrypted values
+
+        Raises:
+            SecretNotFoundError: If a secret doesn't exist or access denied
+        """
+        if any(secret_name not in self._secrets_cache for secret_name in secret_names):
+            self._load_secrets()
+
+        return {
+            secret_name: self.get_secret(secret_name, environment)
+            for secret_name in secret_names
+        }
+
+    def _cache_ttl(self, secret_config: SecretConfig) -> float:
+        """Seconds to cache a secret's decrypted value."""
+        ttl = secret_config.metadata.get("cache_ttl", self.cache_ttl)
+        try:
+            ttl = float(ttl)
+        except (TypeError, ValueError):
+            ttl = self.cache_ttl
+        return min(ttl, self.cache_max_age)
+
+    def _cache_decrypted(self, secret_name: str, secret_config: SecretConfig, value: str) -> None:
+        """Keep a decrypted value until its TTL runs out."""
+        ttl = self._cache_ttl(secret_config)
+        if ttl <= 0:
+            return
+
+        entry = _DecryptedSecret(
+            bytearray(value.encode()) if self.zeroize_cache else value,
+            secret_config.encrypted_value,
+            time.monotonic() + ttl,
+        )
+        with self._decrypted_lock:
+            # Don't cache a value the secret no longer has
+            current = self._secrets_cache.get(secret_name)
+            if current is None or current.encrypted_value != entry.encrypted_value:
+                entry.wipe()
+                return
+            if secret_name in self._decrypted:
+                self._evict(secret_name)
+            self._decrypted[secret_name] = entry
+
+    def _evict(self, secret_name: str, expired: bool = False) -> None:
+        """Remove and wipe a cached value; the caller holds the cache lock."""
+        entry = self._decrypted.pop(secret_name, None)
+        if entry is not None:
+            entry.wipe()
+            self.cache_stats["expirations" if expired else "evictions"] += 1
+
+    def invalidate_cached(self, secret_name: Optional[str] = None) -> None:
+        """
+        Drop cached decrypted values.
+
+        Args:
+            secret_name: Secret to drop, or None for all of them
+        """
+        with self._decrypted_lock:
+            names = [secret_name] if secret_name is not None else list(self._decrypted)
+            for name in names:
+                self._evict(name)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get decrypted value cache metrics.
+
+        Returns:
+            Hit, miss, eviction and expiration counts, the hit rate and
+            the number of cached values
+        """
+        stats: Dict[str, Any] = dict(self.cache_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["size"] = len(self._decrypted)
+        return stats
+
     def has_secret(
         self,
         secret_name: str,
@@ -221,6 +392,7 @@ class SecretsManager:
         """
         if secret_name in self._secrets_cache:
             del self._secrets_cache[secret_name]
+            self.invalidate_cached(secret_name)
             self._save_secrets()
             return True
         return False
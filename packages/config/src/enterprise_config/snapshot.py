@@ -0,0 +1,70 @@
+"""
+Immutable configuration snapshots.
+
+A ``ConfigSnapshot`` holds one merged configuration together with a flat
+map from every dotted key to its value, so a lookup is a single dict
+access. Snapshots are never modified after they are built: a reload or
+change builds a new snapshot and the manager swaps its reference to it,
+which readers pick up without locking.
+"""
+
+from typing import Any, Dict, Tuple, Type
+
+
+class ConfigSnapshot:
+    """
+    One immutable version of the merged configuration.
+
+    Values are shared with the snapshot, not copied, and must not be
+    modified by callers.
+    """
+
+    __slots__ = ("data", "flat", "version", "_models")
+
+    def __init__(self, data: Dict[str, Any], version: int = 0):
+        """
+        Build snapshot.
+
+        Args:
+            data: Merged configuration; owned by the snapshot from now on
+            version: Position of this snapshot in the manager's history
+        """
+        self.data = data
+        self.flat = self.flatten(data)
+        self.version = version
+        self._models: Dict[Tuple[Type, str], Any] = {}
+
+    @staticmethod
+    def flatten(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map each dotted key path in data to its value.
+
+        Nested dicts are included under their own path as well as their
+        children's, so "database" and "database.host" both resolve. Keys
+        that dotted lookup cannot address (non-strings, or containing
+        a dot) are left out.
+        """
+        flat: Dict[str, Any] = {}
+        stack = [("", data)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                if not isinstance(key, str) or "." in key:
+                    continue
+                path = prefix + key
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path + ".", value))
+        return flat
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get value by dotted key."""
+        return self.flat.get(key, default)
+
+    def cached_model(self, model_class: Type, key: str) -> Any:
+        """Get the model instance built for key from this snapshot, if any."""
+        return self._models.get((model_class, key))
+
+    def cache_model(self, model_class: Type, key: str, instance: Any) -> None:
+        """Keep a model instance built from this snapshot."""
+        self._models[(model_class, key)] = instance
@@ -0,0 +1,105 @@
+"""
+Tests for feature flag evaluation.
+"""
+
+import hashlib
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from enterprise_config import FeatureFlagManager, Environment
+from enterprise_config.backends import FileBackend
+from enterprise_config.exceptions import FeatureFlagError
+
+
+@pytest.fixture
+def backend():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield FileBackend(config_path=temp_dir, file_format="yaml")
+
+
+class TestFeatureFlagEvaluation:
+    """Test compiled feature flag evaluation."""
+
+    def test_targeting_and_time_window(self, backend):
+        """Test environment, group and time window checks."""
+        flags = FeatureFlagManager(backend)
+        now = datetime.utcnow()
+        flags.set_flag("targeted", True, environments=[Environment.STAGING], user_groups=["beta"])
+        flags.set_flag("current", True, start_date=now - timedelta(hours=1), end_date=now + timedelta(hours=1))
+        flags.set_flag("upcoming", True, start_date=now + timedelta(hours=1))
+
+        assert flags.is_enabled("targeted", environment=Environment.STAGING, user_group="beta")
+        assert not flags.is_enabled("targeted", environment=Environment.PRODUCTION)
+        assert not flags.is_enabled("targeted", user_group="staff")
+        assert flags.is_enabled("current")
+        assert not flags.is_enabled("upcoming")
+        assert flags.is_enabled("missing", default=True)
+
+    def test_context_rules(self, backend):
+        """Test compiled context rules."""
+        flags = FeatureFlagManager(backend)
+        flags.set_flag("rules", True, metadata={"context_rules": [
+            {"type": "in", "key": "country", "values": ["US", "CA"]},
+            {"type": "greater_than", "key": "age", "value": 17},
+        ]})
+
+        assert flags.is_enabled("rules", context={"country": "US", "age": 30})
+        assert not flags.is_enabled("rules", context={"country": "FR", "age": 30})
+        assert not flags.is_enabled("rules", context={"country": ["US"], "age": 30})
+        assert not flags.is_enabled("rules", context={"country": "CA"})
+
+    def test_md5_bucketing_is_unchanged(self, backend):
+        """Flags stored without a bucketing keep the original MD5 buckets."""
+        backend.save_config("feature_flags", {"rollout": {"enabled": True, "percentage": 50.0}})
+        flags = FeatureFlagManager(backend)
+
+        for user_id in map(str, range(200)):
+            digest = hashlib.md5(f"rollout:{user_id}".encode()).hexdigest()
+            expected = (int(digest[:8], 16) % 10000) / 100.0 < 50.0
+            assert flags.is_enabled("rollout", user_id=user_id) is expected
+
+        # Updating the flag keeps its buckets
+        flags.set_flag("rollout", True, percentage=50.0)
+        assert flags.get_flag("rollout").metadata["bucketing"] == "md5"
+
+    def test_crc32_rollout_is_stable_and_proportional(self, backend):
+        """New flags bucket with CRC32, consistently across managers."""
+        flags = FeatureFlagManager(backend)
+        flags.set_flag("rollout", True, percentage=25.0)
+        assert flags.get_flag("rollout").metadata["bucketing"] == "crc32"
+
+        enabled = [flags.is_enabled("rollout", user_id=str(i)) for i in range(10000)]
+        assert 2250 < sum(enabled) < 2750
+        reloaded = FeatureFlagManager(backend)
+        assert [reloaded.is_enabled("rollout", user_id=str(i)) for i in range(10000)] == enabled
+
+        with pytest.raises(FeatureFlagError):
+            FeatureFlagManager(backend, bucketing="sha1")
+
+    def test_changes_are_compiled(self, backend):
+        """Test that flag updates take effect immediately."""
+        flags = FeatureFlagManager(backend)
+        flags.set_flag("toggle", False)
+        assert not flags.is_enabled("toggle")
+
+        flags.enable_flag("toggle")
+        assert flags.is_enabled("toggle")
+        flags.add_user_group("toggle", "beta")
+        assert not flags.is_enabled("toggle", user_group="staff")
+        flags.delete_flag("toggle")
+        assert not flags.is_enabled("toggle")
+
+    def test_request_cache(self, backend):
+        """Evaluations inside a request scope stay stable."""
+        flags = FeatureFlagManager(backend)
+        flags.set_flag("cached", True)
+
+        with FeatureFlagManager.request_cache() as cache:
+            assert flags.is_enabled("cached")
+            flags.disable_flag("cached")
+            assert flags.is_enabled("cached")
+            assert len(cache) == 1
+
+        assert not flags.is_enabled("cached")
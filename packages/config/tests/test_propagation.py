@@ -0,0 +1,169 @@
+"""
+Tests for push-based configuration change propagation.
+"""
+
+import json
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from enterprise_config import ConfigChangePropagator, ConfigManager, Environment, FeatureFlagManager
+from enterprise_config.backends import RedisBackend
+
+
+def redis_backend(server, **kwargs):
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    return RedisBackend(client=client, **kwargs)
+
+
+def wait_for(condition, timeout=10.0):
+    """Poll condition until true; returns the seconds it took."""
+    start = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start > timeout:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.001)
+    return time.perf_counter() - start
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+class TestRedisChangeEvents:
+    """Test versioned change events from the Redis backend."""
+
+    def test_writes_are_versioned(self, server):
+        """Test that each write bumps the version."""
+        backend = redis_backend(server)
+        backend.save_config("base", {"app": {"name": "Blog"}})
+        backend.bulk_save({"development": {"debug": True}, "production": {"debug": False}})
+        backend.delete_config("production")
+
+        assert backend.get_version() == 4
+        assert backend.get_config_versions() == {"base": 1, "development": 2, "production": 4}
+        assert "changes" not in " ".join(backend.list_configs())
+
+    def test_clear_is_versioned_and_published(self, server):
+        """Test that clearing configs bumps their versions and announces the deletes."""
+        backend = redis_backend(server)
+        backend.bulk_save({"base": {"a": 1}, "production": {"b": 2}})
+        pubsub = backend.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(backend.changes_channel)
+        pubsub.get_message(timeout=1.0)
+
+        assert backend.clear_all_configs() == 2
+        assert backend.delete_config("base") is False
+
+        assert backend.get_version() == 4
+        assert sorted(backend.get_config_versions().values()) == [3, 4]
+        messages = [pubsub.get_message(timeout=1.0) for _ in range(2)]
+        events = [json.loads(message["data"]) for message in messages if message]
+        assert sorted((event["config"], event["data"]) for event in events) == [("base", None), ("production", None)]
+        pubsub.close()
+
+    def test_stale_and_replayed_events_are_ignored(self, server):
+        """Test that only newer versions are applied."""
+        propagator = ConfigChangePropagator(redis_backend(server))
+        applied = []
+        propagator.listen("feature_flags", applied.append)
+
+        assert propagator.apply({"config": "feature_flags", "version": 2, "data": {"a": {}}})
+        assert not propagator.apply({"config": "feature_flags", "version": 1, "data": {}})
+        assert not propagator.apply({"config": "feature_flags", "version": 2, "data": {}})
+
+        assert applied == [{"a": {}}]
+        assert propagator.stats == {"applied": 1, "skipped": 2, "resyncs": 0}
+
+    def test_missed_events_are_resynced(self, server):
+        """Test that changes made while unsubscribed are caught up."""
+        writer = FeatureFlagManager(redis_backend(server))
+        worker_backend = redis_backend(server)
+        worker = FeatureFlagManager(worker_backend)
+        propagator = ConfigChangePropagator(worker_backend)
+        propagator.listen("feature_flags", worker.apply_flags)
+        propagator.mark_loaded()
+
+        writer.set_flag("missed", True)
+
+        assert propagator.resync() == 1
+        assert worker.is_enabled("missed")
+        assert propagator.resync() == 0
+
+
+class TestPushUpdates:
+    """Test managers applying pushed changes."""
+
+    def test_unchanged_flags_keep_their_compiled_form(self, server):
+        """Test that applying a change only recompiles flags that changed."""
+        flags = FeatureFlagManager(redis_backend(server))
+        flags.set_flag("stable", True)
+        flags.set_flag("changing", False)
+        stable = flags._compiled["stable"]
+
+        data = flags.backend.load_config("feature_flags")
+        data["changing"]["enabled"] = True
+        flags.apply_flags(data)
+
+        assert flags._compiled["stable"] is stable
+        assert flags.is_enabled("changing")
+
+    def test_config_manager_applies_pushed_changes(self, server):
+        """Test that configuration, flags and secrets follow backend writes."""
+        writer = redis_backend(server)
+        writer.save_config("base", {"app": {"name": "Blog", "debug": False}})
+        changes = []
+
+        with ConfigManager(
+            environment=Environment.DEVELOPMENT,
+            backend="redis",
+            client=fakeredis.FakeRedis(server=server, decode_responses=True),
+            enable_push_updates=True,
+        ) as config:
+            config.on_change(lambda source, old, new: changes.append(source))
+            writer.save_config("development", {"app": {"debug": True}})
+            FeatureFlagManager(writer).set_flag("pushed", True)
+
+            wait_for(lambda: config.feature_flag("pushed") and config.get("app.debug") is True)
+            assert config.get("app.name") == "Blog"
+            assert changes == ["development"]
+            info = config.get_version_info()
+            assert info["subscribed"]
+            assert info["version"] == info["backend_version"] == 3
+
+    def test_workers_converge(self, server):
+        """Many workers follow a stream of flag changes to the same state."""
+        workers = []
+        for _ in range(25):
+            backend = redis_backend(server)
+            flags = FeatureFlagManager(backend)
+            propagator = ConfigChangePropagator(backend)
+            propagator.mark_loaded()
+            propagator.listen("feature_flags", flags.apply_flags)
+            assert propagator.start()
+            workers.append((flags, propagator))
+
+        writer = FeatureFlagManager(redis_backend(server))
+        try:
+            convergence = []
+            for i in range(20):
+                writer.set_flag(f"flag_{i}", True, percentage=50.0)
+                version = writer.backend.get_version()
+                convergence.append(wait_for(
+                    lambda: all(propagator.version >= version for _, propagator in workers)
+                ))
+
+            for flags, _ in workers:
+                assert [flags.is_enabled(f"flag_{i}", user_id="42") for i in range(20)] == \
+                    [writer.is_enabled(f"flag_{i}", user_id="42") for i in range(20)]
+            # Workers converge in milliseconds, far inside one resync interval
+            assert max(convergence) < 5.0
+            print(f"convergence across {len(workers)} workers: "
+                  f"median {sorted(convergence)[len(convergence) // 2] * 1000:.1f}ms, "
+                  f"max {max(convergence) * 1000:.1f}ms")
+        finally:
+            for _, propagator in workers:
+                propagator.stop(wait=False)
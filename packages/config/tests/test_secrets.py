@@ -0,0 +1,108 @@
+"""
+Tests for secrets management.
+"""
+
+import tempfile
+import time
+
+import pytest
+from cryptography.fernet import Fernet
+
+from enterprise_config import Environment, SecretsManager
+from enterprise_config.backends import FileBackend
+from enterprise_config.exceptions import SecretNotFoundError
+
+KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def backend():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield FileBackend(config_path=temp_dir, file_format="yaml")
+
+
+class TestDecryptedSecretCache:
+    """Test the decrypted value cache."""
+
+    def test_hits_skip_decryption(self, backend):
+        """Test that repeated reads are served from the cache."""
+        secrets = SecretsManager(backend, encryption_key=KEY)
+        secrets.set_secret("api_key", "value-1")
+        decrypts = []
+        decrypt = secrets._decrypt_value
+        secrets._decrypt_value = lambda value: decrypts.append(value) or decrypt(value)
+
+        assert [secrets.get_secret("api_key") for _ in range(3)] == ["value-1"] * 3
+        assert len(decrypts) == 1
+        stats = secrets.get_cache_stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+
+    def test_rotation_and_deletion_invalidate(self, backend):
+        """Test that rotated and deleted secrets are not served stale."""
+        secrets = SecretsManager(backend, encryption_key=KEY)
+        secrets.set_secret("api_key", "old")
+        assert secrets.get_secret("api_key") == "old"
+
+        secrets.rotate_secret("api_key", "new")
+        assert secrets.get_secret("api_key") == "new"
+
+        secrets.delete_secret("api_key")
+        with pytest.raises(SecretNotFoundError):
+            secrets.get_secret("api_key")
+        assert secrets.get_cache_stats()["size"] == 0
+
+    def test_changes_from_elsewhere_invalidate(self, backend):
+        """Test that applied backend changes drop changed values only."""
+        writer = SecretsManager(backend, encryption_key=KEY)
+        writer.set_secret("changed", "old")
+        writer.set_secret("unchanged", "same")
+        reader = SecretsManager(backend, encryption_key=KEY)
+        reader.get_secrets(["changed", "unchanged"])
+
+        writer.rotate_secret("changed", "new")
+        reader.apply_secrets(backend.load_config("secrets"))
+
+        assert reader.get_cache_stats()["evictions"] == 1
+        assert reader.get_secrets(["changed", "unchanged"]) == {"changed": "new", "unchanged": "same"}
+
+    def test_ttl(self, backend):
+        """Test per-secret TTL bounded by the max age."""
+        secrets = SecretsManager(backend, encryption_key=KEY, cache_ttl=60, cache_max_age=120)
+        secrets.set_secret("short", "a", metadata={"cache_ttl": "0.01"})
+        secrets.set_secret("long", "b", metadata={"cache_ttl": "86400"})
+        secrets.set_secret("uncached", "c", metadata={"cache_ttl": "0"})
+
+        assert secrets._cache_ttl(secrets._secrets_cache["long"]) == 120
+        for name in ("short", "long", "uncached"):
+            secrets.get_secret(name)
+        assert set(secrets._decrypted) == {"short", "long"}
+
+        time.sleep(0.02)
+        assert secrets.get_secret("short") == "a"
+        assert secrets.get_cache_stats()["expirations"] == 1
+
+    def test_zeroized_on_eviction(self, backend):
+        """Test that bytearray values are overwritten when evicted."""
+        secrets = SecretsManager(backend, encryption_key=KEY, zeroize_cache=True)
+        secrets.set_secret("api_key", "sensitive")
+        assert secrets.get_secret("api_key") == "sensitive"
+        held = secrets._decrypted["api_key"].value
+        assert held == bytearray(b"sensitive")
+
+        secrets.invalidate_cached()
+        assert held == bytearray(len("sensitive"))
+
+    def test_get_secrets_loads_unknown_secrets_once(self, backend):
+        """Test that a bulk read reloads secrets added by another process once."""
+        reader = SecretsManager(backend, encryption_key=KEY)
+        writer = SecretsManager(backend, encryption_key=KEY)
+        writer.set_secret("a", "1")
+        writer.set_secret("b", "2", environments=[Environment.PRODUCTION])
+        loads = []
+        load_config = backend.load_config
+        backend.load_config = lambda name: loads.append(name) or load_config(name)
+
+        assert reader.get_secrets(["a", "b"], Environment.PRODUCTION) == {"a": "1", "b": "2"}
+        assert loads == ["secrets"]
+        with pytest.raises(SecretNotFoundError):
+            reader.get_secrets(["a", "b"], Environment.DEVELOPMENT)
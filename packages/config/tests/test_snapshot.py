@@ -0,0 +1,133 @@
+"""
+Tests for configuration snapshots.
+"""
+
+import tempfile
+import threading
+
+import pytest
+from pydantic import BaseModel
+
+from enterprise_config import ConfigManager, ConfigSnapshot, Environment
+from enterprise_config.backends import FileBackend
+from enterprise_config.exceptions import ConfigurationError, ValidationError
+
+
+class DatabaseConfig(BaseModel):
+    host: str
+    port: int = 5432
+
+
+def walk(config, key, default=None):
+    """ConfigManager.get as it was before snapshots."""
+    value = config
+    for k in key.split("."):
+        if isinstance(value, dict) and k in value:
+            value = value[k]
+        else:
+            return default
+    return value
+
+
+@pytest.fixture
+def config():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        backend = FileBackend(config_path=temp_dir, file_format="yaml")
+        backend.save_config("base", {
+            "app": {"name": "Blog", "debug": False},
+            "database": {"host": "localhost", "port": 5432, "options": {"ssl": True}},
+        })
+        backend.save_config("development", {"app": {"debug": True}, "database": {"host": "dev-db"}})
+        with ConfigManager(environment=Environment.DEVELOPMENT, config_path=temp_dir) as manager:
+            yield manager
+
+
+class TestConfigSnapshot:
+    """Test snapshot flattening."""
+
+    def test_lookups_match_nested_walk(self):
+        """Test that every dotted key resolves as walking the dicts would."""
+        data = {
+            "a": {"b": {"c": 1, "d": None}, "list": [{"x": 1}]},
+            "a.b": "unreachable",
+            5: "int key",
+            "": {"empty": True},
+        }
+        snapshot = ConfigSnapshot(data)
+        keys = ["a", "a.b", "a.b.c", "a.b.d", "a.list", "a.list.0", "a.list.x",
+                "a.b.c.d", "missing", "a.missing", ".empty", "", "5"]
+
+        for key in keys:
+            assert snapshot.get(key, "default") == walk(data, key, "default"), key
+        assert snapshot.get("a") is data["a"]
+
+
+class TestConfigManagerSnapshots:
+    """Test configuration published as snapshots."""
+
+    def test_get(self, config):
+        """Test merged values through the flattened snapshot."""
+        assert config.get("database.host") == "dev-db"
+        assert config.get("database.options.ssl") is True
+        assert config.get("database") == {"host": "dev-db", "port": 5432, "options": {"ssl": True}}
+        assert config.get("database.missing", "default") == "default"
+        assert config.get(None, "default") == "default"
+
+    def test_changes_publish_new_snapshot(self, config):
+        """Test that set and delete swap in a new snapshot."""
+        before = config.snapshot
+        config.set("database.port", 6543, persist=False)
+
+        assert config.get("database.port") == 6543
+        assert before.get("database.port") == 5432
+        assert config.snapshot.version == before.version + 1
+
+        config.delete("database.options.ssl", persist=False)
+        assert config.get("database.options") == {}
+        assert before.get("database.options.ssl") is True
+
+    def test_reload_drops_removed_keys(self, config):
+        """Test that a reload rebuilds the configuration rather than merging."""
+        config.backend.save_config("development", {"app": {"debug": True}})
+        config.reload()
+
+        assert config.get("database.host") == "localhost"
+
+    def test_get_model_is_cached_per_snapshot(self, config):
+        """Test that models are validated once per snapshot."""
+        model = config.get_model(DatabaseConfig, "database")
+        assert model.host == "dev-db"
+        assert config.get_model(DatabaseConfig, "database") is model
+
+        config.set("database.host", "db-2", persist=False)
+        assert config.get_model(DatabaseConfig, "database").host == "db-2"
+
+        with pytest.raises(ConfigurationError):
+            config.get_model(DatabaseConfig, "cache")
+        with pytest.raises(ValidationError):
+            config.get_model(DatabaseConfig, "app")
+
+    def test_readers_see_whole_snapshots(self, config):
+        """Readers never observe a half-applied change."""
+        config.set("database.options.port", 5432, persist=False)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                snapshot = config.snapshot
+                if snapshot.get("database.port") != snapshot.get("database.options.port"):
+                    errors.append(snapshot.version)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for port in range(200):
+                new_config = dict(config.get_all())
+                new_config["database"] = {"port": port, "options": {"port": port}}
+                config._publish(new_config)
+        finally:
+            done.set()
+            reader.join()
+
+        assert not errors
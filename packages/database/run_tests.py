@@ -40,6 +40,10 @@ def run_tests():
         'tests.test_migrations',
         'tests.test_monitoring',
         'tests.test_routers',
+        'tests.test_pool',
+        'tests.test_replication',
+        'tests.test_sharding',
+        'tests.test_instrumentation',
     ]
     
     # Run tests
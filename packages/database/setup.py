@@ -67,6 +67,8 @@ setup(
             "db-migrate=enterprise_database.cli:migrate_command",
             "db-seed=enterprise_database.cli:seed_command",
             "db-backup=enterprise_database.cli:backup_command",
+            "db-reshard=enterprise_database.cli:reshard_command",
+            "db-queries=enterprise_database.cli:queries_command",
         ],
     },
 )
\ No newline at end of file
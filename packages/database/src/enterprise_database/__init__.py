@@ -10,26 +10,36 @@ __version__ = "0.1.0"
 __author__ = "Enterprise Team"
 __email__ = "team@enterprise.com"
 
-from .config import (
-    get_database_config,
-    DatabaseConfig,
-    setup_read_replica,
-)
-from .repositories import BaseRepository
-from .connections import ConnectionManager
-from .migrations import MigrationManager
-from .seeders import DataSeeder
-from .monitoring import DatabaseMonitor
-from .routers import DatabaseRouter
+# Submodules are imported on first access: Django imports the pooled
+# database backends (enterprise_database.backends) while it is still
+# loading models, before the model-dependent modules can be imported.
+_EXPORTS = {
+    "get_database_config": "config",
+    "DatabaseConfig": "config",
+    "setup_read_replica": "config",
+    "BaseRepository": "repositories",
+    "ConnectionManager": "connections",
+    "ConnectionPool": "pool",
+    "MigrationManager": "migrations",
+    "DataSeeder": "seeders",
+    "DatabaseMonitor": "monitoring",
+    "DatabaseRouter": "routers",
+    "ReplicationMonitor": "replication",
+    "ReadYourWritesMiddleware": "replication",
+    "HashRing": "sharding",
+    "Resharder": "sharding",
+    "scatter_gather": "sharding",
+    "QueryInstrumentation": "instrumentation",
+}
 
-__all__ = [
-    "get_database_config",
-    "DatabaseConfig", 
-    "setup_read_replica",
-    "BaseRepository",
-    "ConnectionManager",
-    "MigrationManager",
-    "DataSeeder",
-    "DatabaseMonitor",
-    "DatabaseRouter",
-]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+
+        value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
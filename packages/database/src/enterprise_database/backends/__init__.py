@@ -0,0 +1,17 @@
+"""
+Django database backends that take their connections from a ConnectionPool.
+
+Use them as the ENGINE of a DATABASES entry, e.g.
+``'ENGINE': 'enterprise_database.backends.postgresql'``, and size the
+pool with an optional ``POOL`` dict in the same entry.
+"""
+
+from .pooled import PooledDatabaseCreationMixin, PooledDatabaseWrapperMixin, close_pools, get_pool, get_pool_stats
+
+__all__ = [
+    "PooledDatabaseCreationMixin",
+    "PooledDatabaseWrapperMixin",
+    "close_pools",
+    "get_pool",
+    "get_pool_stats",
+]
@@ -0,0 +1,141 @@
+"""
+Pooled connections for Django database wrappers.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.signals import setting_changed
+
+from ..pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# One pool per database alias, shared by the per-thread wrappers, with the
+# connection parameters it was created for
+_pools: Dict[str, Tuple[ConnectionPool, Dict[str, Any]]] = {}
+_pools_lock = threading.Lock()
+
+# Alias Django uses for connections to the maintenance database
+NO_DB_ALIAS = '__no_db__'
+
+# DATABASES[alias]['POOL'] keys and their ConnectionPool arguments
+POOL_DEFAULTS = {
+    'MIN_SIZE': ('min_connections', 0),
+    'MAX_SIZE': ('max_connections', 10),
+    'MAX_OVERFLOW': ('max_overflow', 10),
+    'TIMEOUT': ('pool_timeout', 30),
+    'RECYCLE': ('pool_recycle', 3600),
+    'PRE_PING': ('pre_ping', True),
+}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mixin for a Django ``DatabaseWrapper`` that checks connections out of
+    a per-alias ``ConnectionPool`` instead of opening them.
+
+    Closing the wrapper, which Django does at the end of each request
+    when ``CONN_MAX_AGE`` is 0 and ``connections.close_all()`` does for the
+    calling thread, gives the connection back to the pool, so the next
+    request reuses a warm connection. Pools themselves are only closed
+    explicitly, by ``close_pools()``. When the alias's connection
+    parameters change, the old pool is closed and a new one started.
+    """
+
+    def get_new_connection(self, conn_params):
+        if self.alias == NO_DB_ALIAS:
+            # Short-lived, and must not linger in a pool to block DROP DATABASE
+            return super().get_new_connection(conn_params)
+        entry = _pools.get(self.alias)
+        if entry is None or entry[1] != conn_params:
+            with _pools_lock:
+                entry = _pools.get(self.alias)
+                if entry is None or entry[1] != conn_params:
+                    # First use, or the settings changed (e.g. NAME while a
+                    # test database is created): start a pool for them
+                    if entry is not None:
+                        entry[0].close()
+                    entry = _pools[self.alias] = (self._create_pool(conn_params), conn_params)
+        self._pool = entry[0]
+        return self._pool.acquire()
+
+    def _create_pool(self, conn_params) -> ConnectionPool:
+        options = self.settings_dict.get('POOL') or {}
+        kwargs = {
+            argument: options.get(key, default)
+            for key, (argument, default) in POOL_DEFAULTS.items()
+        }
+        parent_connect = super().get_new_connection
+
+        def connect():
+            return parent_connect(conn_params)
+
+        logger.info(f"Creating connection pool for database {self.alias}: {kwargs}")
+        return ConnectionPool(connect, **kwargs)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Release to the pool the connection came from; a replaced pool
+        # closes it instead of keeping it
+        pool = getattr(self, '_pool', None)
+        if pool is None:
+            return super()._close()
+        # A connection closed inside an atomic block stays referenced by
+        # this wrapper until the block exits, so it can't be shared
+        discard = self.in_atomic_block or (self.errors_occurred and not self.is_usable())
+        with self.wrap_database_errors:
+            pool.release(self.connection, discard=discard)
+
+
+class PooledDatabaseCreationMixin:
+    """
+    Mixin for a backend's ``DatabaseCreation`` that closes the alias's pool
+    around creating, cloning and destroying test databases, so idle pooled
+    connections neither block ``DROP DATABASE`` nor outlive their database.
+    """
+
+    def _create_test_db(self, *args, **kwargs):
+        close_pools(self.connection.alias)
+        return super()._create_test_db(*args, **kwargs)
+
+    def _clone_test_db(self, *args, **kwargs):
+        close_pools(self.connection.alias)
+        return super()._clone_test_db(*args, **kwargs)
+
+    def _destroy_test_db(self, *args, **kwargs):
+        close_pools(self.connection.alias)
+        return super()._destroy_test_db(*args, **kwargs)
+
+
+def get_pool(alias: str = 'default') -> Optional[ConnectionPool]:
+    """Get the connection pool of a database alias, if it was created."""
+    entry = _pools.get(alias)
+    return entry[0] if entry else None
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get statistics for every connection pool."""
+    return {alias: pool.get_stats() for alias, (pool, _) in list(_pools.items())}
+
+
+def close_pools(*aliases: str) -> None:
+    """
+    Close the idle connections of the pools of ``aliases``, or of every
+    pool, and forget them; the next connection starts a new pool.
+    """
+    with _pools_lock:
+        entries = [_pools.pop(alias) for alias in (aliases or list(_pools)) if alias in _pools]
+    for pool, _ in entries:
+        pool.close()
+
+
+def _close_pools_on_setting_changed(setting, **kwargs):
+    if setting == 'DATABASES':
+        close_pools()
+
+
+setting_changed.connect(_close_pools_on_setting_changed, dispatch_uid='enterprise_database.backends.pooled')
+
@@ -0,0 +1,15 @@
+"""
+PostgreSQL backend with pooled connections.
+"""
+
+from django.db.backends.postgresql import base, creation
+
+from ..pooled import PooledDatabaseCreationMixin, PooledDatabaseWrapperMixin
+
+
+class DatabaseCreation(PooledDatabaseCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
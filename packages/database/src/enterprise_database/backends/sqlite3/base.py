@@ -0,0 +1,18 @@
+"""
+SQLite backend with pooled connections.
+
+In-memory databases are not pooled usefully: every connection opens its
+own database, and Django never closes them.
+"""
+
+from django.db.backends.sqlite3 import base, creation
+
+from ..pooled import PooledDatabaseCreationMixin, PooledDatabaseWrapperMixin
+
+
+class DatabaseCreation(PooledDatabaseCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
@@ -8,9 +8,6 @@ import argparse
 from typing import Optional
 from django.core.management import execute_from_command_line
 from django.conf import settings
-from .migrations import MigrationManager
-from .seeders import DataSeeder
-from .monitoring import DatabaseMonitor
 
 
 def migrate_command():
@@ -28,6 +25,7 @@ def migrate_command():
     args = parser.parse_args()
     
     try:
+        from .migrations import MigrationManager
         migration_manager = MigrationManager()
         
         if args.check:
@@ -80,6 +78,7 @@ def seed_command():
     args = parser.parse_args()
     
     try:
+        from .seeders import DataSeeder
         seeder = DataSeeder()
         
         if args.dry_run:
@@ -137,6 +136,55 @@ def backup_command():
         sys.exit(1)
 
 
+def reshard_command():
+    """
+    Command-line interface for moving sharded rows to a new shard layout.
+    """
+    parser = argparse.ArgumentParser(description='Database resharding')
+    parser.add_argument('model', help='Sharded model label, e.g. auth.User')
+    parser.add_argument('--field', default='pk', help='Shard key field')
+    parser.add_argument('--from', dest='source', required=True, help='Current shards, comma separated')
+    parser.add_argument('--to', dest='target', required=True, help='New shards, comma separated')
+    parser.add_argument('--batch-size', type=int, help='Rows read per query')
+    parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+    parser.add_argument('--updated-field', help='Datetime field set on every write, to copy rows changed during the copy')
+    parser.add_argument('--since', help='Only copy again rows updated since this ISO time (needs --updated-field)')
+    parser.add_argument('--purge', action='store_true', help='Delete rows from shards they no longer belong on')
+    parser.add_argument('--cascade', action='store_true', help='With --purge, delete related rows and send signals')
+    
+    args = parser.parse_args()
+    
+    try:
+        from django.apps import apps
+        from .sharding import HashRing, Resharder
+        
+        resharder = Resharder(
+            apps.get_model(args.model),
+            args.field,
+            HashRing(args.source.split(',')),
+            HashRing(args.target.split(',')),
+            batch_size=args.batch_size,
+            pause=args.pause,
+            updated_field=args.updated_field,
+        )
+        
+        if args.purge:
+            print(f"Rows purged: {resharder.purge(cascade=args.cascade)}")
+        elif args.since:
+            from django.utils.dateparse import parse_datetime
+            resharder.progress['synced_at'] = parse_datetime(args.since)
+            print(f"Rows caught up: {resharder.catch_up()}")
+        else:
+            stats = resharder.run()
+            print(f"Rows copied: {stats['copied']} of {stats['scanned']} scanned, {stats['caught_up']} caught up")
+    
+    except KeyboardInterrupt:
+        print("\nResharding stopped")
+    except Exception as e:
+        print(f"Resharding error: {e}")
+        sys.exit(1)
+
+
 def monitor_command():
     """
     Command-line interface for database monitoring.
@@ -151,6 +199,7 @@ def monitor_command():
     args = parser.parse_args()
     
     try:
+        from .monitoring import DatabaseMonitor
         monitor = DatabaseMonitor()
         
         if args.stats:
@@ -192,6 +241,66 @@ def monitor_command():
         sys.exit(1)
 
 
+def queries_command():
+    """
+    Command-line interface for query statistics from a running application.
+    """
+    parser = argparse.ArgumentParser(description='Database query statistics')
+    parser.add_argument('--url', default=os.environ.get('DB_QUERY_METRICS_URL'),
+                       help='Query metrics endpoint (default: $DB_QUERY_METRICS_URL)')
+    parser.add_argument('--token', default=os.environ.get('DB_METRICS_TOKEN'),
+                       help='Metrics bearer token (default: $DB_METRICS_TOKEN)')
+    parser.add_argument('--limit', type=int, default=20, help='Query fingerprints to show')
+    parser.add_argument('--sort', default='total',
+                       choices=['total', 'count', 'mean', 'p95', 'max', 'n_plus_one'],
+                       help='Order fingerprints by this statistic')
+    parser.add_argument('--slow', action='store_true', help='Show slow queries')
+    parser.add_argument('--n-plus-one', action='store_true', help='Show possible N+1 patterns')
+    parser.add_argument('--json', action='store_true', help='Print the raw statistics')
+    
+    args = parser.parse_args()
+    if not args.url:
+        parser.error('--url is required')
+    
+    try:
+        import json
+        from urllib.parse import urlencode
+        from urllib.request import Request, urlopen
+        
+        request = Request(f"{args.url}?{urlencode({'limit': args.limit, 'sort': args.sort})}")
+        if args.token:
+            request.add_header('Authorization', f"Bearer {args.token}")
+        with urlopen(request, timeout=30) as response:
+            stats = json.load(response)
+        
+        if args.json:
+            print(json.dumps(stats, indent=2))
+        
+        elif args.slow:
+            print(f"Slow Queries (>= {stats['slow_query_threshold']}s): {len(stats['slow_queries'])}")
+            for query in stats['slow_queries']:
+                print(f"  {query['duration']:.3f}s  {query['name'] or '-'}  {query['sql']}")
+        
+        elif args.n_plus_one:
+            print(f"Possible N+1 patterns (> {stats['n_plus_one_threshold']} per request): {len(stats['n_plus_one'])}")
+            for event in stats['n_plus_one']:
+                print(f"  {event['count']:>5}x  {event['name']}  {event['fingerprint']}")
+        
+        else:
+            print(f"Queries: {stats['queries']}  Total time: {stats['total_time']:.3f}s")
+            print(f"{'count':>8} {'total':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'n+1':>5}  query")
+            for query in stats['fingerprints']:
+                print(
+                    f"{query['count']:>8} {query['total']:>8.3f}s "
+                    f"{query['p50'] * 1000:>7.2f}ms {query['p95'] * 1000:>7.2f}ms {query['p99'] * 1000:>7.2f}ms "
+                    f"{query['n_plus_one']:>5}  {query['fingerprint'][:120]}"
+                )
+    
+    except Exception as e:
+        print(f"Query statistics error: {e}")
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     # Set up Django environment
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
@@ -212,11 +321,15 @@ if __name__ == '__main__':
             backup_command()
         elif command == 'monitor':
             monitor_command()
+        elif command == 'reshard':
+            reshard_command()
+        elif command == 'queries':
+            queries_command()
         else:
             print(f"Unknown command: {command}")
-            print("Available commands: migrate, seed, backup, monitor")
+            print("Available commands: migrate, seed, backup, monitor, reshard, queries")
             sys.exit(1)
     else:
         print("Usage: python -m enterprise_database <command>")
-        print("Available commands: migrate, seed, backup, monitor")
+        print("Available commands: migrate, seed, backup, monitor, reshard, queries")
         sys.exit(1)
\ No newline at end of file
@@ -207,6 +207,25 @@ DATABASE_MONITORING = {
     'SLOW_QUERY_THRESHOLD': config('DB_SLOW_QUERY_THRESHOLD', default=1.0, cast=float),  # seconds
     'LOG_QUERIES': config('DB_LOG_QUERIES', default=False, cast=bool),
     'METRICS_COLLECTION': config('DB_METRICS_COLLECTION', default=True, cast=bool),
+    'N_PLUS_ONE_THRESHOLD': config('DB_N_PLUS_ONE_THRESHOLD', default=10, cast=int),  # same query per request
+    'MAX_FINGERPRINTS': config('DB_QUERY_MAX_FINGERPRINTS', default=500, cast=int),
+    'METRICS_TOKEN': config('DB_METRICS_TOKEN', default=''),  # bearer token for the query metrics endpoint
+}
+
+
+# Read replica routing configuration
+DATABASE_REPLICATION = {
+    'MAX_LAG': config('DB_REPLICA_MAX_LAG', default=5.0, cast=float),  # seconds
+    'CHECK_INTERVAL': config('DB_REPLICA_CHECK_INTERVAL', default=5.0, cast=float),  # seconds
+    'PIN_SECONDS': config('DB_REPLICA_PIN_SECONDS', default=10.0, cast=float),  # read-your-writes window
+    'PIN_COOKIE': config('DB_REPLICA_PIN_COOKIE', default='db_written_at'),
+}
+
+# Sharding configuration
+DATABASE_SHARDING = {
+    'VIRTUAL_NODES': config('DB_SHARD_VIRTUAL_NODES', default=64, cast=int),  # ring points per shard
+    'RESHARD_BATCH_SIZE': config('DB_RESHARD_BATCH_SIZE', default=1000, cast=int),
+    'SCATTER_WORKERS': config('DB_SHARD_SCATTER_WORKERS', default=8, cast=int),
 }
 
 
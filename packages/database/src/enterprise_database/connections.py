@@ -11,6 +11,7 @@ from django.db import connections, connection
 from django.db.utils import ConnectionHandler
 from django.conf import settings
 from .exceptions import ConnectionError
+from .pool import ConnectionPool
 from .config import DATABASE_HEALTH_CHECK, DATABASE_MONITORING
 
 logger = logging.getLogger(__name__)
@@ -165,9 +166,14 @@ class ConnectionManager:
         Get connection statistics.
         
         Returns:
-            Dictionary with connection statistics
+            Dictionary with connection statistics, including each
+            connection pool's statistics under "pools"
         """
-        return self._connection_stats.copy()
+        from .backends import get_pool_stats
+        
+        stats = self._connection_stats.copy()
+        stats['pools'] = get_pool_stats()
+        return stats
     
     def get_health_status(self) -> Dict[str, Any]:
         """
@@ -210,106 +216,6 @@ class ConnectionManager:
         logger.info("Closed all database connections")
 
 
-class ConnectionPool:
-    """
-    Custom connection pool implementation.
-    """
-    
-    def __init__(
-        self,
-        min_connections: int = 5,
-        max_connections: int = 20,
-        max_overflow: int = 10,
-        pool_timeout: int = 30,
-        pool_recycle: int = 3600,
-    ):
-        self.min_connections = min_connections
-        self.max_connections = max_connections
-        self.max_overflow = max_overflow
-        self.pool_timeout = pool_timeout
-        self.pool_recycle = pool_recycle
-        
-        self._pool = []
-        self._overflow = []
-        self._lock = threading.Lock()
-        self._created_connections = 0
-        
-        # Pre-create minimum connections
-        self._initialize_pool()
-    
-    def _initialize_pool(self):
-        """Initialize the connection pool with minimum connections."""
-        for _ in range(self.min_connections):
-            conn = self._create_connection()
-            if conn:
-                self._pool.append(conn)
-    
-    def _create_connection(self):
-        """Create a new database connection."""
-        try:
-            # This would create an actual database connection
-            # For now, we'll return a placeholder
-            self._created_connections += 1
-            return f"connection_{self._created_connections}"
-        except Exception as e:
-            logger.error(f"Failed to create connection: {e}")
-            return None
-    
-    @contextmanager
-    def get_connection(self):
-        """
-        Get a connection from the pool.
-        
-        Yields:
-            Database connection
-        """
-        conn = None
-        is_overflow = False
-        
-        try:
-            with self._lock:
-                # Try to get from main pool
-                if self._pool:
-                    conn = self._pool.pop()
-                # Try overflow if main pool is empty
-                elif len(self._overflow) < self.max_overflow:
-                    conn = self._create_connection()
-                    if conn:
-                        self._overflow.append(conn)
-                        is_overflow = True
-                else:
-                    raise ConnectionError("Connection pool exhausted")
-            
-            if not conn:
-                raise ConnectionError("Failed to get connection from pool")
-            
-            yield conn
-            
-        finally:
-            if conn:
-                with self._lock:
-                    if is_overflow:
-                        # Remove overflow connections
-                        if conn in self._overflow:
-                            self._overflow.remove(conn)
-                    else:
-                        # Return to main pool
-                        if len(self._pool) < self.max_connections:
-                            self._pool.append(conn)
-    
-    def get_stats(self) -> Dict[str, Any]:
-        """Get pool statistics."""
-        with self._lock:
-            return {
-                'pool_size': len(self._pool),
-                'overflow_size': len(self._overflow),
-                'total_created': self._created_connections,
-                'min_connections': self.min_connections,
-                'max_connections': self.max_connections,
-                'max_overflow': self.max_overflow,
-            }
-
-
 # Global connection manager instance
 connection_manager = ConnectionManager()
 
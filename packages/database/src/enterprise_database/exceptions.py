@@ -23,6 +23,11 @@ class ConnectionError(DatabaseError):
     pass
 
 
+class ShardingError(DatabaseError):
+    """Exception raised for sharding and resharding issues."""
+    pass
+
+
 class MigrationError(DatabaseError):
     """Exception raised for migration-related issues."""
     pass
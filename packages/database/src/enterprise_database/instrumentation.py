@@ -0,0 +1,401 @@
+"""
+In-process query instrumentation: per-fingerprint latency histograms,
+slow query capture and N+1 detection.
+"""
+
+import bisect
+import hmac
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from django.views import View
+
+from .config import DATABASE_MONITORING
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Latency bucket upper bounds in seconds, four per power of two (about 19%
+# apart) from 1 microsecond to about two minutes
+_BUCKET_BOUNDS = [2 ** (i / 4) / 1e6 for i in range(1, 4 * 27 + 1)]
+
+# Fingerprint that collects queries once MAX_FINGERPRINTS are tracked
+OTHER_QUERIES = '<other>'
+
+SORT_KEYS = ('total', 'count', 'mean', 'p95', 'max', 'n_plus_one')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """
+    Normalize SQL so queries differing only in values share a fingerprint.
+
+    Literals and placeholders become ``?`` and ``IN`` lists of any length
+    become ``(...)``.
+
+    Args:
+        sql: SQL statement
+
+    Returns:
+        Normalized statement
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql.replace('%s', '?'))
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """Counters and latency histogram for one query fingerprint."""
+
+    __slots__ = ('fingerprint', 'sample', 'count', 'total', 'max', 'rows', 'errors',
+                 'slow', 'n_plus_one', 'buckets', 'names')
+
+    def __init__(self, fingerprint: str, sample: str):
+        self.fingerprint = fingerprint
+        self.sample = sample
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.slow = 0
+        self.n_plus_one = 0
+        self.buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.names: Counter = Counter()
+
+    def add(self, duration: float, rows: int, error: bool, slow: bool, name: Optional[str]) -> None:
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        if rows > 0:
+            self.rows += rows
+        self.errors += error
+        self.slow += slow
+        self.buckets[bisect.bisect_left(_BUCKET_BOUNDS, duration)] += 1
+        self.names[name or '-'] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a latency percentile from the histogram (bucket upper bound)."""
+        target = fraction * self.count
+        running = 0
+        for index, count in enumerate(self.buckets):
+            running += count
+            if count and running >= target:
+                bound = _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'fingerprint': self.fingerprint,
+            'sample': self.sample,
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+            'rows': self.rows,
+            'errors': self.errors,
+            'slow': self.slow,
+            'n_plus_one': self.n_plus_one,
+            'names': dict(self.names.most_common(5)),
+        }
+
+
+class _Scope:
+    """Queries made by one request or task."""
+
+    __slots__ = ('name', 'counts')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts: Counter = Counter()
+
+
+_scope: ContextVar[Optional[_Scope]] = ContextVar('enterprise_database_query_scope', default=None)
+
+
+class QueryInstrumentation:
+    """
+    Database execute wrapper recording every query's timing.
+
+    Once enabled it is installed on each connection as it is opened, and
+    records per fingerprint the count, total and percentile latency, rows
+    (as reported by the driver's ``rowcount``; SQLite reports none for
+    SELECT) and the views or tasks that ran it. Queries slower than
+    ``SLOW_QUERY_THRESHOLD`` are kept in a bounded log, and a fingerprint
+    run more than ``N_PLUS_ONE_THRESHOLD`` times within one ``track()``
+    scope is flagged as a possible N+1 pattern.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: Optional[float] = None,
+        n_plus_one_threshold: Optional[int] = None,
+        max_fingerprints: Optional[int] = None,
+        history: int = 100,
+    ):
+        """
+        Initialize instrumentation.
+
+        Args:
+            slow_threshold: Seconds from which a query is logged as slow
+            n_plus_one_threshold: Repeats of a fingerprint in one scope
+                above which it is flagged
+            max_fingerprints: Fingerprints tracked before new ones are
+                counted under ``OTHER_QUERIES``
+            history: Slow queries and N+1 events kept
+        """
+        self.slow_threshold = (
+            DATABASE_MONITORING['SLOW_QUERY_THRESHOLD'] if slow_threshold is None else slow_threshold
+        )
+        self.n_plus_one_threshold = (
+            DATABASE_MONITORING['N_PLUS_ONE_THRESHOLD'] if n_plus_one_threshold is None else n_plus_one_threshold
+        )
+        self.max_fingerprints = (
+            DATABASE_MONITORING['MAX_FINGERPRINTS'] if max_fingerprints is None else max_fingerprints
+        )
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stats: Dict[str, QueryStats] = {}
+        self._slow_queries: deque = deque(maxlen=history)
+        self._n_plus_one: deque = deque(maxlen=history)
+        self._started_at = time.time()
+
+    def enable(self) -> None:
+        """Instrument connections opened from now on and those open in this thread."""
+        self.enabled = True
+        connection_created.connect(self._install, dispatch_uid=f'enterprise_database.instrumentation.{id(self)}')
+        for conn in connections.all(initialized_only=True):
+            self._install(conn.__class__, conn)
+
+    def disable(self) -> None:
+        """Stop recording queries."""
+        self.enabled = False
+        connection_created.disconnect(dispatch_uid=f'enterprise_database.instrumentation.{id(self)}')
+        for conn in connections.all(initialized_only=True):
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+    def _install(self, sender, connection, **kwargs) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __call__(self, execute, sql, params, many, context):
+        if not self.enabled:
+            return execute(sql, params, many, context)
+        error = False
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except Exception:
+            error = True
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            try:
+                rows = context['cursor'].rowcount
+            except Exception:
+                rows = -1
+            self.record(sql, duration, rows, error, context['connection'].alias)
+
+    def record(self, sql: str, duration: float, rows: int = -1, error: bool = False, alias: str = 'default') -> None:
+        """
+        Record one executed query.
+
+        Args:
+            sql: SQL statement
+            duration: Execution time in seconds
+            rows: Rows returned or affected, negative if unknown
+            error: Whether the query raised
+            alias: Database alias it ran on
+        """
+        key = fingerprint(sql)
+        scope = _scope.get()
+        name = scope.name if scope is not None else None
+        slow = duration >= self.slow_threshold
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    key = OTHER_QUERIES
+                    stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = QueryStats(key, sql[:1000])
+            stats.add(duration, rows, error, slow, name)
+            if slow:
+                self._slow_queries.append({
+                    'sql': sql[:1000],
+                    'duration': duration,
+                    'name': name,
+                    'database': alias,
+                    'timestamp': time.time(),
+                })
+
+        if scope is not None:
+            scope.counts[key] += 1
+        if slow:
+            logger.warning(f"Slow query ({duration:.3f}s) in {name or '-'} on {alias}: {sql[:200]}")
+
+    @contextmanager
+    def track(self, name: str):
+        """
+        Attribute queries to a view or task and check them for N+1 patterns.
+
+        Usable as a context manager or a decorator::
+
+            @query_instrumentation.track('tasks.send_newsletter')
+            def send_newsletter(): ...
+        """
+        scope = _Scope(name)
+        token = _scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _scope.reset(token)
+            self._check_n_plus_one(scope)
+
+    def set_name(self, name: str) -> None:
+        """Rename the current scope, e.g. once the view has been resolved."""
+        scope = _scope.get()
+        if scope is not None:
+            scope.name = name
+
+    def _check_n_plus_one(self, scope: _Scope) -> None:
+        for key, count in scope.counts.items():
+            if count <= self.n_plus_one_threshold or key == OTHER_QUERIES:
+                continue
+            with self._lock:
+                stats = self._stats.get(key)
+                if stats is not None:
+                    stats.n_plus_one += 1
+                self._n_plus_one.append({
+                    'name': scope.name,
+                    'fingerprint': key,
+                    'count': count,
+                    'timestamp': time.time(),
+                })
+            logger.warning(f"Possible N+1 queries in {scope.name}: {count} x {key[:200]}")
+
+    def get_stats(self, limit: Optional[int] = None, sort: str = 'total') -> Dict[str, Any]:
+        """
+        Get recorded query statistics.
+
+        Args:
+            limit: Fingerprints to return
+            sort: One of ``SORT_KEYS``, descending
+
+        Returns:
+            Totals, per-fingerprint statistics, slow queries and N+1 events
+        """
+        with self._lock:
+            fingerprints = [stats.as_dict() for stats in self._stats.values()]
+            slow_queries = list(self._slow_queries)
+            n_plus_one = list(self._n_plus_one)
+
+        fingerprints.sort(key=lambda stats: stats[sort], reverse=True)
+        return {
+            'enabled': self.enabled,
+            'since': self._started_at,
+            'queries': sum(stats['count'] for stats in fingerprints),
+            'total_time': sum(stats['total'] for stats in fingerprints),
+            'fingerprints': fingerprints[:limit] if limit is not None else fingerprints,
+            'slow_queries': slow_queries,
+            'n_plus_one': n_plus_one,
+            'slow_query_threshold': self.slow_threshold,
+            'n_plus_one_threshold': self.n_plus_one_threshold,
+        }
+
+    def reset(self) -> None:
+        """Clear recorded statistics."""
+        with self._lock:
+            self._stats.clear()
+            self._slow_queries.clear()
+            self._n_plus_one.clear()
+            self._started_at = time.time()
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Enable query instrumentation and attribute each request's queries to its view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        query_instrumentation.enable()
+
+    def __call__(self, request):
+        with query_instrumentation.track(f"{request.method} <unresolved>"):
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is not None and match.view_name:
+            name = match.view_name
+        else:
+            name = f"{view_func.__module__}.{getattr(view_func, '__qualname__', view_func.__class__.__name__)}"
+        query_instrumentation.set_name(f"{request.method} {name}")
+        return None
+
+
+class QueryMetricsView(View):
+    """
+    Query statistics endpoint.
+
+    Open to staff users, or to callers sending ``Authorization: Bearer
+    <DB_METRICS_TOKEN>`` when a token is configured. Accepts ``limit``
+    and ``sort`` query parameters.
+    """
+
+    def get(self, request):
+        if not self._authorized(request):
+            return JsonResponse({
+                'error': 'Forbidden',
+                'message': 'You do not have permission to access this resource.',
+                'status_code': 403
+            }, status=403)
+
+        try:
+            limit = int(request.GET.get('limit', 50))
+        except ValueError:
+            limit = 50
+        sort = request.GET.get('sort', 'total')
+        if sort not in SORT_KEYS:
+            sort = 'total'
+        return JsonResponse(query_instrumentation.get_stats(limit=limit, sort=sort))
+
+    def _authorized(self, request) -> bool:
+        token = DATABASE_MONITORING['METRICS_TOKEN']
+        header = request.headers.get('Authorization', '')
+        if token and hmac.compare_digest(header, f"Bearer {token}"):
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
+
+
+# Global query instrumentation instance
+query_instrumentation = QueryInstrumentation()
+
+
+def get_query_instrumentation() -> QueryInstrumentation:
+    """Get the global query instrumentation instance."""
+    return query_instrumentation
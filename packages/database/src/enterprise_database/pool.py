@@ -0,0 +1,332 @@
+"""
+Connection pooling for DB-API connections.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Generator, List, Optional
+
+from .exceptions import ConnectionError
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    """A pooled DB-API connection and when it was opened."""
+
+    __slots__ = ('connection', 'created_at')
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.created_at = time.monotonic()
+
+
+class _Waiter:
+    """A checkout waiting for a connection, or for a free slot to open one."""
+
+    __slots__ = ('event', 'pooled', 'slot')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.pooled: Optional[_PooledConnection] = None
+        self.slot = False
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections (psycopg2, sqlite3, ...).
+
+    Keeps up to ``max_connections`` idle connections and opens up to
+    ``max_overflow`` more under load. Connections are handed to waiting
+    checkouts in arrival order, recycled once older than ``pool_recycle``
+    seconds, and checked with ``ping_query`` before reuse when
+    ``pre_ping`` is set.
+    """
+    
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_connections: int = 5,
+        max_connections: int = 20,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: float = 3600,
+        pre_ping: bool = True,
+        ping_query: str = 'SELECT 1',
+    ):
+        """
+        Initialize the pool.
+        
+        Args:
+            connect: Callable opening a new DB-API connection
+            min_connections: Connections opened up front
+            max_connections: Connections kept open while idle
+            max_overflow: Connections opened beyond max_connections under load
+            pool_timeout: Seconds a checkout waits for a connection
+            pool_recycle: Seconds after which a connection is reopened
+                (0 or less to never recycle)
+            pre_ping: Check idle connections with ping_query before reuse
+            ping_query: Query used to check a connection
+        """
+        self.connect = connect
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pre_ping = pre_ping
+        self.ping_query = ping_query
+        
+        self._idle: List[_PooledConnection] = []
+        self._waiters: Deque[_Waiter] = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._open = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'ping_failures': 0,
+            'discarded': 0,
+            'connect_errors': 0,
+        }
+        
+        # Pre-create minimum connections
+        self._initialize_pool()
+    
+    def _initialize_pool(self):
+        """Initialize the connection pool with minimum connections."""
+        for _ in range(min(self.min_connections, self.max_connections)):
+            with self._lock:
+                self._open += 1
+            try:
+                pooled = self._create_connection()
+            except ConnectionError as e:
+                logger.error(f"Failed to create connection: {e}")
+                break
+            with self._lock:
+                self._idle.append(pooled)
+    
+    def _create_connection(self) -> _PooledConnection:
+        """
+        Open a connection for a slot already counted in ``_open``.
+        
+        Raises:
+            ConnectionError: If the connection cannot be opened; the slot
+                is given back
+        """
+        try:
+            pooled = _PooledConnection(self.connect())
+        except Exception as e:
+            self._release_slot(connect_error=True)
+            raise ConnectionError(f"Failed to create connection: {e}")
+        with self._lock:
+            self._stats['created'] += 1
+        return pooled
+    
+    def _release_slot(self, connect_error: bool = False) -> None:
+        """Give up a slot, or pass it to the first waiter to open its own."""
+        with self._lock:
+            if connect_error:
+                self._stats['connect_errors'] += 1
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.slot = True
+                waiter.event.set()
+            else:
+                self._open -= 1
+    
+    def _close_connection(self, pooled: _PooledConnection) -> None:
+        try:
+            pooled.connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+    
+    def _check_reusable(self, pooled: _PooledConnection) -> Optional[str]:
+        """
+        Check a connection taken from the pool before handing it out.
+        
+        Returns:
+            Name of the stat to count if it must be reopened, else None
+        """
+        if self.pool_recycle > 0 and time.monotonic() - pooled.created_at > self.pool_recycle:
+            return 'recycled'
+        if self.pre_ping:
+            try:
+                cursor = pooled.connection.cursor()
+                try:
+                    cursor.execute(self.ping_query)
+                    cursor.fetchall()
+                finally:
+                    cursor.close()
+            except Exception as e:
+                logger.warning(f"Pooled connection failed pre-ping: {e}")
+                return 'ping_failures'
+        return None
+    
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Check out a connection.
+        
+        Args:
+            timeout: Seconds to wait when the pool is exhausted
+                (defaults to pool_timeout)
+            
+        Returns:
+            DB-API connection; give it back with release()
+            
+        Raises:
+            ConnectionError: If no connection became available in time or
+                a new one could not be opened
+        """
+        timeout = self.pool_timeout if timeout is None else timeout
+        waiter = None
+        pooled = None
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("Connection pool is closed")
+            if self._idle and not self._waiters:
+                pooled = self._idle.pop()
+            elif self._open < self.max_connections + self.max_overflow:
+                self._open += 1
+            else:
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+                self._stats['waits'] += 1
+        
+        if waiter is not None:
+            started = time.monotonic()
+            waiter.event.wait(timeout)
+            with self._lock:
+                self._stats['wait_time'] += time.monotonic() - started
+                if not waiter.event.is_set():
+                    self._waiters.remove(waiter)
+                    self._stats['timeouts'] += 1
+                    raise ConnectionError(
+                        f"Connection pool exhausted: no connection available within {timeout}s"
+                    )
+            pooled = waiter.pooled
+            if pooled is None and not waiter.slot:
+                raise ConnectionError("Connection pool is closed")
+        
+        if pooled is not None:
+            reopen = self._check_reusable(pooled)
+            if reopen:
+                # Reopen in the same slot
+                with self._lock:
+                    self._stats[reopen] += 1
+                self._close_connection(pooled)
+                pooled = None
+        if pooled is None:
+            pooled = self._create_connection()
+        
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._in_use[id(pooled.connection)] = pooled
+        return pooled.connection
+    
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """
+        Give a checked out connection back to the pool.
+        
+        Any open transaction is rolled back. The connection goes to the
+        longest waiting checkout, back to the idle connections, or is
+        closed if max_connections are already idle.
+        
+        Args:
+            connection: Connection returned by acquire()
+            discard: Close the connection instead of reusing it
+        """
+        with self._lock:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            logger.warning("Released a connection that is not checked out of this pool")
+            return
+        
+        if not discard:
+            try:
+                connection.rollback()
+            except Exception as e:
+                logger.warning(f"Discarding pooled connection that failed to reset: {e}")
+                discard = True
+        
+        if discard:
+            with self._lock:
+                self._stats['discarded'] += 1
+            self._close_connection(pooled)
+            self._release_slot()
+            return
+        
+        with self._lock:
+            if self._closed:
+                self._open -= 1
+            elif self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.pooled = pooled
+                waiter.event.set()
+                return
+            elif len(self._idle) < self.max_connections:
+                self._idle.append(pooled)
+                return
+            else:
+                self._open -= 1
+        self._close_connection(pooled)
+    
+    @contextmanager
+    def get_connection(self, timeout: Optional[float] = None) -> Generator[Any, None, None]:
+        """
+        Get a connection from the pool.
+        
+        Args:
+            timeout: Seconds to wait when the pool is exhausted
+            
+        Yields:
+            Database connection
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def close(self) -> None:
+        """Close the idle connections; checked out ones close when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            waiters, self._waiters = self._waiters, deque()
+        for waiter in waiters:
+            # Woken with neither a connection nor a slot: the pool is closed
+            waiter.event.set()
+        for pooled in idle:
+            self._close_connection(pooled)
+    
+    @property
+    def checked_out(self) -> int:
+        """Number of connections currently checked out."""
+        return len(self._in_use)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'pool_size': len(self._idle),
+                'checked_out': len(self._in_use),
+                'open_connections': self._open,
+                'overflow_size': max(0, self._open - self.max_connections),
+                'waiting': len(self._waiters),
+                'total_created': self._stats['created'],
+                'min_connections': self.min_connections,
+                'max_connections': self.max_connections,
+                'max_overflow': self.max_overflow,
+            })
+        return stats
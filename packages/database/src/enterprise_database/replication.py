@@ -0,0 +1,303 @@
+"""
+Replication lag tracking and read-your-writes pinning for read routing.
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections as default_connections
+
+from .config import DATABASE_REPLICATION
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it has replayed
+# everything it received or is not in recovery at all
+POSTGRESQL_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Wall-clock time of the last write made by the current request or
+# session; reads are kept off replicas that have not replayed it
+_written_at: ContextVar[float] = ContextVar('enterprise_database_written_at', default=0.0)
+
+
+def is_replica(alias: str, settings_dict: Dict[str, Any]) -> bool:
+    """Whether a DATABASES entry is a read replica."""
+    return alias == 'read_replica' or alias.startswith('read_replica_') or 'REPLICA' in settings_dict
+
+
+def get_replica_aliases() -> List[str]:
+    """Aliases of the configured read replicas."""
+    databases = getattr(settings, 'DATABASES', {})
+    return [alias for alias, settings_dict in databases.items() if is_replica(alias, settings_dict)]
+
+
+def postgresql_lag(connection) -> float:
+    """
+    Probe replication lag of a PostgreSQL replica.
+
+    Args:
+        connection: Django connection to the replica
+
+    Returns:
+        Lag in seconds
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRESQL_LAG_QUERY)
+        return float(cursor.fetchone()[0])
+
+
+def record_write(written_at: Optional[float] = None) -> None:
+    """Keep the current request's reads on up-to-date databases from now on."""
+    _written_at.set(time.time() if written_at is None else written_at)
+
+
+def last_write() -> float:
+    """Wall-clock time of the current request's or session's last write, 0 if none."""
+    return _written_at.get()
+
+
+class ReplicaState:
+    """Last known replication state of one replica."""
+
+    __slots__ = ('alias', 'lag', 'checked_at', 'healthy', 'error', 'reads')
+
+    def __init__(self, alias: str):
+        self.alias = alias
+        self.lag = 0.0
+        self.checked_at = 0.0
+        self.healthy = True
+        self.error: Optional[str] = None
+        self.reads = 0
+
+    @property
+    def replayed_until(self) -> float:
+        """Wall-clock time up to which the replica had replayed when checked."""
+        return self.checked_at - self.lag
+
+
+class ReplicationMonitor:
+    """
+    Tracks replica lag and picks the replica to read from.
+
+    Lag is probed lazily: the first routing decision after
+    ``CHECK_INTERVAL`` seconds refreshes it, while concurrent decisions
+    keep using the previous values. PostgreSQL replicas are probed with
+    ``POSTGRESQL_LAG_QUERY``; other backends have no lag to report unless
+    a ``lag_probe`` is given.
+    """
+
+    def __init__(
+        self,
+        lag_probe: Optional[Callable[[Any], Optional[float]]] = None,
+        connections=None,
+        max_lag: Optional[float] = None,
+        check_interval: Optional[float] = None,
+        pin_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize monitor.
+
+        Args:
+            lag_probe: Returns a replica's lag in seconds given its Django
+                connection, or None if it cannot tell
+            connections: Connection handler to probe through (default:
+                ``django.db.connections``)
+            max_lag: Replicas further behind than this are not read from
+            check_interval: Seconds between lag probes
+            pin_seconds: After a write, reads stay on the primary for at
+                most this long, or until a replica has replayed the write
+        """
+        self.lag_probe = lag_probe
+        self.connections = connections if connections is not None else default_connections
+        self.max_lag = DATABASE_REPLICATION['MAX_LAG'] if max_lag is None else max_lag
+        self.check_interval = DATABASE_REPLICATION['CHECK_INTERVAL'] if check_interval is None else check_interval
+        self.pin_seconds = DATABASE_REPLICATION['PIN_SECONDS'] if pin_seconds is None else pin_seconds
+        self._replicas: Dict[str, ReplicaState] = {}
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._primary_reads = 0
+
+    def _state(self, alias: str) -> ReplicaState:
+        state = self._replicas.get(alias)
+        if state is None:
+            state = self._replicas.setdefault(alias, ReplicaState(alias))
+        return state
+
+    def _probe(self, alias: str) -> Optional[float]:
+        if self.lag_probe is not None:
+            return self.lag_probe(self.connections[alias])
+        if 'postgresql' not in settings.DATABASES[alias].get('ENGINE', ''):
+            return None
+        return postgresql_lag(self.connections[alias])
+
+    def refresh(self, aliases: Optional[List[str]] = None) -> None:
+        """Probe the lag of every replica now."""
+        for alias in aliases if aliases is not None else get_replica_aliases():
+            state = self._state(alias)
+            try:
+                lag = self._probe(alias)
+                state.lag = 0.0 if lag is None else max(0.0, lag)
+                state.healthy = True
+                state.error = None
+            except Exception as e:
+                logger.warning(f"Replication lag check failed for {alias}: {e}")
+                state.healthy = False
+                state.error = str(e)
+            state.checked_at = time.time()
+        self._refreshed_at = time.monotonic()
+
+    def _refresh_if_due(self, aliases: List[str]) -> None:
+        if time.monotonic() - self._refreshed_at < self.check_interval:
+            return
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh(aliases)
+            finally:
+                self._refresh_lock.release()
+
+    def set_lag(self, alias: str, lag: float) -> None:
+        """Record a replica's lag measured elsewhere."""
+        state = self._state(alias)
+        state.lag = lag
+        state.healthy = True
+        state.checked_at = time.time()
+
+    def _load(self, alias: str) -> int:
+        from .backends import get_pool
+
+        pool = get_pool(alias)
+        return pool.checked_out if pool is not None else 0
+
+    def select_replica(self, aliases: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Pick the replica to read from.
+
+        Replicas that are unhealthy, more than ``max_lag`` behind, or have
+        not replayed the current request's last write (within the pin
+        window) are skipped. Among the rest, the one with the fewest
+        checked out pooled connections per unit of ``REPLICA['WEIGHT']``
+        wins; ties are broken at random in proportion to weight.
+
+        Returns:
+            Replica alias, or None to read from the primary
+        """
+        if aliases is None:
+            aliases = get_replica_aliases()
+        if not aliases:
+            return None
+        self._refresh_if_due(aliases)
+
+        written_at = _written_at.get()
+        if written_at and time.time() - written_at >= self.pin_seconds:
+            written_at = 0.0
+
+        candidates = []
+        weights = []
+        databases = settings.DATABASES
+        for alias in aliases:
+            state = self._state(alias)
+            if not state.healthy or state.lag > self.max_lag:
+                continue
+            if written_at and state.replayed_until < written_at:
+                continue
+            candidates.append(alias)
+            weights.append(float(databases[alias].get('REPLICA', {}).get('WEIGHT', 1)))
+
+        if not candidates:
+            self._primary_reads += 1
+            return None
+        if len(candidates) > 1:
+            loads = [self._load(alias) / weight for alias, weight in zip(candidates, weights)]
+            least = min(loads)
+            if loads.count(least) < len(loads):
+                picked = [i for i, load in enumerate(loads) if load == least]
+                candidates = [candidates[i] for i in picked]
+                weights = [weights[i] for i in picked]
+        alias = candidates[0] if len(candidates) == 1 else random.choices(candidates, weights)[0]
+        self._replicas[alias].reads += 1
+        return alias
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get replication status.
+
+        Returns:
+            Per-replica lag, health, last check and reads routed, plus the
+            reads kept on the primary
+        """
+        return {
+            'replicas': {
+                alias: {
+                    'lag': state.lag,
+                    'healthy': state.healthy,
+                    'error': state.error,
+                    'checked_at': state.checked_at,
+                    'reads': state.reads,
+                }
+                for alias, state in list(self._replicas.items())
+            },
+            'primary_reads': self._primary_reads,
+            'max_lag': self.max_lag,
+            'pin_seconds': self.pin_seconds,
+        }
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keep a client's reads off stale replicas after it writes.
+
+    Writes routed by ``DatabaseRouter`` mark the current request. The
+    write time is echoed in a cookie for ``PIN_SECONDS``, so the client's
+    following requests are pinned too until a replica has caught up.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie_name = DATABASE_REPLICATION['PIN_COOKIE']
+
+    def __call__(self, request):
+        try:
+            written_at = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            written_at = 0.0
+        # The cookie is client-controlled: a write can't be in the future,
+        # and one older than the pin window no longer pins anything
+        now = time.time()
+        if not math.isfinite(written_at) or written_at < now - replication_monitor.pin_seconds:
+            written_at = 0.0
+        written_at = min(written_at, now)
+        token = _written_at.set(written_at)
+        try:
+            response = self.get_response(request)
+            if _written_at.get() > written_at:
+                response.set_cookie(
+                    self.cookie_name,
+                    f"{_written_at.get():.6f}",
+                    max_age=int(replication_monitor.pin_seconds) + 1,
+                    httponly=True,
+                    samesite='Lax',
+                )
+            return response
+        finally:
+            _written_at.reset(token)
+
+
+# Global replication monitor instance
+replication_monitor = ReplicationMonitor()
+
+
+def get_replication_monitor() -> ReplicationMonitor:
+    """Get the global replication monitor instance."""
+    return replication_monitor
@@ -2,7 +2,7 @@
 Repository pattern implementation for clean data access.
 """
 
-from typing import Any, Dict, List, Optional, Type, Union, QuerySet
+from typing import Any, Dict, List, Optional, Type, Union
 from django.db import models, transaction
 from django.db.models import Q, QuerySet as DjangoQuerySet
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
@@ -4,8 +4,12 @@ Database routing for read/write splitting and multi-database support.
 
 import logging
 from typing import Optional, Type, Any
+from django.apps import apps
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.conf import settings
+
+from .replication import get_replica_aliases, record_write, replication_monitor
+from .sharding import HashRing
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +19,9 @@ class DatabaseRouter:
     Database router for read/write splitting and multi-database operations.
     
     This router automatically routes read operations to read replicas
-    and write operations to the primary database.
+    and write operations to the primary database. Replicas lagging more
+    than ``DATABASE_REPLICATION['MAX_LAG']`` are skipped, and after a
+    write reads stay on the primary until a replica has replayed it.
     """
     
     # Models that should always use the primary database
@@ -56,10 +62,12 @@ class DatabaseRouter:
         if app_label in self.APP_DATABASE_MAPPING:
             return self.APP_DATABASE_MAPPING[app_label]
         
-        # Use read replica if available and not in transaction
+        # Use an up-to-date read replica if available and not in transaction
         if self._has_read_replica() and not self._in_transaction():
-            logger.debug(f"Routing read for {model_name} to read replica")
-            return 'read_replica'
+            replica = replication_monitor.select_replica()
+            if replica:
+                logger.debug(f"Routing read for {model_name} to read replica {replica}")
+                return replica
         
         # Default to primary database
         return 'default'
@@ -82,7 +90,8 @@ class DatabaseRouter:
         if app_label in self.APP_DATABASE_MAPPING:
             return self.APP_DATABASE_MAPPING[app_label]
         
-        # All writes go to primary database
+        # All writes go to primary database; pin following reads to it
+        record_write()
         logger.debug(f"Routing write for {model_name} to primary database")
         return 'default'
     
@@ -100,9 +109,8 @@ class DatabaseRouter:
         """
         db_set = {'default'}
         
-        # Add read replica to allowed databases
-        if self._has_read_replica():
-            db_set.add('read_replica')
+        # Add read replicas to allowed databases
+        db_set.update(get_replica_aliases())
         
         # Add app-specific databases
         db_set.update(self.APP_DATABASE_MAPPING.values())
@@ -127,7 +135,7 @@ class DatabaseRouter:
             True if migration is allowed, False if not, None if no opinion
         """
         # Don't migrate to read replicas
-        if db == 'read_replica':
+        if db == 'read_replica' or db in get_replica_aliases():
             return False
         
         # Check app-specific database mapping
@@ -139,8 +147,7 @@ class DatabaseRouter:
     
     def _has_read_replica(self) -> bool:
         """Check if read replica is configured."""
-        databases = getattr(settings, 'DATABASES', {})
-        return 'read_replica' in databases
+        return bool(get_replica_aliases())
     
     def _in_transaction(self) -> bool:
         """Check if currently in a database transaction."""
@@ -250,6 +257,12 @@ class MultiTenantRouter(DatabaseRouter):
 class ShardingRouter(DatabaseRouter):
     """
     Router for database sharding based on model attributes.
+    
+    Shard keys are placed on a consistent-hash ring, so every process
+    routes a key to the same shard and adding a shard only moves the keys
+    it takes over. Queries are routed by an ``instance`` hint, a
+    ``shard_key`` hint, or an equality filter on the shard key made
+    through ``ShardedQuerySet``.
     """
     
     SHARDING_RULES = {
@@ -257,9 +270,69 @@ class ShardingRouter(DatabaseRouter):
         # 'auth.User': {
         #     'field': 'id',
         #     'shards': ['shard1', 'shard2', 'shard3', 'shard4'],
+        #     # or weighted: {'shard1': 1, 'shard2': 2}, optionally 'vnodes': 64
         # },
     }
     
+    def __init__(self):
+        super().__init__()
+        self._rings = {}
+    
+    def get_ring(self, model_name: str) -> Optional[HashRing]:
+        """
+        Get the hash ring of a sharded model.
+        
+        Args:
+            model_name: Model label, e.g. 'auth.User'
+            
+        Returns:
+            Hash ring or None if the model is not sharded
+        """
+        ring = self._rings.get(model_name)
+        if ring is None and model_name in self.SHARDING_RULES:
+            rule = self.SHARDING_RULES[model_name]
+            ring = self._rings.setdefault(model_name, HashRing(rule['shards'], rule.get('vnodes')))
+        return ring
+    
+    def get_shard_for_value(self, model_name: str, value: Any) -> Optional[str]:
+        """
+        Get shard database for a shard key value.
+        
+        Args:
+            model_name: Model label, e.g. 'auth.User'
+            value: Shard key value
+            
+        Returns:
+            Shard database alias or None
+        """
+        ring = self.get_ring(model_name)
+        return ring.get_shard(self.to_shard_key(model_name, value)) if ring else None
+    
+    def to_shard_key(self, model_name: str, value: Any) -> Any:
+        """
+        Convert a shard key value to the type the model's field holds.
+        
+        Filter and ``shard_key`` hints carry raw lookup values, e.g. a
+        UUID string taken from a URL, which would hash differently from
+        the ``UUID`` on the instance.
+        
+        Args:
+            model_name: Model label, e.g. 'auth.User'
+            value: Shard key value
+            
+        Returns:
+            Value as the field's ``to_python()`` returns it
+        """
+        if isinstance(value, models.Model):
+            value = value.pk
+        name = self.SHARDING_RULES[model_name]['field']
+        model = apps.get_model(model_name)
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            return value
+    
     def get_shard_for_instance(self, instance: models.Model) -> Optional[str]:
         """
         Get shard database for a model instance.
@@ -275,32 +348,56 @@ class ShardingRouter(DatabaseRouter):
         if model_name not in self.SHARDING_RULES:
             return None
         
-        rule = self.SHARDING_RULES[model_name]
-        field_value = getattr(instance, rule['field'])
-        
-        # Simple hash-based sharding
-        shard_index = hash(field_value) % len(rule['shards'])
-        return rule['shards'][shard_index]
+        field_value = getattr(instance, self.SHARDING_RULES[model_name]['field'])
+        return self.get_shard_for_value(model_name, field_value)
     
-    def db_for_read(self, model: Type[models.Model], **hints) -> Optional[str]:
-        """Route reads based on sharding rules."""
+    def _get_shard_from_hints(self, model: Type[models.Model], hints: dict) -> Optional[str]:
+        """Find the shard from an instance, shard key or shard key filter."""
         instance = hints.get('instance')
         if instance:
             shard = self.get_shard_for_instance(instance)
             if shard:
                 return shard
         
+        model_name = f"{model._meta.app_label}.{model.__name__}"
+        if model_name not in self.SHARDING_RULES:
+            return None
+        
+        if 'shard_key' in hints:
+            return self.get_shard_for_value(model_name, hints['shard_key'])
+        
+        field = self.SHARDING_RULES[model_name]['field']
+        filters = hints.get('filters', {})
+        names = (field, 'pk') if field == model._meta.pk.name else (field,)
+        for name in names:
+            if name in filters:
+                return self.get_shard_for_value(model_name, filters[name])
+        return None
+    
+    def db_for_read(self, model: Type[models.Model], **hints) -> Optional[str]:
+        """Route reads based on sharding rules."""
+        shard = self._get_shard_from_hints(model, hints)
+        if shard:
+            return shard
+        
         return super().db_for_read(model, **hints)
     
     def db_for_write(self, model: Type[models.Model], **hints) -> Optional[str]:
         """Route writes based on sharding rules."""
-        instance = hints.get('instance')
-        if instance:
-            shard = self.get_shard_for_instance(instance)
-            if shard:
-                return shard
+        shard = self._get_shard_from_hints(model, hints)
+        if shard:
+            return shard
         
         return super().db_for_write(model, **hints)
+    
+    def allow_migrate(self, db: str, app_label: str, model_name: str = None, **hints) -> Optional[bool]:
+        """Create sharded models' tables on their shards."""
+        if model_name:
+            for label in self.SHARDING_RULES:
+                if label.lower() == f"{app_label}.{model_name}".lower():
+                    return db in self.get_ring(label).shards
+        
+        return super().allow_migrate(db, app_label, model_name, **hints)
 
 
 # Utility functions for router management
@@ -0,0 +1,416 @@
+"""
+Consistent-hash sharding, resharding and cross-shard reads.
+"""
+
+import bisect
+import hashlib
+import heapq
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union
+
+from django.db import connections, models, transaction
+from django.db.models.deletion import Collector, ProtectedError, RestrictedError
+from django.utils import timezone
+
+from .config import DATABASE_SHARDING
+from .exceptions import ShardingError
+
+logger = logging.getLogger(__name__)
+
+
+def stable_hash(value: Any) -> int:
+    """
+    Hash a shard key the same way in every process.
+
+    Unlike ``hash()``, the result does not depend on PYTHONHASHSEED.
+    Integers and their string form hash alike, so keys taken from URLs
+    route the same as keys read from the database.
+
+    Args:
+        value: Shard key value
+
+    Returns:
+        64-bit hash
+    """
+    if isinstance(value, bytes):
+        data = value
+    elif isinstance(value, uuid.UUID):
+        data = value.hex.encode()
+    else:
+        data = str(value).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """
+    Consistent-hash ring mapping shard keys to database aliases.
+
+    Each shard is placed on the ring ``vnodes * weight`` times, so keys
+    spread evenly and adding or removing a shard only moves the keys
+    between it and its ring neighbours (about ``1/n`` of them).
+    """
+
+    def __init__(self, shards: Union[Iterable[str], Dict[str, int]], vnodes: Optional[int] = None):
+        """
+        Initialize ring.
+
+        Args:
+            shards: Shard aliases, or a mapping of alias to weight
+            vnodes: Ring points per unit of weight
+
+        Raises:
+            ShardingError: If there are no shards
+        """
+        weights = dict(shards) if isinstance(shards, dict) else {alias: 1 for alias in shards}
+        if not weights:
+            raise ShardingError("A hash ring needs at least one shard")
+        self.weights = weights
+        self.vnodes = DATABASE_SHARDING['VIRTUAL_NODES'] if vnodes is None else vnodes
+
+        points = sorted(
+            (stable_hash(f"{alias}#{i}"), alias)
+            for alias, weight in weights.items()
+            for i in range(max(1, int(self.vnodes * weight)))
+        )
+        self._points = [point for point, _ in points]
+        self._aliases = [alias for _, alias in points]
+
+    @property
+    def shards(self) -> List[str]:
+        """Shard aliases on the ring."""
+        return list(self.weights)
+
+    def get_shard(self, key: Any) -> str:
+        """
+        Get the shard a key belongs to.
+
+        Args:
+            key: Shard key value
+
+        Returns:
+            Shard database alias
+        """
+        index = bisect.bisect(self._points, stable_hash(key))
+        return self._aliases[index % len(self._aliases)]
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def __repr__(self) -> str:
+        return f"HashRing({self.weights!r}, vnodes={self.vnodes})"
+
+
+class ShardedQuerySet(models.QuerySet):
+    """
+    QuerySet that passes equality filters to the routers as hints.
+
+    ``filter(field=value)``, ``get(field=value)`` and ``create(...)`` on a
+    sharded model are then routed to the shard owning ``value``; other
+    queries go wherever the router sends unhinted queries, or to
+    ``scatter_gather``.
+    """
+
+    def _with_filter_hints(self, lookups: Dict[str, Any]) -> 'ShardedQuerySet':
+        filters = {}
+        for lookup, value in lookups.items():
+            field, _, lookup_type = lookup.partition('__')
+            if lookup_type in ('', 'exact'):
+                filters[field] = value
+        if filters:
+            # Clones share their hints dict, so replace it rather than update it
+            self._hints = dict(self._hints, filters=dict(self._hints.get('filters', {}), **filters))
+        return self
+
+    def filter(self, *args, **kwargs):
+        return super().filter(*args, **kwargs)._with_filter_hints(kwargs)
+
+    def shard_key(self, value: Any) -> 'ShardedQuerySet':
+        """Route this query to the shard owning ``value``."""
+        clone = self._chain()
+        clone._hints = dict(clone._hints, shard_key=value)
+        return clone
+
+    def create(self, **kwargs):
+        return super(ShardedQuerySet, self._chain()._with_filter_hints(kwargs)).create(**kwargs)
+
+
+ShardedManager = models.Manager.from_queryset(ShardedQuerySet)
+
+
+def scatter_gather(
+    queryset: models.QuerySet,
+    shards: Union[HashRing, Iterable[str]],
+    key: Optional[Callable[[Any], Any]] = None,
+    reverse: bool = False,
+    limit: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> List[Any]:
+    """
+    Run a read on every shard in parallel and combine the results.
+
+    Args:
+        queryset: Query to run on each shard
+        shards: Hash ring or shard aliases to query
+        key: Sort key; when given, per-shard results (already sorted by
+            ``queryset``'s ordering) are merged in order
+        reverse: Whether the merge order is descending
+        limit: Rows to fetch per shard and to return overall
+        max_workers: Shards queried at once
+
+    Returns:
+        Rows from every shard
+    """
+    aliases = shards.shards if isinstance(shards, HashRing) else list(shards)
+
+    def fetch(alias):
+        try:
+            shard_queryset = queryset.using(alias)
+            if limit is not None:
+                shard_queryset = shard_queryset[:limit]
+            return list(shard_queryset)
+        finally:
+            connections[alias].close()
+
+    workers = max_workers or DATABASE_SHARDING['SCATTER_WORKERS']
+    with ThreadPoolExecutor(max_workers=min(workers, len(aliases)) or 1) as executor:
+        results = list(executor.map(fetch, aliases))
+
+    if key is not None:
+        rows = list(heapq.merge(*results, key=key, reverse=reverse))
+    else:
+        rows = [row for result in results for row in result]
+    return rows[:limit] if limit is not None else rows
+
+
+class Resharder:
+    """
+    Move rows of a sharded model from one ring layout to another.
+
+    ``run()`` copies, shard by shard and in primary key batches, every row
+    whose shard differs under the target ring, leaving the source rows in
+    place so reads keep working while the copy runs. Progress is kept per
+    shard, so a stopped run resumes where it left off.
+
+    Rows keep changing on their source shard while the copy runs. Given an
+    ``updated_field`` (e.g. an ``auto_now`` ``updated_at``), ``catch_up()``
+    copies again the moved rows changed since the copy (or the previous
+    catch-up) started; ``run()`` ends with one such pass. To cut over,
+    stop writes to the model, call ``catch_up()`` once more, switch the
+    router to the target ring and resume writes. Without an
+    ``updated_field`` writes must be stopped for the whole copy. Deletes
+    are never replayed, so hold them until the cut-over.
+
+    Once the router uses the target ring, ``purge()`` deletes the rows
+    that no longer belong on each shard. Primary keys must be unique
+    across shards (e.g. UUIDs or keys from a shared sequence);
+    many-to-many and other related rows are not moved.
+    """
+
+    def __init__(
+        self,
+        model: Type[models.Model],
+        field: str,
+        source: HashRing,
+        target: HashRing,
+        batch_size: Optional[int] = None,
+        pause: float = 0.0,
+        updated_field: Optional[str] = None,
+    ):
+        """
+        Initialize resharder.
+
+        Args:
+            model: Sharded model class
+            field: Shard key field
+            source: Ring the rows are currently placed by
+            target: Ring to place the rows by
+            batch_size: Rows read per query
+            pause: Seconds to sleep between batches, to limit the load
+            updated_field: Datetime field set on every write, for catch-up
+        """
+        self.model = model
+        self.field = field
+        self.source = source
+        self.target = target
+        self.batch_size = batch_size or DATABASE_SHARDING['RESHARD_BATCH_SIZE']
+        self.pause = pause
+        self.updated_field = updated_field
+        self.progress: Dict[str, Any] = {}
+        self.stats = {'scanned': 0, 'copied': 0, 'caught_up': 0, 'purged': 0, 'batches': 0}
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _batches(self, alias: str, phase: str, **filters):
+        manager = self.model._base_manager.db_manager(alias)
+        key = f"{phase}:{alias}"
+        while not self._stop.is_set():
+            queryset = manager.filter(**filters).order_by('pk')
+            if key in self.progress:
+                queryset = queryset.filter(pk__gt=self.progress[key])
+            batch = list(queryset[:self.batch_size])
+            if not batch:
+                break
+            yield batch
+            self.progress[key] = batch[-1].pk
+            self.stats['batches'] += 1
+            if self.pause:
+                time.sleep(self.pause)
+
+    def _copy(self, alias: str, batch: List[models.Model]) -> int:
+        """Write the rows of batch that move off alias to their target shards."""
+        moves: Dict[str, List[models.Model]] = {}
+        for obj in batch:
+            destination = self.target.get_shard(getattr(obj, self.field))
+            if destination != alias:
+                moves.setdefault(destination, []).append(obj)
+
+        pk = self.model._meta.pk
+        fields = [f.name for f in self.model._meta.concrete_fields if f is not pk]
+        for destination, objs in moves.items():
+            # Upsert, so rows copied by an earlier run or pass are refreshed
+            with transaction.atomic(using=destination):
+                self.model._base_manager.db_manager(destination).bulk_create(
+                    objs, update_conflicts=True, unique_fields=[pk.name], update_fields=fields
+                )
+        return sum(len(objs) for objs in moves.values())
+
+    def run(self) -> Dict[str, int]:
+        """
+        Copy rows to the shards they belong on under the target ring.
+
+        Returns:
+            Rows scanned, copied and caught up so far
+        """
+        self.progress.setdefault('synced_at', timezone.now())
+        for alias in self.source.shards:
+            for batch in self._batches(alias, 'copy'):
+                self.stats['scanned'] += len(batch)
+                self.stats['copied'] += self._copy(alias, batch)
+        if self.updated_field and not self._stop.is_set():
+            self.catch_up()
+        return dict(self.stats)
+
+    def catch_up(self) -> int:
+        """
+        Copy again the moved rows written since the last copy or catch-up began.
+
+        Returns:
+            Rows copied
+        """
+        if not self.updated_field:
+            raise ShardingError("catch_up() needs an updated_field; stop writes during the copy instead")
+        if 'synced_at' not in self.progress:
+            raise ShardingError("catch_up() follows run()")
+
+        started = timezone.now()
+        since = {f"{self.updated_field}__gte": self.progress['synced_at']}
+        copied = 0
+        for alias in self.source.shards:
+            self.progress.pop(f"catch_up:{alias}", None)
+            for batch in self._batches(alias, 'catch_up', **since):
+                copied += self._copy(alias, batch)
+        if not self._stop.is_set():
+            self.progress['synced_at'] = started
+        self.stats['caught_up'] += copied
+        return copied
+
+    def purge(self, cascade: bool = False) -> int:
+        """
+        Delete rows from shards they no longer belong on.
+
+        Rows are deleted with a raw ``DELETE``: no signals are sent, since
+        the rows still exist on their new shard. If other rows on the old
+        shard reference them, a ``ShardingError`` names those models,
+        unless ``cascade`` is set, in which case the rows are deleted
+        through the ORM and their ``on_delete`` rules and signals run.
+
+        Args:
+            cascade: Delete related rows left on the old shard too
+
+        Returns:
+            Rows deleted
+        """
+        purged = 0
+        for alias in self.source.shards:
+            for batch in self._batches(alias, 'purge'):
+                stale = [obj.pk for obj in batch if self.target.get_shard(getattr(obj, self.field)) != alias]
+                if not stale:
+                    continue
+                queryset = self.model._base_manager.db_manager(alias).filter(pk__in=stale)
+                if cascade:
+                    queryset.delete()
+                else:
+                    related = self._related_models(alias, queryset)
+                    if related:
+                        raise ShardingError(
+                            f"Rows on {alias} reference rows being purged: {', '.join(related)}; "
+                            f"move them first or purge with cascade"
+                        )
+                    queryset._raw_delete(alias)
+                purged += len(stale)
+        self.stats['purged'] += purged
+        return purged
+
+    def _related_models(self, alias: str, queryset) -> List[str]:
+        """Labels of other models whose rows on alias a delete would reach."""
+        collector = Collector(using=alias, origin=None)
+        try:
+            collector.collect(queryset)
+        except (ProtectedError, RestrictedError) as e:
+            return sorted({obj._meta.label for obj in e.protected_objects if obj._meta.model is not self.model})
+        related = {
+            model._meta.label for model, instances in collector.data.items()
+            if model is not self.model and instances
+        }
+        related.update(
+            qs.model._meta.label for qs in collector.fast_deletes
+            if qs.model is not self.model and qs.exists()
+        )
+        related.update(
+            field.model._meta.label for (field, _), batches in collector.field_updates.items()
+            if any(batch.exists() if isinstance(batch, models.QuerySet) else batch for batch in batches)
+        )
+        return sorted(related)
+
+    def start(self) -> threading.Thread:
+        """Run the copy in a background thread."""
+        if self._thread and self._thread.is_alive():
+            raise ShardingError("Resharding is already running")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_in_background, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run_in_background(self) -> None:
+        try:
+            self.run()
+        except Exception as e:
+            logger.error(f"Resharding {self.model._meta.label} failed: {e}")
+            self.error = str(e)
+        finally:
+            connections.close_all()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop after the current batch; ``run()`` resumes from there."""
+        self._stop.set()
+        if wait and self._thread:
+            self._thread.join()
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        Get resharding progress.
+
+        Returns:
+            Counters, last primary key done per shard and phase, and state
+        """
+        return {
+            **self.stats,
+            'progress': dict(self.progress),
+            'running': bool(self._thread and self._thread.is_alive()),
+            'error': self.error,
+        }
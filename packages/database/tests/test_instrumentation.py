@@ -0,0 +1,191 @@
+"""
+Tests for query instrumentation.
+"""
+
+import io
+import json
+import sys
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from enterprise_database import cli
+from enterprise_database.config import DATABASE_MONITORING
+from enterprise_database.instrumentation import (
+    OTHER_QUERIES,
+    QueryInstrumentation,
+    QueryInstrumentationMiddleware,
+    QueryMetricsView,
+    fingerprint,
+    query_instrumentation,
+)
+
+
+class TestQueryInstrumentation(SimpleTestCase):
+    """Test cases for QueryInstrumentation class."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.connections = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+        })
+        self.instrumentation = QueryInstrumentation(slow_threshold=60, n_plus_one_threshold=3)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.instrumentation.disable()
+        self.connections.close_all()
+
+    def query(self, sql, params=None):
+        with self.connections['default'].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def test_fingerprint(self):
+        """Test that queries differing only in values share a fingerprint."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t1 WHERE id = 42 AND name = 'it''s'  AND x IN (%s, %s)"),
+            "SELECT * FROM t1 WHERE id = ? AND name = ? AND x IN (...)",
+        )
+        self.assertEqual(fingerprint('SELECT a FROM b WHERE c IN (%s)'), fingerprint('SELECT a FROM b WHERE c IN (1, 2, 3)'))
+
+    def test_records_queries_on_new_connections(self):
+        """Test that enabling installs the execute wrapper on connections as they open."""
+        self.instrumentation.enable()
+        self.query('CREATE TABLE items (id INTEGER)')
+        for i in range(5):
+            self.query('INSERT INTO items VALUES (%s)', [i])
+
+        stats = self.instrumentation.get_stats()
+        insert = next(s for s in stats['fingerprints'] if s['fingerprint'].startswith('INSERT'))
+        self.assertEqual((insert['count'], insert['rows'], insert['names']), (5, 5, {'-': 5}))
+        self.assertLessEqual(insert['p50'], insert['p99'])
+        self.assertLessEqual(insert['p99'], insert['max'])
+
+        self.instrumentation.disable()
+        self.query('SELECT 1')
+        self.assertEqual(self.instrumentation.get_stats()['queries'], 6)
+
+    def test_n_plus_one_and_attribution(self):
+        """Test that repeated queries within one scope are flagged."""
+        self.instrumentation.enable()
+        self.query('CREATE TABLE items (id INTEGER)')
+
+        with self.instrumentation.track('blog:post_list'):
+            for i in range(4):
+                self.query('SELECT * FROM items WHERE id = %s', [i])
+        with self.instrumentation.track('blog:post_detail'):
+            self.query('SELECT * FROM items WHERE id = %s', [1])
+
+        stats = self.instrumentation.get_stats(sort='n_plus_one')
+        select = stats['fingerprints'][0]
+        self.assertEqual(select['fingerprint'], 'SELECT * FROM items WHERE id = ?')
+        self.assertEqual(select['n_plus_one'], 1)
+        self.assertEqual(select['names'], {'blog:post_list': 4, 'blog:post_detail': 1})
+        self.assertEqual(
+            [(e['name'], e['count']) for e in stats['n_plus_one']],
+            [('blog:post_list', 4)],
+        )
+
+    def test_slow_queries_and_percentiles(self):
+        """Test slow query capture and histogram percentiles."""
+        self.instrumentation.slow_threshold = 0.5
+        for duration in [0.001] * 90 + [0.010] * 9 + [1.0]:
+            self.instrumentation.record('SELECT 1', duration)
+
+        stats = self.instrumentation.get_stats()
+        select = stats['fingerprints'][0]
+        self.assertAlmostEqual(select['p50'], 0.001, delta=0.0002)
+        self.assertAlmostEqual(select['p95'], 0.010, delta=0.002)
+        self.assertAlmostEqual(select['p99'], 0.010, delta=0.002)
+        self.assertEqual(select['slow'], 1)
+        self.assertEqual(stats['slow_queries'][0]['duration'], 1.0)
+
+    def test_fingerprint_limit(self):
+        """Test that fingerprints beyond the limit are counted together."""
+        self.instrumentation.max_fingerprints = 2
+        for table in ('a', 'b', 'c', 'd'):
+            self.instrumentation.record(f'SELECT * FROM {table}', 0.001)
+
+        fingerprints = {s['fingerprint']: s['count'] for s in self.instrumentation.get_stats()['fingerprints']}
+        self.assertEqual(fingerprints[OTHER_QUERIES], 2)
+        self.assertEqual(len(fingerprints), 3)
+
+
+class TestQueryInstrumentationEndpoints(SimpleTestCase):
+    """Test cases for the middleware, metrics view and CLI."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.factory = RequestFactory()
+        query_instrumentation.reset()
+        self.addCleanup(query_instrumentation.disable)
+        self.addCleanup(query_instrumentation.reset)
+
+    def test_middleware_attributes_queries_to_view(self):
+        """Test that a request's queries are recorded under its view."""
+        repeats = query_instrumentation.n_plus_one_threshold + 1
+
+        def post_list(request):
+            with connection.cursor() as cursor:
+                for _ in range(repeats):
+                    cursor.execute('SELECT %s', [1])
+            return HttpResponse()
+
+        def handler(request):
+            # Django calls process_view once the URL has been resolved
+            middleware.process_view(request, post_list, (), {})
+            return post_list(request)
+
+        middleware = QueryInstrumentationMiddleware(handler)
+        middleware(self.factory.get('/posts/'))
+        QueryInstrumentationMiddleware(post_list)(self.factory.get('/posts/'))
+
+        stats = query_instrumentation.get_stats()
+        name = f"GET {__name__}.{post_list.__qualname__}"
+        select = next(s for s in stats['fingerprints'] if s['fingerprint'] == 'SELECT ?')
+        self.assertEqual(select['names'], {name: repeats, 'GET <unresolved>': repeats})
+        self.assertEqual([e['name'] for e in stats['n_plus_one']], [name, 'GET <unresolved>'])
+
+    def test_metrics_view_requires_staff_or_token(self):
+        """Test access to the query metrics endpoint."""
+        query_instrumentation.record('SELECT 1', 0.002)
+
+        request = self.factory.get('/metrics/queries/')
+        request.user = AnonymousUser()
+        self.assertEqual(QueryMetricsView.as_view()(request).status_code, 403)
+
+        with patch.dict(DATABASE_MONITORING, {'METRICS_TOKEN': 'secret'}):
+            request = self.factory.get('/metrics/queries/?limit=1', HTTP_AUTHORIZATION='Bearer secret')
+            request.user = AnonymousUser()
+            response = QueryMetricsView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        stats = json.loads(response.content)
+        self.assertEqual(stats['queries'], 1)
+        self.assertEqual(stats['fingerprints'][0]['fingerprint'], 'SELECT ?')
+
+    def test_cli_prints_report(self):
+        """Test the queries subcommand against a metrics endpoint."""
+        query_instrumentation.record('SELECT * FROM items WHERE id = 1', 0.004)
+        body = json.dumps(query_instrumentation.get_stats()).encode()
+
+        output = io.StringIO()
+        argv = ['db-queries', '--url', 'http://app/metrics/queries/', '--token', 'secret']
+        with patch.object(sys, 'argv', argv), patch('sys.stdout', output), \
+                patch('urllib.request.urlopen', return_value=io.BytesIO(body)) as urlopen:
+            cli.queries_command()
+
+        request = urlopen.call_args[0][0]
+        self.assertEqual(request.get_header('Authorization'), 'Bearer secret')
+        self.assertIn('limit=20', request.full_url)
+        self.assertIn('Queries: 1', output.getvalue())
+        self.assertIn('SELECT * FROM items WHERE id = ?', output.getvalue())
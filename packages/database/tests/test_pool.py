@@ -0,0 +1,250 @@
+"""
+Tests for database connection pooling.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from django.test.signals import setting_changed
+
+from enterprise_database.backends import close_pools, get_pool
+from enterprise_database.exceptions import ConnectionError
+from enterprise_database.pool import ConnectionPool
+
+
+class TestConnectionPool(SimpleTestCase):
+    """Test cases for ConnectionPool class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'pool.sqlite3')
+        self.opened = []
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.opened.append(conn)
+        return conn
+
+    def create_pool(self, **kwargs):
+        options = {'min_connections': 0, 'max_connections': 2, 'max_overflow': 1, 'pool_timeout': 0.2}
+        options.update(kwargs)
+        return ConnectionPool(self.connect, **options)
+
+    def test_reuses_connections(self):
+        """Test that released connections are handed out again."""
+        pool = self.create_pool(min_connections=1)
+        self.assertEqual(len(self.opened), 1)
+
+        for _ in range(5):
+            with pool.get_connection() as conn:
+                conn.execute('SELECT 1')
+
+        self.assertEqual(len(self.opened), 1)
+        stats = pool.get_stats()
+        self.assertEqual(stats['checkouts'], 5)
+        self.assertEqual(stats['pool_size'], 1)
+        self.assertEqual(stats['checked_out'], 0)
+
+    def test_overflow_and_exhaustion(self):
+        """Test overflow connections and checkout timeout."""
+        pool = self.create_pool()
+        held = [pool.acquire() for _ in range(3)]
+        self.assertEqual(pool.get_stats()['overflow_size'], 1)
+
+        with self.assertRaises(ConnectionError):
+            pool.acquire()
+        self.assertEqual(pool.get_stats()['timeouts'], 1)
+
+        # Only max_connections stay open once idle
+        for conn in held:
+            pool.release(conn)
+        stats = pool.get_stats()
+        self.assertEqual((stats['pool_size'], stats['open_connections']), (2, 2))
+
+    def test_waiters_are_served_in_order(self):
+        """Test that waiting checkouts get connections first come, first served."""
+        pool = self.create_pool(max_connections=1, max_overflow=0, pool_timeout=5)
+        held = pool.acquire()
+        served = []
+
+        def checkout(i):
+            with pool.get_connection():
+                served.append(i)
+
+        threads = []
+        for i in range(4):
+            thread = threading.Thread(target=checkout, args=(i,))
+            thread.start()
+            threads.append(thread)
+            while pool.get_stats()['waiting'] < i + 1:
+                time.sleep(0.001)
+
+        pool.release(held)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(served, [0, 1, 2, 3])
+        self.assertEqual(len(self.opened), 1)
+
+    def test_recycle_and_pre_ping(self):
+        """Test that old and broken connections are reopened on checkout."""
+        pool = self.create_pool(pool_recycle=60)
+        conn = pool.acquire()
+        pool.release(conn)
+
+        conn.close()
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, conn)
+        self.assertEqual(pool.get_stats()['ping_failures'], 1)
+        pool.release(replacement)
+
+        pool.pool_recycle = 0.001
+        time.sleep(0.01)
+        pool.release(pool.acquire())
+        self.assertEqual(pool.get_stats()['recycled'], 1)
+        self.assertEqual(len(self.opened), 3)
+
+    def test_release_resets_transactions(self):
+        """Test that uncommitted work is rolled back on release."""
+        pool = self.create_pool(max_connections=1)
+        with pool.get_connection() as conn:
+            conn.execute('CREATE TABLE items (id INTEGER)')
+            conn.commit()
+            conn.execute('INSERT INTO items VALUES (1)')
+
+        with pool.get_connection() as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM items').fetchone()[0], 0)
+
+    def test_close(self):
+        """Test closing the pool."""
+        pool = self.create_pool(min_connections=2)
+        held = pool.acquire()
+        pool.close()
+
+        with self.assertRaises(ConnectionError):
+            pool.acquire()
+        pool.release(held)
+        self.assertEqual(pool.get_stats()['open_connections'], 0)
+
+
+class TestPooledDatabaseBackend(SimpleTestCase):
+    """Test cases for the pooled Django database backends."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.connections = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+            'pooled': {
+                'ENGINE': 'enterprise_database.backends.sqlite3',
+                'NAME': os.path.join(self.temp_dir, 'pooled.sqlite3'),
+                'POOL': {'MAX_SIZE': 2, 'MAX_OVERFLOW': 0},
+            },
+        })
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.connections.close_all()
+        close_pools()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_requests_reuse_warm_connections(self):
+        """Test that closing a connection returns it to the pool."""
+        def request():
+            connection = self.connections['pooled']
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            raw = connection.connection
+            connection.close()
+            return raw
+
+        first = request()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(request()))
+        thread.start()
+        thread.join()
+
+        self.assertIs(results[0], first)
+        stats = get_pool('pooled').get_stats()
+        self.assertEqual((stats['created'], stats['checkouts']), (1, 2))
+        self.assertEqual(stats['pool_size'], 1)
+
+    def test_pool_follows_changed_database_name(self):
+        """Test that a new NAME, as set for test databases, gets a new pool."""
+        connection = self.connections['pooled']
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE items (id INTEGER)')
+        connection.close()
+        first = get_pool('pooled')
+
+        connection.settings_dict['NAME'] = os.path.join(self.temp_dir, 'other.sqlite3')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'items'")
+            self.assertEqual(cursor.fetchall(), [])
+        connection.close()
+
+        self.assertIsNot(get_pool('pooled'), first)
+        self.assertEqual(first.get_stats()['open_connections'], 0)
+
+    def test_close_all_releases_only_the_calling_threads_connections(self):
+        """Test that close_all in one thread leaves other threads' connections open."""
+        connection = self.connections['pooled']
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        pool = get_pool('pooled')
+
+        def worker():
+            with self.connections['pooled'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            self.connections.close_all()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertIs(get_pool('pooled'), pool)
+        stats = pool.get_stats()
+        self.assertEqual(stats['checked_out'], 1)
+        self.assertEqual(stats['pool_size'], 1)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    def test_pools_closed_explicitly(self):
+        """Test that close_pools, DATABASES changes and test db teardown close pools."""
+        def use():
+            connection = self.connections['pooled']
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.close()
+            return get_pool('pooled')
+
+        pool = use()
+        close_pools('pooled')
+        self.assertIsNone(get_pool('pooled'))
+        self.assertEqual(pool.get_stats()['open_connections'], 0)
+
+        pool = use()
+        setting_changed.send(sender=None, setting='DATABASES', value={}, enter=True)
+        self.assertIsNone(get_pool('pooled'))
+        self.assertEqual(pool.get_stats()['open_connections'], 0)
+
+        pool = use()
+        name = self.connections['pooled'].settings_dict['NAME']
+        self.connections['pooled'].creation.destroy_test_db(verbosity=0)
+        self.assertIsNone(get_pool('pooled'))
+        self.assertEqual(pool.get_stats()['open_connections'], 0)
+        self.assertFalse(os.path.exists(name))
@@ -0,0 +1,212 @@
+"""
+Tests for replication lag aware read routing.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from enterprise_database.replication import (
+    ReadYourWritesMiddleware,
+    ReplicationMonitor,
+    get_replica_aliases,
+    last_write,
+    record_write,
+)
+from enterprise_database.routers import DatabaseRouter
+
+
+def simulated_lag(connection):
+    """Read the lag a test wrote into the replica itself."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT seconds FROM replication_lag')
+        return cursor.fetchone()[0]
+
+
+class TestReplicationMonitor(SimpleTestCase):
+    """Test cases for ReplicationMonitor with two local SQLite replicas."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.databases_setting = {
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+            'read_replica_1': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(self.temp_dir, 'replica_1.sqlite3'),
+            },
+            'read_replica_2': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(self.temp_dir, 'replica_2.sqlite3'),
+                'REPLICA': {'WEIGHT': 3},
+            },
+        }
+        override = override_settings(DATABASES=self.databases_setting)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.connections = ConnectionHandler(self.databases_setting)
+        for alias in ('read_replica_1', 'read_replica_2'):
+            with self.connections[alias].cursor() as cursor:
+                cursor.execute('CREATE TABLE replication_lag (seconds REAL)')
+                cursor.execute('INSERT INTO replication_lag VALUES (0)')
+        self.monitor = ReplicationMonitor(
+            lag_probe=simulated_lag,
+            connections=self.connections,
+            max_lag=5,
+            check_interval=60,
+            pin_seconds=10,
+        )
+        record_write(0.0)
+        self.addCleanup(record_write, 0.0)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.connections.close_all()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def set_replica_lag(self, alias, seconds):
+        with self.connections[alias].cursor() as cursor:
+            cursor.execute('UPDATE replication_lag SET seconds = %s', [seconds])
+
+    def test_replica_aliases(self):
+        """Test that replicas are found by alias or REPLICA settings."""
+        self.assertEqual(get_replica_aliases(), ['read_replica_1', 'read_replica_2'])
+
+    def test_lagging_replicas_are_skipped(self):
+        """Test that replicas further behind than max_lag get no reads."""
+        self.set_replica_lag('read_replica_2', 30)
+        self.monitor.refresh()
+
+        self.assertEqual({self.monitor.select_replica() for _ in range(20)}, {'read_replica_1'})
+        status = self.monitor.get_status()
+        self.assertEqual(status['replicas']['read_replica_2']['lag'], 30)
+        self.assertEqual(status['replicas']['read_replica_1']['reads'], 20)
+
+        self.set_replica_lag('read_replica_1', 30)
+        self.monitor.refresh()
+        self.assertIsNone(self.monitor.select_replica())
+        self.assertEqual(self.monitor.get_status()['primary_reads'], 1)
+
+    def test_failed_probe_marks_replica_unhealthy(self):
+        """Test that a replica whose lag cannot be read gets no reads."""
+        with self.connections['read_replica_1'].cursor() as cursor:
+            cursor.execute('DROP TABLE replication_lag')
+        self.monitor.refresh()
+
+        self.assertFalse(self.monitor.get_status()['replicas']['read_replica_1']['healthy'])
+        self.assertEqual(self.monitor.select_replica(), 'read_replica_2')
+
+    def test_weighted_selection(self):
+        """Test that equally loaded replicas share reads by weight."""
+        self.monitor.refresh()
+        with patch('enterprise_database.replication.random.choices', return_value=['read_replica_2']) as choices:
+            self.assertEqual(self.monitor.select_replica(), 'read_replica_2')
+        choices.assert_called_once_with(['read_replica_1', 'read_replica_2'], [1.0, 3.0])
+
+    def test_least_loaded_selection(self):
+        """Test that the replica with fewest checkouts per weight is preferred."""
+        self.monitor.refresh()
+        loads = {'read_replica_1': 1, 'read_replica_2': 6}
+        with patch.object(ReplicationMonitor, '_load', side_effect=lambda alias: loads[alias]):
+            self.assertEqual(self.monitor.select_replica(), 'read_replica_1')
+            loads['read_replica_1'] = 3
+            self.assertEqual(self.monitor.select_replica(), 'read_replica_2')
+
+    def test_reads_pinned_after_write(self):
+        """Test that reads avoid replicas that have not replayed a recent write."""
+        self.set_replica_lag('read_replica_2', 2)
+        self.monitor.refresh()
+        record_write(time.time() - 1)
+
+        # Only the replica with no lag has replayed the write
+        self.assertEqual({self.monitor.select_replica() for _ in range(10)}, {'read_replica_1'})
+
+        self.set_replica_lag('read_replica_1', 2)
+        self.monitor.refresh()
+        self.assertIsNone(self.monitor.select_replica())
+
+        # Once the pin window has passed, lagging replicas are used again
+        record_write(time.time() - 11)
+        self.assertIsNotNone(self.monitor.select_replica())
+
+    def test_router_uses_monitor(self):
+        """Test that DatabaseRouter routes reads and records writes."""
+        router = DatabaseRouter()
+        self.set_replica_lag('read_replica_1', 30)
+        self.monitor.refresh()
+
+        with patch('enterprise_database.routers.replication_monitor', self.monitor), \
+                patch.object(DatabaseRouter, '_in_transaction', return_value=False):
+            self.assertEqual(router.db_for_read(_Post), 'read_replica_2')
+            self.assertEqual(router.db_for_write(_Post), 'default')
+            self.assertGreater(last_write(), 0)
+            self.assertEqual(router.db_for_read(_Post), 'default')
+
+        self.assertFalse(router.allow_migrate('read_replica_2', 'blog'))
+
+
+class _Meta:
+    app_label = 'blog'
+
+
+class _Post:
+    """Stand-in model class for routing decisions."""
+
+    _meta = _Meta
+
+
+class TestReadYourWritesMiddleware(SimpleTestCase):
+    """Test cases for ReadYourWritesMiddleware."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.factory = RequestFactory()
+
+    def test_write_sets_pin_cookie(self):
+        """Test that a write is carried to the client's next request."""
+        def write_view(request):
+            record_write()
+            return HttpResponse()
+
+        response = ReadYourWritesMiddleware(write_view)(self.factory.post('/'))
+        cookie = response.cookies['db_written_at']
+        self.assertAlmostEqual(float(cookie.value), time.time(), delta=5)
+        self.assertEqual(last_write(), 0.0)
+
+        seen = []
+
+        def read_view(request):
+            seen.append(last_write())
+            return HttpResponse()
+
+        request = self.factory.get('/')
+        request.COOKIES['db_written_at'] = cookie.value
+        response = ReadYourWritesMiddleware(read_view)(request)
+        self.assertEqual(seen, [float(cookie.value)])
+        self.assertNotIn('db_written_at', response.cookies)
+
+    def test_forged_pin_cookie_is_bounded(self):
+        """Test that future, stale and non-numeric cookies pin at most until now."""
+        seen = []
+
+        def read_view(request):
+            seen.append(last_write())
+            return HttpResponse()
+
+        for value in ['9999999999', 'inf', 'nan', 'abc', f"{time.time() - 3600:.6f}"]:
+            request = self.factory.get('/')
+            request.COOKIES['db_written_at'] = value
+            ReadYourWritesMiddleware(read_view)(request)
+
+        self.assertLessEqual(seen[0], time.time())
+        self.assertGreater(seen[0], 0.0)
+        self.assertEqual(seen[1:], [0.0] * 4)
@@ -0,0 +1,232 @@
+"""
+Tests for consistent-hash sharding.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import uuid
+
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, models
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from enterprise_database.exceptions import ShardingError
+from enterprise_database.routers import ShardingRouter
+from enterprise_database.sharding import HashRing, Resharder, ShardedQuerySet, scatter_gather, stable_hash
+
+SHARDS = ['shard_1', 'shard_2', 'shard_3']
+NEW_SHARDS = SHARDS + ['shard_4']
+
+
+class ShardedDocument(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    title = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = 'enterprise_database'
+
+
+class GroupShardingRouter(ShardingRouter):
+    SHARDING_RULES = {
+        'auth.Group': {'field': 'name', 'shards': SHARDS},
+        'enterprise_database.ShardedDocument': {'field': 'id', 'shards': SHARDS},
+    }
+
+
+class TestHashRing(SimpleTestCase):
+    """Test cases for HashRing class."""
+
+    def test_routing_is_stable_across_processes(self):
+        """Test that workers with different hash seeds agree on shards."""
+        keys = ['alice', 'bob', 42, '42']
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1]);"
+            "from enterprise_database.sharding import HashRing;"
+            f"print([HashRing({SHARDS!r}).get_shard(k) for k in {keys!r}])"
+        )
+        src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+        output = subprocess.run(
+            [sys.executable, '-c', script, src],
+            env=dict(os.environ, PYTHONHASHSEED='123'),
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+        ring = HashRing(SHARDS)
+        self.assertEqual(output.strip(), str([ring.get_shard(key) for key in keys]))
+        self.assertEqual(stable_hash(42), stable_hash('42'))
+
+    def test_adding_a_shard_moves_few_keys(self):
+        """Test that a new shard only takes over about its share of keys."""
+        old, new = HashRing(SHARDS), HashRing(NEW_SHARDS)
+        keys = [f"user-{i}" for i in range(4000)]
+
+        moved = [key for key in keys if old.get_shard(key) != new.get_shard(key)]
+        self.assertTrue({new.get_shard(key) for key in moved} <= {'shard_4'})
+        self.assertLess(abs(len(moved) / len(keys) - 0.25), 0.08)
+
+    def test_weights(self):
+        """Test that weighted shards get proportionally more keys."""
+        ring = HashRing({'shard_1': 1, 'shard_2': 3})
+        counts = {'shard_1': 0, 'shard_2': 0}
+        for i in range(4000):
+            counts[ring.get_shard(i)] += 1
+        self.assertLess(abs(counts['shard_2'] / 4000 - 0.75), 0.08)
+
+
+@override_settings(DATABASE_ROUTERS=['tests.test_sharding.GroupShardingRouter'])
+class TestShardedModels(SimpleTestCase):
+    """Test cases for routing, resharding and scatter-gather over SQLite shards."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        databases = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+        for alias in NEW_SHARDS:
+            databases[alias] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(self.temp_dir, f'{alias}.sqlite3')}
+        handler = ConnectionHandler(databases)
+        for alias in NEW_SHARDS:
+            connections.settings[alias] = handler.settings[alias]
+            with connections[alias].schema_editor() as editor:
+                for model in (ContentType, Permission, Group, User):
+                    editor.create_model(model)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        for alias in NEW_SHARDS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def names_on(self, alias):
+        return set(Group.objects.using(alias).values_list('name', flat=True))
+
+    def test_queries_routed_by_shard_key(self):
+        """Test that creates, filters and instance saves reach the owning shard."""
+        ring = HashRing(SHARDS)
+        groups = ShardedQuerySet(Group)
+        for i in range(12):
+            groups.create(name=f"group-{i}")
+
+        for alias in SHARDS:
+            self.assertEqual(self.names_on(alias), {n for n in (f"group-{i}" for i in range(12)) if ring.get_shard(n) == alias})
+
+        group = groups.get(name='group-5')
+        self.assertEqual(group._state.db, ring.get_shard('group-5'))
+        self.assertEqual(groups.filter(name__exact='group-7').count(), 1)
+        self.assertEqual(groups.shard_key('group-7').count(), len(self.names_on(ring.get_shard('group-7'))))
+
+        Group(name='group-new').save()
+        self.assertIn('group-new', self.names_on(ring.get_shard('group-new')))
+
+        router = GroupShardingRouter()
+        self.assertTrue(router.allow_migrate('shard_2', 'auth', 'group'))
+        self.assertFalse(router.allow_migrate('default', 'auth', 'group'))
+
+    def test_uuid_strings_route_like_uuids(self):
+        """Test that a UUID string from a URL reaches the shard its instance was saved on."""
+        for alias in SHARDS:
+            with connections[alias].schema_editor() as editor:
+                editor.create_model(ShardedDocument)
+        documents = ShardedQuerySet(ShardedDocument)
+        created = [documents.create(id=uuid.uuid4(), title=f"doc-{i}") for i in range(30)]
+
+        for document in created:
+            self.assertEqual(documents.get(pk=str(document.pk)).title, document.title)
+            self.assertEqual(documents.get(id=document.pk.hex)._state.db, document._state.db)
+            self.assertTrue(documents.shard_key(str(document.pk)).filter(title=document.title).exists())
+
+    def test_reshard_to_new_shard(self):
+        """Test copying rows to a four shard ring, then purging the old copies."""
+        old, new = HashRing(SHARDS), HashRing(NEW_SHARDS)
+        names = [f"group-{i}" for i in range(200)]
+        for alias in SHARDS:
+            Group.objects.using(alias).bulk_create([
+                Group(id=i + 1, name=n) for i, n in enumerate(names) if old.get_shard(n) == alias
+            ])
+
+        resharder = Resharder(Group, 'name', old, new, batch_size=25)
+        resharder.start().join()
+        progress = resharder.get_progress()
+        self.assertIsNone(progress['error'])
+        self.assertEqual(progress['scanned'], 200)
+        moved = {n for n in names if new.get_shard(n) == 'shard_4'}
+        self.assertEqual(progress['copied'], len(moved))
+        self.assertEqual(self.names_on('shard_4'), moved)
+
+        # Source rows stay readable until the router switches rings
+        self.assertEqual(sum(len(self.names_on(alias)) for alias in SHARDS), 200)
+
+        self.assertEqual(resharder.purge(), len(moved))
+        for alias in NEW_SHARDS:
+            self.assertEqual(self.names_on(alias), {n for n in names if new.get_shard(n) == alias})
+
+    def test_catch_up_copies_rows_written_during_copy(self):
+        """Test that rows updated after their batch was copied are copied again."""
+        old, new = HashRing(SHARDS), HashRing(NEW_SHARDS)
+        names = [f"user-{i}" for i in range(60)]
+        for alias in SHARDS:
+            User.objects.using(alias).bulk_create([
+                User(id=i + 1, username=n) for i, n in enumerate(names) if old.get_shard(n) == alias
+            ])
+
+        resharder = Resharder(User, 'username', old, new, batch_size=10, updated_field='last_login')
+        stats = resharder.run()
+        self.assertEqual(stats['caught_up'], 0)
+
+        moved = sorted(n for n in names if new.get_shard(n) == 'shard_4')
+        stayed = next(n for n in names if new.get_shard(n) != 'shard_4')
+        for name in (moved[0], stayed):
+            User.objects.using(old.get_shard(name)).filter(username=name).update(
+                first_name='changed', last_login=timezone.now()
+            )
+
+        self.assertEqual(resharder.catch_up(), 1)
+        self.assertEqual(User.objects.using('shard_4').get(username=moved[0]).first_name, 'changed')
+        self.assertEqual(resharder.catch_up(), 0)
+
+        with self.assertRaises(ShardingError):
+            Resharder(User, 'username', old, new).catch_up()
+
+    def test_purge_refuses_referenced_rows(self):
+        """Test that purge neither cascades nor sends signals unless asked to."""
+        old, new = HashRing(SHARDS), HashRing(NEW_SHARDS)
+        names = [f"group-{i}" for i in range(40)]
+        for alias in SHARDS:
+            Group.objects.using(alias).bulk_create([
+                Group(id=i + 1, name=n) for i, n in enumerate(names) if old.get_shard(n) == alias
+            ])
+        resharder = Resharder(Group, 'name', old, new)
+        resharder.run()
+
+        name = next(n for n in names if new.get_shard(n) == 'shard_4')
+        alias = old.get_shard(name)
+        user = User.objects.using(alias).create(username='member')
+        User.groups.through.objects.using(alias).create(user_id=user.pk, group_id=Group.objects.using(alias).get(name=name).pk)
+
+        with self.assertRaisesMessage(ShardingError, 'auth.User_groups'):
+            resharder.purge()
+        self.assertIn(name, self.names_on(alias))
+
+        resharder.purge(cascade=True)
+        self.assertNotIn(name, self.names_on(alias))
+        self.assertFalse(User.groups.through.objects.using(alias).filter(user=user).exists())
+
+    def test_scatter_gather(self):
+        """Test that reads across shards are merged in order."""
+        for i in range(30):
+            ShardedQuerySet(Group).create(name=f"group-{i:02d}")
+
+        rows = scatter_gather(Group.objects.order_by('name'), SHARDS, key=lambda group: group.name, limit=10)
+        self.assertEqual([group.name for group in rows], [f"group-{i:02d}" for i in range(10)])
+
+        names = scatter_gather(Group.objects.values_list('name', flat=True), HashRing(SHARDS))
+        self.assertEqual(sorted(names), [f"group-{i:02d}" for i in range(30)])
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Bulk Import Benchmark
+Measures throughput and query counts of the batched import pipeline
+(BulkImporter behind DataImportMixin) importing posts from a CSV file,
+against saving the same rows one serializer at a time as imports did before.
+
+Usage:
+    python tests/performance/bulk_import_benchmark.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'apps', 'api')
+sys.path.insert(0, os.path.abspath(API_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.testing')
+
+
+def setup_database(path):
+    """Point Django at a file-backed SQLite database and create tables."""
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+    # Post saves broadcast over the channel layer; keep that in-process
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def write_csv(path, total, offset):
+    """Write ``total`` post rows referencing authors, categories and tags by name."""
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write('title,content,author,category,tags,status\n')
+        for i in range(offset, offset + total):
+            fh.write(f'Benchmark post {i},{"lorem ipsum " * 40},writer-{i % 10},'
+                     f'Category {i % 5},"tag-{i % 7}, tag-{i % 11}",published\n')
+
+
+def build_view():
+    """Return a PostViewSet bound to a staff request, as for an import."""
+    from django.contrib.auth import get_user_model
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from apps.blog.api_views import PostViewSet
+
+    request = Request(APIRequestFactory().post('/import/'))
+    request.user = get_user_model().objects.get(username='writer-0')
+    return PostViewSet(request=request, action='import_csv', format_kwarg=None, args=(), kwargs={})
+
+
+def seed():
+    from django.contrib.auth import get_user_model
+    from apps.blog.models import Category, Tag
+
+    User = get_user_model()
+    for i in range(10):
+        User.objects.create_user(username=f'writer-{i}', email=f'writer-{i}@example.com')
+    for i in range(5):
+        Category.objects.create(name=f'Category {i}', slug=f'category-{i}')
+    for i in range(11):
+        Tag.objects.create(name=f'tag-{i}', slug=f'tag-{i}')
+
+
+def run_batched(path):
+    from apps.core.bulk_import import BulkImporter, iter_csv_records
+
+    with open(path, 'rb') as fh:
+        return BulkImporter(build_view(), 'csv').run(iter_csv_records(fh)).imported_count
+
+
+def run_per_row(path):
+    """Save rows one at a time through the serializer, resolving names per row."""
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from apps.blog.models import Category, Tag
+    from apps.blog.serializers import PostImportSerializer
+    from apps.core.bulk_import import iter_csv_records
+
+    User = get_user_model()
+    imported = 0
+    with open(path, 'rb') as fh, transaction.atomic():
+        for row in iter_csv_records(fh):
+            row['author'] = User.objects.get(username=row['author']).id
+            row['category'] = Category.objects.get(name=row['category']).id
+            row['tags'] = [Tag.objects.get(name=name.strip()).id for name in row['tags'].split(',')]
+            serializer = PostImportSerializer(data=row)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            imported += 1
+    return imported
+
+
+def measure(label, produce, path):
+    from django.db import connection
+
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_queries):
+        start = time.perf_counter()
+        imported = produce(path)
+        elapsed = time.perf_counter() - start
+    return label, imported, elapsed, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched bulk imports')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help='Import sizes to measure')
+    parser.add_argument('--per-row-limit', type=int, default=20000,
+                        help='Skip the per-row baseline above this many rows')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_database(os.path.join(tmp, 'import_benchmark.sqlite3'))
+        seed()
+
+        print(f"{'rows':>9}  {'importer':<10}{'seconds':>9}{'rows/s':>10}{'queries':>9}")
+        offset = 0
+        for total in args.rows:
+            cases = [('batched', run_batched)]
+            if total <= args.per_row_limit:
+                cases.append(('per-row', run_per_row))
+            for label, produce in cases:
+                path = os.path.join(tmp, 'posts.csv')
+                write_csv(path, total, offset)
+                offset += total
+                label, imported, elapsed, queries = measure(label, produce, path)
+                print(f"{imported:>9}  {label:<10}{elapsed:>9.2f}"
+                      f"{imported / elapsed:>10.0f}{queries:>9}")
+
+
+if __name__ == '__main__':
+    main()
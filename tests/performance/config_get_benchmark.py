@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Configuration Lookup Benchmark
+Measures ConfigManager.get lookups per second on one core for dotted keys
+of varying depth, through the flattened snapshot and through the previous
+nested dict walk, and ConfigManager.get_model with the per-snapshot model
+cache against validating a new model per call.
+
+Usage:
+    python tests/performance/config_get_benchmark.py --sections 50 --keys 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'config', 'src')))
+
+
+def rate(lookup, calls, seconds):
+    """Run lookup over calls for about ``seconds``; returns lookups per second."""
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for call in calls:
+            lookup(*call)
+        done += len(calls)
+    return done / (time.perf_counter() - start)
+
+
+def build_config(sections):
+    return {
+        f"section_{i}": {
+            "host": f"host-{i}.internal",
+            "port": 5000 + i,
+            "options": {"timeout": 30, "retries": 3, "pool": {"min": 1, "max": 10}},
+        }
+        for i in range(sections)
+    }
+
+
+def previous_get(manager):
+    """ConfigManager.get as it was before snapshots."""
+    def get(key, default=None):
+        try:
+            value = manager.snapshot.data
+            for k in key.split("."):
+                if isinstance(value, dict) and k in value:
+                    value = value[k]
+                else:
+                    return default
+            return value
+        except Exception:
+            return default
+    return get
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark configuration lookups')
+    parser.add_argument('--sections', type=int, default=50, help='Top-level configuration sections')
+    parser.add_argument('--keys', type=int, default=1000, help='Lookups in the mix')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Time spent per measurement')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    from pydantic import BaseModel
+
+    from enterprise_config import ConfigManager
+    from enterprise_config.backends import FileBackend
+
+    class PoolConfig(BaseModel):
+        min: int
+        max: int
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        FileBackend(config_path=temp_dir).save_config("base", build_config(args.sections))
+        manager = ConfigManager(config_path=temp_dir)
+
+    leaves = ["host", "port", "options.timeout", "options.pool.max", "missing"]
+    calls = [(f"section_{rng.randrange(args.sections)}.{rng.choice(leaves)}",) for _ in range(args.keys)]
+    model_calls = [(PoolConfig, f"section_{rng.randrange(args.sections)}.options.pool") for _ in range(args.keys)]
+
+    def uncached_model(model_class, key):
+        return model_class(**manager.get(key))
+
+    results = [
+        ('get, previous dict walk', rate(previous_get(manager), calls, args.seconds)),
+        ('get, flattened snapshot', rate(manager.get, calls, args.seconds)),
+        ('get_model, validate per call', rate(uncached_model, model_calls, args.seconds)),
+        ('get_model, snapshot cache', rate(manager.get_model, model_calls, args.seconds)),
+    ]
+
+    print(f"{args.sections} sections, {len(manager.snapshot.flat)} flattened keys, {args.keys} lookups in the mix")
+    print(f"{'path':<30} {'lookups/s':>14}")
+    for name, per_second in results:
+        print(f"{name:<30} {per_second:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Database Connection Pool Benchmark
+Measures request throughput for short requests that run one query and
+then release their connection the way Django does at the end of a
+request, with CONN_MAX_AGE=0: through Django's stock backend, which opens
+and closes a connection per request, and through the pooled backend from
+enterprise_database.backends, which reuses warm connections.
+
+Usage:
+    python tests/performance/connection_pool_benchmark.py --requests 2000 --threads 4
+    python tests/performance/connection_pool_benchmark.py --engine postgresql \
+        --name blog --user postgres --host localhost
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'database', 'src')))
+
+
+def rate(alias, requests, threads):
+    """Serve ``requests`` across ``threads``; returns requests per second."""
+    from django.db import connections
+
+    def worker(count):
+        connection = connections[alias]
+        for _ in range(count):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            # What django.db.close_old_connections does after each request
+            connection.close_if_unusable_or_obsolete()
+        connection.close()
+
+    workers = [threading.Thread(target=worker, args=(requests // threads,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (requests // threads * threads) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pooled database connections')
+    parser.add_argument('--engine', choices=['sqlite3', 'postgresql'], default='sqlite3')
+    parser.add_argument('--name', help='Database name (default: a temporary SQLite file)')
+    parser.add_argument('--user', default='')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--host', default='')
+    parser.add_argument('--port', default='')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per measurement')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent request threads')
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    temp_dir = tempfile.mkdtemp()
+    database = {
+        'NAME': args.name or os.path.join(temp_dir, 'benchmark.sqlite3'),
+        'USER': args.user,
+        'PASSWORD': args.password,
+        'HOST': args.host,
+        'PORT': args.port,
+        'CONN_MAX_AGE': 0,
+    }
+    settings.configure(DATABASES={
+        'default': dict(database, ENGINE=f'django.db.backends.{args.engine}'),
+        'pooled': dict(
+            database,
+            ENGINE=f'enterprise_database.backends.{args.engine}',
+            POOL={'MAX_SIZE': args.threads, 'MAX_OVERFLOW': 0, 'PRE_PING': False},
+        ),
+        'pooled_pre_ping': dict(
+            database,
+            ENGINE=f'enterprise_database.backends.{args.engine}',
+            POOL={'MAX_SIZE': args.threads, 'MAX_OVERFLOW': 0, 'PRE_PING': True},
+        ),
+    })
+    django.setup()
+
+    from enterprise_database.backends import get_pool_stats
+
+    results = [
+        ('connect per request', rate('default', args.requests, args.threads)),
+        ('pooled', rate('pooled', args.requests, args.threads)),
+        ('pooled, pre-ping', rate('pooled_pre_ping', args.requests, args.threads)),
+    ]
+
+    print(f"{args.engine}, {args.requests} requests on {args.threads} threads, CONN_MAX_AGE=0")
+    print(f"{'path':<22} {'requests/s':>12} {'per request':>12}")
+    for name, per_second in results:
+        print(f"{name:<22} {per_second:>12.0f} {1e6 / per_second:>10.0f}us")
+    for alias, stats in get_pool_stats().items():
+        print(f"{alias}: {stats['created']} connections opened for {stats['checkouts']} checkouts")
+
+
+if __name__ == '__main__':
+    main()
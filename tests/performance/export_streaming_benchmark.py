@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Export Memory Benchmark
+Measures peak Python memory of the streaming CSV/JSON/XML exporters in
+DataExportMixin against the previous build-everything-in-memory approach,
+at increasing export sizes. Streaming peaks should stay flat as rows grow.
+
+Usage:
+    python tests/performance/export_streaming_benchmark.py --rows 10000 50000 200000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from io import StringIO
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'apps', 'api')
+sys.path.insert(0, os.path.abspath(API_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.testing')
+
+
+def setup_database(path):
+    """Point Django at a file-backed SQLite database and create tables."""
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def seed_tags(total):
+    """Grow the tag table to ``total`` rows with bulk inserts."""
+    from apps.blog.models import Tag
+
+    existing = Tag.objects.count()
+    batch = []
+    for i in range(existing, total):
+        batch.append(Tag(name=f'benchmark-tag-{i}', slug=f'benchmark-tag-{i}',
+                         description='x' * 120))
+        if len(batch) >= 5000:
+            Tag.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Tag.objects.bulk_create(batch)
+
+
+def measure(label, produce):
+    """Run ``produce`` and return (seconds, peak MiB, bytes produced)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = produce()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'label': label, 'seconds': elapsed, 'peak_mib': peak / 2 ** 20, 'bytes': size}
+
+
+def run(rows_list):
+    from rest_framework import viewsets
+    from apps.blog.models import Tag
+    from apps.core.export_import import DataExportMixin
+
+    fields = ['id', 'name', 'slug', 'description', 'created_at']
+
+    class BenchmarkExportViewSet(DataExportMixin, viewsets.GenericViewSet):
+        queryset = Tag.objects.order_by('name')
+
+    view = BenchmarkExportViewSet()
+
+    def stream(writer):
+        def produce():
+            rows = view.iter_export_rows(Tag.objects.order_by('name'), fields)
+            return sum(len(chunk) for chunk in writer(rows))
+        return produce
+
+    def legacy_csv():
+        out = StringIO()
+        writer = csv.writer(out)
+        writer.writerow(fields)
+        for obj in Tag.objects.order_by('name'):
+            writer.writerow([str(view.get_field_value(obj, f)) for f in fields])
+        return len(out.getvalue())
+
+    def legacy_json():
+        data = [{f: str(view.get_field_value(obj, f)) for f in fields}
+                for obj in Tag.objects.order_by('name')]
+        return len(json.dumps(data))
+
+    def legacy_xml():
+        root = ET.Element('data')
+        for obj in Tag.objects.order_by('name'):
+            item = ET.SubElement(root, 'tag')
+            for f in fields:
+                ET.SubElement(item, f).text = str(view.get_field_value(obj, f))
+        return len(ET.tostring(root, encoding='unicode'))
+
+    cases = [
+        ('csv streaming', stream(lambda rows: view.stream_csv(fields, rows))),
+        ('csv legacy', legacy_csv),
+        ('json streaming', stream(lambda rows: view.stream_json(fields, rows))),
+        ('ndjson streaming', stream(lambda rows: view.stream_ndjson(fields, rows))),
+        ('json legacy', legacy_json),
+        ('xml streaming', stream(lambda rows: view.stream_xml(fields, rows, 'tag'))),
+        ('xml legacy', legacy_xml),
+    ]
+
+    print(f"{'rows':>9}  {'exporter':<18}{'seconds':>9}{'peak MiB':>11}{'MiB out':>10}")
+    for total in rows_list:
+        seed_tags(total)
+        for label, produce in cases:
+            result = measure(label, produce)
+            print(f"{total:>9}  {label:<18}{result['seconds']:>9.2f}"
+                  f"{result['peak_mib']:>11.2f}{result['bytes'] / 2 ** 20:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming exports')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 200000],
+                        help='Export sizes to measure (ascending)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_database(os.path.join(tmp, 'export_benchmark.sqlite3'))
+        run(sorted(args.rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Feature Flag Evaluation Benchmark
+Measures FeatureFlagManager.is_enabled evaluations per second on one core
+for a mix of plain, targeted, time-windowed, percentage rollout and
+context rule flags: the compiled flags with CRC32 and with MD5 (original)
+bucketing, the compiled flags inside a request cache, and the previous
+FeatureFlag.is_active path for comparison.
+
+Usage:
+    python tests/performance/feature_flag_benchmark.py --flags 50 --callers 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'config', 'src')))
+
+
+def rate(check, calls, seconds):
+    """Run check over calls for about ``seconds``; returns evaluations per second."""
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for call in calls:
+            check(*call)
+        done += len(calls)
+    return done / (time.perf_counter() - start)
+
+
+def define_flags(manager, count, rng):
+    now = datetime.utcnow()
+    for i in range(count):
+        kind = i % 5
+        options = {}
+        if kind == 1:
+            options = {"environments": ["production", "staging"], "user_groups": ["beta", "staff"]}
+        elif kind == 2:
+            options = {"start_date": now - timedelta(days=1), "end_date": now + timedelta(days=30)}
+        elif kind == 3:
+            options = {"percentage": rng.choice([5.0, 25.0, 50.0])}
+        elif kind == 4:
+            options = {"metadata": {"context_rules": [
+                {"type": "in", "key": "country", "values": ["US", "CA", "GB"]},
+                {"type": "greater_than", "key": "account_age", "value": 30},
+            ]}}
+        manager.set_flag(f"flag_{i}", True, **options)
+
+
+def previous_is_enabled(manager):
+    """is_enabled as it was before flags were compiled, over the same flag definitions."""
+    import hashlib
+
+    def is_enabled(flag_name, environment, user_group, user_id, context):
+        flag = manager.get_flag(flag_name)
+        if not flag.is_active(environment=environment, user_group=user_group, current_time=datetime.utcnow()):
+            return False
+        if flag.percentage is not None and user_id:
+            digest = hashlib.md5(f"{flag_name}:{user_id}".encode("utf-8")).hexdigest()
+            if (int(digest[:8], 16) % 10000) / 100.0 >= flag.percentage:
+                return False
+        if context and flag.metadata.get("context_rules"):
+            for rule in flag.metadata["context_rules"]:
+                if rule["type"] == "in" and context.get(rule["key"]) not in rule["values"]:
+                    return False
+                if rule["type"] == "greater_than" and context.get(rule["key"], 0) <= rule["value"]:
+                    return False
+        return flag.enabled
+
+    return is_enabled
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark feature flag evaluation')
+    parser.add_argument('--flags', type=int, default=50, help='Flags defined')
+    parser.add_argument('--callers', type=int, default=1000, help='Distinct callers in the mix')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Time spent per measurement')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    from enterprise_config.backends import FileBackend
+    from enterprise_config.feature_flags import FeatureFlagManager
+    from enterprise_config.models import Environment
+
+    rng = random.Random(args.seed)
+    managers = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for bucketing in ("crc32", "md5"):
+            manager = FeatureFlagManager(FileBackend(config_path=os.path.join(temp_dir, bucketing)), bucketing=bucketing)
+            define_flags(manager, args.flags, random.Random(args.seed))
+            managers[bucketing] = manager
+
+    calls = []
+    for _ in range(args.callers):
+        flag_name = f"flag_{rng.randrange(args.flags)}"
+        context = {"country": rng.choice(["US", "FR"]), "account_age": rng.randrange(90)} \
+            if flag_name.endswith(("4", "9")) else None
+        calls.append((flag_name, Environment.PRODUCTION, rng.choice([None, "beta"]), str(rng.randrange(10 ** 6)), context))
+
+    def compiled(manager):
+        def check(flag_name, environment, user_group, user_id, context):
+            manager.is_enabled(flag_name, environment, user_group, user_id, False, context)
+        return check
+
+    results = [('previous is_active path', rate(previous_is_enabled(managers["md5"]), calls, args.seconds))]
+    for bucketing, manager in managers.items():
+        results.append((f'compiled, {bucketing} buckets', rate(compiled(manager), calls, args.seconds)))
+    with FeatureFlagManager.request_cache():
+        results.append(('compiled, request cache', rate(compiled(managers["crc32"]), calls, args.seconds)))
+
+    print(f"{args.flags} flags, {args.callers} evaluations in the mix")
+    print(f"{'path':<28} {'evaluations/s':>14}")
+    for name, per_second in results:
+        print(f"{name:<28} {per_second:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+JWT Validation Benchmark
+Measures access token validations per second on one core: decoding with
+the raw configured key as before, JWTStrategy with its prepared key but
+no verified-token cache, and JWTStrategy with the cache. A share of the
+token mix is revoked and many more ids sit in the revocation filter, so
+the numbers include revocation checks; store lookups counts how often a
+check had to leave the process.
+
+Usage:
+    python tests/performance/jwt_benchmark.py --tokens 1000 --revoked 50000 --algorithm RS256
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+from datetime import timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'auth', 'src')))
+
+
+def make_key(algorithm):
+    """A secret for HMAC algorithms, a PEM private key for RSA ones."""
+    if algorithm.startswith('HS'):
+        return 'benchmark-secret-key-that-is-long-enough-for-sha'
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+def rate(check, tokens, seconds):
+    """Run check over tokens for about ``seconds``; returns checks per second."""
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for token in tokens:
+            check(token)
+        done += len(tokens)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JWT access token validation')
+    parser.add_argument('--tokens', type=int, default=1000, help='Distinct access tokens in the mix')
+    parser.add_argument('--revoked', type=int, default=50000, help='Other revoked ids in the filter')
+    parser.add_argument('--revoked-share', type=float, default=0.01, help='Share of the mix that is revoked')
+    parser.add_argument('--algorithm', default='HS256', help='HS256, RS256, ...')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Time spent per measurement')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    import jwt
+    from auth_package.storage import InMemoryStateStore
+    from auth_package.strategies import JWTConfig, JWTStrategy
+    from auth_package.token_state import TokenStateStore
+
+    warnings.simplefilter('ignore')
+    rng = random.Random(args.seed)
+    key = make_key(args.algorithm)
+    store = InMemoryStateStore()
+
+    def strategy(cache_size):
+        config = JWTConfig(
+            secret_key=key, algorithm=args.algorithm,
+            access_token_lifetime=timedelta(hours=1), verified_token_cache_size=cache_size
+        )
+        return JWTStrategy(config, token_state=TokenStateStore(store, sync_interval=5.0))
+
+    issuer = strategy(0)
+    tokens = [issuer.generate_tokens(f"user{i}").access_token for i in range(args.tokens)]
+    revoked = set(rng.sample(range(args.tokens), int(args.tokens * args.revoked_share)))
+    for index in revoked:
+        issuer.revoke_access_token(tokens[index])
+    expires_at = time.time() + 3600
+    for i in range(args.revoked):
+        issuer.tokens.revoke_access_token(f"other{i}", expires_at)
+    rng.shuffle(tokens)
+
+    def previous(token):
+        # Parses the configured key on every call, as validate_token did
+        jwt.decode(token, key if args.algorithm.startswith('HS') else
+                   jwt.get_algorithm_by_name(args.algorithm).prepare_key(key).public_key(),
+                   algorithms=[args.algorithm], audience='api', issuer='auth-package')
+
+    def validator(target):
+        def check(token):
+            try:
+                target.validate_token(token)
+            except jwt.InvalidTokenError:
+                pass
+        return check
+
+    prepared = strategy(0)
+    cached = strategy(args.tokens * 2)
+    for target in (prepared, cached):
+        target.tokens.sync()  # Load the revocation feed before timing
+    results = [
+        ('decode, key parsed per call', rate(previous, tokens, args.seconds), None),
+        ('strategy, prepared key', rate(validator(prepared), tokens, args.seconds), prepared.tokens),
+        ('strategy, verified cache', rate(validator(cached), tokens, args.seconds), cached.tokens),
+    ]
+
+    print(f"{args.algorithm}: {args.tokens} tokens, {len(revoked)} revoked in the mix, "
+          f"{args.revoked} other revoked ids")
+    print(f"{'path':<30} {'validations/s':>14} {'store lookups':>14}")
+    for name, per_second, token_state in results:
+        lookups = '-' if token_state is None else f"{token_state.stats['filter_hits']}/{token_state.stats['checks']}"
+        print(f"{name:<30} {per_second:>14.0f} {lookups:>14}")
+
+
+if __name__ == '__main__':
+    main()
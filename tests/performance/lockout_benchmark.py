@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Account Lockout Benchmark
+Replays a synthetic credential-stuffing trace (a botnet of IPs trying a
+leaked list of accounts, with a few successes) through
+AccountLockoutManager backed by time-bucketed counters, and through the
+previous list-scanning implementation for a prefix of the same trace.
+Reports throughput per tenth of the trace (flat for an O(1) update),
+latency percentiles, lockouts, how many counters are held in memory and
+the sizes of the distinct IP/user sets behind suspicious activity checks.
+
+Usage:
+    python tests/performance/lockout_benchmark.py --attempts 1000000 --rate 5000
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+
+AUTH_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'packages', 'auth', 'src')
+sys.path.insert(0, os.path.abspath(AUTH_SRC))
+
+
+class TraceClock:
+    """Simulated time advanced by the trace rather than the wall clock."""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def attack_trace(attempts, users, ips, success_rate, seed):
+    """Yield (user_id, ip_address, success) for a credential-stuffing run."""
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        yield (
+            f"user{rng.randrange(users)}",
+            f"10.{rng.randrange(ips) // 65536}.{rng.randrange(ips) // 256 % 256}.{rng.randrange(ips) % 256}",
+            rng.random() < success_rate,
+        )
+
+
+class LegacyLockoutManager:
+    """The pre-bucketing algorithm: every check scans the full attempt list."""
+
+    def __init__(self):
+        self.attempts = []
+        self.lockouts = {}
+
+    def record_login_attempt(self, user_id, ip_address, success):
+        now = datetime.utcnow()
+        self.attempts.append((user_id, ip_address, now, success))
+        week = now - timedelta(days=7)
+        self.attempts = [a for a in self.attempts if a[2] > week]
+        if success:
+            hour = now - timedelta(hours=1)
+            self.attempts = [
+                a for a in self.attempts
+                if not (a[0] == user_id and not a[3] and a[2] > hour)
+            ]
+            self.lockouts.pop(user_id, None)
+            return
+        hour = now - timedelta(hours=1)
+        user_failures = [a for a in self.attempts if a[0] == user_id and not a[3] and a[2] > hour]
+        [a for a in self.attempts if a[1] == ip_address and not a[3] and a[2] > hour]
+        if len(user_failures) >= 5:
+            self.lockouts[user_id] = now + timedelta(minutes=30)
+        {a[1] for a in self.attempts if a[0] == user_id and a[2] > hour}
+        {a[0] for a in self.attempts if a[1] == ip_address and a[2] > hour}
+
+    def is_account_locked(self, user_id):
+        until = self.lockouts.get(user_id)
+        return until is not None and datetime.utcnow() < until
+
+
+def replay(manager, trace, clock=None, rate=None, latencies=None, checkpoints=10, total=None):
+    """Feed the trace to manager the way LoginView does; returns per-segment rates."""
+    segment = max((total or 1) // checkpoints, 1)
+    rates, locked = [], 0
+    segment_start = time.perf_counter()
+    for index, (user_id, ip_address, success) in enumerate(trace, 1):
+        if clock is not None:
+            clock.now += 1.0 / rate
+        start = time.perf_counter()
+        if manager.is_account_locked(user_id):
+            locked += 1
+        else:
+            manager.record_login_attempt(user_id, ip_address, success)
+        if latencies is not None:
+            latencies.append(time.perf_counter() - start)
+        if index % segment == 0:
+            now = time.perf_counter()
+            rates.append(segment / (now - segment_start))
+            segment_start = now
+    return rates, locked
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark account lockout under a credential-stuffing trace')
+    parser.add_argument('--attempts', type=int, default=1000000, help='Login attempts in the trace')
+    parser.add_argument('--rate', type=float, default=5000, help='Simulated attempts per second')
+    parser.add_argument('--users', type=int, default=200000, help='Distinct targeted accounts')
+    parser.add_argument('--ips', type=int, default=20000, help='Distinct attacking IPs')
+    parser.add_argument('--success-rate', type=float, default=0.005, help='Fraction of attempts that succeed')
+    parser.add_argument('--max-counters', type=int, default=100000, help='Counters kept per window before LRU eviction')
+    parser.add_argument('--max-keys', type=int, default=200000, help='Other keys kept before LRU eviction')
+    parser.add_argument('--legacy-attempts', type=int, default=5000, help='Trace prefix replayed by the list-scanning manager')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    from auth_package import AccountLockoutManager, InMemoryStateStore
+
+    def trace(attempts):
+        return attack_trace(attempts, args.users, args.ips, args.success_rate, args.seed)
+
+    clock = TraceClock()
+    store = InMemoryStateStore(max_keys=args.max_keys, clock=clock, max_counters=args.max_counters)
+    manager = AccountLockoutManager(store=store)
+    latencies = array('d')
+
+    start = time.perf_counter()
+    rates, locked = replay(manager, trace(args.attempts), clock, args.rate, latencies, total=args.attempts)
+    elapsed = time.perf_counter() - start
+
+    print(f"bucketed: {args.attempts} attempts in {elapsed:.1f}s "
+          f"({args.attempts / elapsed:.0f}/s), {locked} rejected while locked")
+    print("  attempts/s per tenth of trace: " + " ".join(f"{rate:.0f}" for rate in rates))
+    print(f"  latency p50 {percentile(latencies, 0.5) * 1e6:.1f}us  "
+          f"p99 {percentile(latencies, 0.99) * 1e6:.1f}us  "
+          f"p99.9 {percentile(latencies, 0.999) * 1e6:.1f}us")
+    for window, counters in sorted(store.windows.items()):
+        print(f"  {window}s window: {len(counters)} counters held, {counters.evictions} evicted")
+    print(f"  other keys: {len(store)} held, {store.evictions} evicted")
+    for prefix in ('lockout:ips:', 'lockout:users:'):
+        sizes = [len(store.members(key)) for key in list(store._data) if key.startswith(prefix)]
+        if sizes:
+            print(f"  {prefix}* sets: {len(sizes)} held, {sum(sizes)} members, "
+                  f"largest {max(sizes)}, mean {sum(sizes) / len(sizes):.1f}")
+    print(f"  peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    legacy = LegacyLockoutManager()
+    start = time.perf_counter()
+    rates, locked = replay(legacy, trace(args.legacy_attempts), total=args.legacy_attempts)
+    elapsed = time.perf_counter() - start
+    print(f"\nlist scan: first {args.legacy_attempts} attempts in {elapsed:.1f}s "
+          f"({args.legacy_attempts / elapsed:.0f}/s), {len(legacy.attempts)} attempts retained")
+    print("  attempts/s per tenth of prefix: " + " ".join(f"{rate:.0f}" for rate in rates))
+
+
+if __name__ == '__main__':
+    main()
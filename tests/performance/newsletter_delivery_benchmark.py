@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Newsletter Delivery Benchmark
+Sends a campaign through CampaignDelivery to a local fake SMTP server and
+reports throughput, connections opened, database queries and how closely
+the provider rate limit was held.
+
+Usage:
+    python tests/performance/newsletter_delivery_benchmark.py --subscribers 100000 --rate 2000
+    python tests/performance/newsletter_delivery_benchmark.py --subscribers 1000000 --rate 5000 --concurrency 16
+"""
+
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'apps', 'api')
+sys.path.insert(0, os.path.abspath(API_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.testing')
+
+
+def setup_database(path):
+    """Point Django at a file-backed SQLite database and create tables."""
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def seed(total, batch_size=5000):
+    """Create ``total`` verified subscribers and a draft campaign."""
+    from django.contrib.auth import get_user_model
+    from apps.newsletter.models import Campaign, Subscriber
+
+    for start in range(0, total, batch_size):
+        Subscriber.objects.bulk_create([
+            Subscriber(email=f'reader{i}@example.com', email_verified=True,
+                       unsubscribe_token=secrets.token_urlsafe(32))
+            for i in range(start, min(start + batch_size, total))
+        ])
+
+    user = get_user_model().objects.create_user(username='editor', email='editor@example.com')
+    return Campaign.objects.create(
+        name='Benchmark', subject='Benchmark issue', content_html='<p>' + 'News. ' * 200 + '</p>',
+        content_text='News. ' * 200, campaign_type=Campaign.CampaignType.NEWSLETTER,
+        status=Campaign.Status.SENDING, total_recipients=total, created_by=user
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark newsletter campaign delivery')
+    parser.add_argument('--subscribers', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=0, help='Messages per second, 0 for unthrottled')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_database(os.path.join(tmp, 'delivery_benchmark.sqlite3'))
+
+        from django.db import connection
+        from apps.newsletter.delivery import CampaignDelivery
+        from tests.smtp_server import FakeSMTPServer
+
+        campaign = seed(args.subscribers)
+        server = FakeSMTPServer().start()
+        providers = {'default': server.provider(CONNECTIONS=args.connections, RATE=args.rate)}
+
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        delivery = CampaignDelivery(
+            campaign, providers=providers, chunk_size=args.chunk_size, concurrency=args.concurrency
+        )
+        with connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            delivery.run()
+            elapsed = time.perf_counter() - start
+        server.stop()
+
+        campaign.refresh_from_db()
+        sent = len(server.messages)
+        print(f"subscribers      {args.subscribers:>12}")
+        print(f"delivered        {sent:>12}")
+        print(f"campaign status  {campaign.status:>12}")
+        print(f"seconds          {elapsed:>12.2f}")
+        print(f"messages/s       {sent / elapsed:>12.0f}")
+        if args.rate:
+            print(f"target rate      {args.rate:>12.0f}")
+        print(f"SMTP connections {server.connections:>12}")
+        print(f"queries          {queries:>12}")
+        print(f"queries/1000 msg {queries / max(sent, 1) * 1000:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Password Validation Benchmark
+Measures PasswordValidator.validate_password throughput and resident
+memory with a large breached password list: compiled into a sorted hash
+file and searched through mmap, against the same kind of list loaded
+from a text file into a set of strings (common_passwords_file). Linux
+only, as memory is read from /proc.
+
+Usage:
+    python tests/performance/password_validation_benchmark.py --entries 10000000 --set-entries 1000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'auth', 'src')))
+
+
+def rss_mb():
+    """Resident memory in MB as (private heap, file-backed pages)."""
+    sizes = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('RssAnon:', 'RssFile:')):
+                sizes[line.split(':')[0]] = int(line.split()[1]) / 1024
+    return sizes['RssAnon'], sizes['RssFile']
+
+
+def added(before):
+    return tuple(now - then for now, then in zip(rss_mb(), before))
+
+
+def breached(count):
+    return (f"breached-{i}" for i in range(count))
+
+
+def build_list(path, entries):
+    from auth_package.breached_passwords import BreachedPasswordList
+    BreachedPasswordList.build(breached(entries), path)
+
+
+def sample_passwords(count, entries, rng):
+    """Mostly fresh passwords, some breached ones, some with keyboard runs."""
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    passwords = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            passwords.append(f"breached-{rng.randrange(entries)}")
+        elif roll < 0.2:
+            passwords.append("Qwerty!" + str(rng.randrange(10000)))
+        else:
+            passwords.append(''.join(rng.choice(alphabet) for _ in range(rng.randint(8, 20))))
+    return passwords
+
+
+def rate(validator, passwords, seconds):
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for password in passwords:
+            validator.validate_password(password)
+        done += len(passwords)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark password validation with a breached password list')
+    parser.add_argument('--entries', type=int, default=10000000, help='Entries in the compiled list')
+    parser.add_argument('--set-entries', type=int, default=1000000, help='Entries in the text list loaded into a set')
+    parser.add_argument('--list', help='Compiled list to reuse (built when missing)')
+    parser.add_argument('--passwords', type=int, default=2000, help='Distinct passwords in the mix')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Time spent per measurement')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='breach-benchmark-')
+    list_path = args.list or os.path.join(workdir, 'breached.bin')
+    if not os.path.exists(list_path):
+        # Built in a child process so its sort buffers do not count here
+        start = time.perf_counter()
+        builder = multiprocessing.Process(target=build_list, args=(list_path, args.entries))
+        builder.start()
+        builder.join()
+        print(f"built {args.entries} entries ({os.path.getsize(list_path) / 2**20:.0f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    from auth_package.password_policies import PasswordPolicy, PasswordValidator
+
+    rng = random.Random(args.seed)
+    passwords = sample_passwords(args.passwords, min(args.entries, args.set_entries), rng)
+
+    baseline = rss_mb()
+    plain = PasswordValidator()
+    plain_rate = rate(plain, passwords, args.seconds)
+
+    before = rss_mb()
+    mapped = PasswordValidator(PasswordPolicy(breached_passwords_file=list_path))
+    mapped_rate = rate(mapped, passwords, args.seconds)
+    mapped_rss = added(before)
+    rejected = sum(
+        "Password is too common and easily guessable" in mapped.validate_password(p)["errors"] for p in passwords
+    )
+
+    text_path = os.path.join(workdir, 'breached.txt')
+    with open(text_path, 'w') as f:
+        for password in breached(args.set_entries):
+            f.write(password + '\n')
+    before = rss_mb()
+    loaded = PasswordValidator(PasswordPolicy(common_passwords_file=text_path))
+    set_rate = rate(loaded, passwords, args.seconds)
+    set_rss = added(before)
+    os.remove(text_path)
+    if not args.list:
+        os.remove(list_path)
+    os.rmdir(workdir)
+
+    print(f"baseline RSS {sum(baseline):.0f} MB; {rejected}/{len(passwords)} sample passwords breached")
+    print("added RSS: heap is private to each worker; file pages are shared page cache")
+    print(f"{'breach list':<32} {'validations/s':>14} {'heap MB':>8} {'file MB':>8}")
+    print(f"{'none':<32} {plain_rate:>14.0f} {'-':>8} {'-':>8}")
+    for name, per_second, (heap, pages) in [
+        (f'mmap hash file, {args.entries} entries', mapped_rate, mapped_rss),
+        (f'set of strings, {args.set_entries} entries', set_rate, set_rss),
+    ]:
+        print(f"{name:<32} {per_second:>14.0f} {heap:>8.1f} {pages:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Permission Check Benchmark
+Measures permission checks per second against deep role hierarchies:
+the previous walk (re-merging parent roles and matching every permission
+on each call), the compiled permission tables, and
+RoleBasedPermissionBackend.has_perm with its per-user decision cache,
+which is how template and DRF checks reach it within a request.
+
+Usage:
+    python tests/performance/permission_benchmark.py --depths 5 20 50 --permissions 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'auth', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'apps', 'api')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.testing')
+
+ACTIONS = ['create', 'read', 'update', 'delete', 'execute']
+
+
+def build_hierarchy(registry, depth, permissions_per_role, resources):
+    """Chain ``depth`` roles, each adding permissions over ``resources`` resources."""
+    from auth_package.permissions import Permission, PermissionAction
+
+    parent = None
+    for level in range(depth):
+        role = registry.create_role(f"level{level}", parent_roles=[parent] if parent else [])
+        for index in range(permissions_per_role):
+            resource = f"resource{(level * permissions_per_role + index) % resources}"
+            action = PermissionAction(ACTIONS[index % len(ACTIONS)])
+            permission = Permission(f"{resource}.{action.value}.{level}", action, resource)
+            registry.register_permission(permission)
+            role.add_permission(permission)
+        parent = role.name
+    return parent
+
+
+def legacy_check(registry, roles, resource, action):
+    """The check as it ran before compilation."""
+    for role_name in roles:
+        role = registry.get_role(role_name)
+        permissions = role.get_all_permissions(registry) if role else set()
+        for permission in permissions:
+            if permission.matches(resource, action, None):
+                return True
+    return False
+
+
+class StubGroups:
+    def __init__(self, names):
+        self.names = names
+
+    def values_list(self, *fields, flat=False):
+        return list(self.names)
+
+
+class StubUser:
+    """Stands in for a request's user; groups are its roles."""
+
+    is_active = True
+
+    def __init__(self, roles):
+        self.groups = StubGroups(roles)
+
+
+def rate(check, queries, seconds):
+    """Run check over queries for about ``seconds``; returns checks per second."""
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for query in queries:
+            check(*query)
+        done += len(queries)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RBAC permission checks')
+    parser.add_argument('--depths', type=int, nargs='+', default=[5, 20, 50], help='Role hierarchy depths')
+    parser.add_argument('--permissions', type=int, default=20, help='Permissions added per role')
+    parser.add_argument('--resources', type=int, default=40, help='Distinct resources')
+    parser.add_argument('--checks', type=int, default=200, help='Distinct checks in the request mix')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Time spent per measurement')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from auth_package.django_integration import RoleBasedPermissionBackend, parse_permission
+    from auth_package.permissions import RoleBasedPermission, RoleRegistry
+
+    rng = random.Random(args.seed)
+    print(f"{'depth':>5} {'walk/s':>12} {'compiled/s':>12} {'has_perm/s':>12} {'speedup':>8}")
+    for depth in args.depths:
+        registry = RoleRegistry()
+        leaf = build_hierarchy(registry, depth, args.permissions, args.resources)
+        roles = [leaf, 'user']
+        perms = [
+            f"resource{rng.randrange(args.resources + 5)}.{rng.choice(ACTIONS)}" for _ in range(args.checks)
+        ]
+        queries = [(roles, *parse_permission(perm)) for perm in perms]
+
+        checker = RoleBasedPermission(registry)
+        backend = RoleBasedPermissionBackend()
+        backend.permission_checker = checker
+        user = StubUser(roles)
+
+        assert all(checker.check_permission(*query) == legacy_check(registry, *query) for query in queries)
+
+        walk = rate(lambda *query: legacy_check(registry, *query), queries, args.seconds)
+        compiled = rate(checker.check_permission, queries, args.seconds)
+        has_perm = rate(backend.has_perm, [(user, perm) for perm in perms], args.seconds)
+        print(f"{depth:>5} {walk:>12.0f} {compiled:>12.0f} {has_perm:>12.0f} {compiled / walk:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
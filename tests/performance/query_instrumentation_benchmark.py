@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Query Instrumentation Benchmark
+Measures the per-query cost of enterprise_database.instrumentation by
+running the same primary key lookup against an in-memory SQLite database
+with and without the execute wrapper installed, inside a tracked request
+scope.
+
+Usage:
+    python tests/performance/query_instrumentation_benchmark.py --queries 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'database', 'src')))
+
+
+def rate(queries):
+    """Run ``queries`` lookups; returns queries per second."""
+    from django.db import connection
+
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for i in range(queries):
+            cursor.execute('SELECT id, name FROM items WHERE id = %s', [i % 100])
+            cursor.fetchall()
+    return queries / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark query instrumentation overhead')
+    parser.add_argument('--queries', type=int, default=20000, help='Queries per measurement')
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    settings.configure(DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}})
+    django.setup()
+
+    from django.db import connection
+    from enterprise_database.instrumentation import QueryInstrumentation
+
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+        cursor.executemany('INSERT INTO items VALUES (%s, %s)', [(i, f'item-{i}') for i in range(100)])
+
+    rate(1000)  # warm up
+    plain = rate(args.queries)
+
+    instrumentation = QueryInstrumentation(n_plus_one_threshold=args.queries * 2)
+    instrumentation.enable()
+    with instrumentation.track('benchmark'):
+        instrumented = rate(args.queries)
+    stats = instrumentation.get_stats()['fingerprints'][0]
+
+    print(f"sqlite3 in memory, {args.queries} queries")
+    print(f"{'path':<16} {'queries/s':>12} {'per query':>12}")
+    for name, per_second in (('plain', plain), ('instrumented', instrumented)):
+        print(f"{name:<16} {per_second:>12.0f} {1e6 / per_second:>10.1f}us")
+    print(f"overhead: {1e6 / instrumented - 1e6 / plain:.1f}us per query")
+    print(f"recorded p50 {stats['p50'] * 1e6:.0f}us, p99 {stats['p99'] * 1e6:.0f}us over {stats['count']} queries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Session Store Benchmark
+Fills a SessionManager with live sessions, then times logins, session
+validation, cleanup and the suspicious session listing. Cleanup pops the
+sessions that ended off the expiry index and the listing reads the
+suspicious index; the full scan over every session that both used to do
+is timed alongside for comparison.
+
+Usage:
+    python tests/performance/session_benchmark.py --sessions 1000000 --expiring 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.abspath(os.path.join(ROOT, 'packages', 'auth', 'src')))
+
+
+def rate(operation, items, seconds):
+    """Run operation over items for about ``seconds``; returns operations per second."""
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for item in items:
+            operation(item)
+        done += len(items)
+    return done / (time.perf_counter() - start)
+
+
+def timed(operation):
+    start = time.perf_counter()
+    result = operation()
+    return result, time.perf_counter() - start
+
+
+def full_scan(manager, chunk_size=10000):
+    """Load every session in chunks and count the ended ones, as cleanup used to."""
+    session_ids = [session_id for session_id, _ in manager.store.zrange_by_score(manager.EXPIRY_INDEX, float('inf'))]
+    ended = 0
+    for start in range(0, len(session_ids), chunk_size):
+        sessions = manager._load_sessions(session_ids[start:start + chunk_size])
+        ended += sum(session is None or not session.is_active for session in sessions.values())
+    return ended
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark session indexes at scale')
+    parser.add_argument('--sessions', type=int, default=1000000, help='Live sessions in the store')
+    parser.add_argument('--per-user', type=int, default=4, help='Sessions per user')
+    parser.add_argument('--expiring', type=int, default=10000, help='Sessions that expire before cleanup')
+    parser.add_argument('--suspicious', type=int, default=100, help='Sessions flagged suspicious')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Time spent per rate measurement')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    from auth_package.session_management import DeviceInfo, SessionManager
+    from auth_package.storage import InMemoryStateStore
+
+    rng = random.Random(args.seed)
+    store = InMemoryStateStore(max_keys=4 * args.sessions)
+    manager = SessionManager(store=store)
+    short_lived = SessionManager({"session_timeout": 1}, store=store)
+
+    def device(user):
+        return DeviceInfo(device_id=f"device{user}", user_agent="Benchmark Browser", ip_address="10.0.0.1")
+
+    start = time.perf_counter()
+    sessions = []
+    for i in range(args.sessions):
+        user = i // args.per_user
+        target = short_lived if i < args.expiring else manager
+        sessions.append((target.create_session(f"user{user}", device(user)).session_id, user))
+    print(f"created {args.sessions} sessions in {time.perf_counter() - start:.1f}s")
+
+    live = sessions[args.expiring:]
+    flagged = rng.sample(live, args.suspicious)
+    for session_id, _ in flagged:
+        manager.validate_session(session_id, DeviceInfo(device_id="other", user_agent="Other", ip_address="10.0.0.2"))
+    flagged = set(flagged)
+    sample = [entry for entry in rng.sample(live, 1000 + args.suspicious) if entry not in flagged][:1000]
+
+    validate_rate = rate(lambda entry: manager.validate_session(entry[0], device(entry[1])), sample, args.seconds)
+    users = iter(range(args.sessions, 10 * args.sessions))
+    login_rate = rate(lambda _: manager.create_session(f"user{next(users)}", device(0)), range(1000), args.seconds)
+    # Users already at the limit, so each login revokes their idlest session
+    full_users = [f"user{user}" for user in rng.sample(range(args.expiring // args.per_user + 1,
+                                                             args.sessions // args.per_user), 1000)]
+    for user in full_users:
+        manager.create_session(user, device(0))
+    limited_rate = rate(lambda user: manager.create_session(user, device(0)), full_users, args.seconds)
+
+    time.sleep(1.5)  # Let the short-lived sessions expire
+    (suspicious, suspicious_seconds) = timed(manager.get_suspicious_sessions)
+    (scanned, scan_seconds) = timed(lambda: full_scan(manager))
+    (cleaned, cleanup_seconds) = timed(manager.cleanup_expired_sessions)
+
+    print(f"{manager.store.zcard(manager.EXPIRY_INDEX)} sessions indexed after cleanup")
+    print(f"{'operation':<40} {'result':>12}")
+    print(f"{'validate_session':<40} {validate_rate:>10.0f}/s")
+    print(f"{'create_session, new user':<40} {login_rate:>10.0f}/s")
+    print(f"{'create_session, user at the limit':<40} {limited_rate:>10.0f}/s")
+    print(f"{'get_suspicious_sessions':<40} {suspicious_seconds * 1000:>10.1f}ms  ({len(suspicious)} sessions)")
+    print(f"{'cleanup_expired_sessions':<40} {cleanup_seconds * 1000:>10.1f}ms  ({cleaned} removed)")
+    print(f"{'full scan (previous cleanup and listing)':<40} {scan_seconds * 1000:>10.1f}ms  ({scanned} ended)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tracking Pixel Benchmark
+Measures throughput of TrackOpenView with buffered tracking against the
+previous inline path (load the EmailLog, save it, load the Campaign and
+save ``emails_opened += 1``) for the same burst of pixel hits, and the
+time and queries the buffered flush needs to apply the burst.
+
+Usage:
+    python tests/performance/tracking_benchmark.py --hits 20000 --threads 8
+"""
+
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'apps', 'api')
+sys.path.insert(0, os.path.abspath(API_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.testing')
+
+
+def setup_database(path):
+    """Point Django at a file-backed SQLite database and create tables."""
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+    settings.DATABASES['default']['OPTIONS'] = {'timeout': 60}
+    settings.NEWSLETTER_TRACKING_SETTINGS = {'BACKGROUND_FLUSH': False, 'FLUSH_THRESHOLD': 10 ** 9}
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def seed(recipients):
+    """Create a sent campaign with ``recipients`` sent email logs."""
+    from django.contrib.auth import get_user_model
+    from apps.newsletter.models import Campaign, EmailLog, Subscriber
+
+    user = get_user_model().objects.create_user(username='editor', email='editor@example.com')
+    campaign = Campaign.objects.create(
+        name='Benchmark', subject='Benchmark', content_html='<p>News</p>', content_text='News',
+        campaign_type=Campaign.CampaignType.NEWSLETTER, status=Campaign.Status.SENT, created_by=user
+    )
+    subscribers = Subscriber.objects.bulk_create([
+        Subscriber(email=f'reader{i}@example.com', email_verified=True,
+                   unsubscribe_token=secrets.token_urlsafe(32))
+        for i in range(recipients)
+    ])
+    logs = EmailLog.objects.bulk_create([
+        EmailLog(campaign=campaign, subscriber=subscriber, email_address=subscriber.email,
+                 subject=campaign.subject, status=EmailLog.Status.SENT,
+                 tracking_id=secrets.token_urlsafe(32))
+        for subscriber in subscribers
+    ])
+    return campaign, [log.tracking_id for log in logs]
+
+
+def inline_open(tracking_id):
+    """The pre-buffering TrackOpenView body."""
+    from django.utils import timezone
+    from apps.newsletter.models import EmailLog
+
+    try:
+        email_log = EmailLog.objects.get(tracking_id=tracking_id)
+        if email_log.status == EmailLog.Status.SENT:
+            email_log.status = EmailLog.Status.OPENED
+            email_log.opened_at = timezone.now()
+            email_log.save()
+            campaign = email_log.campaign
+            campaign.emails_opened += 1
+            campaign.save()
+    except EmailLog.DoesNotExist:
+        pass
+
+
+def run_hits(handler, hits, threads):
+    from django.db import connection
+
+    def hit(tracking_id):
+        try:
+            handler(tracking_id)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(hit, hits))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark newsletter tracking pixel throughput')
+    parser.add_argument('--hits', type=int, default=20000, help='Pixel requests per run')
+    parser.add_argument('--recipients', type=int, default=10000, help='Distinct tracking ids')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent request threads')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_database(os.path.join(tmp, 'tracking_benchmark.sqlite3'))
+
+        from django.db import connection
+        from rest_framework.test import APIRequestFactory
+        from apps.newsletter.api_views import TrackOpenView
+        from apps.newsletter.models import Campaign, EmailLog
+        from apps.newsletter.tracking import tracking_buffer
+
+        campaign, tracking_ids = seed(args.recipients)
+        hits = [tracking_ids[i % len(tracking_ids)] for i in range(args.hits)]
+        factory = APIRequestFactory()
+        view = TrackOpenView.as_view()
+
+        def buffered_open(tracking_id):
+            view(factory.get('/'), tracking_id=tracking_id)
+
+        def reset():
+            EmailLog.objects.update(status=EmailLog.Status.SENT, opened_at=None)
+            Campaign.objects.update(emails_opened=0)
+
+        print(f"{'path':<10}{'hits':>9}{'seconds':>10}{'hits/s':>10}{'opened':>9}")
+
+        elapsed = run_hits(buffered_open, hits, args.threads)
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            flush_start = time.perf_counter()
+            tracking_buffer.flush()
+            flush_elapsed = time.perf_counter() - flush_start
+        opened = Campaign.objects.get(pk=campaign.pk).emails_opened
+        print(f"{'buffered':<10}{args.hits:>9}{elapsed:>10.2f}{args.hits / elapsed:>10.0f}{opened:>9}")
+
+        reset()
+        elapsed = run_hits(inline_open, hits, args.threads)
+        opened = Campaign.objects.get(pk=campaign.pk).emails_opened
+        print(f"{'inline':<10}{args.hits:>9}{elapsed:>10.2f}{args.hits / elapsed:>10.0f}{opened:>9}")
+
+        print(f"\nbuffered flush: {flush_elapsed:.2f}s, {queries} queries")
+        if opened != args.recipients and args.hits >= args.recipients:
+            print(f"inline path lost {args.recipients - opened} opens to concurrent read-modify-write")
+
+
+if __name__ == '__main__':
+    main()